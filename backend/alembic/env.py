@@ -23,6 +23,9 @@ from app.models.quote import Quote  # noqa: F401
 from app.models.customer_po import CustomerPO  # noqa: F401
 from app.models.vendor import Vendor  # noqa: F401
 from app.models.vendor_proposal import VendorProposal  # noqa: F401
+from app.models.vendor_tag import VendorTag  # noqa: F401
+from app.models.vendor_metrics import VendorMetrics  # noqa: F401
+from app.models.embedding import DocumentEmbedding, LineItemEmbedding  # noqa: F401
 from app.models.company import Company  # noqa: F401
 from app.models.user import User  # noqa: F401
 target_metadata = Base.metadata
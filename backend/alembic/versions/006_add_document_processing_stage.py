@@ -0,0 +1,25 @@
+"""Add processing_stage to documents for the async processing pipeline
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add processing_stage column."""
+    op.add_column('documents', sa.Column('processing_stage', sa.String(20), nullable=True))
+
+
+def downgrade() -> None:
+    """Remove processing_stage column."""
+    op.drop_column('documents', 'processing_stage')
@@ -0,0 +1,40 @@
+"""Add content_hash to documents for upload deduplication
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Add content_hash and source_document_id with a per-company unique index."""
+    op.add_column('documents', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.add_column('documents', sa.Column('source_document_id', sa.UUID(), nullable=True))
+    op.create_foreign_key(
+        'fk_documents_source_document_id', 'documents', 'documents',
+        ['source_document_id'], ['id'],
+    )
+    op.create_index(
+        'uq_document_company_content_hash',
+        'documents',
+        ['company_id', 'content_hash'],
+        unique=True,
+        postgresql_where=sa.text('source_document_id IS NULL AND deleted_at IS NULL'),
+    )
+
+
+def downgrade() -> None:
+    """Remove content_hash and source_document_id."""
+    op.drop_index('uq_document_company_content_hash', table_name='documents')
+    op.drop_constraint('fk_documents_source_document_id', 'documents', type_='foreignkey')
+    op.drop_column('documents', 'source_document_id')
+    op.drop_column('documents', 'content_hash')
@@ -0,0 +1,43 @@
+"""Add (company_id, created_at, id) indexes for keyset pagination
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-16
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+# (index name, table, columns)
+INDEXES = [
+    ('ix_deal_company_created', 'deal', ['company_id', 'created_at', 'id']),
+    ('ix_quote_company_created', 'quote', ['company_id', 'created_at', 'id']),
+    ('ix_customer_po_company_created', 'customer_po', ['company_id', 'created_at', 'id']),
+    ('ix_customer_company_created', 'customer', ['company_id', 'created_at', 'id']),
+    ('ix_vendors_company_created', 'vendors', ['company_id', 'created_at', 'id']),
+    ('ix_vendor_proposals_company_created', 'vendor_proposals', ['company_id', 'created_at', 'id']),
+    ('ix_document_company_created', 'documents', ['company_id', 'created_at', 'id']),
+    ('ix_activity_logs_deal_created', 'activity_log', ['company_id', 'deal_id', 'created_at', 'id']),
+    (
+        'ix_activity_logs_entity_created',
+        'activity_log',
+        ['company_id', 'entity_type', 'entity_id', 'created_at', 'id'],
+    ),
+]
+
+
+def upgrade() -> None:
+    """Index list orderings so cursor pages are index seeks."""
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Remove the keyset pagination indexes."""
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,31 @@
+"""Add sequence_counter for generated deal/quote/PO/vendor/customer numbers
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-16
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Create sequence_counter (rows are seeded from existing numbers on first use)."""
+    op.create_table(
+        'sequence_counter',
+        sa.Column('company_id', sa.UUID(), sa.ForeignKey('company.id'), nullable=False),
+        sa.Column('name', sa.String(50), nullable=False),
+        sa.Column('value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('company_id', 'name'),
+    )
+
+
+def downgrade() -> None:
+    """Drop sequence_counter."""
+    op.drop_table('sequence_counter')
@@ -0,0 +1,140 @@
+"""Partition activity_log by month of created_at
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-16
+
+On PostgreSQL the table is rebuilt as a RANGE partitioned table with one
+partition per month of existing rows (through PARTITIONS_AHEAD months
+from now) plus a DEFAULT partition, and the rows copied across. The copy
+holds an exclusive lock on activity_log; run it in a maintenance window
+on large tables. Afterwards app.services.audit_retention keeps
+partitions created ahead and archives months past retention.
+
+Elsewhere (SQLite development databases) the table stays as it is. On
+both, the single-column indexes go: the timeline indexes from 008 serve
+the reads, and every extra index is paid on each insert.
+"""
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+PARTITIONS_AHEAD = 3
+
+# Names from 001/002, and from create_all of the previous model
+REDUNDANT_INDEXES = [
+    'ix_activity_log_deal_id',
+    'ix_activity_log_created_at',
+    'ix_activity_log_company_id',
+    'ix_activity_logs_company_id',
+    'ix_activity_logs_entity',
+]
+
+TIMELINE_INDEXES = [
+    ('ix_activity_logs_deal_created', ['company_id', 'deal_id', 'created_at', 'id']),
+    ('ix_activity_logs_entity_created', ['company_id', 'entity_type', 'entity_id', 'created_at', 'id']),
+]
+
+COLUMNS = 'id, company_id, deal_id, user_id, action, entity_type, entity_id, changes, created_at'
+
+
+def _month(value: datetime) -> datetime:
+    value = value.astimezone(timezone.utc) if value.tzinfo else value
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def _next_month(month: datetime) -> datetime:
+    return datetime(month.year + month.month // 12, month.month % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def upgrade() -> None:
+    """Partition activity_log by month (PostgreSQL) and drop its redundant indexes."""
+    for name in REDUNDANT_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+
+    # The new table reuses these names
+    for name, _ in TIMELINE_INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+    op.execute('ALTER TABLE activity_log RENAME TO activity_log_unpartitioned')
+    op.execute('ALTER TABLE activity_log_unpartitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_unpartitioned_pkey')
+
+    op.execute("""
+        CREATE TABLE activity_log (
+            id UUID NOT NULL,
+            company_id UUID REFERENCES company (id),
+            deal_id UUID,
+            user_id UUID,
+            action VARCHAR(50) NOT NULL,
+            entity_type VARCHAR(50) NOT NULL,
+            entity_id UUID NOT NULL,
+            changes JSON NOT NULL,
+            created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute('CREATE TABLE activity_log_default PARTITION OF activity_log DEFAULT')
+
+    now = datetime.now(timezone.utc)
+    oldest = bind.execute(sa.text('SELECT min(created_at) FROM activity_log_unpartitioned')).scalar()
+    month = _month(oldest or now)
+    last = _month(now)
+    for _ in range(PARTITIONS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE activity_log_p{month.year:04d}_{month.month:02d} PARTITION OF activity_log "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+        )
+        month = _next_month(month)
+
+    op.execute(f'INSERT INTO activity_log ({COLUMNS}) SELECT {COLUMNS} FROM activity_log_unpartitioned')
+    op.execute('DROP TABLE activity_log_unpartitioned')
+
+    # Created on the parent, so on every partition (current and future)
+    for name, columns in TIMELINE_INDEXES:
+        op.create_index(name, 'activity_log', columns)
+
+
+def downgrade() -> None:
+    """Copy activity_log back into a plain table and restore its indexes."""
+    bind = op.get_bind()
+    if bind.dialect.name == 'postgresql':
+        for name, _ in TIMELINE_INDEXES:
+            op.execute(f'DROP INDEX IF EXISTS {name}')
+        op.execute('ALTER TABLE activity_log RENAME TO activity_log_partitioned')
+        op.execute('ALTER TABLE activity_log_partitioned RENAME CONSTRAINT activity_log_pkey TO activity_log_partitioned_pkey')
+        op.create_table(
+            'activity_log',
+            sa.Column('id', sa.UUID(), nullable=False),
+            sa.Column('company_id', sa.UUID(), sa.ForeignKey('company.id'), nullable=True),
+            sa.Column('deal_id', sa.UUID(), nullable=True),
+            sa.Column('user_id', sa.UUID(), nullable=True),
+            sa.Column('action', sa.String(50), nullable=False),
+            sa.Column('entity_type', sa.String(50), nullable=False),
+            sa.Column('entity_id', sa.UUID(), nullable=False),
+            sa.Column('changes', sa.JSON(), nullable=False),
+            sa.Column('created_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.execute(f'INSERT INTO activity_log ({COLUMNS}) SELECT {COLUMNS} FROM activity_log_partitioned')
+        # Drops the partitions with it
+        op.execute('DROP TABLE activity_log_partitioned')
+        for name, columns in TIMELINE_INDEXES:
+            op.create_index(name, 'activity_log', columns)
+
+    op.create_index('ix_activity_log_deal_id', 'activity_log', ['deal_id'])
+    op.create_index('ix_activity_log_created_at', 'activity_log', ['created_at'])
+    op.create_index('ix_activity_logs_company_id', 'activity_log', ['company_id'])
+    op.create_index('ix_activity_logs_entity', 'activity_log', ['entity_type', 'entity_id'])
@@ -0,0 +1,137 @@
+"""Add text search and autocomplete indexes on vendors/customers, and vendor_tags
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-16
+
+Name/code search moves off '%q%' scans: a pg_trgm GIN index on
+PostgreSQL, a trigram FTS5 table kept in step by triggers on SQLite (see
+app.models.search_index). Autocomplete gets lower(name)/lower(code)
+prefix indexes, and vendor product categories and certifications are
+copied into vendor_tags so filters on them are index lookups.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = {
+    'vendors': ('company_name', 'vendor_code'),
+    'customer': ('company_name', 'customer_code'),
+}
+
+PREFIX_INDEXES = [
+    ('ix_vendors_name_prefix', 'vendors', 'company_name'),
+    ('ix_vendors_code_prefix', 'vendors', 'vendor_code'),
+    ('ix_customer_name_prefix', 'customer', 'company_name'),
+    ('ix_customer_code_prefix', 'customer', 'customer_code'),
+]
+
+# The DDL of app.models.search_index as of this revision
+
+
+def _sqlite_search(table: str, columns) -> None:
+    fts = f"{table}_fts"
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table}', content_rowid='rowid', tokenize='trigram')"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new}); END"
+    )
+    # Index the rows already there
+    op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def _postgresql_search(table: str, columns) -> None:
+    search_text = " || ' ' || ".join(columns)
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        f"CREATE INDEX IF NOT EXISTS ix_{table}_search_trgm ON {table} "
+        f"USING gin (({search_text}) gin_trgm_ops)"
+    )
+
+
+# JSON column on vendors -> vendor_tags.kind
+TAG_COLUMNS = {'product_categories': 'category', 'certifications': 'certification'}
+
+
+def upgrade() -> None:
+    """Create the search indexes and vendor_tags, and fill them from existing rows."""
+    dialect = op.get_bind().dialect.name
+
+    for table, columns in SEARCH_COLUMNS.items():
+        if dialect == 'postgresql':
+            _postgresql_search(table, columns)
+        elif dialect == 'sqlite':
+            _sqlite_search(table, columns)
+
+    for name, table, column in PREFIX_INDEXES:
+        ops = ' text_pattern_ops' if dialect == 'postgresql' else ''
+        op.execute(f"CREATE INDEX {name} ON {table} (company_id, lower({column}){ops})")
+
+    op.create_table(
+        'vendor_tags',
+        sa.Column('vendor_id', sa.UUID(), sa.ForeignKey('vendors.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('kind', sa.String(20), nullable=False),
+        sa.Column('value', sa.String(200), nullable=False),
+        sa.Column('company_id', sa.UUID(), sa.ForeignKey('company.id'), nullable=False),
+        sa.PrimaryKeyConstraint('vendor_id', 'kind', 'value'),
+    )
+    op.create_index(
+        'ix_vendor_tags_company_kind_value', 'vendor_tags',
+        ['company_id', 'kind', 'value', 'vendor_id'],
+        postgresql_ops={'value': 'text_pattern_ops'},
+    )
+
+    for column, kind in TAG_COLUMNS.items():
+        if dialect == 'postgresql':
+            elements = f"json_array_elements_text(CASE WHEN json_typeof(v.{column}) = 'array' THEN v.{column} ELSE '[]'::json END) AS e(value)"
+            value = "e.value"
+        else:
+            elements = f"json_each(CASE WHEN json_type(v.{column}) = 'array' THEN v.{column} ELSE '[]' END) AS e"
+            value = "CAST(e.value AS TEXT)"
+        op.execute(
+            "INSERT INTO vendor_tags (vendor_id, kind, value, company_id) "
+            f"SELECT DISTINCT v.id, '{kind}', substr(lower(trim({value})), 1, 200), v.company_id "
+            f"FROM vendors v, {elements} "
+            f"WHERE trim({value}) <> ''"
+        )
+
+
+def downgrade() -> None:
+    """Drop vendor_tags and the search indexes."""
+    dialect = op.get_bind().dialect.name
+
+    op.drop_index('ix_vendor_tags_company_kind_value', table_name='vendor_tags')
+    op.drop_table('vendor_tags')
+
+    for name, table, _ in PREFIX_INDEXES:
+        op.drop_index(name, table_name=table)
+
+    for table in SEARCH_COLUMNS:
+        if dialect == 'postgresql':
+            op.execute(f"DROP INDEX IF EXISTS ix_{table}_search_trgm")
+        elif dialect == 'sqlite':
+            fts = f"{table}_fts"
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            op.execute(f"DROP TABLE IF EXISTS {fts}")
@@ -0,0 +1,119 @@
+"""Add full text search over documents and indexes on parsed_data fields
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-17
+
+Documents get a word index over original_filename, description,
+extracted_text and the values of parsed_data: a search_vector tsvector
+column kept current by a trigger (and a GIN index) on PostgreSQL, an
+FTS5 table (with company_id) kept in step by triggers on SQLite (see
+app.models.search_index). The rfq_number, vendor_name and invoice_number
+fields of parsed_data get company-scoped lower() indexes.
+
+On PostgreSQL the backfill rewrites every document row once; run it in a
+maintenance window on large tables.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+TEXT_COLUMNS = ('original_filename', 'description', 'extracted_text')
+JSON_COLUMNS = ('parsed_data',)
+PARSED_FIELDS = ('rfq_number', 'vendor_name', 'invoice_number')
+
+# The DDL of app.models.search_index as of this revision
+
+
+def _tsvector(row: str = '') -> str:
+    parts = [f"to_tsvector('english', coalesce({row}{c}, ''))" for c in TEXT_COLUMNS]
+    parts += [
+        f"json_to_tsvector('english', coalesce({row}{c}, '{{}}'::json), '[\"string\", \"numeric\"]')"
+        for c in JSON_COLUMNS
+    ]
+    return " || ".join(parts)
+
+
+def _postgresql_search() -> None:
+    watched = ", ".join(TEXT_COLUMNS + JSON_COLUMNS)
+    op.execute("ALTER TABLE documents ADD COLUMN IF NOT EXISTS search_vector tsvector")
+    op.execute(
+        "CREATE OR REPLACE FUNCTION documents_search_vector_update() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector := {_tsvector(row='NEW.')}; "
+        "RETURN NEW; END $$ LANGUAGE plpgsql"
+    )
+    op.execute("DROP TRIGGER IF EXISTS documents_search_vector ON documents")
+    op.execute(
+        f"CREATE TRIGGER documents_search_vector BEFORE INSERT OR UPDATE OF {watched} ON documents "
+        "FOR EACH ROW EXECUTE FUNCTION documents_search_vector_update()"
+    )
+    # Index the rows already there
+    op.execute(f"UPDATE documents SET search_vector = {_tsvector()}")
+    op.execute("CREATE INDEX IF NOT EXISTS ix_documents_search_vector ON documents USING gin (search_vector)")
+
+
+def _sqlite_search() -> None:
+    # company_id first, so searches match the tenant inside the index
+    fts_columns = ('company_id',) + TEXT_COLUMNS + JSON_COLUMNS
+    cols = ", ".join(fts_columns)
+    new = ", ".join(f"new.{c}" for c in fts_columns)
+    old = ", ".join(f"old.{c}" for c in fts_columns)
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5("
+        f"{cols}, content='documents', content_rowid='rowid', tokenize='porter unicode61')"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS documents_fts_ai AFTER INSERT ON documents BEGIN "
+        f"INSERT INTO documents_fts(rowid, {cols}) VALUES (new.rowid, {new}); END"
+    )
+    op.execute(
+        "CREATE TRIGGER IF NOT EXISTS documents_fts_ad AFTER DELETE ON documents BEGIN "
+        f"INSERT INTO documents_fts(documents_fts, rowid, {cols}) VALUES ('delete', old.rowid, {old}); END"
+    )
+    op.execute(
+        f"CREATE TRIGGER IF NOT EXISTS documents_fts_au AFTER UPDATE OF {cols} ON documents BEGIN "
+        f"INSERT INTO documents_fts(documents_fts, rowid, {cols}) VALUES ('delete', old.rowid, {old}); "
+        f"INSERT INTO documents_fts(rowid, {cols}) VALUES (new.rowid, {new}); END"
+    )
+    # Index the rows already there
+    op.execute("INSERT INTO documents_fts(documents_fts) VALUES ('rebuild')")
+
+
+def upgrade() -> None:
+    """Create the document search index and the parsed_data field indexes."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        _postgresql_search()
+    elif dialect == 'sqlite':
+        _sqlite_search()
+
+    for field in PARSED_FIELDS:
+        if dialect == 'postgresql':
+            expression = f"lower(parsed_data ->> '{field}') text_pattern_ops"
+        else:
+            expression = f"lower(json_extract(parsed_data, '$.{field}'))"
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_documents_{field} ON documents (company_id, {expression})")
+
+
+def downgrade() -> None:
+    """Drop the parsed_data field indexes and the document search index."""
+    dialect = op.get_bind().dialect.name
+
+    for field in PARSED_FIELDS:
+        op.execute(f"DROP INDEX IF EXISTS ix_documents_{field}")
+
+    if dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_documents_search_vector")
+        op.execute("DROP TRIGGER IF EXISTS documents_search_vector ON documents")
+        op.execute("DROP FUNCTION IF EXISTS documents_search_vector_update()")
+        op.execute("ALTER TABLE documents DROP COLUMN IF EXISTS search_vector")
+    elif dialect == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            op.execute(f"DROP TRIGGER IF EXISTS documents_fts_{suffix}")
+        op.execute("DROP TABLE IF EXISTS documents_fts")
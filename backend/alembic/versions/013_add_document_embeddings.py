@@ -0,0 +1,72 @@
+"""Add document and line item embeddings for similarity search
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-17
+
+document_embeddings holds one vector per document (its text and
+description), line_item_embeddings one per line item AI extraction found
+in a document. On PostgreSQL the columns are pgvector vector(256) with
+HNSW cosine indexes; elsewhere they hold float32 bytes.
+
+Existing documents are not embedded here (that needs the configured
+embedding backend): run the maintenance.embed_documents task once after
+upgrading.
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+# app.models.embedding.EMBEDDING_DIMENSIONS as of this revision
+DIMENSIONS = 256
+
+TABLES = ('document_embeddings', 'line_item_embeddings')
+
+
+def upgrade() -> None:
+    """Create the embedding tables and their vector indexes."""
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+        vector = Vector(DIMENSIONS)
+    else:
+        vector = sa.LargeBinary()
+
+    op.create_table(
+        'document_embeddings',
+        sa.Column('document_id', sa.UUID(), sa.ForeignKey('documents.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('company_id', sa.UUID(), sa.ForeignKey('company.id'), nullable=False),
+        sa.Column('embedding', vector, nullable=False),
+    )
+    op.create_table(
+        'line_item_embeddings',
+        sa.Column('id', sa.UUID(), primary_key=True),
+        sa.Column('document_id', sa.UUID(), sa.ForeignKey('documents.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('company_id', sa.UUID(), sa.ForeignKey('company.id'), nullable=False),
+        sa.Column('line_index', sa.Integer(), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('material_spec', sa.Text(), nullable=True),
+        sa.Column('embedding', vector, nullable=False),
+        sa.UniqueConstraint('document_id', 'line_index', name='uq_line_item_embeddings_document_line'),
+    )
+
+    if dialect == 'postgresql':
+        for table in TABLES:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS ix_{table}_embedding_hnsw ON {table} "
+                "USING hnsw (embedding vector_cosine_ops)"
+            )
+
+
+def downgrade() -> None:
+    """Drop the embedding tables (and with them their indexes)."""
+    op.drop_table('line_item_embeddings')
+    op.drop_table('document_embeddings')
@@ -0,0 +1,64 @@
+"""Add vendor_metrics and proposal fulfilment timestamps
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-17
+
+vendor_metrics holds the running counts and averages that vendors'
+credibility_score, on_time_delivery_rate, quality_score and
+avg_lead_time_days are now derived from. vendor_proposals gain
+decided_at, shipped_at and delivered_at, which the metrics are computed
+from.
+
+Proposals decided before this revision get decided_at = updated_at.
+Run the maintenance.recompute_vendor_metrics task once after upgrading
+to fill vendor_metrics.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+TIMESTAMPS = ('decided_at', 'shipped_at', 'delivered_at')
+
+
+def upgrade() -> None:
+    """Create vendor_metrics and add the proposal timestamps."""
+    op.create_table(
+        'vendor_metrics',
+        sa.Column('vendor_id', sa.UUID(), sa.ForeignKey('vendors.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('company_id', sa.UUID(), sa.ForeignKey('company.id'), nullable=False),
+        sa.Column('proposals_decided', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('proposals_won', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quality_samples', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('quality_ewma', sa.Float(), nullable=True),
+        sa.Column('lead_time_samples', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('lead_time_ewma', sa.Float(), nullable=True),
+        sa.Column('deliveries', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('on_time_ewma', sa.Float(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+    )
+    op.create_index('ix_vendor_metrics_company_id', 'vendor_metrics', ['company_id'])
+
+    with op.batch_alter_table('vendor_proposals') as batch_op:
+        for column in TIMESTAMPS:
+            batch_op.add_column(sa.Column(column, sa.DateTime(timezone=True), nullable=True))
+    # 003 created status as a string holding values, the ORM's enum stores names
+    op.execute(
+        "UPDATE vendor_proposals SET decided_at = updated_at "
+        "WHERE lower(CAST(status AS VARCHAR(50))) IN ('selected', 'rejected')"
+    )
+
+
+def downgrade() -> None:
+    """Drop the proposal timestamps and vendor_metrics."""
+    with op.batch_alter_table('vendor_proposals') as batch_op:
+        for column in TIMESTAMPS:
+            batch_op.drop_column(column)
+    op.drop_index('ix_vendor_metrics_company_id', table_name='vendor_metrics')
+    op.drop_table('vendor_metrics')
@@ -4,7 +4,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query, status
 
-from app.deps import CurrentUserDep, SessionDep
+from app.deps import CurrentUserDep, CursorDep, SessionDep
 from app.models.customer_po import CustomerPOStatus
 from app.schemas.customer_po import (
     CustomerPOCreate,
@@ -13,6 +13,7 @@ from app.schemas.customer_po import (
     CustomerPOStatusUpdate,
     CustomerPOUpdate,
 )
+from app.services.counts import TotalMode
 from app.services.customer_po import CustomerPOService
 
 router = APIRouter(
@@ -44,6 +45,8 @@ async def list_customer_pos(
     current_user: CurrentUserDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
+    include_total: TotalMode = Query(TotalMode.EXACT),
     customer_id: Optional[UUID] = Query(None),
     deal_id: Optional[UUID] = Query(None),
     quote_id: Optional[UUID] = Query(None),
@@ -58,6 +61,8 @@ async def list_customer_pos(
     return await service.list_customer_pos(
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        include_total=include_total,
         customer_id=customer_id,
         deal_id=deal_id,
         quote_id=quote_id,
@@ -1,14 +1,15 @@
 """API endpoints for customer management."""
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query, status
 
-from app.deps import CurrentUserDep, SessionDep
+from app.deps import CurrentUserDep, CursorDep, SessionDep
 from app.schemas.customer import (
     CustomerCreate,
     CustomersListResponse,
     CustomerResponse,
+    CustomerSuggestion,
     CustomerUpdate,
 )
 from app.schemas.deal import DealListResponse
@@ -48,6 +49,7 @@ async def list_customers(
     current_user: CurrentUserDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
     is_active: Optional[bool] = Query(None),
     country: Optional[str] = Query(None),
     search: Optional[str] = Query(None),
@@ -61,12 +63,29 @@ async def list_customers(
     return await service.list_customers(
         skip=skip,
         limit=limit,
+        cursor=cursor,
         is_active=is_active,
         country=country,
         search=search,
     )
 
 
+@router.get("/autocomplete", response_model=List[CustomerSuggestion])
+async def autocomplete_customers(
+    db: SessionDep,
+    current_user: CurrentUserDep,
+    q: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """Suggest active customers whose name or code starts with q."""
+    service = CustomerService(
+        db,
+        user_id=current_user["user_id"],
+        company_id=current_user["company_id"]
+    )
+    return await service.autocomplete_customers(q, limit=limit)
+
+
 @router.get("/{customer_id}", response_model=CustomerResponse)
 async def get_customer(
     customer_id: UUID,
@@ -1,12 +1,12 @@
 """API endpoints for deal management."""
 import traceback
-from typing import Optional
+from typing import List, Optional
 from uuid import UUID
 
 import structlog
 from fastapi import APIRouter, HTTPException, Query, status
 
-from app.deps import CurrentUserDep, SessionDep
+from app.deps import CurrentUserDep, CursorDep, SessionDep
 from app.models.deal import DealStatus
 from app.schemas.deal import (
     DealCreate,
@@ -15,8 +15,10 @@ from app.schemas.deal import (
     DealStatusUpdate,
     DealUpdate,
 )
-from app.schemas.activity_log import DealActivityListResponse
+from app.schemas.activity_log import DealActivityListResponse, DealTimelineResponse
+from app.services.counts import TotalMode
 from app.services.deal import DealService
+from app.services.pagination import next_cursor
 
 logger = structlog.get_logger(__name__)
 
@@ -61,6 +63,8 @@ async def list_deals(
     current_user: CurrentUserDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
+    include_total: TotalMode = Query(TotalMode.EXACT),
     status: Optional[DealStatus] = Query(None),
     customer_id: Optional[UUID] = Query(None),
 ):
@@ -74,6 +78,8 @@ async def list_deals(
         return await service.list_deals(
             skip=skip,
             limit=limit,
+            cursor=cursor,
+            include_total=include_total,
             status=status,
             customer_id=customer_id,
         )
@@ -233,6 +239,7 @@ async def get_deal_activity(
     current_user: CurrentUserDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
 ):
     """Get activity logs for a deal."""
     try:
@@ -250,10 +257,12 @@ async def get_deal_activity(
             )
 
         logs, total = await service.activity_log_service.get_deal_activity_logs(
-            deal_id, skip=skip, limit=limit
+            deal_id, skip=skip, limit=limit, cursor=cursor
         )
 
-        return DealActivityListResponse(activity_logs=logs, total=total)
+        return DealActivityListResponse(
+            activity_logs=logs, total=total, next_cursor=next_cursor(logs, limit)
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -262,3 +271,55 @@ async def get_deal_activity(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get deal activity: {str(e)}",
         )
+
+
+@router.get("/{deal_id}/timeline", response_model=DealTimelineResponse)
+async def get_deal_timeline(
+    deal_id: UUID,
+    db: SessionDep,
+    current_user: CurrentUserDep,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: CursorDep = None,
+    entity_type: Optional[List[str]] = Query(None),
+    include_total: TotalMode = Query(TotalMode.NONE),
+):
+    """
+    Get a deal's full history in one list: the deal's own events and its
+    quotes', customer POs' and vendor proposals', newest first.
+
+    Filter with entity_type (repeatable: deal, quote, customer_po,
+    vendor_proposal); page with cursor.
+    """
+    try:
+        service = DealService(
+            db,
+            user_id=current_user["user_id"],
+            company_id=current_user["company_id"]
+        )
+        # Verify deal exists first
+        deal = await service.get_deal(deal_id)
+        if not deal:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Deal {deal_id} not found",
+            )
+
+        events, total = await service.activity_log_service.get_deal_timeline(
+            deal_id,
+            limit=limit,
+            cursor=cursor,
+            entity_types=entity_type,
+            include_total=include_total,
+        )
+
+        return DealTimelineResponse(
+            events=events, total=total, next_cursor=next_cursor(events, limit)
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error("Failed to get deal timeline", error=str(e), traceback=traceback.format_exc())
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to get deal timeline: {str(e)}",
+        )
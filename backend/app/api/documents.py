@@ -2,26 +2,36 @@
 from typing import Optional
 from uuid import UUID
 
-from fastapi import APIRouter, HTTPException, Query, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, Query, status, File, UploadFile, Form
 from fastapi.responses import JSONResponse
 
-from app.deps import CurrentUserDep, SessionDep
+from app.deps import CurrentUserDep, CursorDep, SessionDep
 from app.models.document import DocumentCategory
 from app.schemas.document import (
     DocumentListResponse,
     DocumentResponse,
     DocumentDownloadUrlResponse,
     DocumentResponseWithoutText,
+    DocumentSearchHit,
+    DocumentSearchResponse,
+    DocumentStatusResponse,
+    SimilarDocument,
+    SimilarDocumentsResponse,
+    SimilarLineItem,
+    SimilarLineItemsResponse,
 )
-from app.services.document import DocumentService
+from app.services.counts import TotalMode
+from app.services.document import DocumentService, MAX_UPLOAD_SIZE
+from app.services.document_parsing import DocumentParsingService
+from app.services.pagination import next_cursor
+from app.services.storage import UploadTooLargeError
+from app.workers.document_pipeline import get_document_queue
 
 router = APIRouter(
     prefix="/api/documents",
     tags=["documents"],
 )
 
-# Maximum file size: 25MB
-MAX_FILE_SIZE = 25 * 1024 * 1024
 ALLOWED_MIME_TYPES = {
     "application/pdf",
     "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -36,7 +46,42 @@ ALLOWED_MIME_TYPES = {
 }
 
 
-@router.post("/upload", response_model=DocumentResponse, status_code=status.HTTP_201_CREATED)
+def resolve_mime_type(declared: Optional[str], head: bytes) -> str:
+    """
+    Decide an upload's MIME type from the client's header and its content.
+
+    A generic or missing declared type is replaced by the sniffed one, and a
+    declared type the content contradicts is rejected.
+
+    Args:
+        declared: Content-Type sent for the file part
+        head: First bytes of the file
+
+    Returns:
+        An allowed MIME type
+
+    Raises:
+        HTTPException: 400 if the type is unsupported or doesn't match the content
+    """
+    sniffed = DocumentParsingService.sniff_mime_types(head)
+    mime_type = declared or "application/octet-stream"
+    if mime_type == "application/octet-stream" and sniffed and len(sniffed) == 1:
+        mime_type = next(iter(sniffed))
+
+    if mime_type not in ALLOWED_MIME_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type. Allowed: PDF, Excel, Word, Images",
+        )
+    if sniffed is not None and mime_type not in sniffed:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"File content does not match its type ({mime_type})",
+        )
+    return mime_type
+
+
+@router.post("/upload", response_model=DocumentResponse, status_code=status.HTTP_202_ACCEPTED)
 async def upload_document(
     file: UploadFile = File(...),
     category: DocumentCategory = Form(...),
@@ -46,18 +91,19 @@ async def upload_document(
     tags: Optional[str] = Form(None),
     db: SessionDep = None,
     current_user: CurrentUserDep = None,
+    queue=Depends(get_document_queue),
 ):
     """
-    Upload and process a document.
+    Upload a document and queue it for processing.
 
     - Validates file size and type
-    - Uploads to MinIO
-    - Extracts text (PDF, Excel, Word, Image with OCR)
-    - Sends to Claude for structured extraction
-    - Returns document with parsed_data
+    - Uploads to MinIO, or reuses the stored file and results when the same
+      content was uploaded to the company before
+    - Queues text extraction (PDF, Excel, Word, Image with OCR) and
+      Claude structured extraction on the document pipeline
+    - Returns immediately with status PROCESSING
 
-    Returns document with status:
-    - PROCESSING: Currently being processed
+    Poll GET /api/documents/{id}/status until the status is:
     - COMPLETED: Successfully processed with parsed_data
     - FAILED: Processing failed, check error_message
     """
@@ -65,21 +111,12 @@ async def upload_document(
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
     try:
-        # Validate file size
-        content = await file.read()
-        if len(content) > MAX_FILE_SIZE:
-            raise HTTPException(
-                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                detail=f"File too large (max {MAX_FILE_SIZE / 1024 / 1024:.0f}MB)",
-            )
-
-        # Validate MIME type
-        mime_type = file.content_type or "application/octet-stream"
-        if mime_type not in ALLOWED_MIME_TYPES:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Unsupported file type. Allowed: PDF, Excel, Word, Images",
-            )
+        # Check the declared type against the file's leading bytes
+        head = await file.read(DocumentParsingService.SNIFF_LENGTH)
+        await file.seek(0)
+        if not head:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="File content cannot be empty")
+        mime_type = resolve_mime_type(file.content_type, head)
 
         # Parse tags
         tag_list = []
@@ -93,15 +130,19 @@ async def upload_document(
             user_id=current_user["user_id"],
         )
 
-        document = await service.upload_and_process_document(
-            file_content=content,
+        # Stream from the spooled upload to storage; the file is never
+        # read into memory as a whole
+        document = await service.submit_document_stream(
+            stream=file.file,
             filename=file.filename or "document",
             mime_type=mime_type,
             category=category,
+            queue=queue,
             entity_type=entity_type,
             entity_id=entity_id,
             description=description,
             tags=tag_list,
+            max_size=MAX_UPLOAD_SIZE,
         )
 
         # Return response using model_construct to avoid ORM lazy-loading issues
@@ -116,9 +157,12 @@ async def upload_document(
             original_filename=document.original_filename,
             file_size_bytes=document.file_size_bytes,
             mime_type=document.mime_type,
+            content_hash=document.content_hash,
+            source_document_id=document.source_document_id,
             extracted_text=document.extracted_text,
             parsed_data=document.parsed_data,
             status=document.status,
+            processing_stage=document.processing_stage,
             ai_confidence_score=document.ai_confidence_score,
             error_message=document.error_message,
             description=document.description,
@@ -130,6 +174,8 @@ async def upload_document(
 
     except HTTPException:
         raise
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
@@ -149,6 +195,8 @@ async def list_documents(
     category: Optional[DocumentCategory] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
+    include_total: TotalMode = Query(TotalMode.EXACT),
 ):
     """
     List documents attached to entities.
@@ -170,6 +218,8 @@ async def list_documents(
         category=category,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        include_total=include_total,
     )
 
     return DocumentListResponse(
@@ -177,6 +227,7 @@ async def list_documents(
         total=total,
         skip=skip,
         limit=limit,
+        next_cursor=next_cursor(documents, limit),
     )
 
 
@@ -187,6 +238,8 @@ async def list_company_documents(
     category: Optional[DocumentCategory] = Query(None),
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
+    include_total: TotalMode = Query(TotalMode.EXACT),
 ):
     """
     List company-level documents (not attached to any entity).
@@ -204,6 +257,8 @@ async def list_company_documents(
         category=category,
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        include_total=include_total,
     )
 
     return DocumentListResponse(
@@ -211,6 +266,132 @@ async def list_company_documents(
         total=total,
         skip=skip,
         limit=limit,
+        next_cursor=next_cursor(documents, limit),
+    )
+
+
+@router.get("/search", response_model=DocumentSearchResponse)
+async def search_documents(
+    db: SessionDep,
+    current_user: CurrentUserDep,
+    q: Optional[str] = Query(None, min_length=1, max_length=200, description="Words to find in the document"),
+    category: Optional[DocumentCategory] = Query(None),
+    entity_type: Optional[str] = Query(None),
+    entity_id: Optional[UUID] = Query(None),
+    rfq_number: Optional[str] = Query(None, description="Extracted RFQ number starts with"),
+    vendor_name: Optional[str] = Query(None, description="Extracted vendor name starts with"),
+    invoice_number: Optional[str] = Query(None, description="Extracted invoice number starts with"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: CursorDep = None,
+):
+    """
+    Search documents, newest first.
+
+    Needs q and/or one of the extracted fields:
+    - q: Words in the filename, description, extracted text or extracted data (all must match)
+    - rfq_number, vendor_name, invoice_number: Extracted data fields (prefix, case-insensitive)
+
+    Optional filters: category, entity_type, entity_id
+    """
+    service = DocumentService(
+        db=db,
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+    )
+
+    try:
+        documents, snippets = await service.search_documents(
+            q=q,
+            category=category,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            parsed_fields={
+                "rfq_number": rfq_number,
+                "vendor_name": vendor_name,
+                "invoice_number": invoice_number,
+            },
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return DocumentSearchResponse(
+        items=[
+            DocumentSearchHit.model_validate(doc).model_copy(update={"snippet": snippets.get(doc.id)})
+            for doc in documents
+        ],
+        next_cursor=next_cursor(documents, limit),
+    )
+
+
+@router.get("/similar-line-items", response_model=SimilarLineItemsResponse)
+async def find_similar_line_items(
+    db: SessionDep,
+    current_user: CurrentUserDep,
+    q: str = Query(..., min_length=1, max_length=1000, description="Line item description and/or material spec"),
+    category: Optional[DocumentCategory] = Query(None, description="e.g. rfq or vendor_proposal"),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Find line items of past documents (RFQs, vendor proposals, invoices) like a description/spec.
+
+    Line items are those AI extraction found; ranking is by embedding similarity.
+    """
+    service = DocumentService(
+        db=db,
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+    )
+
+    matches = await service.find_similar_line_items(q, category=category, limit=limit)
+    return SimilarLineItemsResponse(
+        items=[
+            SimilarLineItem(
+                document_id=document.id,
+                document_category=document.category,
+                original_filename=document.original_filename,
+                document_created_at=document.created_at,
+                line_index=line_item.line_index,
+                description=line_item.description,
+                material_spec=line_item.material_spec,
+                similarity=similarity,
+            )
+            for line_item, document, similarity in matches
+        ]
+    )
+
+
+@router.get("/{document_id}/similar", response_model=SimilarDocumentsResponse)
+async def find_similar_documents(
+    document_id: UUID,
+    db: SessionDep,
+    current_user: CurrentUserDep,
+    category: Optional[DocumentCategory] = Query(None, description="e.g. rfq or vendor_proposal"),
+    limit: int = Query(10, ge=1, le=50),
+):
+    """
+    Find past documents most similar to a document (e.g. RFQs like this RFQ).
+
+    Empty until the document has finished processing.
+    """
+    service = DocumentService(
+        db=db,
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+    )
+
+    matches = await service.find_similar_documents(document_id, category=category, limit=limit)
+    if matches is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+    return SimilarDocumentsResponse(
+        items=[
+            SimilarDocument(**DocumentResponseWithoutText.model_validate(document).model_dump(), similarity=similarity)
+            for document, similarity in matches
+        ]
     )
 
 
@@ -247,9 +428,12 @@ async def get_document(
         original_filename=document.original_filename,
         file_size_bytes=document.file_size_bytes,
         mime_type=document.mime_type,
+        content_hash=document.content_hash,
+        source_document_id=document.source_document_id,
         extracted_text=document.extracted_text,
         parsed_data=document.parsed_data,
         status=document.status,
+        processing_stage=document.processing_stage,
         ai_confidence_score=document.ai_confidence_score,
         error_message=document.error_message,
         description=document.description,
@@ -260,6 +444,35 @@ async def get_document(
     )
 
 
+@router.get("/{document_id}/status", response_model=DocumentStatusResponse)
+async def get_document_status(
+    document_id: UUID,
+    db: SessionDep,
+    current_user: CurrentUserDep,
+):
+    """
+    Get processing status for a document.
+
+    Cheap to poll after upload: returns status, the current pipeline stage
+    (queued, parse, ocr, extract) and any error, without extracted_text.
+    """
+    service = DocumentService(
+        db=db,
+        company_id=current_user["company_id"],
+        user_id=current_user["user_id"],
+    )
+
+    document = await service.get_document(document_id)
+
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found",
+        )
+
+    return DocumentStatusResponse.model_validate(document)
+
+
 @router.get("/{document_id}/download", response_model=DocumentDownloadUrlResponse)
 async def get_download_url(
     document_id: UUID,
@@ -308,12 +521,15 @@ async def re_extract_document(
     document_id: UUID,
     db: SessionDep,
     current_user: CurrentUserDep,
+    force_refresh: bool = Query(False, description="Call Claude even if a cached extraction exists"),
 ):
     """
     Re-trigger AI extraction for a document.
 
     Resets the document status to PROCESSING and retriggers extraction.
     Useful when initial extraction failed or returned incomplete data.
+    Results are cached per text, prompt version and model; pass
+    force_refresh=true to bypass the cache.
     """
     service = DocumentService(
         db=db,
@@ -322,7 +538,7 @@ async def re_extract_document(
     )
 
     try:
-        document = await service.re_extract_document(document_id)
+        document = await service.re_extract_document(document_id, force_refresh=force_refresh)
         return DocumentResponse.from_orm(document)
 
     except ValueError as e:
@@ -4,7 +4,7 @@ from uuid import UUID
 
 from fastapi import APIRouter, HTTPException, Query, status
 
-from app.deps import CurrentUserDep, SessionDep
+from app.deps import CurrentUserDep, CursorDep, SessionDep
 from app.models.quote import QuoteStatus
 from app.schemas.quote import (
     QuoteCreate,
@@ -14,6 +14,8 @@ from app.schemas.quote import (
     QuoteUpdate,
 )
 from app.schemas.activity_log import DealActivityListResponse
+from app.services.counts import TotalMode
+from app.services.pagination import next_cursor
 from app.services.quote import QuoteService
 
 router = APIRouter(
@@ -45,6 +47,8 @@ async def list_quotes(
     current_user: CurrentUserDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
+    include_total: TotalMode = Query(TotalMode.EXACT),
     customer_id: Optional[UUID] = Query(None),
     deal_id: Optional[UUID] = Query(None),
     status: Optional[QuoteStatus] = Query(None),
@@ -58,6 +62,8 @@ async def list_quotes(
     return await service.list_quotes(
         skip=skip,
         limit=limit,
+        cursor=cursor,
+        include_total=include_total,
         customer_id=customer_id,
         deal_id=deal_id,
         status=status,
@@ -174,6 +180,7 @@ async def get_quote_activity(
     current_user: CurrentUserDep,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
+    cursor: CursorDep = None,
 ):
     """Get activity logs for a quote."""
     service = QuoteService(
@@ -190,7 +197,9 @@ async def get_quote_activity(
         )
 
     logs, total = await service.activity_log_service.get_entity_activity_logs(
-        "quote", quote_id, skip=skip, limit=limit
+        "quote", quote_id, skip=skip, limit=limit, cursor=cursor
     )
 
-    return DealActivityListResponse(activity_logs=logs, total=total)
+    return DealActivityListResponse(
+        activity_logs=logs, total=total, next_cursor=next_cursor(logs, limit)
+    )
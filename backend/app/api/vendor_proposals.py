@@ -3,7 +3,7 @@ from fastapi import APIRouter, HTTPException, Query
 from uuid import UUID
 from typing import Optional
 
-from app.deps import SessionDep, CurrentUserDep
+from app.deps import SessionDep, CurrentUserDep, CursorDep
 from app.schemas.vendor_proposal import (
     VendorProposalCreate,
     VendorProposalUpdate,
@@ -101,6 +101,7 @@ async def list_proposals(
     limit: int = Query(100, ge=1, le=1000),
     deal_id: Optional[str] = Query(None),
     vendor_id: Optional[str] = Query(None),
+    cursor: CursorDep = None,
     db: SessionDep = None,
     current_user: CurrentUserDep = None,
 ):
@@ -118,6 +119,7 @@ async def list_proposals(
     result = await service.list_proposals(
         skip=skip,
         limit=limit,
+        cursor=cursor,
         deal_id=deal_id_uuid,
         vendor_id=vendor_id_uuid,
     )
@@ -129,6 +131,12 @@ async def compare_proposals(
     deal_id: UUID,
     db: SessionDep,
     current_user: CurrentUserDep,
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Currency to compare prices in"),
+    price_weight: Optional[float] = Query(None, ge=0),
+    lead_time_weight: Optional[float] = Query(None, ge=0),
+    credibility_weight: Optional[float] = Query(None, ge=0),
+    spec_match_weight: Optional[float] = Query(None, ge=0),
+    payment_terms_weight: Optional[float] = Query(None, ge=0),
 ):
     """
     HERO FEATURE: Compare all vendor proposals for a deal side-by-side.
@@ -139,17 +147,30 @@ async def compare_proposals(
     - Lead time comparison
     - Spec match status and discrepancies
     - Proposal status for each vendor
+    - Weighted score and rank; pass *_weight parameters to see how the
+      ranking changes with other weights
 
     This is the key differentiator that sells TradeFlow OS to customers:
     see all vendor options at a glance and make data-driven procurement decisions.
     """
+    weights = {
+        name: value
+        for name, value in (
+            ("price", price_weight),
+            ("lead_time", lead_time_weight),
+            ("credibility", credibility_weight),
+            ("spec_match", spec_match_weight),
+            ("payment_terms", payment_terms_weight),
+        )
+        if value is not None
+    }
     try:
         service = VendorProposalService(
             db,
             user_id=current_user["user_id"],
             company_id=current_user["company_id"],
         )
-        comparison = await service.get_proposal_comparison(deal_id)
+        comparison = await service.get_proposal_comparison(deal_id, weights=weights, base_currency=currency)
         return comparison
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
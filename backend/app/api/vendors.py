@@ -1,9 +1,18 @@
 """API routes for vendor management (M3 Procurement)."""
 from fastapi import APIRouter, HTTPException, Query
+from typing import List
 from uuid import UUID
 
-from app.deps import SessionDep, CurrentUserDep
-from app.schemas.vendor import VendorCreate, VendorUpdate, VendorResponse, VendorListResponse
+from app.deps import SessionDep, CurrentUserDep, CursorDep
+from app.schemas.vendor import (
+    VendorCreate,
+    VendorUpdate,
+    VendorResponse,
+    VendorListResponse,
+    VendorSuggestion,
+    VendorRecommendationResponse,
+)
+from app.services.counts import TotalMode
 from app.services.vendor import VendorService
 
 router = APIRouter(prefix="/api/vendors", tags=["vendors"])
@@ -33,6 +42,8 @@ async def create_vendor(
 async def list_vendors(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=1000),
+    cursor: CursorDep = None,
+    include_total: TotalMode = Query(TotalMode.EXACT),
     db: SessionDep = None,
     current_user: CurrentUserDep = None,
 ):
@@ -42,7 +53,9 @@ async def list_vendors(
         user_id=current_user["user_id"],
         company_id=current_user["company_id"],
     )
-    result = await service.list_vendors(skip=skip, limit=limit)
+    result = await service.list_vendors(
+        skip=skip, limit=limit, cursor=cursor, include_total=include_total
+    )
     return result
 
 
@@ -64,6 +77,22 @@ async def search_vendors(
     return result
 
 
+@router.get("/autocomplete", response_model=List[VendorSuggestion])
+async def autocomplete_vendors(
+    q: str = Query(..., min_length=1, description="Start of a vendor name or code"),
+    limit: int = Query(10, ge=1, le=50),
+    db: SessionDep = None,
+    current_user: CurrentUserDep = None,
+):
+    """Suggest active vendors whose name or code starts with q."""
+    service = VendorService(
+        db,
+        user_id=current_user["user_id"],
+        company_id=current_user["company_id"],
+    )
+    return await service.autocomplete_vendors(q, limit=limit)
+
+
 @router.get("/advanced", response_model=VendorListResponse)
 async def search_vendors_advanced(
     q: str = Query(None, min_length=1, description="Keyword search on name/code"),
@@ -106,6 +135,31 @@ async def search_vendors_advanced(
     return result
 
 
+@router.get("/recommend", response_model=VendorRecommendationResponse)
+async def recommend_vendors(
+    deal_id: UUID = Query(..., description="Deal whose line items to match"),
+    limit: int = Query(20, ge=1, le=200),
+    db: SessionDep = None,
+    current_user: CurrentUserDep = None,
+):
+    """
+    Recommend vendors for a deal.
+
+    Every active vendor is scored on category and certification match
+    with the deal's line items, credibility, on-time delivery, lead time,
+    and how often and how cheaply it won past proposals.
+    """
+    service = VendorService(
+        db,
+        user_id=current_user["user_id"],
+        company_id=current_user["company_id"],
+    )
+    try:
+        return await service.recommend_vendors(deal_id, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.get("/{vendor_id}", response_model=VendorResponse)
 async def get_vendor(
     vendor_id: UUID,
@@ -24,12 +24,25 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/1"
 
+    # Document processing pipeline
+    # "celery" dispatches stages to app.workers.celery_app, "local" runs them
+    # in-process on the API event loop (development and tests)
+    DOCUMENT_PIPELINE_BACKEND: str = "local"
+    DOCUMENT_PIPELINE_CONCURRENCY: int = 4
+    # Worker processes for CPU-bound parsing/OCR (0 = run in a thread instead)
+    PARSING_POOL_WORKERS: int = 2
+    PARSING_POOL_MAX_TASKS_PER_CHILD: int = 50
+
     # Object Storage (MinIO/S3)
     MINIO_ENDPOINT: str = "localhost:9000"
     MINIO_ACCESS_KEY: str = "minioadmin"
     MINIO_SECRET_KEY: str = "minioadmin"
     MINIO_BUCKET: str = "documents"
     MINIO_SECURE: bool = False
+    MINIO_REGION: str = "us-east-1"
+    MINIO_MAX_CONNECTIONS: int = 32
+    MINIO_CONNECT_TIMEOUT_SECONDS: float = 5
+    MINIO_READ_TIMEOUT_SECONDS: float = 60
 
     # Authentication & Security
     JWT_SECRET_KEY: str = "dev-secret-key-change-in-production"
@@ -37,12 +50,75 @@ class Settings(BaseSettings):
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     BCRYPT_ROUNDS: int = 12
+    # Principal cache for get_current_user_full: "memory", "redis" (shared
+    # tier behind the LRU) or "none". The TTL bounds how long another API
+    # process may still accept a deactivated user or an old role
+    PRINCIPAL_CACHE_BACKEND: str = "memory"
+    PRINCIPAL_CACHE_TTL_SECONDS: float = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+
+    # Counts served for include_total=estimate, adjusted in-process as rows
+    # are created and deleted. Other API processes' changes show up once
+    # an entry expires; 0 disables the cache (planner estimates only)
+    COUNT_CACHE_TTL_SECONDS: float = 300
+    COUNT_CACHE_MAX_ENTRIES: int = 10000
+    # Generated numbers (DEAL-001, ...) leased from the counter table this
+    # many at a time per process. 1 allocates in the creating transaction:
+    # gapless and in order, but concurrent creates in a company queue on
+    # the counter row until commit. Larger blocks skip that wait at the
+    # cost of gaps on restart and numbers out of creation order
+    SEQUENCE_BLOCK_SIZE: int = 1
+    # Activity log entries are written in one INSERT per commit ("commit"),
+    # or handed to a background writer that batches across requests
+    # ("background"; entries still queued are lost if the process dies).
+    # Past AUDIT_LOG_MAX_PENDING queued entries, commits write inline again
+    AUDIT_LOG_WRITER: str = "commit"
+    AUDIT_LOG_MAX_PENDING: int = 10000
+    AUDIT_LOG_BATCH_SIZE: int = 500
+    # Activity log retention: months kept in the database (older months are
+    # archived to MinIO as gzipped JSONL; <= 0 keeps everything), and
+    # monthly partitions created ahead of time (PostgreSQL)
+    AUDIT_LOG_HOT_MONTHS: int = 24
+    AUDIT_LOG_PARTITIONS_AHEAD: int = 3
 
     # Anthropic AI
     ANTHROPIC_API_KEY: str = ""
     ANTHROPIC_MODEL: str = "claude-opus-4-6"
     ANTHROPIC_FAST_MODEL: str = "claude-haiku-4-5-20251001"
     ANTHROPIC_MAX_TOKENS: int = 4096
+    ANTHROPIC_MAX_CONNECTIONS: int = 10
+
+    # AI extraction cache: in-process LRU, backed by a shared Redis tier
+    # when AI_EXTRACTION_CACHE_BACKEND is "redis" ("memory" = LRU only)
+    AI_EXTRACTION_CACHE_BACKEND: str = "memory"
+    AI_EXTRACTION_CACHE_MAX_ENTRIES: int = 1000
+    AI_EXTRACTION_CACHE_TTL_SECONDS: int = 30 * 24 * 3600
+
+    # Document similarity search: embeddings computed by the document
+    # pipeline with "hashing" (local, no model) or the
+    # app.services.embeddings.Embedder named as "package.module:Class".
+    # EMBEDDING_SEARCH_EF is the HNSW candidate list per search
+    # (PostgreSQL); the index is shared by all tenants, so a tenant with a
+    # small share of rows needs more candidates to fill a page
+    EMBEDDING_BACKEND: str = "hashing"
+    EMBEDDING_SEARCH_EF: int = 200
+    EMBEDDING_BACKFILL_BATCH_SIZE: int = 100
+
+    # Vendor recommendations: each tenant's vendor features (metrics, tags,
+    # proposal history) are loaded into memory and reused until this
+    # process changes a vendor or proposal of the tenant, or the TTL
+    # passes (other processes' changes); 0 loads them on every request
+    VENDOR_FEATURES_TTL_SECONDS: float = 300
+    VENDOR_FEATURES_MAX_COMPANIES: int = 100
+    # Weight of the newest sample in vendors' running on-time, quality and
+    # lead time averages (higher forgets a vendor's past sooner)
+    VENDOR_METRICS_EWMA_ALPHA: float = 0.2
+    # Proposal comparison: each deal's proposals are loaded once and
+    # rescored per request (weights, base currency) until this process
+    # changes one of them or the deal, or the TTL passes (other
+    # processes' changes, vendor credibility updates); 0 disables
+    PROPOSAL_COMPARISON_TTL_SECONDS: float = 300
+    PROPOSAL_COMPARISON_MAX_DEALS: int = 1000
 
     # Email (SMTP)
     SMTP_HOST: str = "smtp.gmail.com"
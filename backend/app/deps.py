@@ -10,6 +10,8 @@ from sqlalchemy import select
 from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.services.pagination import Cursor, InvalidCursorError
+from app.services.principal_cache import get_principal_cache
 
 # Type annotation for database session
 SessionDep = Annotated[AsyncSession, Depends(get_db)]
@@ -66,26 +68,35 @@ async def get_current_user_full(
         user_id = UUID(user_id_str)
         company_id = UUID(company_id_str)
 
-        # Verify user still exists and is active
-        result = await db.execute(
-            select(User).where(
-                (User.id == user_id)
-                & (User.company_id == company_id)
-                & (User.is_active == True)
-            )
-        )
-        user = result.scalars().first()
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found or inactive",
+        # Verify user still exists and is active, from the principal cache
+        # when possible (entries are dropped on deactivation/role change)
+        cache = get_principal_cache()
+        principal = await cache.get_principal(user_id) if cache else None
+        if principal is not None and principal["company_id"] == str(company_id):
+            role = principal["role"]
+        else:
+            result = await db.execute(
+                select(User).where(
+                    (User.id == user_id)
+                    & (User.company_id == company_id)
+                    & (User.is_active == True)
+                )
             )
+            user = result.scalars().first()
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="User not found or inactive",
+                )
+            role = user.role
+            if cache:
+                await cache.set_principal(user_id, company_id, role)
 
         return {
             "user_id": user_id,
             "company_id": company_id,
             "email": email,
-            "role": user.role,
+            "role": role,
         }
 
     except JWTError:
@@ -134,5 +145,21 @@ def require_permission(permission: str):
     return dependency
 
 
+def get_cursor(cursor: Optional[str] = None) -> Optional[Cursor]:
+    """
+    Decode the `cursor` query parameter of list endpoints.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        return Cursor.decode(cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 # Common dependencies
 CurrentUserDep = Annotated[dict, Depends(get_current_user_full)]
+CursorDep = Annotated[Optional[Cursor], Depends(get_cursor)]
@@ -24,9 +24,38 @@ async def lifespan(app: FastAPI):
         await conn.run_sync(Base.metadata.create_all)
     logger.info("Database tables created/verified")
 
+    # One MinIO client for the process; the bucket is checked here, not per request
+    from app.services.storage import verify_storage
+    if await verify_storage():
+        logger.info("MinIO bucket verified", bucket=settings.MINIO_BUCKET)
+
+    # The in-process document queue loses its work on restart
+    from app.database import AsyncSessionLocal
+    from app.workers.document_pipeline import requeue_unfinished_documents
+    try:
+        requeued = await requeue_unfinished_documents(AsyncSessionLocal)
+        if requeued:
+            logger.info("Re-queued unfinished documents", count=requeued)
+    except Exception as e:
+        logger.error("Failed to re-queue unfinished documents", error=str(e))
+
+    from app.services.activity_log import start_audit_writer
+    if start_audit_writer(AsyncSessionLocal):
+        logger.info("Activity log background writer started")
+
     yield
     # Shutdown
     logger.info("Shutting down TradeFlow OS API")
+    from app.services.activity_log import stop_audit_writer
+    await stop_audit_writer()
+    from app.workers.document_pipeline import shutdown_document_queue
+    await shutdown_document_queue()
+    from app.services.ai_extraction import close_anthropic_client
+    await close_anthropic_client()
+    from app.services.parsing_pool import shutdown_parsing_pool
+    shutdown_parsing_pool()
+    from app.services.storage import close_storage_service
+    close_storage_service()
 
 
 def create_app() -> FastAPI:
@@ -102,13 +131,10 @@ def create_app() -> FastAPI:
             logger.error("Database health check failed", error=str(e))
             checks["status"] = "not_ready"
 
-        # Check MinIO connectivity
+        # Check MinIO: report the startup bucket check, retrying it if it failed
         try:
-            from app.services.storage import StorageService
-            storage = StorageService()
-            # Simple check - verify MinIO client exists and can be initialized
-            if storage.client is not None:
-                checks["minio"] = True
+            from app.services.storage import get_storage_service, verify_storage
+            checks["minio"] = get_storage_service().bucket_verified or await verify_storage()
         except Exception as e:
             logger.warning("MinIO health check failed (optional)", error=str(e))
             # MinIO failure is not critical for readiness, log but don't fail
@@ -126,6 +152,14 @@ def create_app() -> FastAPI:
 
         return {"status": "ready", "checks": checks}
 
+    # Operational counters (e.g. document_dedup.hit_rate)
+    @app.get("/metrics")
+    async def metrics():
+        """In-process metrics for this API instance."""
+        from app.services import metrics as app_metrics
+
+        return app_metrics.snapshot()
+
     # Add explicit CORS handling for OPTIONS requests
     @app.options("/{full_path:path}")
     async def options_handler(full_path: str):
@@ -8,7 +8,11 @@ from app.models.quote import Quote, QuoteStatus
 from app.models.customer_po import CustomerPO, CustomerPOStatus
 from app.models.vendor import Vendor
 from app.models.vendor_proposal import VendorProposal, VendorProposalStatus
-from app.models.document import Document, DocumentCategory, DocumentStatus
+from app.models.vendor_tag import VendorTag
+from app.models.vendor_metrics import VendorMetrics
+from app.models.document import Document, DocumentCategory, DocumentProcessingStage, DocumentStatus
+from app.models.sequence_counter import SequenceCounter
+from app.models.embedding import DocumentEmbedding, LineItemEmbedding
 
 __all__ = [
     "Deal",
@@ -24,7 +28,13 @@ __all__ = [
     "Vendor",
     "VendorProposal",
     "VendorProposalStatus",
+    "VendorTag",
+    "VendorMetrics",
     "Document",
     "DocumentCategory",
     "DocumentStatus",
+    "DocumentProcessingStage",
+    "SequenceCounter",
+    "DocumentEmbedding",
+    "LineItemEmbedding",
 ]
@@ -3,21 +3,27 @@ from datetime import datetime
 from typing import Optional
 from uuid import UUID
 
-from sqlalchemy import DateTime, String, Text, func, JSON, ForeignKey, Index
+from sqlalchemy import DDL, DateTime, String, Text, func, JSON, ForeignKey, Index, event
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
 
 
 class ActivityLog(Base):
-    """Audit trail for all deal mutations."""
+    """
+    Audit trail for all deal mutations.
+
+    On PostgreSQL the table is range-partitioned by month of created_at
+    (activity_log_pYYYY_MM, see app.services.audit_retention), which is
+    why created_at is part of the primary key.
+    """
 
     __tablename__ = "activity_log"
 
     # IDs
     id: Mapped[UUID] = mapped_column(primary_key=True, default=lambda: __import__('uuid').uuid4())
-    company_id: Mapped[UUID] = mapped_column(ForeignKey("company.id"), nullable=False, index=True)
-    deal_id: Mapped[Optional[UUID]] = mapped_column(nullable=True, index=True)
+    company_id: Mapped[UUID] = mapped_column(ForeignKey("company.id"), nullable=False)
+    deal_id: Mapped[Optional[UUID]] = mapped_column(nullable=True)
     user_id: Mapped[Optional[UUID]] = mapped_column(nullable=True)
 
     # Action
@@ -42,14 +48,33 @@ class ActivityLog(Base):
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True),
+        primary_key=True,
         default=func.now(),
         nullable=False,
-        index=True
     )
 
+    # Only the timeline indexes: every other index is paid on each insert
+    # into an append-only table, and old rows are found by partition
     __table_args__ = (
-        Index("ix_activity_logs_entity", "entity_type", "entity_id"),
+        # Keyset pagination of a deal's / an entity's history, newest first
+        Index("ix_activity_logs_deal_created", "company_id", "deal_id", "created_at", "id"),
+        Index(
+            "ix_activity_logs_entity_created",
+            "company_id", "entity_type", "entity_id", "created_at", "id",
+        ),
+        {"postgresql_partition_by": "RANGE (created_at)"},
     )
 
     def __repr__(self) -> str:
         return f"<ActivityLog {self.action} on {self.entity_type} {self.entity_id}>"
+
+
+# Rows outside the monthly partitions created so far land here rather than
+# failing the insert (create_all makes no monthly partitions)
+event.listen(
+    ActivityLog.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS activity_log_default PARTITION OF activity_log DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 from uuid import UUID
 
 from app.database import Base
+from app.models.search_index import register_text_search
 
 
 class Customer(Base):
@@ -59,7 +60,25 @@ class Customer(Base):
     __table_args__ = (
         # Customer code unique per company
         Index("ix_customer_code_company", "customer_code", "company_id", unique=True),
+        # Keyset pagination: newest first within a company
+        Index("ix_customer_company_created", "company_id", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
         return f"<Customer {self.customer_code} - {self.company_name}>"
+
+
+# Search on name/code (trigram), and name/code autocomplete (prefix)
+register_text_search(Customer.__table__, ("company_name", "customer_code"))
+Index(
+    "ix_customer_name_prefix",
+    Customer.company_id,
+    func.lower(Customer.company_name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_customer_code_prefix",
+    Customer.company_id,
+    func.lower(Customer.customer_code).label("code_lower"),
+    postgresql_ops={"code_lower": "text_pattern_ops"},
+)
@@ -84,6 +84,8 @@ class CustomerPO(Base):
     __table_args__ = (
         # Internal ref unique per company
         Index("ix_internal_ref_company", "internal_ref", "company_id", unique=True),
+        # Keyset pagination: newest first within a company
+        Index("ix_customer_po_company_created", "company_id", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
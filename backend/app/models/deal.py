@@ -98,6 +98,8 @@ class Deal(Base):
     __table_args__ = (
         # Deal number unique per company
         Index("ix_deal_number_company", "deal_number", "company_id", unique=True),
+        # Keyset pagination: newest first within a company
+        Index("ix_deal_company_created", "company_id", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
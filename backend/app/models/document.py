@@ -1,5 +1,5 @@
 """Document management model for M4 AI Document Management."""
-from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, JSON, Enum as SQLEnum, Text, Float
+from sqlalchemy import String, Integer, DateTime, ForeignKey, Index, JSON, Enum as SQLEnum, Text, Float, text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 from datetime import datetime
@@ -7,6 +7,10 @@ from uuid import UUID, uuid4
 from typing import Optional
 from enum import Enum
 from app.database import Base
+from app.models.search_index import register_full_text_search, register_json_field_indexes
+
+# parsed_data fields document search filters on (indexed)
+SEARCHABLE_PARSED_FIELDS = ("rfq_number", "vendor_name", "invoice_number")
 
 
 class DocumentCategory(str, Enum):
@@ -32,6 +36,14 @@ class DocumentStatus(str, Enum):
     FAILED = "failed"
 
 
+class DocumentProcessingStage(str, Enum):
+    """Pipeline stage a PROCESSING document is currently in."""
+    QUEUED = "queued"
+    PARSE = "parse"
+    OCR = "ocr"
+    EXTRACT = "extract"
+
+
 class Document(Base):
     """Polymorphic document model - attaches to any entity or company."""
 
@@ -64,6 +76,12 @@ class Document(Base):
     file_size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
     mime_type: Mapped[str] = mapped_column(String(100), nullable=False)
 
+    # Content Addressing (SHA-256 of the file bytes)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    # Set on duplicate uploads: the first document with the same content,
+    # whose storage object this document shares
+    source_document_id: Mapped[Optional[UUID]] = mapped_column(ForeignKey("documents.id"), nullable=True)
+
     # Document Content
     extracted_text: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     parsed_data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
@@ -75,6 +93,7 @@ class Document(Base):
         default=DocumentStatus.UPLOADING,
         index=True,
     )
+    processing_stage: Mapped[Optional[str]] = mapped_column(String(20), nullable=True)
     ai_confidence_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     error_message: Mapped[Optional[str]] = mapped_column(String(1000), nullable=True)
 
@@ -94,7 +113,26 @@ class Document(Base):
         Index("ix_document_company_only", "company_id", "deleted_at"),
         # Index for listing by category
         Index("ix_document_category_company", "category", "company_id", "deleted_at"),
+        # Keyset pagination: newest first within a company
+        Index("ix_document_company_created", "company_id", "created_at", "id"),
+        # One original per content hash per company (duplicates point at it)
+        Index(
+            "uq_document_company_content_hash",
+            "company_id",
+            "content_hash",
+            unique=True,
+            postgresql_where=text("source_document_id IS NULL AND deleted_at IS NULL"),
+            sqlite_where=text("source_document_id IS NULL AND deleted_at IS NULL"),
+        ),
     )
 
     def __repr__(self) -> str:
         return f"<Document {self.original_filename} - {self.status}>"
+
+
+# Word search over the document's text (documents_fts / search_vector),
+# and lookups by SEARCHABLE_PARSED_FIELDS
+register_full_text_search(
+    Document.__table__, ("original_filename", "description", "extracted_text"), json_columns=("parsed_data",)
+)
+register_json_field_indexes(Document.__table__, "parsed_data", SEARCHABLE_PARSED_FIELDS)
@@ -0,0 +1,102 @@
+"""Embedding models: vectors of documents and their line items for similarity search."""
+from typing import Optional
+from uuid import UUID, uuid4
+
+import numpy as np
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import DDL, ForeignKey, Integer, LargeBinary, Table, Text, UniqueConstraint, event
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.types import TypeDecorator
+
+from app.database import Base
+
+# Length of every stored vector (see app.services.embeddings); changing it
+# needs a migration and a rebuild of the stored embeddings
+EMBEDDING_DIMENSIONS = 256
+
+
+class EmbeddingVector(TypeDecorator):
+    """
+    pgvector vector(EMBEDDING_DIMENSIONS) on PostgreSQL, float32 bytes elsewhere.
+
+    Values are NumPy arrays either way. The bytes form is for databases
+    without pgvector (development, tests), where similarity search reads
+    the tenant's vectors; parsing pgvector's text form there costs more
+    than the search itself.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+    comparator_factory = Vector.comparator_factory
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(Vector(EMBEDDING_DIMENSIONS))
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return np.asarray(value, dtype="<f4").tobytes()
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return np.frombuffer(value, dtype="<f4")
+
+
+def vector_index_name(table_name: str) -> str:
+    """PostgreSQL HNSW index over table_name's embedding column."""
+    return f"ix_{table_name}_embedding_hnsw"
+
+
+class DocumentEmbedding(Base):
+    """Vector of a document's extracted text and description."""
+
+    __tablename__ = "document_embeddings"
+
+    document_id: Mapped[UUID] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), primary_key=True)
+    company_id: Mapped[UUID] = mapped_column(ForeignKey("company.id"), nullable=False)
+    embedding = mapped_column(EmbeddingVector(), nullable=False)
+
+
+class LineItemEmbedding(Base):
+    """Vector of one line item (description and material spec) extracted from a document."""
+
+    __tablename__ = "line_item_embeddings"
+
+    id: Mapped[UUID] = mapped_column(primary_key=True, default=uuid4)
+    document_id: Mapped[UUID] = mapped_column(ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
+    company_id: Mapped[UUID] = mapped_column(ForeignKey("company.id"), nullable=False)
+    # Position in the document's parsed_data["line_items"]
+    line_index: Mapped[int] = mapped_column(Integer, nullable=False)
+    description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    material_spec: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    embedding = mapped_column(EmbeddingVector(), nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("document_id", "line_index", name="uq_line_item_embeddings_document_line"),
+    )
+
+
+def register_vector_index(table: Table) -> None:
+    """
+    Create the pgvector extension and an HNSW cosine index along with the table.
+
+    HNSW rather than IVFFlat: it needs no training rows, so it can be
+    built on an empty table and stays accurate as rows are added.
+    Elsewhere vectors are searched in NumPy.
+    """
+    event.listen(table, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS vector").execute_if(dialect="postgresql"))
+    event.listen(
+        table,
+        "after_create",
+        DDL(
+            f"CREATE INDEX IF NOT EXISTS {vector_index_name(table.name)} ON {table.name} "
+            f"USING hnsw (embedding vector_cosine_ops)"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
+register_vector_index(DocumentEmbedding.__table__)
+register_vector_index(LineItemEmbedding.__table__)
@@ -92,6 +92,8 @@ class Quote(Base):
     __table_args__ = (
         # Quote number unique per company
         Index("ix_quote_number_company", "quote_number", "company_id", unique=True),
+        # Keyset pagination: newest first within a company
+        Index("ix_quote_company_created", "company_id", "created_at", "id"),
     )
 
     def __repr__(self) -> str:
@@ -0,0 +1,152 @@
+"""Text search indexes for name/code columns and documents (see app.services.search)."""
+from typing import Sequence
+
+from sqlalchemy import DDL, Table, event
+
+
+def fts_table_name(table_name: str) -> str:
+    """SQLite FTS5 table indexing table_name."""
+    return f"{table_name}_fts"
+
+
+def trigram_index_name(table_name: str) -> str:
+    """PostgreSQL pg_trgm index over table_name's search text."""
+    return f"ix_{table_name}_search_trgm"
+
+
+def search_vector_index_name(table_name: str) -> str:
+    """PostgreSQL GIN index over table_name's search_vector column."""
+    return f"ix_{table_name}_search_vector"
+
+
+def json_field_index_name(table_name: str, field: str) -> str:
+    """Index over one field of table_name's JSON column."""
+    return f"ix_{table_name}_{field}"
+
+
+# Text search configuration of tsvector columns and queries
+FULL_TEXT_CONFIG = "english"
+
+# Indexed first in SQLite full text tables, so a search can match the
+# tenant inside FTS5 instead of joining every tenant's matches
+FULL_TEXT_TENANT_COLUMN = "company_id"
+
+
+def search_text_sql(columns: Sequence[str]) -> str:
+    """The indexed search text: the columns joined with spaces."""
+    return " || ' ' || ".join(columns)
+
+
+def sqlite_search_ddl(table_name: str, columns: Sequence[str], tokenize: str = "trigram") -> list:
+    """
+    Statements creating an FTS5 index over columns of a table.
+
+    The FTS5 table holds no copy of the rows (content=table_name); the
+    triggers keep its index in step with inserts, updates and deletes.
+    """
+    fts = fts_table_name(table_name)
+    cols = ", ".join(columns)
+    new = ", ".join(f"new.{c}" for c in columns)
+    old = ", ".join(f"old.{c}" for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{cols}, content='{table_name}', content_rowid='rowid', tokenize='{tokenize}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table_name} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.rowid, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.rowid, {new}); END",
+    ]
+
+
+def postgresql_search_ddl(table_name: str, columns: Sequence[str]) -> list:
+    """Statements creating a pg_trgm GIN index over columns of a table."""
+    return [
+        "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+        f"CREATE INDEX IF NOT EXISTS {trigram_index_name(table_name)} ON {table_name} "
+        f"USING gin (({search_text_sql(columns)}) gin_trgm_ops)",
+    ]
+
+
+def tsvector_sql(columns: Sequence[str], json_columns: Sequence[str] = (), row: str = "") -> str:
+    """A tsvector of the text columns and the string/number values of the JSON ones."""
+    parts = [f"to_tsvector('{FULL_TEXT_CONFIG}', coalesce({row}{c}, ''))" for c in columns]
+    parts += [
+        f"json_to_tsvector('{FULL_TEXT_CONFIG}', coalesce({row}{c}, '{{}}'::json), '[\"string\", \"numeric\"]')"
+        for c in json_columns
+    ]
+    return " || ".join(parts)
+
+
+def postgresql_full_text_ddl(table_name: str, columns: Sequence[str], json_columns: Sequence[str] = ()) -> list:
+    """
+    Statements adding a maintained search_vector tsvector column and its GIN index.
+
+    A trigger recomputes the vector when one of the columns changes, so
+    status updates and the like don't re-parse the text.
+    """
+    function = f"{table_name}_search_vector_update"
+    watched = ", ".join([*columns, *json_columns])
+    return [
+        f"ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS search_vector tsvector",
+        f"CREATE OR REPLACE FUNCTION {function}() RETURNS trigger AS $$ BEGIN "
+        f"NEW.search_vector := {tsvector_sql(columns, json_columns, row='NEW.')}; "
+        f"RETURN NEW; END $$ LANGUAGE plpgsql",
+        f"DROP TRIGGER IF EXISTS {table_name}_search_vector ON {table_name}",
+        f"CREATE TRIGGER {table_name}_search_vector BEFORE INSERT OR UPDATE OF {watched} ON {table_name} "
+        f"FOR EACH ROW EXECUTE FUNCTION {function}()",
+        f"CREATE INDEX IF NOT EXISTS {search_vector_index_name(table_name)} ON {table_name} USING gin (search_vector)",
+    ]
+
+
+def json_field_sql(dialect: str, column: str, field: str) -> str:
+    """One text field of a JSON column, written as app.services.search queries it."""
+    if dialect == "postgresql":
+        return f"{column} ->> '{field}'"
+    return f"json_extract({column}, '$.{field}')"
+
+
+def json_field_index_ddl(dialect: str, table_name: str, column: str, field: str) -> str:
+    """Index for company-scoped prefix lookups of lower(field)."""
+    ops = " text_pattern_ops" if dialect == "postgresql" else ""
+    return (
+        f"CREATE INDEX IF NOT EXISTS {json_field_index_name(table_name, field)} ON {table_name} "
+        f"(company_id, lower({json_field_sql(dialect, column, field)}){ops})"
+    )
+
+
+def register_text_search(table: Table, columns: Sequence[str]) -> None:
+    """
+    Create the table's text search index along with it (create_all).
+
+    Migrations create the same objects for existing databases.
+    """
+    for statement in sqlite_search_ddl(table.name, columns):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgresql_search_ddl(table.name, columns):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def register_full_text_search(table: Table, columns: Sequence[str], json_columns: Sequence[str] = ()) -> None:
+    """
+    Create the table's word search index along with it (create_all).
+
+    FTS5 with stemming on SQLite (FULL_TEXT_TENANT_COLUMN indexed too), a
+    search_vector column on PostgreSQL. Migrations create the same
+    objects for existing databases.
+    """
+    fts_columns = [FULL_TEXT_TENANT_COLUMN, *columns, *json_columns]
+    for statement in sqlite_search_ddl(table.name, fts_columns, tokenize="porter unicode61"):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+    for statement in postgresql_full_text_ddl(table.name, columns, json_columns):
+        event.listen(table, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+
+
+def register_json_field_indexes(table: Table, column: str, fields: Sequence[str]) -> None:
+    """Create json_field_index_ddl() indexes for fields along with the table."""
+    for field in fields:
+        for dialect in ("sqlite", "postgresql"):
+            statement = json_field_index_ddl(dialect, table.name, column, field)
+            event.listen(table, "after_create", DDL(statement).execute_if(dialect=dialect))
@@ -0,0 +1,17 @@
+"""Sequence counter model for generated document numbers."""
+from uuid import UUID
+
+from sqlalchemy import BigInteger, ForeignKey, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class SequenceCounter(Base):
+    """Last number issued per company and number prefix (DEAL-, QT-2026-, ...)."""
+
+    __tablename__ = "sequence_counter"
+
+    company_id: Mapped[UUID] = mapped_column(ForeignKey("company.id"), primary_key=True)
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
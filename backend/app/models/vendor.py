@@ -6,6 +6,7 @@ from datetime import datetime
 from uuid import UUID, uuid4
 from typing import Optional, List, TYPE_CHECKING
 from app.database import Base
+from app.models.search_index import register_text_search
 
 if TYPE_CHECKING:
     from app.models.vendor_proposal import VendorProposal
@@ -60,4 +61,22 @@ class Vendor(Base):
         Index("ix_vendor_code_company", "vendor_code", "company_id", unique=True),
         Index("ix_vendors_company_name", "company_name"),
         Index("ix_vendors_credibility_score", "credibility_score"),
+        # Keyset pagination: newest first within a company
+        Index("ix_vendors_company_created", "company_id", "created_at", "id"),
     )
+
+
+# Search on name/code (trigram), and name/code autocomplete (prefix)
+register_text_search(Vendor.__table__, ("company_name", "vendor_code"))
+Index(
+    "ix_vendors_name_prefix",
+    Vendor.company_id,
+    func.lower(Vendor.company_name).label("name_lower"),
+    postgresql_ops={"name_lower": "text_pattern_ops"},
+)
+Index(
+    "ix_vendors_code_prefix",
+    Vendor.company_id,
+    func.lower(Vendor.vendor_code).label("code_lower"),
+    postgresql_ops={"code_lower": "text_pattern_ops"},
+)
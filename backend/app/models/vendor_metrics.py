@@ -0,0 +1,44 @@
+"""Vendor metrics model: running aggregates behind a vendor's performance fields."""
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class VendorMetrics(Base):
+    """
+    Counts and exponentially weighted averages of a vendor's track record.
+
+    Updated in place as proposals are decided and deals ship or are
+    delivered (app.services.vendor_metrics), and rebuilt from proposal
+    history by the recompute job. Vendor.credibility_score,
+    on_time_delivery_rate, quality_score and avg_lead_time_days are
+    derived from these.
+    """
+
+    __tablename__ = "vendor_metrics"
+
+    vendor_id: Mapped[UUID] = mapped_column(ForeignKey("vendors.id", ondelete="CASCADE"), primary_key=True)
+    company_id: Mapped[UUID] = mapped_column(ForeignKey("company.id"), nullable=False, index=True)
+
+    # Proposals selected or rejected, and of those selected
+    proposals_decided: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    proposals_won: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Decided proposals with specs_match set, and their average (0-1)
+    quality_samples: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    quality_ewma: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Days from selection to shipment
+    lead_time_samples: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    lead_time_ewma: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    # Deliveries with a known due date, and the share on time
+    deliveries: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    on_time_ewma: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=func.now(), onupdate=func.now(), nullable=False
+    )
@@ -61,6 +61,12 @@ class VendorProposal(Base):
     raw_document_url: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     parsed_data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)
 
+    # Fulfilment: when the proposal was last selected or rejected, and when
+    # the deal shipped and was delivered while it was the selected one
+    decided_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    shipped_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+    delivered_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), nullable=True)
+
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now(), nullable=False, index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=func.now(), onupdate=func.now())
@@ -70,4 +76,7 @@ class VendorProposal(Base):
     vendor: Mapped["Vendor"] = relationship("Vendor", back_populates="proposals")
     deal: Mapped["Deal"] = relationship("Deal", back_populates="vendor_proposals")
 
-    __table_args__ = ()
+    __table_args__ = (
+        # Keyset pagination: newest first within a company
+        Index("ix_vendor_proposals_company_created", "company_id", "created_at", "id"),
+    )
@@ -0,0 +1,37 @@
+"""Vendor tag model: product categories and certifications as indexed rows."""
+from uuid import UUID
+
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+CATEGORY = "category"
+CERTIFICATION = "certification"
+
+
+class VendorTag(Base):
+    """
+    One entry of a vendor's product_categories or certifications.
+
+    The JSON lists on Vendor stay the source of truth (and what the API
+    returns); these rows are rewritten from them on every flush that
+    changes them, so filters are index lookups rather than JSON scans.
+    """
+
+    __tablename__ = "vendor_tags"
+
+    vendor_id: Mapped[UUID] = mapped_column(ForeignKey("vendors.id", ondelete="CASCADE"), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20), primary_key=True)  # CATEGORY or CERTIFICATION
+    # Lower-cased, trimmed entry
+    value: Mapped[str] = mapped_column(String(200), primary_key=True)
+    company_id: Mapped[UUID] = mapped_column(ForeignKey("company.id"), nullable=False)
+
+    __table_args__ = (
+        # Prefix lookups of a tag within a company
+        Index(
+            "ix_vendor_tags_company_kind_value",
+            "company_id", "kind", "value", "vendor_id",
+            postgresql_ops={"value": "text_pattern_ops"},
+        ),
+    )
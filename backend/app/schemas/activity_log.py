@@ -31,3 +31,14 @@ class DealActivityListResponse(BaseModel):
     """List of activity logs for a deal."""
     activity_logs: List[ActivityLogResponse]
     total: int
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
+
+
+class DealTimelineResponse(BaseModel):
+    """A deal's history merged with its quotes', POs' and vendor proposals'."""
+    events: List[ActivityLogResponse]
+    # None unless requested with include_total
+    total: Optional[int] = None
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
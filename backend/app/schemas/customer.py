@@ -66,3 +66,12 @@ class CustomersListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
+
+
+class CustomerSuggestion(BaseModel):
+    """Customer autocomplete suggestion."""
+    id: UUID
+    customer_code: str
+    company_name: str
@@ -88,6 +88,9 @@ class CustomerPOResponse(BaseModel):
 class CustomerPOsListResponse(BaseModel):
     """Paginated list of customer POs."""
     customer_pos: List[CustomerPOResponse]
-    total: int
+    # None when requested with include_total=false
+    total: Optional[int]
     skip: int
     limit: int
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
@@ -89,6 +89,9 @@ class DealResponse(BaseModel):
 class DealListResponse(BaseModel):
     """Paginated list of deals."""
     deals: List[DealResponse]
-    total: int
+    # None when requested with include_total=false
+    total: Optional[int]
     skip: int
     limit: int
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
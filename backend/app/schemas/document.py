@@ -35,9 +35,14 @@ class DocumentResponse(BaseModel):
     original_filename: str
     file_size_bytes: int
     mime_type: str
+    content_hash: Optional[str] = Field(None, description="SHA-256 of the file content")
+    source_document_id: Optional[UUID] = Field(
+        None, description="Original document this upload duplicates (shares its file)"
+    )
     extracted_text: Optional[str] = Field(None, description="Raw extracted text (may be large)")
     parsed_data: Optional[dict[str, Any]] = Field(None, description="AI-extracted structured data")
     status: DocumentStatus
+    processing_stage: Optional[str] = Field(None, description="Pipeline stage while PROCESSING")
     ai_confidence_score: Optional[float] = Field(None, ge=0.0, le=1.0)
     error_message: Optional[str] = None
     description: Optional[str] = None
@@ -62,6 +67,7 @@ class DocumentResponseWithoutText(BaseModel):
     mime_type: str
     parsed_data: Optional[dict[str, Any]] = None
     status: DocumentStatus
+    processing_stage: Optional[str] = None
     ai_confidence_score: Optional[float] = None
     error_message: Optional[str] = None
     description: Optional[str] = None
@@ -74,9 +80,72 @@ class DocumentListResponse(BaseModel):
     """Paginated list of documents."""
 
     items: List[DocumentResponseWithoutText]
-    total: int
+    # None when requested with include_total=false
+    total: Optional[int]
     skip: int
     limit: int
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
+
+
+class DocumentSearchHit(DocumentResponseWithoutText):
+    """Document search result."""
+
+    snippet: Optional[str] = Field(
+        None, description="Text around the matched words, which are wrapped in <mark></mark>"
+    )
+
+
+class DocumentSearchResponse(BaseModel):
+    """Page of document search results, newest first."""
+
+    items: List[DocumentSearchHit]
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
+
+
+class SimilarDocument(DocumentResponseWithoutText):
+    """Document similar to the one asked about."""
+
+    similarity: float = Field(description="Cosine similarity of the embeddings, 1 is identical")
+
+
+class SimilarDocumentsResponse(BaseModel):
+    """Documents most similar to a document, most similar first."""
+
+    items: List[SimilarDocument]
+
+
+class SimilarLineItem(BaseModel):
+    """Line item extracted from a past document, similar to the text asked about."""
+
+    document_id: UUID
+    document_category: DocumentCategory
+    original_filename: str
+    document_created_at: datetime
+    line_index: int = Field(description="Position in the document's parsed_data line_items")
+    description: Optional[str] = None
+    material_spec: Optional[str] = None
+    similarity: float = Field(description="Cosine similarity of the embeddings, 1 is identical")
+
+
+class SimilarLineItemsResponse(BaseModel):
+    """Line items most similar to a description/spec, most similar first."""
+
+    items: List[SimilarLineItem]
+
+
+class DocumentStatusResponse(BaseModel):
+    """Lightweight processing status for polling."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: UUID
+    status: DocumentStatus
+    processing_stage: Optional[str] = None
+    ai_confidence_score: Optional[float] = None
+    error_message: Optional[str] = None
+    updated_at: datetime
 
 
 class DocumentDownloadUrlResponse(BaseModel):
@@ -97,6 +97,9 @@ class QuoteResponse(BaseModel):
 class QuotesListResponse(BaseModel):
     """Paginated list of quotes."""
     quotes: List[QuoteResponse]
-    total: int
+    # None when requested with include_total=false
+    total: Optional[int]
     skip: int
     limit: int
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
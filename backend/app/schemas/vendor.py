@@ -69,5 +69,45 @@ class VendorResponse(BaseModel):
 
 class VendorListResponse(BaseModel):
     """Schema for vendor list response."""
-    total: int
+    # None when requested with include_total=false
+    total: Optional[int]
     items: List[VendorResponse]
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
+
+
+class VendorSuggestion(BaseModel):
+    """Schema for a vendor autocomplete suggestion."""
+    id: UUID
+    vendor_code: str
+    company_name: str
+
+
+class VendorRecommendation(BaseModel):
+    """Schema for a vendor ranked for a deal, with its score components in [0, 1]."""
+    vendor_id: UUID
+    vendor_code: str
+    company_name: str
+    # Weighted average of the components below
+    score: float
+    # Share of the deal's line items the vendor has a matching category
+    # for (None when no vendor category matches any line item)
+    category_match: Optional[float] = None
+    # Share of the certifications the line items name that the vendor
+    # holds (None when they name none)
+    certification_match: Optional[float] = None
+    credibility: float
+    on_time_delivery: float
+    lead_time: float
+    win_rate: float
+    price_competitiveness: float
+    matched_categories: List[str] = []
+    matched_certifications: List[str] = []
+
+
+class VendorRecommendationResponse(BaseModel):
+    """Schema for vendor recommendations for a deal."""
+    deal_id: UUID
+    vendors_scored: int
+    required_certifications: List[str]
+    items: List[VendorRecommendation]
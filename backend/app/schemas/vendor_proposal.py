@@ -2,7 +2,7 @@
 from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime, date
 from uuid import UUID
-from typing import Optional, List, Literal
+from typing import Dict, Optional, List, Literal
 
 
 class VendorBaseResponse(BaseModel):
@@ -71,10 +71,23 @@ class VendorProposalResponse(BaseModel):
     discrepancies: Optional[dict]
     notes: Optional[str]
     raw_document_url: Optional[str]
+    decided_at: Optional[datetime] = None
+    shipped_at: Optional[datetime] = None
+    delivered_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
 
+class ProposalLineComparison(BaseModel):
+    """A deal line item across the proposals, prices in the base currency."""
+    line_index: int
+    description: Optional[str]
+    quantity: Optional[float]
+    unit: Optional[str]
+    best_unit_price: Optional[float]
+    best_proposal_id: Optional[UUID]
+
+
 class ProposalComparisonItem(BaseModel):
     """Single vendor proposal in comparison view."""
     id: UUID
@@ -89,19 +102,47 @@ class ProposalComparisonItem(BaseModel):
     is_best_price: bool
     is_worst_price: bool
     is_best_lead_time: bool
+    currency: Optional[str] = None
+    # total_price in the comparison's base currency (None if it has no rate)
+    normalized_total_price: Optional[float] = None
+    payment_terms: Optional[str] = None
+    # Days of credit read from payment_terms (0 for advance payment)
+    payment_days: Optional[float] = None
+    # Weighted score (0-1) and rank (1 = best, ties share a rank)
+    score: float = 0.0
+    rank: int = 0
+    # Per criterion: score (0-1, None when the proposal doesn't give it) and rank
+    criteria: Dict[str, Optional[float]] = Field(default_factory=dict)
+    criterion_ranks: Dict[str, Optional[int]] = Field(default_factory=dict)
+    # Unit prices in the base currency, in the order of the response's lines
+    line_unit_prices: List[Optional[float]] = Field(default_factory=list)
+    # Lines where this proposal is cheapest, and the mean of cheapest / own
+    # unit price over the lines it quotes (1.0 = cheapest on all of them)
+    lines_best: int = 0
+    line_price_index: Optional[float] = None
 
 
 class ProposalComparisonResponse(BaseModel):
     """Hero feature: side-by-side proposal comparison dashboard."""
     deal_id: UUID
     proposals: List[ProposalComparisonItem]
+    # Prices below are in base_currency
     best_price: Optional[float]
     worst_price: Optional[float]
     best_lead_time: Optional[int]
     worst_lead_time: Optional[int]
+    base_currency: Optional[str] = None
+    # Weights the scores were computed with, renormalized over the criteria
+    # at least one proposal gives
+    weights: Dict[str, float] = Field(default_factory=dict)
+    lines: List[ProposalLineComparison] = Field(default_factory=list)
+    # Quoted currencies without a rate; those prices are left out
+    unconverted_currencies: List[str] = Field(default_factory=list)
 
 
 class VendorProposalListResponse(BaseModel):
     """Schema for vendor proposal list response."""
     total: int
     items: List[VendorProposalResponse]
+    # Pass as ?cursor= to get the next page (None on the last page)
+    next_cursor: Optional[str] = None
@@ -1,17 +1,37 @@
 """Activity log service for audit trail."""
-from datetime import datetime
+import asyncio
+import logging
+from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional, Union
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from sqlalchemy import func, select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models.activity_log import ActivityLog
 from app.schemas.activity_log import ActivityLogResponse, ChangeDetail
+from app.services import metrics
+from app.services.counts import TotalMode, count_total
+from app.services.pagination import Cursor, paginate
+
+logger = logging.getLogger(__name__)
+
+# Session.info keys for entries awaiting their unit of work's commit, and
+# for entries handed to the background writer once that commit succeeds
+_PENDING_KEY = "activity_log_pending"
+_HANDOFF_KEY = "activity_log_handoff"
 
 
 class ActivityLogService:
-    """Service for creating and retrieving activity logs."""
+    """
+    Service for creating and retrieving activity logs.
+
+    Entries are buffered on the session and written in one multi-row
+    INSERT when it commits (or by the background writer, see
+    AuditLogWriter), not flushed one by one.
+    """
 
     def __init__(self, db: AsyncSession, company_id: Optional[UUID] = None):
         self.db = db
@@ -62,20 +82,28 @@ class ActivityLogService:
         # Use company_id from parameter or from self
         log_company_id = company_id or self.company_id
 
-        activity_log = ActivityLog(
-            company_id=log_company_id,
-            deal_id=deal_id,
-            user_id=user_id_uuid,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            changes=changes_dict,
-        )
-
-        self.db.add(activity_log)
-        await self.db.flush()
-
-        return ActivityLogResponse.model_validate(activity_log)
+        # Written at commit; ID and timestamp are assigned now so the entry
+        # can be returned and keeps its place in the history
+        entry = {
+            "id": uuid4(),
+            "company_id": log_company_id,
+            "deal_id": deal_id,
+            "user_id": user_id_uuid,
+            "action": action,
+            "entity_type": entity_type,
+            "entity_id": entity_id,
+            "changes": changes_dict,
+            "created_at": datetime.now(timezone.utc),
+        }
+        self.db.info.setdefault(_PENDING_KEY, []).append(entry)
+
+        return ActivityLogResponse.model_validate(entry)
+
+    async def flush_pending(self) -> None:
+        """Write this session's buffered entries now (before reading the log back)."""
+        entries = self.db.info.pop(_PENDING_KEY, None)
+        if entries:
+            await self.db.execute(insert(ActivityLog), entries)
 
     @staticmethod
     def compute_changes(
@@ -122,7 +150,11 @@ class ActivityLogService:
         return changes
 
     async def get_deal_activity_logs(
-        self, deal_id: UUID, skip: int = 0, limit: int = 50
+        self,
+        deal_id: UUID,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[Cursor] = None,
     ) -> tuple[List[ActivityLogResponse], int]:
         """
         Retrieve activity logs for a deal.
@@ -131,10 +163,14 @@ class ActivityLogService:
             deal_id: The deal ID
             skip: Number of records to skip
             limit: Maximum number of records to return
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
 
         Returns:
             Tuple of (logs, total_count)
         """
+        # Include entries this unit of work hasn't committed yet
+        await self.flush_pending()
+
         # Get total count (filter by company)
         count_result = await self.db.execute(
             select(func.count())
@@ -147,17 +183,11 @@ class ActivityLogService:
         total = count_result.scalar() or 0
 
         # Get paginated results, ordered by created_at DESC (newest first)
-        query = (
-            select(ActivityLog)
-            .where(
-                (ActivityLog.deal_id == deal_id)
-                & (ActivityLog.company_id == self.company_id)
-            )
-            .order_by(ActivityLog.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+        query = select(ActivityLog).where(
+            (ActivityLog.deal_id == deal_id)
+            & (ActivityLog.company_id == self.company_id)
         )
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, ActivityLog, skip, limit, cursor))
         logs = result.scalars().all()
 
         return (
@@ -165,8 +195,56 @@ class ActivityLogService:
             total,
         )
 
+    async def get_deal_timeline(
+        self,
+        deal_id: UUID,
+        limit: int = 50,
+        cursor: Optional[Cursor] = None,
+        entity_types: Optional[List[str]] = None,
+        include_total: TotalMode = TotalMode.NONE,
+    ) -> tuple[List[ActivityLogResponse], Optional[int]]:
+        """
+        Everything that happened to a deal and to the quotes, customer POs
+        and vendor proposals under it, newest first.
+
+        Child entities log with their deal's ID, so this is one seek on
+        ix_activity_logs_deal_created (company_id, deal_id, created_at, id)
+        per page, however many children the deal has.
+
+        Args:
+            deal_id: The deal ID
+            limit: Maximum number of events to return
+            cursor: Continue after a previous page's next_cursor
+            entity_types: Only events of these entity types (e.g. ["quote"])
+            include_total: Whether and how to count all matching events
+
+        Returns:
+            Tuple of (events, total or None)
+        """
+        # Include entries this unit of work hasn't committed yet
+        await self.flush_pending()
+
+        query = select(ActivityLog).where(
+            (ActivityLog.company_id == self.company_id)
+            & (ActivityLog.deal_id == deal_id)
+        )
+        if entity_types:
+            query = query.where(ActivityLog.entity_type.in_(entity_types))
+
+        # Activity rows have no deleted_at, so they stay out of the count cache
+        total = await count_total(self.db, query, include_total, ActivityLog, self.company_id, None)
+        result = await self.db.execute(paginate(query, ActivityLog, 0, limit, cursor))
+        logs = result.scalars().all()
+
+        return [ActivityLogResponse.model_validate(log) for log in logs], total
+
     async def get_entity_activity_logs(
-        self, entity_type: str, entity_id: UUID, skip: int = 0, limit: int = 50
+        self,
+        entity_type: str,
+        entity_id: UUID,
+        skip: int = 0,
+        limit: int = 50,
+        cursor: Optional[Cursor] = None,
     ) -> tuple[List[ActivityLogResponse], int]:
         """
         Retrieve activity logs for any entity (generic method).
@@ -176,10 +254,14 @@ class ActivityLogService:
             entity_id: The entity ID
             skip: Number of records to skip
             limit: Maximum number of records to return
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
 
         Returns:
             Tuple of (logs, total_count)
         """
+        # Include entries this unit of work hasn't committed yet
+        await self.flush_pending()
+
         # Get total count (filter by company)
         count_result = await self.db.execute(
             select(func.count())
@@ -193,21 +275,161 @@ class ActivityLogService:
         total = count_result.scalar() or 0
 
         # Get paginated results, ordered by created_at DESC (newest first)
-        query = (
-            select(ActivityLog)
-            .where(
-                (ActivityLog.entity_type == entity_type)
-                & (ActivityLog.entity_id == entity_id)
-                & (ActivityLog.company_id == self.company_id)
-            )
-            .order_by(ActivityLog.created_at.desc())
-            .offset(skip)
-            .limit(limit)
+        query = select(ActivityLog).where(
+            (ActivityLog.entity_type == entity_type)
+            & (ActivityLog.entity_id == entity_id)
+            & (ActivityLog.company_id == self.company_id)
         )
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, ActivityLog, skip, limit, cursor))
         logs = result.scalars().all()
 
         return (
             [ActivityLogResponse.model_validate(log) for log in logs],
             total,
         )
+
+
+class AuditLogWriter:
+    """
+    Background writer for committed activity log entries.
+
+    With AUDIT_LOG_WRITER="background", a commit hands its entries here
+    instead of inserting them in its own transaction; the writer batches
+    entries from many requests into one INSERT on its own session. At
+    most max_pending entries wait in memory: beyond that, commits write
+    their entries inline again (backpressure instead of unbounded
+    growth). Entries still queued when the process dies are lost.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, max_pending: int, batch_size: int):
+        """
+        Initialize the writer.
+
+        Args:
+            session_factory: Factory for the application database sessions
+            max_pending: Entries that may wait to be written before commits write inline
+            batch_size: Most entries written per INSERT
+        """
+        self.session_factory = session_factory
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        # Entries reserved by committing sessions or queued, not yet written
+        self.pending = 0
+        self._queue: "asyncio.Queue[Optional[List[Dict[str, Any]]]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start writing on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def reserve(self, count: int) -> bool:
+        """
+        Claim room for a committing session's entries.
+
+        Returns:
+            False if the writer is full or stopped (write them inline)
+        """
+        if self._task is None or self._task.done() or self.pending + count > self.max_pending:
+            metrics.increment("audit_log.inline_writes")
+            return False
+        self.pending += count
+        return True
+
+    def release(self, count: int) -> None:
+        """Give back a reservation whose transaction rolled back."""
+        self.pending -= count
+
+    def submit(self, entries: List[Dict[str, Any]]) -> None:
+        """Queue reserved entries once their transaction has committed."""
+        self._queue.put_nowait(entries)
+
+    async def close(self) -> None:
+        """Write everything queued, then stop."""
+        if self._task is None:
+            return
+        self._queue.put_nowait(None)
+        await self._task
+        self._task = None
+
+    async def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = await self._queue.get()
+            if batch is None:
+                break
+            entries = list(batch)
+            while len(entries) < self.batch_size and not self._queue.empty():
+                batch = self._queue.get_nowait()
+                if batch is None:
+                    stopping = True
+                    break
+                entries.extend(batch)
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(insert(ActivityLog), entries)
+                    await db.commit()
+                metrics.increment("audit_log.batches")
+            except Exception as e:
+                logger.error(f"Failed to write {len(entries)} activity log entries: {e}")
+            finally:
+                self.pending -= len(entries)
+
+
+_writer: Optional[AuditLogWriter] = None
+
+
+def start_audit_writer(session_factory: async_sessionmaker) -> Optional[AuditLogWriter]:
+    """
+    Start the background writer if AUDIT_LOG_WRITER is "background".
+
+    Must be called on the event loop the API serves requests on.
+
+    Returns:
+        The running writer, or None when entries are written at commit
+    """
+    global _writer
+    if settings.AUDIT_LOG_WRITER != "background":
+        return None
+    if _writer is None:
+        _writer = AuditLogWriter(
+            session_factory,
+            max_pending=settings.AUDIT_LOG_MAX_PENDING,
+            batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+        )
+        _writer.start()
+    return _writer
+
+
+async def stop_audit_writer() -> None:
+    """Write out queued entries and stop the background writer."""
+    global _writer
+    if _writer is not None:
+        await _writer.close()
+        _writer = None
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_entries(session: Session) -> None:
+    """Write the unit of work's entries in one INSERT, or reserve the writer for them."""
+    entries = session.info.pop(_PENDING_KEY, None)
+    if not entries:
+        return
+    if _writer is not None and _writer.reserve(len(entries)):
+        session.info[_HANDOFF_KEY] = entries
+        return
+    session.execute(insert(ActivityLog), entries)
+
+
+@event.listens_for(Session, "after_commit")
+def _hand_off_entries(session: Session) -> None:
+    entries = session.info.pop(_HANDOFF_KEY, None)
+    if entries:
+        _writer.submit(entries)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_entries(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    entries = session.info.pop(_HANDOFF_KEY, None)
+    if entries and _writer is not None:
+        _writer.release(len(entries))
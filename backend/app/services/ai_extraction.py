@@ -1,15 +1,62 @@
 """AI extraction service using Anthropic Claude."""
+import asyncio
+import hashlib
 import json
 import logging
-from typing import Any, Dict
-from anthropic import Anthropic
+from typing import Any, Dict, Optional
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
+import httpx
 
 from app.config import settings
 from app.models.document import DocumentCategory
+from app.services.extraction_cache import ExtractionCache, get_extraction_cache
 
 logger = logging.getLogger(__name__)
 
 
+_prompt_versions: Dict[DocumentCategory, str] = {}
+
+_client: Optional[AsyncAnthropic] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def get_anthropic_client() -> AsyncAnthropic:
+    """
+    Get the process-wide Anthropic client, creating it on first use.
+
+    ANTHROPIC_MAX_CONNECTIONS bounds this one connection pool, so it limits
+    the whole process. Pooled connections belong to an event loop, so a new
+    client is created when called from a different loop (e.g. each
+    asyncio.run() in a Celery task).
+
+    Returns:
+        AsyncAnthropic client
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        _client = AsyncAnthropic(
+            api_key=settings.ANTHROPIC_API_KEY,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.ANTHROPIC_MAX_CONNECTIONS,
+                )
+            ),
+        )
+        _client_loop = loop
+    return _client
+
+
+async def close_anthropic_client() -> None:
+    """Close the process-wide Anthropic client's connection pool."""
+    global _client, _client_loop
+    client, loop = _client, _client_loop
+    _client = _client_loop = None
+    if client is not None and loop is asyncio.get_running_loop():
+        await client.close()
+
+
 class AIExtractionError(Exception):
     """Raised when AI extraction fails."""
 
@@ -19,23 +66,48 @@ class AIExtractionError(Exception):
 class AIExtractionService:
     """Extract structured data from documents using Claude."""
 
-    def __init__(self):
-        """Initialize Anthropic client."""
-        self.client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+    def __init__(
+        self,
+        cache: Optional[ExtractionCache] = None,
+        client: Optional[AsyncAnthropic] = None,
+    ):
+        """
+        Initialize AIExtractionService.
+
+        Args:
+            cache: Extraction result cache (process-wide cache if omitted)
+            client: Anthropic client (process-wide client if omitted)
+        """
+        self._client = client
         self.model = settings.ANTHROPIC_MODEL
         self.max_tokens = settings.ANTHROPIC_MAX_TOKENS
+        self.cache = cache or get_extraction_cache()
 
-    def extract_structured_data(
+    @property
+    def client(self) -> AsyncAnthropic:
+        return self._client or get_anthropic_client()
+
+    @client.setter
+    def client(self, client: AsyncAnthropic) -> None:
+        self._client = client
+
+    async def extract_structured_data(
         self,
         extracted_text: str,
         category: DocumentCategory,
+        force_refresh: bool = False,
     ) -> Dict[str, Any]:
         """
         Extract structured data from document text using Claude.
 
+        Results are cached by text, category, prompt version and model, so
+        the same text is only sent to Claude again when its category prompt
+        or the model changes.
+
         Args:
             extracted_text: Raw text extracted from document
             category: Document category (drives prompt strategy)
+            force_refresh: Skip the cache lookup (the new result is still cached)
 
         Returns:
             {
@@ -47,10 +119,29 @@ class AIExtractionService:
         Raises:
             AIExtractionError: If extraction fails
         """
+        cache_key = ExtractionCache.make_key(
+            extracted_text, category.value, self.prompt_version(category), self.model
+        )
+        if not force_refresh:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"Extraction cache hit for {category.value}")
+                return cached
+
+        extracted_data = await self._call_claude(extracted_text, category)
+        await self.cache.set(cache_key, extracted_data)
+        return extracted_data
+
+    async def _call_claude(
+        self,
+        extracted_text: str,
+        category: DocumentCategory,
+    ) -> Dict[str, Any]:
+        """Send the category prompt to Claude and parse its JSON reply."""
         try:
             prompt = self._build_prompt(extracted_text, category)
 
-            message = self.client.messages.create(
+            message = await self.client.messages.create(
                 model=self.model,
                 max_tokens=self.max_tokens,
                 messages=[{"role": "user", "content": prompt}],
@@ -88,6 +179,19 @@ class AIExtractionService:
         except Exception as e:
             raise AIExtractionError(f"AI extraction failed: {str(e)}")
 
+    @staticmethod
+    def prompt_version(category: DocumentCategory) -> str:
+        """
+        Version hash of a category's prompt template.
+
+        Changes to the shared instructions or to this category's schema
+        produce a new version, invalidating only the affected cache entries.
+        """
+        if category not in _prompt_versions:
+            template = AIExtractionService._build_prompt("{text}", category)
+            _prompt_versions[category] = hashlib.sha256(template.encode("utf-8")).hexdigest()[:16]
+        return _prompt_versions[category]
+
     @staticmethod
     def _build_prompt(extracted_text: str, category: DocumentCategory) -> str:
         """
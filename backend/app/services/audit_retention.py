@@ -0,0 +1,246 @@
+"""Monthly partitions of activity_log, and archiving of old months to object storage."""
+import gzip
+import json
+import logging
+import re
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.activity_log import ActivityLog
+from app.services import metrics
+from app.services.storage import StorageService
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_PREFIX = "activity-log-archive"
+
+_PARTITION_NAME = re.compile(r"^activity_log_p(\d{4})_(\d{2})$")
+
+
+def month_floor(value: datetime) -> datetime:
+    """First instant (UTC) of the month value falls in."""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, count: int) -> datetime:
+    """The month count months after (or before) a month_floor() value."""
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime) -> str:
+    """Name of a month's partition, e.g. activity_log_p2026_01."""
+    return f"activity_log_p{month.year:04d}_{month.month:02d}"
+
+
+def archive_key(month: datetime, company_id: Optional[UUID]) -> str:
+    """Object key of one tenant's archived month."""
+    return f"{ARCHIVE_PREFIX}/{month.year:04d}-{month.month:02d}/{company_id or 'unassigned'}.jsonl.gz"
+
+
+def _is_postgres(db: AsyncSession) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+async def _partition_months(db: AsyncSession) -> List[datetime]:
+    """Months that have a partition, oldest first (PostgreSQL only)."""
+    if not _is_postgres(db):
+        return []
+    result = await db.execute(text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE parent.relname = 'activity_log'"
+    ))
+    months = []
+    for name in result.scalars():
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc))
+    return sorted(months)
+
+
+async def _oldest_unpartitioned(db: AsyncSession) -> Optional[datetime]:
+    """Oldest created_at outside the monthly partitions (of any row elsewhere)."""
+    if _is_postgres(db):
+        return (await db.execute(text("SELECT min(created_at) FROM activity_log_default"))).scalar()
+    return (await db.execute(select(func.min(ActivityLog.created_at)))).scalar()
+
+
+async def ensure_partitions(db: AsyncSession, first: datetime, last: datetime) -> List[str]:
+    """
+    Create the monthly partitions from first to last that don't exist yet.
+
+    No-op on other databases. Fails if activity_log_default already holds
+    rows for a month being created, which creating months ahead avoids.
+
+    Args:
+        db: Session to run the DDL in
+        first: First month (a month_floor() value)
+        last: Last month, inclusive
+
+    Returns:
+        Names of the partitions created
+    """
+    if not _is_postgres(db):
+        return []
+    existing = set(await _partition_months(db))
+    created = []
+    month = first
+    while month <= last:
+        if month not in existing:
+            name = partition_name(month)
+            await db.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF activity_log "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    if created:
+        logger.info(f"Created activity_log partitions: {', '.join(created)}")
+    return created
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+async def _export_month(db: AsyncSession, storage: StorageService, month: datetime) -> int:
+    """Upload a month's rows as one gzipped JSONL object per tenant."""
+    table = ActivityLog.__table__
+    rows = await db.stream(
+        select(table)
+        .where(table.c.created_at >= month, table.c.created_at < add_months(month, 1))
+        .order_by(table.c.company_id, table.c.created_at, table.c.id)
+        .execution_options(yield_per=1000)
+    )
+
+    count = 0
+    current: Optional[Tuple[Optional[UUID], BinaryIO, gzip.GzipFile]] = None
+    try:
+        async for row in rows.mappings():
+            if current is None or current[0] != row["company_id"]:
+                if current is not None:
+                    await _upload(storage, month, *current)
+                spool = tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024)
+                current = (row["company_id"], spool, gzip.GzipFile(fileobj=spool, mode="wb"))
+            line = json.dumps(dict(row), default=_json_default, separators=(",", ":"))
+            current[2].write(line.encode() + b"\n")
+            count += 1
+        if current is not None:
+            await _upload(storage, month, *current)
+            current = None
+    finally:
+        if current is not None:
+            current[1].close()
+    return count
+
+
+async def _upload(
+    storage: StorageService,
+    month: datetime,
+    company_id: Optional[UUID],
+    spool: BinaryIO,
+    archive: gzip.GzipFile,
+) -> None:
+    try:
+        archive.close()
+        spool.seek(0)
+        await storage.upload_object_async(spool, archive_key(month, company_id), content_type="application/gzip")
+    finally:
+        spool.close()
+
+
+async def archive_month(db: AsyncSession, storage: StorageService, month: datetime) -> int:
+    """
+    Move one month of activity log out of the database into object storage.
+
+    Rows are uploaded first (per tenant, see archive_key), then the month
+    is removed: its partition is detached and dropped on PostgreSQL,
+    which leaves nothing to vacuum, and its rows deleted elsewhere.
+    Re-running after a failure re-uploads the same objects.
+
+    Args:
+        db: Session to run in; the caller commits
+        storage: Object storage to archive to
+        month: The month to archive (a month_floor() value)
+
+    Returns:
+        Number of rows archived
+    """
+    count = await _export_month(db, storage, month)
+    if _is_postgres(db) and month in await _partition_months(db):
+        name = partition_name(month)
+        await db.execute(text(f"ALTER TABLE activity_log DETACH PARTITION {name}"))
+        await db.execute(text(f"DROP TABLE {name}"))
+    else:
+        await db.execute(
+            delete(ActivityLog).where(
+                ActivityLog.created_at >= month, ActivityLog.created_at < add_months(month, 1)
+            )
+        )
+    metrics.increment("audit_log.archived_rows", count)
+    logger.info(f"Archived {count} activity log rows for {month:%Y-%m}")
+    return count
+
+
+async def maintain_activity_log(
+    session_factory: async_sessionmaker,
+    storage: StorageService,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Keep activity_log to its hot window.
+
+    Creates partitions AUDIT_LOG_PARTITIONS_AHEAD months ahead, then
+    archives every month older than AUDIT_LOG_HOT_MONTHS (none when
+    that is <= 0), committing month by month. Archived months are read
+    back from object storage, not through the API.
+
+    Args:
+        session_factory: Factory for the sessions to run in
+        storage: Object storage to archive to
+        now: Current time (defaults to now)
+
+    Returns:
+        Dict with the partitions created and the months and rows archived
+    """
+    current = month_floor(now or datetime.now(timezone.utc))
+    summary: Dict[str, Any] = {"partitions_created": [], "months_archived": [], "rows_archived": 0}
+
+    async with session_factory() as db:
+        summary["partitions_created"] = await ensure_partitions(
+            db, current, add_months(current, settings.AUDIT_LOG_PARTITIONS_AHEAD)
+        )
+        await db.commit()
+
+        if settings.AUDIT_LOG_HOT_MONTHS <= 0:
+            return summary
+        cutoff = add_months(current, -settings.AUDIT_LOG_HOT_MONTHS)
+
+        # Whole partitions past retention, then months of rows outside them
+        # (the DEFAULT partition on PostgreSQL, the whole table elsewhere)
+        months = [month for month in await _partition_months(db) if month < cutoff]
+        while True:
+            for month in months:
+                summary["rows_archived"] += await archive_month(db, storage, month)
+                await db.commit()
+                summary["months_archived"].append(f"{month:%Y-%m}")
+            oldest = await _oldest_unpartitioned(db)
+            if oldest is None or month_floor(oldest) >= cutoff:
+                break
+            months = [month_floor(oldest)]
+
+    return summary
@@ -0,0 +1,327 @@
+"""Total counts for list endpoints: exact, estimated or skipped."""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import Select, event, func, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "count_cache"
+
+# Session.info keys for row changes found before a flush, and to apply to
+# the cache at commit
+_FLUSH_KEY = "count_cache_flush"
+_PENDING_KEY = "count_cache_changes"
+
+
+class TotalMode(str, Enum):
+    """The include_total query parameter of list endpoints."""
+
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+    NONE = "false"
+
+
+class _NotNull:
+    """Filter value matching any non-NULL column value."""
+
+    def __repr__(self) -> str:
+        return "NOT_NULL"
+
+
+NOT_NULL = _NotNull()
+
+Filters = Dict[str, Hashable]
+
+
+class CountCache:
+    """
+    Live row counts per (table, company, filters).
+
+    Each entry is seeded with one exact count and then adjusted as rows
+    are created, deleted or soft-deleted in this process, so a busy list
+    screen counts once per TTL instead of once per request. Entries whose
+    filters a row update might change (a deal moving status) are dropped
+    rather than adjusted. Filters are column equalities, with NOT_NULL
+    for "IS NOT NULL"; soft-deleted rows are never counted.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Entries kept before evicting the least recently used
+            ttl_seconds: How long a seeded count is trusted
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # (table, company_id) -> {filter items: (expires_at, count)}
+        self._entries: "OrderedDict[Tuple[str, UUID], Dict[tuple, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _filter_key(filters: Filters) -> tuple:
+        return tuple(sorted(filters.items()))
+
+    def get(self, table: str, company_id: UUID, filters: Filters) -> Optional[int]:
+        """Cached count, or None on a miss."""
+        with self._lock:
+            group = self._entries.get((table, company_id))
+            entry = group.get(self._filter_key(filters)) if group else None
+            if entry is not None and entry[0] <= time.monotonic():
+                del group[self._filter_key(filters)]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((table, company_id))
+        metrics.increment(f"{METRIC_PREFIX}.hits" if entry is not None else f"{METRIC_PREFIX}.misses")
+        return int(entry[1]) if entry is not None else None
+
+    def set(self, table: str, company_id: UUID, filters: Filters, count: int) -> None:
+        """Seed a count from an exact query."""
+        with self._lock:
+            group = self._entries.setdefault((table, company_id), {})
+            group[self._filter_key(filters)] = [time.monotonic() + self.ttl_seconds, count]
+            self._entries.move_to_end((table, company_id))
+            while sum(len(g) for g in self._entries.values()) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment(f"{METRIC_PREFIX}.evictions")
+
+    def apply(self, table: str, company_id: UUID, values: Dict[str, Any], delta: int) -> None:
+        """Add delta to every count whose filters the row matches."""
+        with self._lock:
+            group = self._entries.get((table, company_id))
+            if not group:
+                return
+            for key, entry in group.items():
+                if all(_matches(values.get(column), value) for column, value in key):
+                    entry[1] = max(0, entry[1] + delta)
+
+    def invalidate(self, table: str, company_id: UUID, columns: Set[str]) -> None:
+        """Drop the counts that filter on any of columns."""
+        with self._lock:
+            group = self._entries.get((table, company_id))
+            if not group:
+                return
+            for key in [key for key in group if any(column in columns for column, _ in key)]:
+                del group[key]
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _matches(row_value: Any, filter_value: Any) -> bool:
+    if filter_value is NOT_NULL:
+        return row_value is not None
+    return row_value == filter_value
+
+
+_cache: Optional[CountCache] = None
+
+
+def get_count_cache() -> Optional[CountCache]:
+    """
+    Get the process-wide count cache, creating it on first use.
+
+    Returns:
+        CountCache, or None when COUNT_CACHE_TTL_SECONDS <= 0
+    """
+    global _cache
+    if settings.COUNT_CACHE_TTL_SECONDS <= 0:
+        return None
+    if _cache is None:
+        _cache = CountCache(
+            max_entries=settings.COUNT_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.COUNT_CACHE_TTL_SECONDS,
+        )
+    return _cache
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, binds and all."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+async def estimate_rows(db: AsyncSession, query: Select) -> Optional[int]:
+    """
+    The PostgreSQL planner's row estimate for a query.
+
+    Costs a plan, not a scan; accuracy depends on how fresh ANALYZE
+    statistics are.
+
+    Returns:
+        Estimated row count, or None on other databases or if EXPLAIN fails
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return None
+    try:
+        plan = (await db.execute(_Explain(query))).scalar()
+    except Exception as e:
+        logger.warning(f"Planner row estimate failed: {e}")
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def count_total(
+    db: AsyncSession,
+    query: Select,
+    mode: TotalMode,
+    model: Any,
+    company_id: UUID,
+    filters: Optional[Filters] = None,
+) -> Optional[int]:
+    """
+    Total for a list query according to include_total.
+
+    ESTIMATE reads the count cache when the query's filters are
+    cacheable, seeding it with one exact count on a miss; otherwise it
+    uses the planner estimate, and an exact count where there is none.
+
+    Args:
+        db: Session to count in
+        query: The list query, filtered but not ordered or paginated
+        mode: TotalMode from the request
+        model: Mapped class the query selects (company_id, deleted_at)
+        company_id: Tenant the query is scoped to
+        filters: The query's filters beyond company_id and deleted_at as
+            column equalities, or None if it has others (e.g. text search)
+
+    Returns:
+        The total, or None for TotalMode.NONE
+    """
+    if mode == TotalMode.NONE:
+        return None
+
+    if mode == TotalMode.ESTIMATE:
+        cache = get_count_cache()
+        if cache is not None and filters is not None:
+            total = cache.get(model.__tablename__, company_id, filters)
+            if total is None:
+                total = await _exact_count(db, query)
+                cache.set(model.__tablename__, company_id, filters, total)
+            return total
+        total = await estimate_rows(db, query)
+        if total is not None:
+            return total
+
+    return await _exact_count(db, query)
+
+
+async def _exact_count(db: AsyncSession, query: Select) -> int:
+    count_query = query.with_only_columns(func.count(), maintain_column_froms=True).order_by(None)
+    return (await db.execute(count_query)).scalar() or 0
+
+
+def _counted(obj: Any) -> bool:
+    return hasattr(obj, "company_id") and hasattr(obj, "deleted_at") and hasattr(obj, "__tablename__")
+
+
+def _changed_columns(obj: Any) -> Set[str]:
+    state = inspect(obj)
+    return {attr.key for attr in state.mapper.column_attrs if state.attrs[attr.key].history.has_changes()}
+
+
+def _was_live(obj: Any) -> bool:
+    """Whether the row was counted before this flush (deleted_at was NULL)."""
+    history = inspect(obj).attrs.deleted_at.history
+    if history.deleted:
+        return history.deleted[0] is None
+    if history.added:
+        # Previous value never loaded; services only soft-delete live rows
+        return True
+    return inspect(obj).dict.get("deleted_at") is None
+
+
+def _is_live(obj: Any) -> bool:
+    """Whether the row counts after this flush (deleted_at may be func.now())."""
+    history = inspect(obj).attrs.deleted_at.history
+    if history.added:
+        return history.added[0] is None
+    return inspect(obj).dict.get("deleted_at") is None
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_row_changes(session: Session, flush_context, instances) -> None:
+    """
+    Note counted rows this flush creates, (soft-)deletes or changes.
+
+    Runs before the flush, which resets the history of SQL-expression
+    values such as func.now(); column values are read after it.
+    """
+    if _cache is None:
+        return
+    changes = []
+    for obj in session.new:
+        if _counted(obj) and _is_live(obj):
+            changes.append((obj, 1, set()))
+    for obj in session.dirty:
+        if not _counted(obj):
+            continue
+        changed = _changed_columns(obj)
+        delta = int(_is_live(obj)) - int(_was_live(obj)) if "deleted_at" in changed else 0
+        changed.discard("deleted_at")
+        if delta or changed:
+            changes.append((obj, delta, changed))
+    for obj in session.deleted:
+        if _counted(obj) and _was_live(obj):
+            changes.append((obj, -1, set()))
+    if changes:
+        session.info.setdefault(_FLUSH_KEY, []).extend(changes)
+
+
+@event.listens_for(Session, "after_flush")
+def _snapshot_row_changes(session: Session, flush_context) -> None:
+    """Record the flushed rows' column values (defaults applied, no lazy loads)."""
+    for obj, delta, changed in session.info.pop(_FLUSH_KEY, []):
+        state = inspect(obj)
+        values = {attr.key: state.dict.get(attr.key) for attr in state.mapper.column_attrs}
+        if values["company_id"] is not None:
+            session.info.setdefault(_PENDING_KEY, []).append(
+                (obj.__tablename__, values["company_id"], values, delta, changed)
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_changes(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, [])
+    cache = _cache
+    if cache is None:
+        return
+    for table, company_id, values, delta, changed in changes:
+        # A row whose filter columns changed may have moved between counts
+        if changed:
+            cache.invalidate(table, company_id, changed)
+        if delta:
+            cache.apply(table, company_id, values, delta)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_changes(session: Session) -> None:
+    session.info.pop(_FLUSH_KEY, None)
+    session.info.pop(_PENDING_KEY, None)
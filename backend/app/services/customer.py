@@ -1,5 +1,5 @@
 """Customer service for CRM operations."""
-from typing import Optional, Union
+from typing import List, Optional, Union
 from uuid import UUID
 
 from sqlalchemy import func, select
@@ -10,9 +10,19 @@ from app.schemas.customer import (
     CustomerCreate,
     CustomersListResponse,
     CustomerResponse,
+    CustomerSuggestion,
     CustomerUpdate,
 )
 from app.services.activity_log import ActivityLogService
+from app.services.counts import TotalMode, count_total
+from app.services.pagination import Cursor, next_cursor, paginate
+from app.services.search import autocomplete_filter, text_search
+from app.services.sequence import next_number, reserve_number
+
+CUSTOMER_CODE_PREFIX = "CUST-"
+
+# Columns of the customer text search index (see app.models.customer)
+CUSTOMER_SEARCH_COLUMNS = ("company_name", "customer_code")
 
 
 class CustomerService:
@@ -43,6 +53,8 @@ class CustomerService:
         customer_code = customer_data.customer_code
         if not customer_code:
             customer_code = await self._generate_customer_code()
+        else:
+            await reserve_number(self.db, self.company_id, CUSTOMER_CODE_PREFIX, customer_code)
 
         customer = Customer(
             company_id=self.company_id,
@@ -83,26 +95,8 @@ class CustomerService:
         Returns:
             Generated customer code
         """
-        # Get all existing customer codes for this company
-        query = select(Customer.customer_code).where(
-            Customer.company_id == self.company_id
-        ).order_by(Customer.customer_code.desc())
-        result = await self.db.execute(query)
-        customer_codes = result.scalars().all()
-
-        # Extract numeric parts and find maximum
-        max_num = 0
-        for code in customer_codes:
-            if code and code.startswith("CUST-"):
-                try:
-                    num = int(code.split("-")[1])
-                    max_num = max(max_num, num)
-                except (ValueError, IndexError):
-                    pass
-
-        # Generate next code
-        next_num = max_num + 1
-        return f"CUST-{next_num:03d}"
+        number = await next_number(self.db, Customer.customer_code, self.company_id, CUSTOMER_CODE_PREFIX)
+        return f"{CUSTOMER_CODE_PREFIX}{number:03d}"
 
     async def get_customer(self, customer_id: UUID) -> Optional[CustomerResponse]:
         """
@@ -131,6 +125,7 @@ class CustomerService:
         is_active: Optional[bool] = None,
         country: Optional[str] = None,
         search: Optional[str] = None,
+        cursor: Optional[Cursor] = None,
     ) -> CustomersListResponse:
         """
         List customers with optional filters.
@@ -141,6 +136,7 @@ class CustomerService:
             is_active: Filter by active status
             country: Filter by country
             search: Search by company name or customer code
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
 
         Returns:
             Paginated list response
@@ -156,37 +152,13 @@ class CustomerService:
         if country:
             query = query.where(Customer.country == country)
         if search:
-            search_term = f"%{search}%"
-            query = query.where(
-                (Customer.company_name.ilike(search_term))
-                | (Customer.customer_code.ilike(search_term))
-            )
+            query, _ = text_search(self.db, query, Customer, CUSTOMER_SEARCH_COLUMNS, search)
 
         # Get total count
-        count_query = select(func.count()).select_from(Customer).where(
-            (Customer.deleted_at.is_(None)) & (Customer.company_id == self.company_id)
-        )
-        if is_active is not None:
-            count_query = count_query.where(Customer.is_active == is_active)
-        if country:
-            count_query = count_query.where(Customer.country == country)
-        if search:
-            search_term = f"%{search}%"
-            count_query = count_query.where(
-                (Customer.company_name.ilike(search_term))
-                | (Customer.customer_code.ilike(search_term))
-            )
-
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
+        total = await count_total(self.db, query, TotalMode.EXACT, Customer, self.company_id)
 
         # Get paginated results, ordered by created_at DESC
-        query = (
-            query.order_by(Customer.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, Customer, skip, limit, cursor))
         customers = result.scalars().all()
 
         return CustomersListResponse(
@@ -194,7 +166,37 @@ class CustomerService:
             total=total,
             skip=skip,
             limit=limit,
+            next_cursor=next_cursor(customers, limit),
+        )
+
+    async def autocomplete_customers(self, prefix: str, limit: int = 10) -> List[CustomerSuggestion]:
+        """
+        Active customers whose name or code starts with prefix.
+
+        Args:
+            prefix: What the user has typed so far
+            limit: Max suggestions to return
+
+        Returns:
+            Suggestions ordered by name
+        """
+        if not prefix.strip():
+            return []
+        result = await self.db.execute(
+            select(Customer.id, Customer.customer_code, Customer.company_name)
+            .where(
+                (Customer.deleted_at.is_(None))
+                & (Customer.company_id == self.company_id)
+                & (Customer.is_active.is_(True))
+                & autocomplete_filter(self.db, Customer, CUSTOMER_SEARCH_COLUMNS, prefix)
+            )
+            .order_by(func.lower(Customer.company_name), Customer.id)
+            .limit(limit)
         )
+        return [
+            CustomerSuggestion(id=row.id, customer_code=row.customer_code, company_name=row.company_name)
+            for row in result
+        ]
 
     async def update_customer(
         self, customer_id: UUID, update_data: CustomerUpdate
@@ -1,8 +1,9 @@
 """CustomerPO service for purchase order management with state machine logic."""
+from datetime import datetime
 from typing import Optional, Union
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.customer_po import CustomerPO, CustomerPOStatus
@@ -14,6 +15,14 @@ from app.schemas.customer_po import (
 )
 from app.schemas.activity_log import ChangeDetail
 from app.services.activity_log import ActivityLogService
+from app.services.counts import TotalMode, count_total
+from app.services.pagination import Cursor, next_cursor, paginate
+from app.services.sequence import next_number, reserve_number
+
+
+def _internal_ref_prefix() -> str:
+    """Internal references restart every year: CPO-2026-001, ..."""
+    return f"CPO-{datetime.now().year}-"
 
 
 # State machine: valid transitions
@@ -54,6 +63,8 @@ class CustomerPOService:
         internal_ref = po_data.internal_ref
         if not internal_ref:
             internal_ref = await self._generate_internal_ref()
+        else:
+            await reserve_number(self.db, self.company_id, _internal_ref_prefix(), internal_ref)
 
         # Convert line items to list of dicts
         line_items_dict = [item.model_dump() for item in po_data.line_items]
@@ -118,6 +129,8 @@ class CustomerPOService:
         deal_id: Optional[UUID] = None,
         quote_id: Optional[UUID] = None,
         status: Optional[CustomerPOStatus] = None,
+        cursor: Optional[Cursor] = None,
+        include_total: TotalMode = TotalMode.EXACT,
     ) -> CustomerPOsListResponse:
         """
         List customer POs with optional filters.
@@ -129,6 +142,8 @@ class CustomerPOService:
             deal_id: Filter by deal
             quote_id: Filter by quote
             status: Filter by status
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
+            include_total: Whether to count exactly, estimate or skip the total
 
         Returns:
             Paginated list response
@@ -149,28 +164,19 @@ class CustomerPOService:
             query = query.where(CustomerPO.status == status)
 
         # Get total count
-        count_query = select(func.count()).select_from(CustomerPO).where(
-            (CustomerPO.deleted_at.is_(None)) & (CustomerPO.company_id == self.company_id)
+        filters = {
+            "customer_id": customer_id,
+            "deal_id": deal_id,
+            "quote_id": quote_id,
+            "status": status,
+        }
+        total = await count_total(
+            self.db, query, include_total, CustomerPO, self.company_id,
+            {column: value for column, value in filters.items() if value},
         )
-        if customer_id:
-            count_query = count_query.where(CustomerPO.customer_id == customer_id)
-        if deal_id:
-            count_query = count_query.where(CustomerPO.deal_id == deal_id)
-        if quote_id:
-            count_query = count_query.where(CustomerPO.quote_id == quote_id)
-        if status:
-            count_query = count_query.where(CustomerPO.status == status)
-
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
 
         # Get paginated results, ordered by created_at DESC
-        query = (
-            query.order_by(CustomerPO.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, CustomerPO, skip, limit, cursor))
         customer_pos = result.scalars().all()
 
         return CustomerPOsListResponse(
@@ -178,6 +184,7 @@ class CustomerPOService:
             total=total,
             skip=skip,
             limit=limit,
+            next_cursor=next_cursor(customer_pos, limit),
         )
 
     async def update_customer_po(
@@ -355,8 +362,6 @@ class CustomerPOService:
                     # Auto-update deal status
                     old_deal_status = deal.status
                     deal.status = target_deal_status
-                    await self.db.flush()
-                    await self.db.refresh(deal)
 
                     # Log deal auto-update
                     await self.activity_log_service.log_activity(
@@ -415,29 +420,9 @@ class CustomerPOService:
         Returns:
             Generated internal reference
         """
-        from datetime import datetime
-
-        # Get all existing internal references for this company
-        current_year = datetime.now().year
-        query = select(CustomerPO.internal_ref).where(
-            CustomerPO.company_id == self.company_id
-        ).order_by(CustomerPO.internal_ref.desc())
-        result = await self.db.execute(query)
-        internal_refs = result.scalars().all()
-
-        # Extract numeric parts and find maximum for current year
-        max_num = 0
-        for ref in internal_refs:
-            if ref and f"CPO-{current_year}-" in ref:
-                try:
-                    num = int(ref.split("-")[-1])
-                    max_num = max(max_num, num)
-                except (ValueError, IndexError):
-                    pass
-
-        # Generate next number
-        next_num = max_num + 1
-        return f"CPO-{current_year}-{next_num:03d}"
+        prefix = _internal_ref_prefix()
+        number = await next_number(self.db, CustomerPO.internal_ref, self.company_id, prefix)
+        return f"{prefix}{number:03d}"
 
     async def _get_customer_po_internal(self, po_id: UUID) -> Optional[CustomerPO]:
         """Internal method to get customer PO (excludes soft-deleted, filters by company)."""
@@ -2,7 +2,7 @@
 from typing import Any, Dict, Optional, Tuple, Union
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.deal import Deal, DealStatus
@@ -14,7 +14,12 @@ from app.schemas.deal import (
 )
 from app.schemas.activity_log import ChangeDetail
 from app.services.activity_log import ActivityLogService
+from app.services.counts import TotalMode, count_total
+from app.services.pagination import Cursor, next_cursor, paginate
+from app.services.sequence import next_number, reserve_number
+from app.services.vendor_metrics import record_deal_progress
 
+DEAL_NUMBER_PREFIX = "DEAL-"
 
 # State machine: valid transitions
 VALID_STATUS_TRANSITIONS = {
@@ -69,6 +74,8 @@ class DealService:
         deal_number = deal_data.deal_number
         if not deal_number:
             deal_number = await self._generate_deal_number()
+        else:
+            await reserve_number(self.db, self.company_id, DEAL_NUMBER_PREFIX, deal_number)
 
         # Convert line items to list of dicts
         line_items_dict = [item.model_dump() for item in deal_data.line_items]
@@ -143,6 +150,8 @@ class DealService:
         limit: int = 50,
         status: Optional[DealStatus] = None,
         customer_id: Optional[UUID] = None,
+        cursor: Optional[Cursor] = None,
+        include_total: TotalMode = TotalMode.EXACT,
     ) -> DealListResponse:
         """
         List deals with optional filters.
@@ -152,6 +161,8 @@ class DealService:
             limit: Max records to return
             status: Filter by status
             customer_id: Filter by customer
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
+            include_total: Whether to count exactly, estimate or skip the total
 
         Returns:
             Paginated list response
@@ -168,24 +179,14 @@ class DealService:
             query = query.where(Deal.customer_id == customer_id)
 
         # Get total count
-        count_query = select(func.count()).select_from(Deal).where(
-            (Deal.deleted_at.is_(None)) & (Deal.company_id == self.company_id)
+        filters = {"status": status, "customer_id": customer_id}
+        total = await count_total(
+            self.db, query, include_total, Deal, self.company_id,
+            {column: value for column, value in filters.items() if value},
         )
-        if status:
-            count_query = count_query.where(Deal.status == status)
-        if customer_id:
-            count_query = count_query.where(Deal.customer_id == customer_id)
-        count_result = await self.db.execute(count_query)
-
-        total = count_result.scalar() or 0
 
         # Get paginated results, ordered by created_at DESC
-        query = (
-            query.order_by(Deal.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, Deal, skip, limit, cursor))
         deals = result.scalars().all()
 
         return DealListResponse(
@@ -193,6 +194,7 @@ class DealService:
             total=total,
             skip=skip,
             limit=limit,
+            next_cursor=next_cursor(deals, limit),
         )
 
     async def update_deal(
@@ -305,6 +307,7 @@ class DealService:
 
         # Update status
         deal.status = new_status
+        await record_deal_progress(self.db, deal, new_status)
         await self.db.flush()
         await self.db.refresh(deal)
 
@@ -365,26 +368,8 @@ class DealService:
         Returns:
             Generated deal number
         """
-        # Get all existing deal numbers for this company (including soft-deleted)
-        query = select(Deal.deal_number).where(
-            Deal.company_id == self.company_id
-        ).order_by(Deal.deal_number.desc())
-        result = await self.db.execute(query)
-        deal_numbers = result.scalars().all()
-
-        # Extract numeric parts and find maximum
-        max_num = 0
-        for deal_num in deal_numbers:
-            if deal_num and deal_num.startswith("DEAL-"):
-                try:
-                    num = int(deal_num.split("-")[1])
-                    max_num = max(max_num, num)
-                except (ValueError, IndexError):
-                    pass
-
-        # Generate next number
-        next_num = max_num + 1
-        return f"DEAL-{next_num:03d}"
+        number = await next_number(self.db, Deal.deal_number, self.company_id, DEAL_NUMBER_PREFIX)
+        return f"{DEAL_NUMBER_PREFIX}{number:03d}"
 
     async def _get_deal_internal(self, deal_id: UUID) -> Optional[Deal]:
         """Internal method to get deal (excludes soft-deleted, filters by company)."""
@@ -1,19 +1,41 @@
 """Document service - orchestrates storage, parsing, and AI extraction."""
+import hashlib
 import logging
 from datetime import datetime
-from typing import Optional, List
+from typing import BinaryIO, Dict, Optional, List
 from uuid import UUID
 
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, and_, or_, case
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import defer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models.document import Document, DocumentCategory, DocumentStatus
-from app.services.storage import StorageService
-from app.services.document_parsing import DocumentParsingService, DocumentParsingError
+from app.models.document import (
+    SEARCHABLE_PARSED_FIELDS,
+    Document,
+    DocumentCategory,
+    DocumentProcessingStage,
+    DocumentStatus,
+)
+from app.models.embedding import DocumentEmbedding, LineItemEmbedding
+from app.services.storage import UploadReader, get_storage_service
+from app.services.document_parsing import DocumentParsingError
 from app.services.ai_extraction import AIExtractionService, AIExtractionError
+from app.services import metrics
+from app.services.counts import NOT_NULL, TotalMode, count_total
+from app.services.pagination import Cursor, paginate
+from app.services.pdf_ocr import extract_text_with_ocr
+from app.services.embeddings import embed_texts, get_embedder, index_document, nearest
+from app.services.search import full_text_search, full_text_snippets, json_field, prefix_match
 
 logger = logging.getLogger(__name__)
 
+# Maximum file size: 25MB
+MAX_UPLOAD_SIZE = 25 * 1024 * 1024
+
+# Columns document search looks in
+DOCUMENT_SEARCH_COLUMNS = ("original_filename", "description", "extracted_text")
+
 
 class DocumentService:
     """Manage document upload, parsing, and AI extraction."""
@@ -35,8 +57,15 @@ class DocumentService:
         self.db = db
         self.company_id = company_id
         self.user_id = user_id
-        self.storage_service = StorageService()
-        self.ai_service = AIExtractionService()
+        self.storage_service = get_storage_service()
+        self._ai_service: Optional[AIExtractionService] = None
+
+    @property
+    def ai_service(self) -> AIExtractionService:
+        """AI extraction client, created only on the paths that extract."""
+        if self._ai_service is None:
+            self._ai_service = AIExtractionService()
+        return self._ai_service
 
     async def upload_and_process_document(
         self,
@@ -48,14 +77,16 @@ class DocumentService:
         entity_id: Optional[UUID | str] = None,
         description: Optional[str] = None,
         tags: Optional[List[str]] = None,
+        content_hash: Optional[str] = None,
     ) -> Document:
         """
         Upload file and process it synchronously.
 
         Flow:
-        1. Upload to MinIO
-        2. Create DB record (status=PROCESSING)
-        3. Download file and extract text
+        1. Upload to MinIO (skipped when the same content is already stored)
+        2. Create DB record (status=PROCESSING, or COMPLETED for a duplicate
+           whose text and AI results can be reused, which ends the flow)
+        3. Extract text
         4. Send to Claude for structured extraction
         5. Update DB with results (status=COMPLETED/FAILED)
         6. Log activity
@@ -69,6 +100,7 @@ class DocumentService:
             entity_id: Optional entity ID
             description: Optional user description
             tags: Optional list of tags
+            content_hash: SHA-256 of file_content if already computed
 
         Returns:
             Document record (with all extracted data)
@@ -77,59 +109,42 @@ class DocumentService:
             ValueError: If validation fails
             Exception: If processing fails (catches and saves status=FAILED)
         """
-        # Validation
-        if not file_content:
-            raise ValueError("File content cannot be empty")
-
-        file_size_mb = len(file_content) / (1024 * 1024)
-        if file_size_mb > 25:
-            raise ValueError(f"File too large: {file_size_mb:.1f}MB (max 25MB)")
-
-        # Convert entity_id to UUID if it's a string
-        if entity_id and isinstance(entity_id, str):
-            entity_id = UUID(entity_id)
-
-        if entity_type and not entity_id:
-            raise ValueError("entity_id required when entity_type is specified")
+        entity_id = self._validate_upload(file_content, entity_type, entity_id)
+        content_hash = content_hash or self.compute_content_hash(file_content)
 
         try:
-            # Step 1: Upload to MinIO
-            logger.info(f"Uploading {filename} to MinIO...")
-            storage_key = self.storage_service.upload_file(
+            # Steps 1-2: Upload to MinIO (unless the content is already stored)
+            # and create the DB record
+            document = await self._create_document(
                 file_content=file_content,
+                file_size=len(file_content),
+                content_hash=content_hash,
                 filename=filename,
-                company_id=self.company_id,
-                content_type=mime_type,
-            )
-
-            # Step 2: Create initial DB record
-            document = Document(
-                company_id=self.company_id,
+                mime_type=mime_type,
+                category=category,
                 entity_type=entity_type,
                 entity_id=entity_id,
-                category=category,
-                storage_bucket="documents",  # From config
-                storage_key=storage_key,
-                original_filename=filename,
-                file_size_bytes=len(file_content),
-                mime_type=mime_type,
-                status=DocumentStatus.PROCESSING,
                 description=description,
-                tags=tags or [],
+                tags=tags,
             )
-            self.db.add(document)
-            await self.db.flush()
             logger.info(f"Created document record: {document.id}")
 
+            if document.status == DocumentStatus.COMPLETED:
+                # Duplicate upload: text and AI results were reused
+                await self.db.commit()
+                await self.db.refresh(document)
+                return document
+
             # Step 3: Extract text
-            logger.info("Extracting text from document...")
-            try:
-                extracted_text = DocumentParsingService.extract_text(file_content, mime_type)
-                document.extracted_text = extracted_text
-                logger.info(f"Extracted {len(extracted_text)} characters")
-            except DocumentParsingError as e:
-                logger.warning(f"Text extraction failed: {e}, continuing with empty text")
-                document.extracted_text = ""
+            if document.extracted_text is None:
+                logger.info("Extracting text from document...")
+                try:
+                    extracted_text = await extract_text_with_ocr(file_content, mime_type)
+                    document.extracted_text = extracted_text
+                    logger.info(f"Extracted {len(extracted_text)} characters")
+                except DocumentParsingError as e:
+                    logger.warning(f"Text extraction failed: {e}, continuing with empty text")
+                    document.extracted_text = ""
 
             # Step 4: AI Extraction
             # Note: extraction_result structure: {"data": {...fields...}, "confidence": 0.92}
@@ -138,7 +153,7 @@ class DocumentService:
             logger.info(f"Sending to Claude for {category.value} extraction...")
             try:
                 if document.extracted_text:  # Only if we have text
-                    extraction_result = self.ai_service.extract_structured_data(
+                    extraction_result = await self.ai_service.extract_structured_data(
                         extracted_text=document.extracted_text,
                         category=category,
                     )
@@ -158,7 +173,8 @@ class DocumentService:
                 document.ai_confidence_score = 0.0
                 document.error_message = str(e)[:1000]
 
-            # Step 5: Mark as completed
+            # Step 5: Embed for similarity search and mark as completed
+            await index_document(self.db, document)
             document.status = DocumentStatus.COMPLETED
             await self.db.flush()
             logger.info(f"Document processing complete: {document.id}")
@@ -192,6 +208,351 @@ class DocumentService:
             else:
                 raise
 
+    async def submit_document(
+        self,
+        file_content: bytes,
+        filename: str,
+        mime_type: str,
+        category: DocumentCategory,
+        queue,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[UUID | str] = None,
+        description: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        content_hash: Optional[str] = None,
+    ) -> Document:
+        """
+        Upload file and queue it for background processing.
+
+        Flow:
+        1. Upload to MinIO (skipped when the same content is already stored)
+        2. Create DB record (status=PROCESSING, processing_stage=queued) and commit
+        3. Enqueue the parse -> OCR -> AI-extract pipeline
+
+        A duplicate of an already processed document is created COMPLETED
+        with the original's text and AI results and is not enqueued.
+
+        Args:
+            file_content: Raw file bytes
+            filename: Original filename
+            mime_type: File MIME type
+            category: Document category
+            queue: Document queue from app.workers.document_pipeline
+            entity_type: Optional entity type (Deal, Quote, etc.)
+            entity_id: Optional entity ID
+            description: Optional user description
+            tags: Optional list of tags
+            content_hash: SHA-256 of file_content if already computed
+
+        Returns:
+            Document record in PROCESSING (or COMPLETED) status
+
+        Raises:
+            ValueError: If validation fails
+            Exception: If the document can't be queued (it is marked FAILED)
+        """
+        entity_id = self._validate_upload(file_content, entity_type, entity_id)
+        content_hash = content_hash or self.compute_content_hash(file_content)
+
+        document = await self._create_document(
+            file_content=file_content,
+            file_size=len(file_content),
+            content_hash=content_hash,
+            filename=filename,
+            mime_type=mime_type,
+            category=category,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            description=description,
+            tags=tags,
+        )
+        return await self._queue_document(document, queue)
+
+    async def submit_document_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        mime_type: str,
+        category: DocumentCategory,
+        queue,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[UUID | str] = None,
+        description: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        max_size: int = MAX_UPLOAD_SIZE,
+    ) -> Document:
+        """
+        Stream a file object to MinIO and queue it for background processing.
+
+        The file goes to storage as a multipart upload while it is hashed,
+        so memory stays at one part whatever its size. Deduplication runs
+        once the hash is known: a duplicate's freshly stored object is
+        deleted and the original's is shared instead.
+
+        Args:
+            stream: File object positioned at the start (e.g. UploadFile.file)
+            filename: Original filename
+            mime_type: File MIME type
+            category: Document category
+            queue: Document queue from app.workers.document_pipeline
+            entity_type: Optional entity type (Deal, Quote, etc.)
+            entity_id: Optional entity ID
+            description: Optional user description
+            tags: Optional list of tags
+            max_size: Largest allowed file in bytes
+
+        Returns:
+            Document record in PROCESSING (or COMPLETED) status
+
+        Raises:
+            UploadTooLargeError: If the file is larger than max_size
+            ValueError: If validation fails
+            Exception: If the document can't be queued (it is marked FAILED)
+        """
+        entity_id = self._normalize_entity(entity_type, entity_id)
+
+        reader = UploadReader(stream, max_size=max_size)
+        logger.info(f"Streaming {filename} to MinIO...")
+        storage_key = await self.storage_service.upload_stream_async(
+            reader,
+            filename=filename,
+            company_id=self.company_id,
+            content_type=mime_type,
+        )
+        if not reader.size:
+            await self.storage_service.delete_file_async(storage_key)
+            raise ValueError("File content cannot be empty")
+
+        document = await self._create_document(
+            file_content=None,
+            file_size=reader.size,
+            content_hash=reader.hexdigest(),
+            filename=filename,
+            mime_type=mime_type,
+            category=category,
+            entity_type=entity_type,
+            entity_id=entity_id,
+            description=description,
+            tags=tags,
+            storage_key=storage_key,
+        )
+        return await self._queue_document(document, queue)
+
+    async def _queue_document(self, document: Document, queue) -> Document:
+        """Commit a new document and enqueue it unless it was completed by dedup."""
+        if document.status == DocumentStatus.PROCESSING:
+            document.processing_stage = DocumentProcessingStage.QUEUED.value
+
+        # Commit before enqueueing so workers can see the record
+        await self.db.commit()
+        await self.db.refresh(document)
+
+        if document.status == DocumentStatus.PROCESSING:
+            try:
+                await queue.enqueue(document.id)
+            except Exception as e:
+                # Nothing would ever pick the document up, so don't leave it PROCESSING
+                logger.error(f"Failed to queue document {document.id}: {e}")
+                document.status = DocumentStatus.FAILED
+                document.processing_stage = None
+                document.error_message = f"Could not queue document for processing: {e}"[:1000]
+                await self.db.commit()
+                raise
+            logger.info(f"Queued document for processing: {document.id}")
+        return document
+
+    @staticmethod
+    def compute_content_hash(file_content: bytes) -> str:
+        """SHA-256 hex digest used to deduplicate uploads."""
+        return hashlib.sha256(file_content).hexdigest()
+
+    async def find_by_content_hash(
+        self,
+        content_hash: str,
+        category: Optional[DocumentCategory] = None,
+    ) -> Optional[Document]:
+        """
+        Find a document in this company with the same content.
+
+        Completed documents are preferred (same category first, so their AI
+        results can be reused), then the oldest.
+
+        Args:
+            content_hash: SHA-256 hex digest of the file
+            category: Category of the new upload
+
+        Returns:
+            Matching document or None
+        """
+        result = await self.db.execute(
+            select(Document)
+            .where(
+                and_(
+                    Document.company_id == self.company_id,
+                    Document.content_hash == content_hash,
+                    Document.deleted_at.is_(None),
+                )
+            )
+            .order_by(
+                case((Document.status == DocumentStatus.COMPLETED, 0), else_=1),
+                case((Document.category == category, 0), else_=1),
+                Document.created_at,
+            )
+            .limit(1)
+            # Pipeline stages update documents from their own sessions
+            .execution_options(populate_existing=True)
+        )
+        return result.scalar_one_or_none()
+
+    async def _create_document(
+        self,
+        file_content: Optional[bytes],
+        file_size: int,
+        content_hash: str,
+        filename: str,
+        mime_type: str,
+        category: DocumentCategory,
+        entity_type: Optional[str],
+        entity_id: Optional[UUID],
+        description: Optional[str],
+        tags: Optional[List[str]],
+        storage_key: Optional[str] = None,
+    ) -> Document:
+        """
+        Store the file and add its DB record (flushed, not committed).
+
+        A duplicate of an existing document shares its storage object and
+        reuses its extracted text, and also its AI results when it was
+        extracted cleanly for the same category (the record is then
+        COMPLETED). Anything else is PROCESSING.
+
+        Args:
+            file_content: Raw file bytes (None if already stored)
+            file_size: Size of the file in bytes
+            storage_key: Key of the already stored file (streamed uploads);
+                deleted if the content turns out to be a duplicate
+
+        Returns:
+            The new document
+        """
+        for attempt in range(2):
+            existing = await self.find_by_content_hash(content_hash, category)
+            if existing:
+                logger.info(f"{filename} duplicates document {existing.id}, reusing its storage object")
+                if storage_key:
+                    await self.storage_service.delete_file_async(storage_key)
+                    storage_key = None
+                storage_bucket, document_key = existing.storage_bucket, existing.storage_key
+            else:
+                storage_bucket = self.storage_service.bucket_name
+                if storage_key is None:
+                    logger.info(f"Uploading {filename} to MinIO...")
+                    storage_key = await self.storage_service.upload_file_async(
+                        file_content=file_content,
+                        filename=filename,
+                        company_id=self.company_id,
+                        content_type=mime_type,
+                    )
+                document_key = storage_key
+
+            document = Document(
+                company_id=self.company_id,
+                entity_type=entity_type,
+                entity_id=entity_id,
+                category=category,
+                storage_bucket=storage_bucket,
+                storage_key=document_key,
+                original_filename=filename,
+                file_size_bytes=file_size,
+                mime_type=mime_type,
+                content_hash=content_hash,
+                source_document_id=(existing.source_document_id or existing.id) if existing else None,
+                status=DocumentStatus.PROCESSING,
+                description=description,
+                tags=tags or [],
+            )
+            self.db.add(document)
+            try:
+                await self.db.flush()
+            except IntegrityError:
+                # A concurrent upload of the same content became the original
+                await self.db.rollback()
+                if existing or attempt:
+                    raise
+                # The next attempt finds it and drops our copy of the object
+                continue
+
+            self._reuse_results(document, existing)
+            if document.status == DocumentStatus.COMPLETED:
+                await index_document(self.db, document)
+            return document
+
+    @staticmethod
+    def _reuse_results(document: Document, existing: Optional[Document]) -> None:
+        """Copy text and AI results from a processed duplicate and count the hit."""
+        reusable = existing is not None and existing.status == DocumentStatus.COMPLETED
+        if reusable:
+            document.extracted_text = existing.extracted_text
+        if (
+            reusable
+            and existing.category == document.category
+            and existing.parsed_data is not None
+            and not existing.error_message
+        ):
+            document.parsed_data = existing.parsed_data
+            document.ai_confidence_score = existing.ai_confidence_score
+            document.status = DocumentStatus.COMPLETED
+            metrics.increment("document_dedup.hits")
+        else:
+            metrics.increment("document_dedup.misses")
+
+    @staticmethod
+    def _validate_upload(
+        file_content: bytes,
+        entity_type: Optional[str],
+        entity_id: Optional[UUID | str],
+    ) -> Optional[UUID]:
+        """
+        Validate an upload and normalize entity_id.
+
+        Returns:
+            entity_id as a UUID (or None)
+
+        Raises:
+            ValueError: If validation fails
+        """
+        if not file_content:
+            raise ValueError("File content cannot be empty")
+
+        file_size_mb = len(file_content) / (1024 * 1024)
+        if file_size_mb > 25:
+            raise ValueError(f"File too large: {file_size_mb:.1f}MB (max 25MB)")
+
+        return DocumentService._normalize_entity(entity_type, entity_id)
+
+    @staticmethod
+    def _normalize_entity(
+        entity_type: Optional[str],
+        entity_id: Optional[UUID | str],
+    ) -> Optional[UUID]:
+        """
+        Validate the entity an upload is attached to.
+
+        Returns:
+            entity_id as a UUID (or None)
+
+        Raises:
+            ValueError: If entity_type is given without entity_id
+        """
+        # Convert entity_id to UUID if it's a string
+        if entity_id and isinstance(entity_id, str):
+            entity_id = UUID(entity_id)
+
+        if entity_type and not entity_id:
+            raise ValueError("entity_id required when entity_type is specified")
+
+        return entity_id
+
     async def get_document(self, document_id: UUID) -> Optional[Document]:
         """
         Get single document with company isolation.
@@ -228,7 +589,9 @@ class DocumentService:
         category: Optional[DocumentCategory] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> tuple[List[Document], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: TotalMode = TotalMode.EXACT,
+    ) -> tuple[List[Document], Optional[int]]:
         """
         List documents with optional filtering.
 
@@ -238,9 +601,11 @@ class DocumentService:
             category: Filter by document category
             skip: Pagination offset
             limit: Pagination limit
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
+            include_total: Whether to count exactly, estimate or skip the total
 
         Returns:
-            (List of documents, total count)
+            (List of documents, total count or None)
         """
         # Base query
         query = select(Document).where(
@@ -259,22 +624,15 @@ class DocumentService:
         if category:
             query = query.where(Document.category == category)
 
-        # Count total
-        count_result = await self.db.execute(
-            select(func.count(Document.id)).where(
-                and_(
-                    Document.company_id == self.company_id,
-                    Document.deleted_at.is_(None),
-                    Document.entity_type.isnot(None),
-                )
-            )
+        # Count total (with the same filters as the page)
+        filters = {"entity_type": entity_type or NOT_NULL, "entity_id": entity_id, "category": category}
+        total = await count_total(
+            self.db, query, include_total, Document, self.company_id,
+            {column: value for column, value in filters.items() if value},
         )
-        total = count_result.scalar() or 0
 
         # Apply pagination and order
-        query = query.order_by(Document.created_at.desc()).offset(skip).limit(limit)
-
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, Document, skip, limit, cursor))
         documents = result.scalars().all()
 
         return documents, total
@@ -284,7 +642,9 @@ class DocumentService:
         category: Optional[DocumentCategory] = None,
         skip: int = 0,
         limit: int = 50,
-    ) -> tuple[List[Document], int]:
+        cursor: Optional[Cursor] = None,
+        include_total: TotalMode = TotalMode.EXACT,
+    ) -> tuple[List[Document], Optional[int]]:
         """
         List company-level documents (no entity attached).
 
@@ -292,9 +652,11 @@ class DocumentService:
             category: Filter by category
             skip: Pagination offset
             limit: Pagination limit
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
+            include_total: Whether to count exactly, estimate or skip the total
 
         Returns:
-            (List of company documents, total count)
+            (List of company documents, total count or None)
         """
         # Company docs have entity_type = NULL
         query = select(Document).where(
@@ -309,23 +671,175 @@ class DocumentService:
             query = query.where(Document.category == category)
 
         # Count total
-        count_query = select(func.count(Document.id)).where(
+        filters = {"entity_type": None}
+        if category:
+            filters["category"] = category
+        total = await count_total(self.db, query, include_total, Document, self.company_id, filters)
+
+        # Apply pagination and order
+        result = await self.db.execute(paginate(query, Document, skip, limit, cursor))
+        documents = result.scalars().all()
+
+        return documents, total
+
+    async def search_documents(
+        self,
+        q: Optional[str] = None,
+        category: Optional[DocumentCategory] = None,
+        entity_type: Optional[str] = None,
+        entity_id: Optional[UUID] = None,
+        parsed_fields: Optional[Dict[str, str]] = None,
+        limit: int = 20,
+        cursor: Optional[Cursor] = None,
+    ) -> tuple[List[Document], Dict[UUID, str]]:
+        """
+        Search documents by words in their text and by extracted fields.
+
+        Words are matched (stemmed, all of them) against the filename,
+        description, extracted text and parsed data values through the
+        full text index; parsed fields match values starting with the
+        given text, case-insensitively. Results are newest first.
+
+        Args:
+            q: Words to find
+            category: Filter by document category
+            entity_type: Filter by entity type (e.g., "Deal")
+            entity_id: Filter by entity ID
+            parsed_fields: SEARCHABLE_PARSED_FIELDS values to match (e.g. rfq_number)
+            limit: Page size
+            cursor: Continue after a previous page's next_cursor
+
+        Returns:
+            (Page of documents, highlighted snippet of q per document id)
+
+        Raises:
+            ValueError: If neither q nor a parsed field is given, or a field isn't searchable
+        """
+        parsed_fields = {field: value for field, value in (parsed_fields or {}).items() if value}
+        unknown = set(parsed_fields) - set(SEARCHABLE_PARSED_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot search parsed_data by {', '.join(sorted(unknown))}")
+        if not (q and q.strip()) and not parsed_fields:
+            raise ValueError("Search needs q or a parsed_data field")
+
+        query = select(Document).where(
             and_(
                 Document.company_id == self.company_id,
-                Document.entity_type.is_(None),
                 Document.deleted_at.is_(None),
             )
         )
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
-
-        # Apply pagination and order
-        query = query.order_by(Document.created_at.desc()).offset(skip).limit(limit)
+        if category:
+            query = query.where(Document.category == category)
+        if entity_type:
+            query = query.where(Document.entity_type == entity_type)
+        if entity_id:
+            query = query.where(Document.entity_id == entity_id)
+        for field, value in parsed_fields.items():
+            query = query.where(prefix_match(self.db, json_field(self.db, Document, "parsed_data", field), value))
+        if q and q.strip():
+            query = full_text_search(self.db, query, Document, DOCUMENT_SEARCH_COLUMNS, q, company_id=self.company_id)
 
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, Document, 0, limit, cursor))
         documents = result.scalars().all()
 
-        return documents, total
+        snippets = {}
+        if q and q.strip():
+            snippets = await full_text_snippets(
+                self.db, Document, "extracted_text", [document.id for document in documents], q
+            )
+        return documents, snippets
+
+    async def find_similar_documents(
+        self,
+        document_id: UUID,
+        category: Optional[DocumentCategory] = None,
+        limit: int = 10,
+    ) -> Optional[List[tuple[Document, float]]]:
+        """
+        Find the company's documents most similar to one, by embedding.
+
+        E.g. past RFQs like a new RFQ, or vendor proposals like it (category).
+
+        Args:
+            document_id: Document to compare with
+            category: Only return documents of this category
+            limit: Maximum results
+
+        Returns:
+            List of (document, cosine similarity), most similar first (empty
+            if the document has no embedding yet), or None if not found
+        """
+        if not await self.get_document(document_id):
+            return None
+        vector = (await self.db.execute(
+            select(DocumentEmbedding.embedding).where(DocumentEmbedding.document_id == document_id)
+        )).scalar_one_or_none()
+        if vector is None:
+            return []
+
+        query = (
+            select(DocumentEmbedding.document_id)
+            .join(Document, Document.id == DocumentEmbedding.document_id)
+            .where(
+                DocumentEmbedding.company_id == self.company_id,
+                Document.deleted_at.is_(None),
+                Document.id != document_id,
+            )
+        )
+        if category:
+            query = query.where(Document.category == category)
+        matches = await nearest(self.db, query, DocumentEmbedding.embedding, vector, limit)
+        return await self._with_documents(matches)
+
+    async def find_similar_line_items(
+        self,
+        text: str,
+        category: Optional[DocumentCategory] = None,
+        limit: int = 20,
+    ) -> List[tuple[LineItemEmbedding, Document, float]]:
+        """
+        Find line items of the company's documents similar to a description/spec.
+
+        Args:
+            text: Line item description and/or material spec
+            category: Only search documents of this category
+            limit: Maximum results
+
+        Returns:
+            List of (line item, its document, cosine similarity), most similar first
+        """
+        vector = (await embed_texts(get_embedder(), [text]))[0]
+        query = (
+            select(LineItemEmbedding.id)
+            .join(Document, Document.id == LineItemEmbedding.document_id)
+            .where(LineItemEmbedding.company_id == self.company_id, Document.deleted_at.is_(None))
+        )
+        if category:
+            query = query.where(Document.category == category)
+        matches = await nearest(self.db, query, LineItemEmbedding.embedding, vector, limit)
+        if not matches:
+            return []
+
+        result = await self.db.execute(
+            select(LineItemEmbedding, Document)
+            .options(defer(LineItemEmbedding.embedding), defer(Document.extracted_text))
+            .join(Document, Document.id == LineItemEmbedding.document_id)
+            .where(LineItemEmbedding.id.in_([key for key, _ in matches]))
+        )
+        rows = {line_item.id: (line_item, document) for line_item, document in result.all()}
+        return [(*rows[key], similarity) for key, similarity in matches if key in rows]
+
+    async def _with_documents(self, matches: List[tuple[UUID, float]]) -> List[tuple[Document, float]]:
+        """Load the documents of (document id, score) pairs, keeping their order."""
+        if not matches:
+            return []
+        result = await self.db.execute(
+            select(Document)
+            .options(defer(Document.extracted_text))
+            .where(Document.id.in_([key for key, _ in matches]))
+        )
+        documents = {document.id: document for document in result.scalars().all()}
+        return [(documents[key], similarity) for key, similarity in matches if key in documents]
 
     async def get_download_url(self, document_id: UUID) -> str:
         """
@@ -344,7 +858,7 @@ class DocumentService:
         if not document:
             raise ValueError("Document not found")
 
-        url = self.storage_service.get_presigned_url(document.storage_key, expiry_minutes=60)
+        url = await self.storage_service.get_presigned_url_async(document.storage_key, expiry_minutes=60)
         logger.info(f"Generated download URL for document: {document_id}")
         return url
 
@@ -367,14 +881,17 @@ class DocumentService:
         await self.db.commit()
         logger.info(f"Soft deleted document: {document_id}")
 
-    async def re_extract_document(self, document_id: UUID) -> Document:
+    async def re_extract_document(self, document_id: UUID, force_refresh: bool = False) -> Document:
         """
         Re-trigger AI extraction for a document.
 
         Resets parsed_data and status, then re-runs extraction pipeline.
+        Unless force_refresh is set, an unchanged text/prompt/model returns
+        the cached extraction instead of calling Claude again.
 
         Args:
             document_id: Document ID
+            force_refresh: Bypass the extraction cache
 
         Returns:
             Updated Document with PROCESSING status
@@ -403,15 +920,16 @@ class DocumentService:
             logger.info(f"Re-extracting document: {document_id}")
 
             # Use existing extracted text to run AI extraction
-            extraction_service = AIExtractionService()
-            extraction_result = extraction_service.extract_structured_data(
+            extraction_result = await self.ai_service.extract_structured_data(
                 extracted_text=document.extracted_text,
                 category=document.category,
+                force_refresh=force_refresh,
             )
 
             # Update document with results
             document.parsed_data = extraction_result.get("data", {})
             document.ai_confidence_score = extraction_result.get("confidence", 0)
+            await index_document(self.db, document)
             document.status = DocumentStatus.COMPLETED
 
             logger.info(f"Re-extraction successful for document: {document_id}")
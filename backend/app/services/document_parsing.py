@@ -1,9 +1,12 @@
 """Document parsing service - extract text from various file formats."""
 import io
 import logging
-from typing import Optional
+import os
+import re
+import tempfile
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 import pdfplumber
-from pdf2image import convert_from_bytes
+from pdf2image import convert_from_path, pdfinfo_from_bytes
 import pytesseract
 from PIL import Image
 from openpyxl import load_workbook
@@ -18,12 +21,104 @@ class DocumentParsingError(Exception):
     pass
 
 
+class PageTextMerger:
+    """
+    Merge native and OCR page text in page order, up to MAX_TEXT_LENGTH.
+
+    Used by both the in-process and the parallel OCR paths, so they pick
+    between native and OCR text and apply the text budget the same way.
+    """
+
+    def __init__(self, native_pages: Dict[int, str], ocr_pages: Iterable[int] = ()):
+        """
+        Initialize PageTextMerger.
+
+        Args:
+            native_pages: Embedded text by 1-based page number
+            ocr_pages: Pages that will be OCR'd
+        """
+        self.native_pages = native_pages
+        self.ocr_pages = set(ocr_pages)
+        self.page_numbers = sorted(self.ocr_pages | set(native_pages))
+        self._parts: List[str] = []
+        self._length = 0
+
+    @property
+    def full(self) -> bool:
+        """Whether MAX_TEXT_LENGTH characters have been collected."""
+        return self._length >= DocumentParsingService.MAX_TEXT_LENGTH
+
+    def add(self, page_num: int, ocr_text: Optional[str] = None) -> bool:
+        """
+        Add the next page, preferring OCR text when it found more.
+
+        Args:
+            page_num: 1-based page number (pages must be added in order)
+            ocr_text: OCR output for the page, if it was OCR'd
+
+        Returns:
+            True once the text budget is full and later pages can be skipped
+        """
+        text = self.native_pages.get(page_num, "")
+        if ocr_text and len(ocr_text.strip()) > len(text.strip()):
+            text = ocr_text
+        if text.strip():
+            self._parts.append(f"--- Page {page_num} ---\n{text}")
+            self._length += len(self._parts[-1]) + 2
+        return self.full
+
+    def text(self) -> str:
+        """Merged text, truncated to MAX_TEXT_LENGTH."""
+        return "\n\n".join(self._parts)[: DocumentParsingService.MAX_TEXT_LENGTH]
+
+
 class DocumentParsingService:
     """Extract text from PDF, Excel, Word, and image files."""
 
     # Maximum text to send to AI (token limit consideration)
     MAX_TEXT_LENGTH = 8000
 
+    # Below this many characters of embedded text, a PDF page is treated as scanned
+    MIN_PAGE_TEXT_LENGTH = 20
+
+    _PAGE_HEADER = re.compile(r"^--- Page (\d+) ---\n", re.MULTILINE)
+
+    # Leading bytes of each supported format and the MIME types they can carry
+    _MAGIC_NUMBERS = (
+        (b"%PDF-", {"application/pdf"}),
+        (b"\x89PNG\r\n\x1a\n", {"image/png"}),
+        (b"\xff\xd8\xff", {"image/jpeg"}),
+        (b"GIF87a", {"image/gif"}),
+        (b"GIF89a", {"image/gif"}),
+        (b"II*\x00", {"image/tiff"}),
+        (b"MM\x00*", {"image/tiff"}),
+        # xlsx/docx are ZIP containers, xls/doc are OLE compound files
+        (b"PK\x03\x04", {
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        }),
+        (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", {"application/vnd.ms-excel", "application/msword"}),
+    )
+    SNIFF_LENGTH = 16
+
+    @staticmethod
+    def sniff_mime_types(head: bytes) -> Optional[Set[str]]:
+        """
+        Identify a file from its first bytes.
+
+        Args:
+            head: At least the first SNIFF_LENGTH bytes of the file
+
+        Returns:
+            MIME types the content can be, or None if the format isn't recognised
+        """
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return {"image/webp"}
+        for magic, mime_types in DocumentParsingService._MAGIC_NUMBERS:
+            if head.startswith(magic):
+                return mime_types
+        return None
+
     @staticmethod
     def extract_text(
         file_content: bytes,
@@ -65,76 +160,230 @@ class DocumentParsingService:
         except Exception as e:
             raise DocumentParsingError(f"Failed to extract text: {str(e)}")
 
+    @staticmethod
+    def extract_native_text(
+        file_content: bytes,
+        mime_type: str,
+    ) -> Tuple[str, List[int]]:
+        """
+        Extract text without OCR (pipeline parse stage).
+
+        Args:
+            file_content: Raw file bytes
+            mime_type: MIME type of file
+
+        Returns:
+            (text, ocr_pages): the embedded text and the 1-based pages that
+            have no usable text layer and should go to the OCR stage. Images
+            return ("", [1]); Excel and Word never need OCR.
+
+        Raises:
+            DocumentParsingError: If extraction fails or unsupported type
+        """
+        if mime_type == "application/pdf":
+            try:
+                page_texts = DocumentParsingService.extract_pdf_page_texts(file_content)
+            except Exception as e:
+                logger.warning(f"pdfplumber failed ({e}), deferring all pages to OCR stage")
+                page_count = DocumentParsingService.count_pdf_pages(file_content)
+                return "", list(range(1, page_count + 1))
+
+            # Pages after the one that fills the text budget would be cut
+            # anyway, so don't send them to OCR
+            merger = PageTextMerger(dict(enumerate(page_texts, 1)))
+            last_page = 0
+            for last_page in merger.page_numbers:
+                if merger.add(last_page):
+                    break
+            ocr_pages = DocumentParsingService.pages_needing_ocr(page_texts[:last_page])
+            return merger.text(), ocr_pages
+        if mime_type.startswith("image/"):
+            return "", [1]
+        return DocumentParsingService.extract_text(file_content, mime_type), []
+
     @staticmethod
     def extract_text_from_pdf(file_content: bytes) -> str:
         """
-        Extract text from PDF using pdfplumber, with OCR fallback.
+        Extract text from PDF using pdfplumber, OCR-ing only pages without text.
 
         Args:
             file_content: Raw PDF bytes
 
         Returns:
-            Extracted text from all pages
+            Extracted text in page order, truncated to MAX_TEXT_LENGTH
 
         Raises:
             DocumentParsingError: If extraction fails
         """
         try:
-            text_parts = []
-
             # Try pdfplumber first (faster for text-based PDFs)
             try:
-                with pdfplumber.open(io.BytesIO(file_content)) as pdf:
-                    for page_num, page in enumerate(pdf.pages, 1):
-                        text = page.extract_text()
-                        if text and text.strip():
-                            text_parts.append(f"--- Page {page_num} ---\n{text}")
-
-                extracted = "\n\n".join(text_parts)
-
-                # If we got minimal text, try OCR
-                if len(extracted.strip()) < 100:
-                    logger.info("PDF has minimal text, attempting OCR fallback")
-                    extracted = DocumentParsingService._extract_text_from_pdf_ocr(file_content)
-
+                page_texts = DocumentParsingService.extract_pdf_page_texts(file_content)
             except Exception as e:
                 logger.warning(f"pdfplumber failed ({e}), attempting OCR fallback")
                 extracted = DocumentParsingService._extract_text_from_pdf_ocr(file_content)
+            else:
+                ocr_pages = DocumentParsingService.pages_needing_ocr(page_texts)
+                if ocr_pages:
+                    logger.info(f"{len(ocr_pages)} of {len(page_texts)} PDF pages have no text, using OCR")
+                    extracted = DocumentParsingService._extract_text_from_pdf_ocr(
+                        file_content,
+                        native_pages=dict(enumerate(page_texts, 1)),
+                        ocr_pages=ocr_pages,
+                    )
+                else:
+                    merger = PageTextMerger(dict(enumerate(page_texts, 1)))
+                    for page_num in merger.page_numbers:
+                        if merger.add(page_num):
+                            break
+                    extracted = merger.text()
 
             # Truncate to max length
             return extracted[: DocumentParsingService.MAX_TEXT_LENGTH]
 
+        except DocumentParsingError:
+            raise
         except Exception as e:
             raise DocumentParsingError(f"PDF extraction failed: {str(e)}")
 
     @staticmethod
-    def _extract_text_from_pdf_ocr(file_content: bytes) -> str:
+    def extract_pdf_page_texts(file_content: bytes) -> List[str]:
         """
-        Extract text from PDF using OCR (pytesseract).
+        Extract the embedded text layer of each PDF page with pdfplumber.
 
         Args:
             file_content: Raw PDF bytes
 
         Returns:
-            Extracted text from all pages
+            Text per page in page order ("" for pages without a text layer)
+        """
+        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+            return [page.extract_text() or "" for page in pdf.pages]
+
+    @staticmethod
+    def pages_needing_ocr(page_texts: List[str]) -> List[int]:
+        """1-based numbers of pages whose text layer is missing or too thin."""
+        return [
+            page_num
+            for page_num, text in enumerate(page_texts, 1)
+            if len(text.strip()) < DocumentParsingService.MIN_PAGE_TEXT_LENGTH
+        ]
+
+    @staticmethod
+    def count_pdf_pages(file_content: bytes) -> int:
+        """
+        Count PDF pages without rendering them (poppler pdfinfo).
 
         Raises:
-            DocumentParsingError: If OCR fails
+            DocumentParsingError: If the PDF can't be read
         """
         try:
-            # Convert PDF to images
-            images = convert_from_bytes(file_content)
-            text_parts = []
+            return int(pdfinfo_from_bytes(file_content)["Pages"])
+        except Exception as e:
+            raise DocumentParsingError(f"Could not read PDF page count: {str(e)}")
+
+    @staticmethod
+    def write_temp_pdf(file_content: bytes) -> str:
+        """
+        Write PDF bytes to a temporary file for page-by-page rendering.
+
+        The caller must delete the file.
 
-            for page_num, image in enumerate(images, 1):
-                text = pytesseract.image_to_string(image)
-                if text.strip():
-                    text_parts.append(f"--- Page {page_num} ---\n{text}")
+        Returns:
+            Path of the temporary file
+        """
+        fd, path = tempfile.mkstemp(suffix=".pdf")
+        with os.fdopen(fd, "wb") as f:
+            f.write(file_content)
+        return path
+
+    @staticmethod
+    def ocr_pdf_page(pdf_path: str, page_number: int) -> str:
+        """
+        Rasterize and OCR a single PDF page.
+
+        Only the requested page is rendered, so memory stays at one page
+        image no matter how long the document is. Taking a path rather than
+        the bytes keeps the PDF from being copied to a worker for every page.
 
-            return "\n\n".join(text_parts)
+        Args:
+            pdf_path: Path of the PDF file (see write_temp_pdf)
+            page_number: 1-based page number
+
+        Returns:
+            OCR text of the page
 
+        Raises:
+            DocumentParsingError: If rendering or OCR fails
+        """
+        try:
+            images = convert_from_path(pdf_path, first_page=page_number, last_page=page_number)
+            return "\n".join(pytesseract.image_to_string(image) for image in images)
         except Exception as e:
-            raise DocumentParsingError(f"PDF OCR extraction failed: {str(e)}")
+            raise DocumentParsingError(f"OCR failed for page {page_number}: {str(e)}")
+
+    @staticmethod
+    def split_pages(text: str) -> Dict[int, str]:
+        """
+        Split text produced by PageTextMerger back into {page_number: text}.
+
+        Args:
+            text: Text with "--- Page N ---" headers
+
+        Returns:
+            Page texts keyed by 1-based page number
+        """
+        pages = {}
+        matches = list(DocumentParsingService._PAGE_HEADER.finditer(text or ""))
+        for match, next_match in zip(matches, matches[1:] + [None]):
+            body_end = next_match.start() if next_match else len(text)
+            pages[int(match.group(1))] = text[match.end():body_end].strip("\n")
+        return pages
+
+    @staticmethod
+    def _extract_text_from_pdf_ocr(
+        file_content: bytes,
+        native_pages: Optional[Dict[int, str]] = None,
+        ocr_pages: Optional[List[int]] = None,
+    ) -> str:
+        """
+        Merge native text with OCR of the given pages, one page at a time.
+
+        Pages are rendered lazily in page order and OCR stops as soon as
+        MAX_TEXT_LENGTH characters have been collected. A page whose OCR
+        fails keeps its native text. See pdf_ocr.stream_pdf_ocr for the
+        parallel version.
+
+        Args:
+            file_content: Raw PDF bytes
+            native_pages: Embedded text by page number (none if omitted)
+            ocr_pages: Pages to OCR (every page if omitted)
+
+        Returns:
+            Extracted text in page order
+
+        Raises:
+            DocumentParsingError: If the page count can't be read
+        """
+        if ocr_pages is None:
+            ocr_pages = list(range(1, DocumentParsingService.count_pdf_pages(file_content) + 1))
+        merger = PageTextMerger(native_pages or {}, ocr_pages)
+
+        pdf_path = DocumentParsingService.write_temp_pdf(file_content)
+        try:
+            for page_num in merger.page_numbers:
+                ocr_text = None
+                if page_num in merger.ocr_pages:
+                    try:
+                        ocr_text = DocumentParsingService.ocr_pdf_page(pdf_path, page_num)
+                    except DocumentParsingError as e:
+                        logger.warning(f"{e}, keeping native text")
+                if merger.add(page_num, ocr_text):
+                    break
+        finally:
+            os.unlink(pdf_path)
+
+        return merger.text()
 
     @staticmethod
     def extract_text_from_excel(file_content: bytes) -> str:
@@ -0,0 +1,318 @@
+"""Text embeddings for similarity search over documents and their line items."""
+import asyncio
+import importlib
+import logging
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Select, delete, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import load_only
+
+from app.config import settings
+from app.models.document import Document, DocumentStatus
+from app.models.embedding import EMBEDDING_DIMENSIONS, DocumentEmbedding, LineItemEmbedding
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"\w+")
+
+
+class Embedder:
+    """
+    Turns texts into unit-length vectors of EMBEDDING_DIMENSIONS floats.
+
+    Subclass to plug in another model and name it in EMBEDDING_BACKEND as
+    "package.module:Class" (constructed without arguments). Vectors from
+    different backends aren't comparable, so switching backends needs
+    backfill_embeddings(rebuild=True).
+    """
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed texts.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            float32 array of shape (len(texts), EMBEDDING_DIMENSIONS), rows of length 1
+        """
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """
+    Local embedder: hashed word and word-pair counts.
+
+    Words and adjacent word pairs are hashed (CRC32, so stable across
+    processes) into signed buckets, weighted 1 + log(count) and
+    normalized. Needs no model or fitted vocabulary, so vectors stay
+    comparable as the corpus grows; similarity is lexical overlap
+    ("carbon steel pipe" is near "steel pipe, carbon"), not meaning.
+    """
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def _features(self, value: str) -> Counter:
+        words = _WORD.findall(value.lower())
+        features = Counter(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+        return features
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, value in enumerate(texts):
+            for feature, count in self._features(value).items():
+                digest = zlib.crc32(feature.encode("utf-8"))
+                sign = 1.0 if (digest // self.dimensions) % 2 == 0 else -1.0
+                vectors[row, digest % self.dimensions] += sign * (1.0 + math.log(count))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+_embedder: Optional[Embedder] = None
+
+
+def get_embedder() -> Embedder:
+    """
+    The process-wide embedder for EMBEDDING_BACKEND.
+
+    Returns:
+        HashingEmbedder for "hashing", otherwise an instance of the
+        "package.module:Class" the setting names
+    """
+    global _embedder
+    if _embedder is None:
+        backend = settings.EMBEDDING_BACKEND
+        if backend == "hashing":
+            _embedder = HashingEmbedder()
+        else:
+            module_name, _, class_name = backend.partition(":")
+            _embedder = getattr(importlib.import_module(module_name), class_name)()
+    return _embedder
+
+
+async def embed_texts(embedder: Embedder, texts: Sequence[str]) -> np.ndarray:
+    """
+    Embed texts off the event loop, checking the backend's output shape.
+
+    Raises:
+        ValueError: If the backend returns vectors of the wrong shape
+    """
+    if not texts:
+        return np.zeros((0, EMBEDDING_DIMENSIONS), dtype=np.float32)
+    vectors = np.asarray(await asyncio.to_thread(embedder.embed, list(texts)), dtype=np.float32)
+    if vectors.shape != (len(texts), EMBEDDING_DIMENSIONS):
+        raise ValueError(
+            f"{type(embedder).__name__} returned vectors of shape {vectors.shape}, "
+            f"expected ({len(texts)}, {EMBEDDING_DIMENSIONS})"
+        )
+    return vectors
+
+
+def document_text(document: Document) -> Optional[str]:
+    """What a document's embedding is computed from (None if it has no text)."""
+    value = "\n".join(part for part in (document.description, document.extracted_text) if part)
+    return value if value.strip() else None
+
+
+def document_line_items(document: Document) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    (line_index, description, material_spec) of the line items AI extraction found.
+
+    RFQ extraction calls the material spec "specification"; items with
+    neither field are skipped.
+    """
+    items = (document.parsed_data or {}).get("line_items")
+    if not isinstance(items, list):
+        return []
+    result = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            continue
+        description = item.get("description")
+        material_spec = item.get("material_spec") or item.get("specification")
+        description = str(description).strip() if description else None
+        material_spec = str(material_spec).strip() if material_spec else None
+        if description or material_spec:
+            result.append((index, description, material_spec))
+    return result
+
+
+def line_item_text(description: Optional[str], material_spec: Optional[str]) -> str:
+    """What a line item's embedding is computed from."""
+    return " ".join(part for part in (description, material_spec) if part)
+
+
+async def embedding_rows(
+    documents: Sequence[Document], embedder: Embedder
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Embed documents and their line items in one call to the backend.
+
+    Args:
+        documents: Documents with text, description and parsed_data loaded
+        embedder: Backend to embed with
+
+    Returns:
+        (document_embeddings rows, line_item_embeddings rows)
+    """
+    document_rows, line_rows, texts = [], [], []
+    for document in documents:
+        value = document_text(document)
+        if value:
+            document_rows.append({"document_id": document.id, "company_id": document.company_id})
+            texts.append(value)
+    for document in documents:
+        for index, description, material_spec in document_line_items(document):
+            line_rows.append({
+                "document_id": document.id,
+                "company_id": document.company_id,
+                "line_index": index,
+                "description": description,
+                "material_spec": material_spec,
+            })
+            texts.append(line_item_text(description, material_spec))
+
+    vectors = await embed_texts(embedder, texts)
+    for row, vector in zip(document_rows + line_rows, vectors):
+        row["embedding"] = vector
+    return document_rows, line_rows
+
+
+async def replace_embeddings(
+    db: AsyncSession,
+    document_ids: Sequence[Any],
+    document_rows: List[Dict[str, Any]],
+    line_rows: List[Dict[str, Any]],
+) -> None:
+    """Replace the stored embeddings of documents with embedding_rows() output."""
+    await db.execute(delete(DocumentEmbedding).where(DocumentEmbedding.document_id.in_(document_ids)))
+    await db.execute(delete(LineItemEmbedding).where(LineItemEmbedding.document_id.in_(document_ids)))
+    if document_rows:
+        await db.execute(insert(DocumentEmbedding), document_rows)
+    if line_rows:
+        await db.execute(insert(LineItemEmbedding), line_rows)
+
+
+async def index_document(db: AsyncSession, document: Document, embedder: Optional[Embedder] = None) -> bool:
+    """
+    Store the embeddings of a document and its extracted line items, replacing old ones.
+
+    Embedding errors are logged rather than raised: the document is still
+    usable without them, and backfill_embeddings() embeds it later.
+
+    Args:
+        db: Session the document is in (flushed, not committed)
+        document: Document with its text and parsed_data
+        embedder: Backend to embed with (get_embedder() if omitted)
+
+    Returns:
+        Whether embeddings were stored
+    """
+    try:
+        document_rows, line_rows = await embedding_rows([document], embedder or get_embedder())
+    except Exception as e:
+        logger.warning(f"Embedding failed for document {document.id}: {e}, leaving it to the backfill")
+        return False
+    await replace_embeddings(db, [document.id], document_rows, line_rows)
+    return True
+
+
+async def backfill_embeddings(
+    session_factory: async_sessionmaker,
+    embedder: Optional[Embedder] = None,
+    batch_size: Optional[int] = None,
+    rebuild: bool = False,
+) -> int:
+    """
+    Embed completed documents in batches, committing each batch.
+
+    Covers documents processed before embeddings existed and ones whose
+    embedding failed in the pipeline. Safe to stop and re-run.
+
+    Args:
+        session_factory: Factory for the sessions batches run in
+        embedder: Backend to embed with (get_embedder() if omitted)
+        batch_size: Documents per batch and backend call (EMBEDDING_BACKFILL_BATCH_SIZE if omitted)
+        rebuild: Re-embed documents that already have embeddings (after changing backend)
+
+    Returns:
+        Number of documents embedded
+    """
+    embedder = embedder or get_embedder()
+    batch_size = batch_size or settings.EMBEDDING_BACKFILL_BATCH_SIZE
+    last_id = None
+    embedded = 0
+    while True:
+        async with session_factory() as db:
+            query = (
+                select(Document)
+                .options(load_only(
+                    Document.id, Document.company_id, Document.description,
+                    Document.extracted_text, Document.parsed_data,
+                ))
+                .where(Document.status == DocumentStatus.COMPLETED, Document.deleted_at.is_(None))
+                .order_by(Document.id)
+                .limit(batch_size)
+            )
+            if last_id is not None:
+                query = query.where(Document.id > last_id)
+            if not rebuild:
+                query = query.where(~Document.id.in_(select(DocumentEmbedding.document_id)))
+            documents = (await db.execute(query)).scalars().all()
+            if not documents:
+                break
+
+            document_rows, line_rows = await embedding_rows(documents, embedder)
+            await replace_embeddings(db, [document.id for document in documents], document_rows, line_rows)
+            await db.commit()
+            last_id = documents[-1].id
+            embedded += len(document_rows)
+            logger.info(f"Embedded {embedded} documents (through {last_id})")
+    return embedded
+
+
+async def nearest(
+    db: AsyncSession,
+    query: Select,
+    column: Any,
+    vector: np.ndarray,
+    limit: int,
+) -> List[Tuple[Any, float]]:
+    """
+    The rows of a query whose embedding is closest to vector, best first.
+
+    PostgreSQL orders by cosine distance through the HNSW index; the index
+    spans all tenants and is filtered after the search, so
+    EMBEDDING_SEARCH_EF candidates are considered rather than the
+    default 40. Elsewhere the candidates' vectors are scored in NumPy.
+
+    Args:
+        db: Session to query in
+        query: select() of one key column, with the filters applied
+        column: The embedding column of the searched table
+        vector: Unit-length query vector
+        limit: Rows to return
+
+    Returns:
+        List of (key, cosine similarity)
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        await db.execute(text(f"SET LOCAL hnsw.ef_search = {int(settings.EMBEDDING_SEARCH_EF)}"))
+        distance = column.cosine_distance(vector)
+        result = await db.execute(query.add_columns(distance).order_by(distance).limit(limit))
+        return [(key, 1.0 - float(value)) for key, value in result.all()]
+
+    rows = (await db.execute(query.add_columns(column))).all()
+    if not rows:
+        return []
+    scores = np.vstack([row[1] for row in rows]) @ np.asarray(vector, dtype=np.float32)
+    best = np.argsort(-scores, kind="stable")[:limit]
+    return [(rows[i][0], float(scores[i])) for i in best]
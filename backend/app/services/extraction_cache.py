@@ -0,0 +1,63 @@
+"""Layered cache for AI extraction results."""
+import hashlib
+import logging
+from typing import Optional
+
+from app.config import settings
+from app.services.layered_cache import LayeredCache, create_redis_client
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "ai_extraction_cache"
+
+
+class ExtractionCache(LayeredCache):
+    """
+    Cache of Claude extraction results by text, category, prompt and model.
+
+    Entries expire after ttl_seconds in both tiers. Redis errors are logged
+    and treated as misses, so the cache can never fail an extraction.
+    """
+
+    metric_prefix = METRIC_PREFIX
+
+    @staticmethod
+    def make_key(text: str, category: str, prompt_version: str, model: str) -> str:
+        """
+        Build the cache key for an extraction.
+
+        Args:
+            text: Extracted document text sent to the model
+            category: Document category value
+            prompt_version: Hash of the category's prompt template
+            model: Model name
+
+        Returns:
+            Cache key
+        """
+        text_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{METRIC_PREFIX}:{model}:{category}:{prompt_version}:{text_hash}"
+
+
+_cache: Optional[ExtractionCache] = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    """
+    Get the process-wide extraction cache, creating it on first use.
+
+    Returns:
+        ExtractionCache with a Redis tier when AI_EXTRACTION_CACHE_BACKEND
+        is "redis", otherwise in-process only
+    """
+    global _cache
+    if _cache is None:
+        redis_client = None
+        if settings.AI_EXTRACTION_CACHE_BACKEND == "redis":
+            redis_client = create_redis_client()
+        _cache = ExtractionCache(
+            max_entries=settings.AI_EXTRACTION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.AI_EXTRACTION_CACHE_TTL_SECONDS,
+            redis_client=redis_client,
+        )
+    return _cache
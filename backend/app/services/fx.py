@@ -0,0 +1,48 @@
+"""Currency conversion rates."""
+import logging
+from typing import Dict, Iterable, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# USD per unit of each currency. Reference rates: the Gulf currencies are
+# pegged, the others are approximate
+REFERENCE_RATES_USD: Dict[str, float] = {
+    "USD": 1.0,
+    "AED": 1 / 3.6725,
+    "SAR": 1 / 3.75,
+    "QAR": 1 / 3.64,
+    "OMR": 1 / 0.3845,
+    "BHD": 1 / 0.376,
+    "KWD": 3.25,
+    "EUR": 1.08,
+    "GBP": 1.27,
+    "CNY": 0.138,
+    "INR": 0.012,
+    "JPY": 0.0067,
+}
+
+
+async def get_rates(currencies: Iterable[str], base: Optional[str] = None) -> Dict[str, float]:
+    """
+    Rates to convert amounts into a base currency.
+
+    Args:
+        currencies: Currency codes to convert from
+        base: Currency to convert into (defaults to FX_BASE_CURRENCY)
+
+    Returns:
+        Units of base per unit of each currency; currencies without a rate are left out
+    """
+    base = (base or settings.FX_BASE_CURRENCY).upper()
+    base_usd = REFERENCE_RATES_USD.get(base)
+    if base_usd is None:
+        logger.warning(f"No FX rate for base currency {base}")
+        return {}
+    rates = {}
+    for currency in currencies:
+        usd = REFERENCE_RATES_USD.get((currency or "").upper())
+        if usd is not None:
+            rates[currency] = usd / base_usd
+    return rates
@@ -0,0 +1,154 @@
+"""In-process LRU cache with an optional shared Redis tier."""
+import asyncio
+import copy
+import json
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from app.config import settings
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LayeredCache:
+    """
+    In-process LRU in front of an optional shared Redis tier.
+
+    Values are JSON-serializable dicts. Entries expire after ttl_seconds in
+    both tiers. Redis errors are logged and treated as misses, so the cache
+    can never fail the operation it sits in front of. Counters are reported
+    under metric_prefix ("<prefix>.hits", "<prefix>.misses", ...).
+    """
+
+    metric_prefix = "cache"
+
+    def __init__(self, max_entries: int, ttl_seconds: float, redis_client=None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: In-process entries kept before evicting the least recently used
+            ttl_seconds: Lifetime of an entry in either tier
+            redis_client: Synchronous redis.Redis client for the shared tier (optional)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.redis_client = redis_client
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a value, promoting Redis hits into the LRU.
+
+        Returns:
+            Cached value or None
+        """
+        value = self._get_local(key)
+        if value is None and self.redis_client is not None:
+            value, ttl_seconds = await self._get_redis(key)
+            if value is not None:
+                metrics.increment(f"{self.metric_prefix}.redis_hits")
+                # Expire locally when the Redis entry does, not a full TTL later
+                self._set_local(key, value, ttl_seconds)
+
+        metrics.increment(f"{self.metric_prefix}.hits" if value is not None else f"{self.metric_prefix}.misses")
+        return value
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store a value in every tier."""
+        self._set_local(key, value)
+        if self.redis_client is not None:
+            try:
+                payload = json.dumps(value)
+                await asyncio.to_thread(self.redis_client.set, key, payload, ex=self._redis_ttl())
+            except Exception as e:
+                logger.warning(f"{self.metric_prefix} write to Redis failed: {e}")
+
+    async def delete(self, key: str) -> None:
+        """Remove a value from every tier."""
+        self.delete_local(key)
+        if self.redis_client is not None:
+            try:
+                await asyncio.to_thread(self.redis_client.delete, key)
+            except Exception as e:
+                logger.warning(f"{self.metric_prefix} delete from Redis failed: {e}")
+
+    def delete_local(self, key: str) -> None:
+        """Remove a value from the in-process tier only."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all in-process entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def _get_local(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            # Callers may mutate the result (e.g. store it on a model)
+            return copy.deepcopy(value)
+
+    def _set_local(self, key: str, value: Dict[str, Any], ttl_seconds: Optional[float] = None) -> None:
+        if ttl_seconds is None:
+            ttl_seconds = self.ttl_seconds
+        # Keep our own copy so the caller's dict isn't shared with the LRU
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment(f"{self.metric_prefix}.evictions")
+
+    def _redis_ttl(self) -> int:
+        """Redis expiry in whole seconds (`ex` rejects 0 and fractions)."""
+        return max(1, math.ceil(self.ttl_seconds))
+
+    async def _get_redis(self, key: str) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        """Read an entry and its remaining lifetime in seconds from Redis."""
+        try:
+            payload, ttl_ms = await asyncio.to_thread(self._read_redis, key)
+        except Exception as e:
+            logger.warning(f"{self.metric_prefix} read from Redis failed: {e}")
+            return None, None
+        if not payload:
+            return None, None
+        # PTTL is -1 for keys without an expiry
+        ttl_seconds = ttl_ms / 1000 if ttl_ms is not None and ttl_ms >= 0 else None
+        return json.loads(payload), ttl_seconds
+
+    def _read_redis(self, key: str):
+        pipe = self.redis_client.pipeline()
+        pipe.get(key)
+        pipe.pttl(key)
+        return pipe.execute()
+
+
+def create_redis_client():
+    """
+    Synchronous Redis client for cache tiers.
+
+    Short timeouts: a slow Redis should turn into cache misses, not slow
+    requests.
+    """
+    import redis
+
+    return redis.Redis.from_url(
+        settings.REDIS_URL,
+        socket_timeout=1,
+        socket_connect_timeout=1,
+    )
@@ -0,0 +1,64 @@
+"""In-process counters for operational metrics."""
+import threading
+from collections import defaultdict
+from typing import Dict
+
+_lock = threading.Lock()
+_counters: Dict[str, int] = defaultdict(int)
+
+
+def increment(name: str, value: int = 1) -> None:
+    """
+    Add to a named counter.
+
+    Args:
+        name: Counter name, e.g. "document_dedup.hits"
+        value: Amount to add
+    """
+    with _lock:
+        _counters[name] += value
+
+
+def get_count(name: str) -> int:
+    """Current value of a counter (0 if never incremented)."""
+    with _lock:
+        return _counters.get(name, 0)
+
+
+def hit_rate(prefix: str) -> float:
+    """
+    Hit rate of a "<prefix>.hits" / "<prefix>.misses" counter pair.
+
+    Returns:
+        hits / (hits + misses), or 0.0 before any lookups
+    """
+    with _lock:
+        hits = _counters.get(f"{prefix}.hits", 0)
+        misses = _counters.get(f"{prefix}.misses", 0)
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+def snapshot() -> Dict[str, float]:
+    """
+    All counters plus a "<prefix>.hit_rate" for every hits/misses pair.
+
+    Returns:
+        Metric name to value
+    """
+    with _lock:
+        metrics: Dict[str, float] = dict(_counters)
+    prefixes = {
+        name.rsplit(".", 1)[0]
+        for name in metrics
+        if name.endswith((".hits", ".misses"))
+    }
+    for prefix in prefixes:
+        metrics[f"{prefix}.hit_rate"] = hit_rate(prefix)
+    return metrics
+
+
+def reset() -> None:
+    """Clear all counters (tests)."""
+    with _lock:
+        _counters.clear()
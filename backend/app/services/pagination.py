@@ -0,0 +1,121 @@
+"""Keyset (cursor) pagination, newest first, on (created_at, id)."""
+import base64
+import json
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import DateTime, Select, func, literal, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+class Cursor(NamedTuple):
+    """Position after the last row of a page."""
+
+    created_at: datetime
+    id: UUID
+
+    def encode(self) -> str:
+        """Opaque URL-safe token for the API."""
+        payload = json.dumps([self.created_at.isoformat(), self.id.hex]).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        """
+        Parse a token from encode().
+
+        Raises:
+            InvalidCursorError: If the token is malformed
+        """
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+            return cls(datetime.fromisoformat(created_at), UUID(hex=row_id))
+        except (ValueError, TypeError) as e:
+            raise InvalidCursorError("Invalid pagination cursor") from e
+
+
+class sortable_timestamp(FunctionElement):
+    """
+    A timestamp as compared for ordering and seeking.
+
+    The column itself on PostgreSQL, so the (company_id, created_at, id)
+    indexes serve both. SQLite compares timestamps as text and server
+    defaults are stored without fractional seconds, so there both sides
+    are normalized to one format first.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(sortable_timestamp)
+def _compile_sortable_timestamp(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(sortable_timestamp, "sqlite")
+def _compile_sortable_timestamp_sqlite(element, compiler, **kw):
+    (timestamp,) = element.clauses.clauses
+    return compiler.process(func.strftime("%Y-%m-%d %H:%M:%f", timestamp), **kw)
+
+
+def paginate(
+    query: Select,
+    model: Any,
+    skip: int = 0,
+    limit: int = 50,
+    cursor: Optional[Cursor] = None,
+) -> Select:
+    """
+    Order a query newest first and select one page.
+
+    With a cursor the page starts right after it (an index seek, whatever
+    the depth); otherwise the first `skip` rows are skipped.
+
+    Args:
+        query: Filtered select of model
+        model: Mapped class with created_at and id columns
+        skip: Rows to skip (ignored when cursor is given)
+        limit: Page size
+        cursor: Position from a previous page's next_cursor
+
+    Returns:
+        The paginated query
+    """
+    created_at = sortable_timestamp(model.created_at)
+    if cursor is not None:
+        query = query.where(
+            tuple_(created_at, model.id)
+            < tuple_(
+                sortable_timestamp(literal(cursor.created_at, model.created_at.type)),
+                literal(cursor.id, model.id.type),
+            )
+        )
+    elif skip:
+        query = query.offset(skip)
+    return query.order_by(created_at.desc(), model.id.desc()).limit(limit)
+
+
+def next_cursor(rows: Sequence[Any], limit: int) -> Optional[str]:
+    """
+    Cursor for the page after rows.
+
+    Args:
+        rows: Page returned by a paginate() query (models or schemas)
+        limit: Page size it was fetched with
+
+    Returns:
+        Encoded cursor, or None when the page wasn't full (no more rows)
+    """
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return Cursor(last.created_at, last.id).encode()
+
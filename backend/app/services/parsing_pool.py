@@ -0,0 +1,63 @@
+"""Process pool for CPU-bound document parsing and OCR."""
+import asyncio
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_parsing_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process-wide parsing pool, creating it on first use.
+
+    Returns:
+        ProcessPoolExecutor, or None when PARSING_POOL_WORKERS is 0 or the
+        current process can't fork children (e.g. a Celery prefork worker)
+    """
+    global _executor
+    if settings.PARSING_POOL_WORKERS <= 0 or multiprocessing.current_process().daemon:
+        return None
+    if _executor is None:
+        # spawn: pdfplumber/tesseract state must not be inherited from a
+        # process that is already running an event loop and DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PARSING_POOL_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=settings.PARSING_POOL_MAX_TASKS_PER_CHILD or None,
+        )
+        logger.info(f"Started parsing pool with {settings.PARSING_POOL_WORKERS} workers")
+    return _executor
+
+
+async def run_in_parsing_pool(func: Callable[..., T], *args: Any) -> T:
+    """
+    Run a CPU-bound function without blocking the event loop.
+
+    Args:
+        func: Picklable module-level function or staticmethod
+        *args: Picklable positional arguments
+
+    Returns:
+        The function's return value (exceptions are re-raised)
+    """
+    executor = get_parsing_pool()
+    if executor is None:
+        return await asyncio.to_thread(func, *args)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, func, *args)
+
+
+def shutdown_parsing_pool() -> None:
+    """Stop the parsing pool's worker processes."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
@@ -0,0 +1,131 @@
+"""Streaming page-level PDF OCR across the parsing pool."""
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+from app.config import settings
+from app.services.document_parsing import DocumentParsingService, DocumentParsingError, PageTextMerger
+from app.services.parsing_pool import run_in_parsing_pool
+
+logger = logging.getLogger(__name__)
+
+
+async def stream_pdf_ocr(
+    pdf_path: str,
+    native_pages: Dict[int, str],
+    ocr_pages: List[int],
+    window: Optional[int] = None,
+) -> str:
+    """
+    OCR the given PDF pages in parallel and merge them with the native text.
+
+    Pages are consumed in page order while up to ``window`` of the next
+    pages are already being rendered and OCR'd in the parsing pool. Once
+    MAX_TEXT_LENGTH characters are collected the remaining work is
+    cancelled, so a long catalogue stops after the first few scanned pages.
+
+    Args:
+        pdf_path: Path of the PDF file (workers render pages from it)
+        native_pages: Embedded text by 1-based page number
+        ocr_pages: Pages without a usable text layer
+        window: Pages in flight at once (defaults to the pool size)
+
+    Returns:
+        Merged text in page order, truncated to MAX_TEXT_LENGTH
+    """
+    window = window or max(1, settings.PARSING_POOL_WORKERS)
+    merger = PageTextMerger(native_pages, ocr_pages)
+    upcoming = iter(sorted(merger.ocr_pages))
+    in_flight: Dict[int, asyncio.Future] = {}
+
+    def schedule() -> None:
+        while len(in_flight) < window:
+            page_num = next(upcoming, None)
+            if page_num is None:
+                return
+            in_flight[page_num] = asyncio.ensure_future(
+                run_in_parsing_pool(DocumentParsingService.ocr_pdf_page, pdf_path, page_num)
+            )
+
+    ocr_count = 0
+    schedule()
+    try:
+        for page_num in merger.page_numbers:
+            ocr_text = None
+            if page_num in merger.ocr_pages:
+                # Pages are scheduled in order, so this one is always in flight
+                try:
+                    ocr_text = await in_flight.pop(page_num)
+                    ocr_count += 1
+                except DocumentParsingError as e:
+                    logger.warning(f"{e}, keeping native text")
+                schedule()
+            if merger.add(page_num, ocr_text):
+                break
+    finally:
+        for future in in_flight.values():
+            future.cancel()
+
+    logger.info(f"OCR'd {ocr_count} of {len(merger.ocr_pages)} pages without text")
+    return merger.text()
+
+
+async def ocr_document_pages(
+    file_content: bytes,
+    mime_type: str,
+    native_text: Optional[str],
+    ocr_pages: List[int],
+) -> str:
+    """
+    OCR the pages the parse step found no text on (pipeline OCR stage).
+
+    Args:
+        file_content: Raw file bytes
+        mime_type: MIME type of file
+        native_text: Text from extract_native_text
+        ocr_pages: Pages from extract_native_text
+
+    Returns:
+        Native text merged with OCR output ("" if nothing was OCR'd)
+
+    Raises:
+        DocumentParsingError: If OCR fails
+    """
+    if not ocr_pages:
+        return ""
+    if mime_type == "application/pdf":
+        pdf_path = await asyncio.to_thread(DocumentParsingService.write_temp_pdf, file_content)
+        try:
+            return await stream_pdf_ocr(
+                pdf_path,
+                native_pages=DocumentParsingService.split_pages(native_text),
+                ocr_pages=ocr_pages,
+            )
+        finally:
+            os.unlink(pdf_path)
+    return await run_in_parsing_pool(DocumentParsingService.extract_text_from_image, file_content)
+
+
+async def extract_text_with_ocr(file_content: bytes, mime_type: str) -> str:
+    """
+    Extract text, OCR-ing pages without a text layer in parallel.
+
+    The async counterpart of DocumentParsingService.extract_text for
+    callers on the event loop.
+
+    Args:
+        file_content: Raw file bytes
+        mime_type: MIME type of file
+
+    Returns:
+        Extracted text content
+
+    Raises:
+        DocumentParsingError: If extraction fails or unsupported type
+    """
+    text, ocr_pages = await run_in_parsing_pool(
+        DocumentParsingService.extract_native_text, file_content, mime_type
+    )
+    ocr_text = await ocr_document_pages(file_content, mime_type, text, ocr_pages)
+    return ocr_text if len(ocr_text.strip()) > len(text.strip()) else text
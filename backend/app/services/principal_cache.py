@@ -0,0 +1,144 @@
+"""Cache of authenticated principals for get_current_user_full."""
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.user import User
+from app.services.layered_cache import LayeredCache, create_redis_client
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "principal_cache"
+
+# Session.info key for users whose cached principal must go at commit
+_PENDING_KEY = "principal_cache_invalidations"
+
+
+class PrincipalCache(LayeredCache):
+    """
+    Active users' company and role, by user ID.
+
+    Saves the user lookup on every authenticated request. Entries are
+    dropped when a user is deactivated, deleted or changes role (see the
+    session hooks below); other API processes' in-process tiers can serve
+    the old principal for at most ttl_seconds, which bounds staleness.
+    """
+
+    metric_prefix = METRIC_PREFIX
+
+    @staticmethod
+    def make_key(user_id: UUID) -> str:
+        """Cache key for a user."""
+        return f"{METRIC_PREFIX}:{user_id}"
+
+    async def get_principal(self, user_id: UUID) -> Optional[Dict[str, Any]]:
+        """
+        Look up an active user's principal.
+
+        Returns:
+            {"company_id": str, "role": str} or None
+        """
+        return await self.get(self.make_key(user_id))
+
+    async def set_principal(self, user_id: UUID, company_id: UUID, role: str) -> None:
+        """Cache an active user's principal."""
+        await self.set(self.make_key(user_id), {"company_id": str(company_id), "role": role})
+
+    async def invalidate(self, user_id: UUID) -> None:
+        """Drop a user's principal from every tier."""
+        await self.delete(self.make_key(user_id))
+
+
+_cache: Optional[PrincipalCache] = None
+_pending_deletes: Set[asyncio.Task] = set()
+
+
+def get_principal_cache() -> Optional[PrincipalCache]:
+    """
+    Get the process-wide principal cache, creating it on first use.
+
+    Returns:
+        PrincipalCache with a Redis tier when PRINCIPAL_CACHE_BACKEND is
+        "redis", in-process only for "memory", or None when caching is
+        disabled ("none" or PRINCIPAL_CACHE_TTL_SECONDS <= 0)
+    """
+    global _cache
+    if settings.PRINCIPAL_CACHE_BACKEND == "none" or settings.PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return None
+    if _cache is None:
+        redis_client = None
+        if settings.PRINCIPAL_CACHE_BACKEND == "redis":
+            redis_client = create_redis_client()
+        _cache = PrincipalCache(
+            max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+            redis_client=redis_client,
+        )
+    return _cache
+
+
+def invalidate_principals(user_ids: Set[UUID]) -> None:
+    """
+    Drop cached principals from every tier without awaiting.
+
+    The in-process tier is cleared immediately; the Redis delete runs in
+    the background on the running loop (or inline outside of one).
+    """
+    cache = _cache
+    if cache is None or not user_ids:
+        return
+    for user_id in user_ids:
+        cache.delete_local(cache.make_key(user_id))
+    if cache.redis_client is None:
+        return
+
+    async def delete_shared():
+        for user_id in user_ids:
+            await cache.invalidate(user_id)
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(delete_shared())
+        return
+    task = loop.create_task(delete_shared())
+    _pending_deletes.add(task)
+    task.add_done_callback(_pending_deletes.discard)
+
+
+def _principal_changed(user: User) -> bool:
+    state = inspect(user)
+    return state.attrs.is_active.history.has_changes() or state.attrs.role.history.has_changes()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session: Session, flush_context) -> None:
+    """Note users whose principal a flush changed and drop them locally now."""
+    changed = {
+        user.id
+        for user in session.dirty
+        if isinstance(user, User) and _principal_changed(user)
+    }
+    changed |= {user.id for user in session.deleted if isinstance(user, User)}
+    if changed:
+        session.info.setdefault(_PENDING_KEY, set()).update(changed)
+        # Local drop now; requests racing the commit can re-cache the old
+        # row, so everything is dropped again after commit
+        if _cache is not None:
+            for user_id in changed:
+                _cache.delete_local(_cache.make_key(user_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    invalidate_principals(session.info.pop(_PENDING_KEY, set()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_users(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,511 @@
+"""Proposal comparison for a deal: proposals normalized to a base currency and scored in NumPy."""
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.deal import Deal
+from app.models.vendor import Vendor
+from app.models.vendor_proposal import VendorProposal
+from app.schemas.vendor_proposal import (
+    ProposalComparisonItem,
+    ProposalComparisonResponse,
+    ProposalLineComparison,
+)
+from app.services.fx import get_rates
+from app.services.snapshot_cache import SnapshotCache
+from app.services.vendor_recommendation import match_tokens
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "proposal_comparison"
+
+# Session.info key for the (company, deal) pairs whose proposals a flush changed
+_STALE_KEY = "proposal_comparison_stale"
+
+# Criteria and their default weights. A criterion no proposal gives is
+# left out and the others re-weighted
+DEFAULT_WEIGHTS = {
+    "price": 0.40,
+    "lead_time": 0.20,
+    "credibility": 0.15,
+    "spec_match": 0.15,
+    "payment_terms": 0.10,
+}
+CRITERIA = tuple(DEFAULT_WEIGHTS)
+
+# Score of a proposal that doesn't say whether it meets the specs
+SPEC_UNKNOWN = 0.5
+
+_PERCENT = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+_DAYS = re.compile(r"(?:net\s*(\d+))|(?:(\d+)\s*(?:days?|d)\b)")
+_IMMEDIATE = re.compile(r"advance|prepa|upfront|up-front|\bcia\b|\bcod\b|cash|sight|on delivery|immediate")
+_SEGMENT = re.compile(r"[,;+/]|\band\b|\bbalance\b")
+
+
+def payment_days(terms: Optional[str]) -> Optional[float]:
+    """
+    Days of credit a payment terms string gives the buyer.
+
+    "Net 30" is 30, advance payment, cash and LC at sight are 0, and
+    split terms are weighted by their shares ("30% advance, 70% net 60"
+    is 42). A part without a share takes what the others leave.
+
+    Returns:
+        Days, or None when no part of the terms is recognized
+    """
+    if not terms:
+        return None
+    parts: List[Tuple[Optional[float], float]] = []
+    for segment in _SEGMENT.split(terms.lower()):
+        percent = _PERCENT.search(segment)
+        rest = _PERCENT.sub(" ", segment)
+        days = _DAYS.search(rest)
+        if days:
+            value = float(days.group(1) or days.group(2))
+        elif _IMMEDIATE.search(rest):
+            value = 0.0
+        elif percent and parts and parts[-1][0] is None:
+            # "70% within 60 days" split as "70%" + "within 60 days"
+            parts[-1] = (float(percent.group(1)), parts[-1][1])
+            continue
+        else:
+            continue
+        parts.append((float(percent.group(1)) if percent else None, value))
+    if not parts:
+        return None
+    shares = [share for share, _ in parts if share is not None]
+    if not shares:
+        return parts[0][1]
+    unassigned = [value for share, value in parts if share is None]
+    total = sum(share * value for share, value in parts if share is not None)
+    remaining = max(0.0, 100.0 - sum(shares))
+    if unassigned and remaining:
+        total += remaining * sum(unassigned) / len(unassigned)
+        return total / 100.0
+    return total / sum(shares)
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if np.isfinite(number) else None
+
+
+def quoted_items(line_items: Any) -> List[dict]:
+    """A proposal's line items: a list, or the "line_items"/"items" list of a dict."""
+    if isinstance(line_items, dict):
+        line_items = line_items.get("line_items") or line_items.get("items")
+    if not isinstance(line_items, list):
+        return []
+    return [item for item in line_items if isinstance(item, dict)]
+
+
+def unit_price(item: dict) -> Optional[float]:
+    """An item's unit_price, or total_price / quantity."""
+    price = _number(item.get("unit_price"))
+    if price is None:
+        total, quantity = _number(item.get("total_price")), _number(item.get("quantity"))
+        if total is not None and quantity:
+            price = total / quantity
+    return price
+
+
+def match_lines(deal_lines: Sequence[dict], items: Sequence[dict]) -> List[Optional[int]]:
+    """
+    The deal line item each quoted item prices.
+
+    Items are paired with lines greedily by description word overlap
+    (Jaccard); items left over are paired by position when the proposal
+    quotes as many items as the deal has lines.
+
+    Returns:
+        Deal line index per item, or None when it matches none
+    """
+    m, q = len(deal_lines), len(items)
+    result: List[Optional[int]] = [None] * q
+    if not m or not q:
+        return result
+    line_tokens = [match_tokens(str(line.get("description") or "")) for line in deal_lines]
+    item_tokens = [match_tokens(str(item.get("description") or "")) for item in items]
+    overlap = np.array([
+        [len(a & b) / len(a | b) if a and b else 0.0 for b in line_tokens] for a in item_tokens
+    ])
+    taken = np.zeros(m, dtype=bool)
+    for flat in np.argsort(-overlap, axis=None, kind="stable"):
+        i, j = divmod(int(flat), m)
+        if overlap[i, j] <= 0:
+            break
+        if result[i] is None and not taken[j]:
+            result[i], taken[j] = j, True
+    if q == m:
+        for i in range(q):
+            if result[i] is None and not taken[i]:
+                result[i], taken[i] = i, True
+    return result
+
+
+@dataclass
+class DealProposals:
+    """A deal's proposals as loaded for comparison, prices in their quoted currencies."""
+
+    deal_id: UUID
+    lines: List[dict]
+    proposals: List[dict]
+    currencies: List[str]
+    # Per proposal (NaN when missing)
+    total_price: np.ndarray
+    total_currency: np.ndarray
+    lead_time: np.ndarray
+    credibility: np.ndarray
+    spec_match: np.ndarray
+    payment_days: np.ndarray
+    # Proposals x deal lines (NaN where a proposal doesn't price a line)
+    line_prices: np.ndarray
+    line_currency: np.ndarray
+
+
+async def load_deal_proposals(db: AsyncSession, company_id: UUID, deal_id: UUID) -> DealProposals:
+    """
+    Load a deal's line items and live proposals (with vendor credibility).
+
+    Raises:
+        ValueError: If the deal is not found
+    """
+    deal_lines = (await db.execute(
+        select(Deal.line_items).where(
+            and_(Deal.id == deal_id, Deal.company_id == company_id, Deal.deleted_at.is_(None))
+        )
+    )).first()
+    if deal_lines is None:
+        raise ValueError("Deal not found")
+    lines = [line for line in deal_lines[0] or [] if isinstance(line, dict)]
+
+    rows = (await db.execute(
+        select(
+            VendorProposal.id,
+            VendorProposal.vendor_id,
+            Vendor.company_name,
+            Vendor.credibility_score,
+            VendorProposal.total_price,
+            VendorProposal.currency,
+            VendorProposal.lead_time_days,
+            VendorProposal.specs_match,
+            VendorProposal.discrepancies,
+            VendorProposal.status,
+            VendorProposal.payment_terms,
+            VendorProposal.line_items,
+        )
+        .join(Vendor, Vendor.id == VendorProposal.vendor_id)
+        .where(
+            and_(
+                VendorProposal.deal_id == deal_id,
+                VendorProposal.company_id == company_id,
+                VendorProposal.deleted_at.is_(None),
+            )
+        )
+        .order_by(VendorProposal.created_at.asc())
+    )).all()
+
+    n, m = len(rows), len(lines)
+    currency_index: Dict[str, int] = {}
+
+    def currency_of(code: Optional[str]) -> int:
+        return currency_index.setdefault((code or "").upper(), len(currency_index))
+
+    total_currency = np.zeros(n, dtype=np.intp)
+    line_prices = np.full((n, m), np.nan)
+    line_currency = np.zeros((n, m), dtype=np.intp)
+    proposals = []
+    for row, proposal in enumerate(rows):
+        total_currency[row] = currency_of(proposal.currency)
+        items = quoted_items(proposal.line_items)
+        for item, line in zip(items, match_lines(lines, items)):
+            price = unit_price(item) if line is not None else None
+            if price is not None:
+                line_prices[row, line] = price
+                line_currency[row, line] = currency_of(item.get("currency") or proposal.currency)
+        proposals.append({
+            "id": proposal.id,
+            "vendor_id": proposal.vendor_id,
+            "vendor_name": proposal.company_name,
+            "vendor_credibility": proposal.credibility_score,
+            "total_price": proposal.total_price,
+            "currency": proposal.currency,
+            "lead_time_days": proposal.lead_time_days,
+            "specs_match": proposal.specs_match,
+            "discrepancies": proposal.discrepancies,
+            "status": proposal.status.value,
+            "payment_terms": proposal.payment_terms,
+        })
+
+    def column(values) -> np.ndarray:
+        return np.array([np.nan if v is None else float(v) for v in values], dtype=float)
+
+    return DealProposals(
+        deal_id=deal_id,
+        lines=lines,
+        proposals=proposals,
+        currencies=list(currency_index),
+        total_price=column(p["total_price"] for p in proposals),
+        total_currency=total_currency,
+        lead_time=column(p["lead_time_days"] for p in proposals),
+        credibility=column(p["vendor_credibility"] for p in proposals),
+        spec_match=column(p["specs_match"] for p in proposals),
+        payment_days=column(payment_days(p["payment_terms"]) for p in proposals),
+        line_prices=line_prices,
+        line_currency=line_currency,
+    )
+
+
+def _ranks(values: np.ndarray) -> np.ndarray:
+    """Competition ranks, highest value first (1, 2, 2, 4); 0 where NaN."""
+    ranks = np.zeros(values.shape, dtype=np.intp)
+    known = ~np.isnan(values)
+    descending = np.sort(-values[known])
+    ranks[known] = np.searchsorted(descending, -values[known], side="left") + 1
+    return ranks
+
+
+def _ratio_to_best(values: np.ndarray, offset: float = 0.0) -> np.ndarray:
+    """Lowest value / each value (1.0 for the lowest), NaN where missing or not positive."""
+    values = np.where(values + offset > 0, values + offset, np.nan)
+    if np.isnan(values).all():
+        return values
+    return np.nanmin(values) / values
+
+
+def _round(value: float, digits: int = 4) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), digits)
+
+
+def score_proposals(
+    data: DealProposals,
+    rates: Dict[str, float],
+    base_currency: str,
+    weights: Optional[Dict[str, float]] = None,
+) -> ProposalComparisonResponse:
+    """
+    Score and rank a deal's proposals.
+
+    Each criterion is scored 0-1, higher better: price and lead time as
+    the best value over the proposal's (lead time + 1 day, so same-day
+    delivery doesn't divide by zero), credibility / 100, spec match 1 or 0
+    (SPEC_UNKNOWN when not stated), and payment terms as days of credit
+    over the longest offered. The score is the weighted mean over the
+    criteria any proposal gives, a proposal missing one scoring 0 on it.
+
+    Args:
+        data: The deal's proposals
+        rates: Units of base_currency per unit of each quoted currency
+        base_currency: Currency prices are compared in
+        weights: Criterion weights overriding DEFAULT_WEIGHTS
+
+    Returns:
+        ProposalComparisonResponse, proposals in the order they were received
+
+    Raises:
+        ValueError: If a weight is unknown or negative, or all are zero
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    unknown = set(weights) - set(CRITERIA)
+    if unknown:
+        raise ValueError(f"Unknown comparison criteria: {', '.join(sorted(unknown))}")
+    if any(w < 0 for w in weights.values()):
+        raise ValueError("Comparison weights must not be negative")
+
+    rate = np.array([rates.get(code, np.nan) for code in data.currencies] or [np.nan])
+    total = data.total_price * rate[data.total_currency]
+    line_prices = data.line_prices * rate[data.line_currency]
+    max_days = np.nanmax(data.payment_days) if (~np.isnan(data.payment_days)).any() else np.nan
+    criteria = {
+        "price": _ratio_to_best(total),
+        "lead_time": _ratio_to_best(data.lead_time, offset=1.0),
+        "credibility": data.credibility / 100.0,
+        "spec_match": np.where(np.isnan(data.spec_match), SPEC_UNKNOWN, data.spec_match),
+        "payment_terms": data.payment_days / max_days if max_days > 0 else np.where(
+            np.isnan(data.payment_days), np.nan, 1.0
+        ),
+    }
+    if np.isnan(data.spec_match).all():
+        criteria["spec_match"] = np.full(len(data.proposals), np.nan)
+
+    names = [name for name in CRITERIA if weights[name] > 0 and not np.isnan(criteria[name]).all()]
+    used = np.array([weights[name] for name in names])
+    if names and used.sum() <= 0:
+        raise ValueError("At least one comparison weight must be positive")
+    if names:
+        matrix = np.nan_to_num(np.column_stack([criteria[name] for name in names]), nan=0.0)
+        scores = matrix @ (used / used.sum())
+    else:
+        scores = np.zeros(len(data.proposals))
+    ranks = _ranks(np.round(scores, 9))
+    criterion_ranks = {name: _ranks(values) for name, values in criteria.items()}
+
+    # Line by line: cheapest unit price per line, and each proposal's
+    # cheapest / own price over the lines it quotes
+    priced = ~np.isnan(line_prices)
+    best_line = np.full(len(data.lines), np.nan)
+    if len(data.proposals):
+        best_line = np.where(priced, line_prices, np.inf).min(axis=0)
+        best_line[np.isinf(best_line)] = np.nan
+    cheapest = priced & np.isclose(line_prices, best_line[None, :])
+    best_row = np.where(cheapest.any(axis=0), cheapest.argmax(axis=0), -1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        relative = np.where(priced, best_line[None, :] / line_prices, 0.0)
+        line_index = relative.sum(axis=1) / priced.sum(axis=1)
+
+    known_total = total[~np.isnan(total)]
+    best_price = float(known_total.min()) if known_total.size else None
+    worst_price = float(known_total.max()) if known_total.size else None
+    leads = data.lead_time[~np.isnan(data.lead_time)]
+    best_lead = int(leads.min()) if leads.size else None
+    worst_lead = int(leads.max()) if leads.size else None
+
+    items = []
+    for row, proposal in enumerate(data.proposals):
+        price = total[row]
+        items.append(ProposalComparisonItem(
+            **proposal,
+            is_best_price=bool(best_price is not None and np.isclose(price, best_price)),
+            is_worst_price=bool(worst_price is not None and np.isclose(price, worst_price)),
+            is_best_lead_time=bool(best_lead is not None and data.lead_time[row] == best_lead),
+            normalized_total_price=_round(price, 2),
+            payment_days=_round(data.payment_days[row], 1),
+            score=round(float(scores[row]), 4),
+            rank=int(ranks[row]),
+            criteria={name: _round(criteria[name][row]) for name in names},
+            criterion_ranks={name: int(criterion_ranks[name][row]) or None for name in names},
+            line_unit_prices=[_round(value, 4) for value in line_prices[row]],
+            lines_best=int(cheapest[row].sum()),
+            line_price_index=_round(line_index[row]),
+        ))
+
+    return ProposalComparisonResponse(
+        deal_id=data.deal_id,
+        proposals=items,
+        best_price=_round(best_price, 2) if best_price is not None else None,
+        worst_price=_round(worst_price, 2) if worst_price is not None else None,
+        best_lead_time=best_lead,
+        worst_lead_time=worst_lead,
+        base_currency=base_currency,
+        weights={name: round(float(w), 4) for name, w in zip(names, used / used.sum())} if names else {},
+        lines=[
+            ProposalLineComparison(
+                line_index=j,
+                description=line.get("description"),
+                quantity=_number(line.get("quantity")),
+                unit=line.get("unit"),
+                best_unit_price=_round(best_line[j], 4),
+                best_proposal_id=data.proposals[best_row[j]]["id"] if best_row[j] >= 0 else None,
+            )
+            for j, line in enumerate(data.lines)
+        ],
+        unconverted_currencies=sorted(code for code in data.currencies if code not in rates),
+    )
+
+
+_cache: Optional[SnapshotCache[DealProposals]] = None
+
+
+def get_comparison_cache() -> Optional[SnapshotCache[DealProposals]]:
+    """
+    Get the process-wide cache of loaded deal proposals, keyed by (company, deal).
+
+    Returns:
+        SnapshotCache, or None when PROPOSAL_COMPARISON_TTL_SECONDS <= 0
+    """
+    global _cache
+    if settings.PROPOSAL_COMPARISON_TTL_SECONDS <= 0:
+        return None
+    if _cache is None:
+        _cache = SnapshotCache(
+            METRIC_PREFIX,
+            max_entries=settings.PROPOSAL_COMPARISON_MAX_DEALS,
+            ttl_seconds=settings.PROPOSAL_COMPARISON_TTL_SECONDS,
+        )
+    return _cache
+
+
+async def compare_proposals(
+    db: AsyncSession,
+    company_id: UUID,
+    deal_id: UUID,
+    weights: Optional[Dict[str, float]] = None,
+    base_currency: Optional[str] = None,
+) -> ProposalComparisonResponse:
+    """
+    Compare a deal's proposals, loading them from the cache when possible.
+
+    Only the loaded proposals are cached; currency conversion and scoring
+    run per call, so reweighting or another base currency costs no query.
+    A session that has flushed changes to the deal's proposals reads them
+    from the database until it commits.
+
+    Args:
+        db: Database session
+        company_id: Tenant
+        deal_id: Deal whose proposals to compare
+        weights: Criterion weights overriding DEFAULT_WEIGHTS
+        base_currency: Currency to compare in (defaults to FX_BASE_CURRENCY)
+
+    Raises:
+        ValueError: If the deal is not found or the weights are invalid
+    """
+    key = (company_id, deal_id)
+    cache = get_comparison_cache()
+    if cache is None or key in db.sync_session.info.get(_STALE_KEY, ()):
+        data = await load_deal_proposals(db, company_id, deal_id)
+    else:
+        data = await cache.get_or_load(key, lambda: load_deal_proposals(db, company_id, deal_id))
+    base_currency = (base_currency or settings.FX_BASE_CURRENCY).upper()
+    rates = await get_rates(data.currencies, base=base_currency)
+    missing = [code for code in data.currencies if code not in rates]
+    if missing:
+        logger.warning(f"No {base_currency} rate for {', '.join(missing)}; deal {deal_id} prices left out")
+    return score_proposals(data, rates, base_currency, weights)
+
+
+@event.listens_for(Session, "after_flush")
+def _note_changed_deals(session: Session, flush_context) -> None:
+    """
+    Record the deals whose proposals (or line items) this flush wrote.
+
+    Recorded even before the cache exists, so that compare_proposals()
+    doesn't cache what this session has flushed but not committed.
+    """
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, VendorProposal):
+            state = inspect(obj).dict
+            key = (state.get("company_id"), state.get("deal_id"))
+        elif isinstance(obj, Deal):
+            state = inspect(obj).dict
+            key = (state.get("company_id"), state.get("id"))
+        else:
+            continue
+        if None not in key:
+            session.info.setdefault(_STALE_KEY, set()).add(key)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_deals(session: Session) -> None:
+    stale = session.info.pop(_STALE_KEY, set())
+    cache = _cache
+    if cache is None:
+        return
+    for key in stale:
+        cache.invalidate(key)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_deals(session: Session) -> None:
+    session.info.pop(_STALE_KEY, None)
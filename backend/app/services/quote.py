@@ -1,8 +1,9 @@
 """Quote service for quote management with state machine logic."""
+from datetime import datetime
 from typing import Optional, Union
 from uuid import UUID
 
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.quote import Quote, QuoteStatus
@@ -14,6 +15,14 @@ from app.schemas.quote import (
 )
 from app.schemas.activity_log import ChangeDetail
 from app.services.activity_log import ActivityLogService
+from app.services.counts import TotalMode, count_total
+from app.services.pagination import Cursor, next_cursor, paginate
+from app.services.sequence import next_number, reserve_number
+
+
+def _quote_number_prefix() -> str:
+    """Quote numbers restart every year: QT-2026-001, ..."""
+    return f"QT-{datetime.now().year}-"
 
 
 # State machine: valid transitions
@@ -55,6 +64,8 @@ class QuoteService:
         quote_number = quote_data.quote_number
         if not quote_number:
             quote_number = await self._generate_quote_number()
+        else:
+            await reserve_number(self.db, self.company_id, _quote_number_prefix(), quote_number)
 
         # Convert line items to list of dicts
         line_items_dict = [item.model_dump() for item in quote_data.line_items]
@@ -102,8 +113,6 @@ class QuoteService:
                 if DealStatus.QUOTED in valid_transitions:
                     old_deal_status = deal.status
                     deal.status = DealStatus.QUOTED
-                    await self.db.flush()
-                    await self.db.refresh(deal)
 
                     # Log deal auto-update
                     await self.activity_log_service.log_activity(
@@ -161,6 +170,8 @@ class QuoteService:
         customer_id: Optional[UUID] = None,
         deal_id: Optional[UUID] = None,
         status: Optional[QuoteStatus] = None,
+        cursor: Optional[Cursor] = None,
+        include_total: TotalMode = TotalMode.EXACT,
     ) -> QuotesListResponse:
         """
         List quotes with optional filters.
@@ -171,6 +182,8 @@ class QuoteService:
             customer_id: Filter by customer
             deal_id: Filter by deal
             status: Filter by status
+            cursor: Continue after a previous page's next_cursor (skip is ignored)
+            include_total: Whether to count exactly, estimate or skip the total
 
         Returns:
             Paginated list response
@@ -189,26 +202,14 @@ class QuoteService:
             query = query.where(Quote.status == status)
 
         # Get total count
-        count_query = select(func.count()).select_from(Quote).where(
-            (Quote.deleted_at.is_(None)) & (Quote.company_id == self.company_id)
+        filters = {"customer_id": customer_id, "deal_id": deal_id, "status": status}
+        total = await count_total(
+            self.db, query, include_total, Quote, self.company_id,
+            {column: value for column, value in filters.items() if value},
         )
-        if customer_id:
-            count_query = count_query.where(Quote.customer_id == customer_id)
-        if deal_id:
-            count_query = count_query.where(Quote.deal_id == deal_id)
-        if status:
-            count_query = count_query.where(Quote.status == status)
-
-        count_result = await self.db.execute(count_query)
-        total = count_result.scalar() or 0
 
         # Get paginated results, ordered by created_at DESC
-        query = (
-            query.order_by(Quote.created_at.desc())
-            .offset(skip)
-            .limit(limit)
-        )
-        result = await self.db.execute(query)
+        result = await self.db.execute(paginate(query, Quote, skip, limit, cursor))
         quotes = result.scalars().all()
 
         return QuotesListResponse(
@@ -216,6 +217,7 @@ class QuoteService:
             total=total,
             skip=skip,
             limit=limit,
+            next_cursor=next_cursor(quotes, limit),
         )
 
     async def update_quote(
@@ -351,8 +353,6 @@ class QuoteService:
                 # Auto-update deal status
                 old_deal_status = deal.status
                 deal.status = DealStatus.QUOTED
-                await self.db.flush()
-                await self.db.refresh(deal)
 
                 # Log deal auto-update
                 await self.activity_log_service.log_activity(
@@ -428,29 +428,9 @@ class QuoteService:
         Returns:
             Generated quote number
         """
-        from datetime import datetime
-
-        # Get all existing quote numbers for this company
-        current_year = datetime.now().year
-        query = select(Quote.quote_number).where(
-            Quote.company_id == self.company_id
-        ).order_by(Quote.quote_number.desc())
-        result = await self.db.execute(query)
-        quote_numbers = result.scalars().all()
-
-        # Extract numeric parts and find maximum for current year
-        max_num = 0
-        for quote_num in quote_numbers:
-            if quote_num and f"QT-{current_year}-" in quote_num:
-                try:
-                    num = int(quote_num.split("-")[-1])
-                    max_num = max(max_num, num)
-                except (ValueError, IndexError):
-                    pass
-
-        # Generate next number
-        next_num = max_num + 1
-        return f"QT-{current_year}-{next_num:03d}"
+        prefix = _quote_number_prefix()
+        number = await next_number(self.db, Quote.quote_number, self.company_id, prefix)
+        return f"{prefix}{number:03d}"
 
     async def _get_quote_internal(self, quote_id: UUID) -> Optional[Quote]:
         """Internal method to get quote (excludes soft-deleted, filters by company)."""
@@ -0,0 +1,324 @@
+"""Indexed text search: name/code search and autocomplete, vendor tags, document full text."""
+import logging
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy import (
+    ColumnElement,
+    Select,
+    and_,
+    column,
+    delete,
+    event,
+    false,
+    func,
+    insert,
+    inspect,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+)
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.search_index import FULL_TEXT_CONFIG, FULL_TEXT_TENANT_COLUMN, fts_table_name, json_field_sql
+from app.models.vendor import Vendor
+from app.models.vendor_tag import CATEGORY, CERTIFICATION, VendorTag
+
+logger = logging.getLogger(__name__)
+
+# Shortest query a trigram index can serve; shorter ones scan
+MIN_TRIGRAM_QUERY = 3
+
+# Around matched words in full text snippets; the rest of a snippet is
+# the document's text as extracted (escape it before rendering as HTML)
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+SNIPPET_WORDS = 16
+
+# Vendor JSON list attribute -> VendorTag.kind
+TAG_ATTRIBUTES = {"product_categories": CATEGORY, "certifications": CERTIFICATION}
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _dialect(db: AsyncSession) -> str:
+    return db.get_bind().dialect.name
+
+
+def _search_text(model: Any, columns: Sequence[str]) -> ColumnElement:
+    """name || ' ' || code, written as the trigram index expression is."""
+    expression = getattr(model, columns[0])
+    for name in columns[1:]:
+        expression = expression.op("||")(literal_column("' '")).op("||")(getattr(model, name))
+    return expression
+
+
+def _fts_matches(model: Any, match: str, ranked: bool = True):
+    """
+    CTE of the FTS rowids (and, if ranked, bm25 rank) matching an FTS5 query.
+
+    Materialized so MATCH runs once: joined directly, SQLite may drive
+    from the company index and re-run it for every row of the tenant.
+    The rank is computed for every match, so leave it out when unused.
+    """
+    name = fts_table_name(model.__tablename__)
+    fts = table(name, column("rowid"), column("rank"))
+    columns = [fts.c.rowid.label("rowid")] + ([fts.c.rank.label("rank")] if ranked else [])
+    return (
+        select(*columns)
+        .where(literal_column(name).op("MATCH")(match))
+        .cte(f"{name}_match")
+        .prefix_with("MATERIALIZED")
+    )
+
+
+def text_search(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    columns: Sequence[str],
+    q: str,
+) -> Tuple[Select, ColumnElement]:
+    """
+    Restrict a query to rows whose columns contain q, case-insensitively.
+
+    Served by the table's text search index (see
+    app.models.search_index): pg_trgm on PostgreSQL, a trigram FTS5 table
+    on SQLite. Queries shorter than MIN_TRIGRAM_QUERY fall back to ILIKE.
+
+    Args:
+        db: Session the query will run in (picks the dialect)
+        query: select() of model
+        model: Mapped class with the columns
+        columns: Column names to search, as registered for the index
+        q: Text to find
+
+    Returns:
+        Tuple of (filtered query, relevance score to order by, higher is better)
+    """
+    q = q.strip()
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        search_text = _search_text(model, columns)
+        return (
+            query.where(search_text.ilike(f"%{_escape_like(q)}%", escape="\\")),
+            func.similarity(search_text, q),
+        )
+    if dialect == "sqlite" and len(q) >= MIN_TRIGRAM_QUERY:
+        phrase = '"' + q.replace('"', '""') + '"'
+        matches = _fts_matches(model, phrase)
+        query = query.join(matches, matches.c.rowid == literal_column(f"{model.__tablename__}.rowid"))
+        # bm25: lower is better
+        return query, -matches.c.rank
+    pattern = f"%{_escape_like(q)}%"
+    return (
+        query.where(or_(*(getattr(model, name).ilike(pattern, escape="\\") for name in columns))),
+        literal(0),
+    )
+
+
+def _words(q: str) -> List[str]:
+    return re.findall(r"\w+", q)
+
+
+def _fts_words_query(words: Sequence[str]) -> str:
+    """FTS5 query matching rows with all of words (each quoted, so no syntax)."""
+    return " ".join('"' + word + '"' for word in words)
+
+
+def full_text_search(
+    db: AsyncSession,
+    query: Select,
+    model: Any,
+    columns: Sequence[str],
+    q: str,
+    company_id: Optional[UUID] = None,
+) -> Select:
+    """
+    Restrict a query to rows containing every word of q, stemmed.
+
+    Served by the table's full text index (see register_full_text_search):
+    the search_vector column on PostgreSQL, an FTS5 table on SQLite. The
+    SQLite index spans all tenants; passing company_id matches the tenant
+    inside it, so a common word doesn't join every tenant's matches.
+
+    Args:
+        db: Session the query will run in (picks the dialect)
+        query: select() of model, already filtered to company_id
+        model: Mapped class with the index
+        columns: Text columns searched where there is no index
+        q: Words to find
+        company_id: Tenant the query is filtered to
+
+    Returns:
+        The filtered query (matching nothing if q has no words)
+    """
+    words = _words(q)
+    if not words:
+        return query.where(false())
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        vector = literal_column(f"{model.__tablename__}.search_vector")
+        return query.where(vector.op("@@")(func.plainto_tsquery(FULL_TEXT_CONFIG, " ".join(words))))
+    if dialect == "sqlite":
+        match = _fts_words_query(words)
+        if company_id is not None:
+            # Stored (and so indexed) as 32 hex digits
+            match = f'{FULL_TEXT_TENANT_COLUMN}:"{company_id.hex}" AND {match}'
+        matches = _fts_matches(model, match, ranked=False)
+        return query.join(matches, matches.c.rowid == literal_column(f"{model.__tablename__}.rowid"))
+    return query.where(and_(*(
+        or_(*(getattr(model, name).ilike(f"%{_escape_like(word)}%", escape="\\") for name in columns))
+        for word in words
+    )))
+
+
+async def full_text_snippets(
+    db: AsyncSession,
+    model: Any,
+    text_column: str,
+    ids: Sequence[Any],
+    q: str,
+) -> Dict[Any, str]:
+    """
+    Highlighted snippets of q's words for a page of full_text_search results.
+
+    Only the page's rows are read, after the page query, so a search
+    matching many rows doesn't build snippets for all of them (on SQLite
+    the index is probed by rowid rather than joined in full). SQLite
+    takes the snippet from whichever indexed column matches best,
+    PostgreSQL from text_column.
+
+    Args:
+        db: Session to query in
+        model: Mapped class with the index
+        text_column: Column to take PostgreSQL snippets from
+        ids: Primary keys of the rows
+        q: The search words
+
+    Returns:
+        Dict of id to snippet, for the rows that have one
+    """
+    words = _words(q)
+    if not ids or not words:
+        return {}
+    dialect = _dialect(db)
+    if dialect == "postgresql":
+        options = (
+            f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_END}, "
+            f"MaxWords={SNIPPET_WORDS}, MinWords={SNIPPET_WORDS // 2}, MaxFragments=2"
+        )
+        result = await db.execute(
+            select(
+                model.id,
+                func.ts_headline(
+                    FULL_TEXT_CONFIG,
+                    func.coalesce(getattr(model, text_column), ""),
+                    func.plainto_tsquery(FULL_TEXT_CONFIG, " ".join(words)),
+                    options,
+                ),
+            ).where(model.id.in_(ids))
+        )
+    elif dialect == "sqlite":
+        name = fts_table_name(model.__tablename__)
+        fts = table(name, column("rowid"))
+        rowid = literal_column(f"{model.__tablename__}.rowid")
+        page_rowids = select(rowid).select_from(model.__table__).where(model.id.in_(ids)).correlate(None)
+        result = await db.execute(
+            select(
+                model.id,
+                func.snippet(literal_column(name), -1, HIGHLIGHT_START, HIGHLIGHT_END, "…", SNIPPET_WORDS),
+            )
+            .select_from(fts)
+            .join(model, fts.c.rowid == rowid)
+            .where(literal_column(name).op("MATCH")(_fts_words_query(words)), fts.c.rowid.in_(page_rowids))
+        )
+    else:
+        return {}
+    return {row_id: snippet for row_id, snippet in result if snippet}
+
+
+def json_field(db: AsyncSession, model: Any, column: str, field: str) -> ColumnElement:
+    """A text field of a JSON column, as the json_field_index_ddl() indexes write it."""
+    return literal_column(json_field_sql(_dialect(db), f"{model.__tablename__}.{column}", field))
+
+
+def prefix_match(db: AsyncSession, expression: ColumnElement, prefix: str) -> ColumnElement:
+    """
+    lower(expression) starts with prefix, as an index range scan.
+
+    PostgreSQL uses LIKE 'p%' (text_pattern_ops indexes); elsewhere a
+    range on the lower-cased value.
+    """
+    prefix = prefix.strip().lower()
+    lowered = func.lower(expression)
+    if _dialect(db) == "postgresql":
+        return lowered.like(f"{_escape_like(prefix)}%", escape="\\")
+    return and_(lowered >= prefix, lowered < prefix + "\uffff")
+
+
+def autocomplete_filter(db: AsyncSession, model: Any, columns: Sequence[str], prefix: str) -> ColumnElement:
+    """Any of columns starts with prefix (served by the *_prefix indexes)."""
+    return or_(*(prefix_match(db, getattr(model, name), prefix) for name in columns))
+
+
+def tag_filter(db: AsyncSession, company_id: UUID, kind: str, value: str) -> ColumnElement:
+    """
+    The vendor has a tag of kind starting with value ("iso" matches "ISO 9001").
+
+    One index range scan on vendor_tags instead of a text scan of every
+    vendor's JSON list.
+    """
+    value = value.strip().lower()
+    if _dialect(db) == "postgresql":
+        matches = VendorTag.value.like(f"{_escape_like(value)}%", escape="\\")
+    else:
+        matches = and_(VendorTag.value >= value, VendorTag.value < value + "\uffff")
+    # Not correlated with vendors, so the range is scanned once rather
+    # than once per vendor
+    return Vendor.id.in_(
+        select(VendorTag.vendor_id).where(
+            VendorTag.company_id == company_id,
+            VendorTag.kind == kind,
+            matches,
+        )
+    )
+
+
+def tag_values(values: Optional[List[Any]]) -> List[str]:
+    """VendorTag values for one of a vendor's JSON lists (lower-cased, de-duplicated)."""
+    return [value[:200] for value in sorted({str(v).strip().lower() for v in values or [] if str(v).strip()})]
+
+
+def vendor_tag_rows(vendor: Vendor) -> List[Dict[str, Any]]:
+    """VendorTag rows for a vendor's JSON lists."""
+    rows = []
+    for attribute, kind in TAG_ATTRIBUTES.items():
+        for value in tag_values(getattr(vendor, attribute)):
+            rows.append({"vendor_id": vendor.id, "kind": kind, "value": value, "company_id": vendor.company_id})
+    return rows
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_vendor_tags(session: Session, flush_context) -> None:
+    """Rewrite vendor_tags for vendors whose lists this flush created or changed."""
+    created = [obj for obj in session.new if isinstance(obj, Vendor)]
+    changed = [
+        obj for obj in session.dirty
+        if isinstance(obj, Vendor)
+        and any(inspect(obj).attrs[attribute].history.has_changes() for attribute in TAG_ATTRIBUTES)
+    ]
+    if not created and not changed:
+        return
+    connection = session.connection()
+    if changed:
+        connection.execute(delete(VendorTag).where(VendorTag.vendor_id.in_([v.id for v in changed])))
+    rows = [row for vendor in created + changed for row in vendor_tag_rows(vendor)]
+    if rows:
+        connection.execute(insert(VendorTag), rows)
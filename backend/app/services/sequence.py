@@ -0,0 +1,190 @@
+"""Generated document numbers (DEAL-001, QT-2026-001, ...) from a counter table."""
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.sequence_counter import SequenceCounter
+
+logger = logging.getLogger(__name__)
+
+
+def parse_number(value: Optional[str], prefix: str) -> Optional[int]:
+    """
+    Numeric part of a generated number.
+
+    Returns:
+        42 for ("DEAL-042", "DEAL-"), None if value isn't prefix + digits
+    """
+    if not value or not value.startswith(prefix):
+        return None
+    digits = value[len(prefix):]
+    return int(digits) if digits.isdigit() else None
+
+
+async def _existing_max(db: AsyncSession, column: Any, company_id: UUID, prefix: str) -> int:
+    """Highest number already issued with prefix (soft-deleted rows included)."""
+    model = column.class_
+    result = await db.execute(
+        select(column).where(model.company_id == company_id, column.startswith(prefix, autoescape=True))
+    )
+    numbers = [parse_number(value, prefix) for value in result.scalars()]
+    return max((n for n in numbers if n is not None), default=0)
+
+
+async def _increment(db: AsyncSession, company_id: UUID, name: str, step: int) -> Optional[int]:
+    """Add step to a counter (locking its row) and return the new value, or None if absent."""
+    result = await db.execute(
+        update(SequenceCounter)
+        .where(SequenceCounter.company_id == company_id, SequenceCounter.name == name)
+        .values(value=SequenceCounter.value + step)
+        .returning(SequenceCounter.value)
+        .execution_options(synchronize_session=False)
+    )
+    return result.scalar_one_or_none()
+
+
+async def _create_counter(db: AsyncSession, company_id: UUID, name: str, value: int) -> None:
+    """Insert a counter unless a concurrent transaction already has."""
+    dialect = db.get_bind().dialect.name
+    values = {"company_id": company_id, "name": name, "value": value}
+    if dialect == "postgresql":
+        statement = postgresql.insert(SequenceCounter).values(**values).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite.insert(SequenceCounter).values(**values).on_conflict_do_nothing()
+    else:
+        statement = insert(SequenceCounter).values(**values)
+    await db.execute(statement)
+
+
+async def _take(db: AsyncSession, column: Any, company_id: UUID, prefix: str, count: int) -> int:
+    """
+    Take the next count numbers from the counter.
+
+    The counter is seeded from the numbers already issued the first time
+    a company uses a prefix.
+
+    Returns:
+        The last number taken
+    """
+    value = await _increment(db, company_id, prefix, count)
+    if value is None:
+        seed = await _existing_max(db, column, company_id, prefix)
+        await _create_counter(db, company_id, prefix, seed)
+        value = await _increment(db, company_id, prefix, count)
+    return value
+
+
+class SequenceBlockAllocator:
+    """
+    Hands out numbers from blocks leased from the counter table.
+
+    Each lease commits in its own transaction, so the counter row is
+    locked for one statement rather than for the whole creating
+    transaction. Numbers left in a block when the process exits are
+    never issued, and concurrent processes issue interleaved blocks.
+    """
+
+    def __init__(self, block_size: int):
+        """
+        Initialize the allocator.
+
+        Args:
+            block_size: Numbers leased per round trip
+        """
+        self.block_size = block_size
+        # (company_id, prefix) -> [next, last]
+        self._blocks: Dict[Tuple[UUID, str], List[int]] = {}
+        self._locks: Dict[Tuple[UUID, str], asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def allocate(self, db: AsyncSession, column: Any, company_id: UUID, prefix: str) -> int:
+        """Next number for a company and prefix, leasing a new block when needed."""
+        key = (company_id, prefix)
+        async with self._locks[key]:
+            block = self._blocks.get(key)
+            if block is None or block[0] > block[1]:
+                last = await self._lease(db, column, company_id, prefix)
+                block = self._blocks[key] = [last - self.block_size + 1, last]
+            value = block[0]
+            block[0] += 1
+            return value
+
+    def forget(self, company_id: UUID, prefix: str) -> None:
+        """Drop the current block (its numbers may have been taken by hand)."""
+        self._blocks.pop((company_id, prefix), None)
+
+    async def _lease(self, db: AsyncSession, column: Any, company_id: UUID, prefix: str) -> int:
+        async with AsyncSession(bind=db.bind) as lease_db:
+            last = await _take(lease_db, column, company_id, prefix, self.block_size)
+            await lease_db.commit()
+        logger.debug(f"Leased {prefix} numbers up to {last} for company {company_id}")
+        return last
+
+
+_allocator: Optional[SequenceBlockAllocator] = None
+
+
+def get_sequence_allocator() -> Optional[SequenceBlockAllocator]:
+    """
+    Get the process-wide block allocator, creating it on first use.
+
+    Returns:
+        SequenceBlockAllocator, or None when SEQUENCE_BLOCK_SIZE <= 1
+        (numbers are then taken in the creating transaction)
+    """
+    global _allocator
+    if settings.SEQUENCE_BLOCK_SIZE <= 1:
+        return None
+    if _allocator is None:
+        _allocator = SequenceBlockAllocator(settings.SEQUENCE_BLOCK_SIZE)
+    return _allocator
+
+
+async def next_number(db: AsyncSession, column: Any, company_id: UUID, prefix: str) -> int:
+    """
+    Allocate the next number for a company and prefix.
+
+    Constant time whatever the history: one UPDATE ... RETURNING on the
+    company's counter row (or none, from a leased block). The row lock
+    serializes concurrent creates, so two can't get the same number.
+
+    Args:
+        db: Session of the creating transaction
+        column: Model column holding the numbers (seeds a new counter)
+        company_id: Company the number belongs to
+        prefix: Number prefix, also the counter name ("DEAL-", "QT-2026-")
+
+    Returns:
+        The number to format after prefix
+    """
+    allocator = get_sequence_allocator()
+    if allocator is not None:
+        return await allocator.allocate(db, column, company_id, prefix)
+    return await _take(db, column, company_id, prefix, 1)
+
+
+async def reserve_number(db: AsyncSession, company_id: UUID, prefix: str, value: Optional[str]) -> None:
+    """
+    Keep the counter past a number given by hand (e.g. deal_number="DEAL-050").
+
+    No-op unless value is prefix + digits and the counter exists (a new
+    counter is seeded from the stored numbers anyway).
+    """
+    number = parse_number(value, prefix)
+    if number is None:
+        return
+    await db.execute(
+        update(SequenceCounter)
+        .where(SequenceCounter.company_id == company_id, SequenceCounter.name == prefix)
+        .values(value=case((SequenceCounter.value < number, number), else_=SequenceCounter.value))
+        .execution_options(synchronize_session=False)
+    )
+    allocator = get_sequence_allocator()
+    if allocator is not None:
+        allocator.forget(company_id, prefix)
@@ -0,0 +1,84 @@
+"""In-process cache of values loaded from the database, dropped when the rows behind them change."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from app.services import metrics
+
+V = TypeVar("V")
+
+
+class SnapshotCache(Generic[V]):
+    """
+    Loaded values per key (a tenant, a deal), with LRU eviction and a TTL.
+
+    Callers invalidate a key after committing a change to the rows behind
+    it; changes made by other processes show up once an entry expires.
+    """
+
+    def __init__(self, metric_prefix: str, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            metric_prefix: Prefix of the hit, miss and eviction counters
+            max_entries: Keys kept before evicting the least recently used
+            ttl_seconds: How long a loaded value is used
+        """
+        self.metric_prefix = metric_prefix
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        # Bumped on invalidation, so a load that raced a commit isn't stored
+        self._generations: Dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Cached value, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        metrics.increment(f"{self.metric_prefix}.hits" if entry is not None else f"{self.metric_prefix}.misses")
+        return entry[1] if entry is not None else None
+
+    def generation(self, key: Hashable) -> int:
+        """Current generation of a key, to pass to set() after loading."""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: V, generation: int) -> None:
+        """Store a value loaded at generation, unless the key was invalidated since."""
+        with self._lock:
+            if self._generations.get(key, 0) != generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                metrics.increment(f"{self.metric_prefix}.evictions")
+
+    async def get_or_load(self, key: Hashable, load: Callable[[], Awaitable[V]]) -> V:
+        """Cached value, or load() stored for next time."""
+        value = self.get(key)
+        if value is None:
+            generation = self.generation(key)
+            value = await load()
+            self.set(key, value, generation)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a key's value."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
@@ -1,8 +1,15 @@
 """Storage service for MinIO/S3 operations."""
+import asyncio
+import hashlib
 import io
 import logging
+import os
 from datetime import datetime, timedelta
+from typing import BinaryIO, Optional
 from uuid import UUID
+
+import certifi
+import urllib3
 from minio import Minio
 from minio.error import S3Error
 
@@ -10,31 +17,140 @@ from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Smallest part size S3 accepts; also the most an upload holds in memory
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when a streamed upload exceeds its size limit."""
+
+
+class UploadReader:
+    """
+    File-like wrapper that hashes and counts bytes as they are read.
+
+    MinIO pulls the upload through read(), so the SHA-256 and size are known
+    once the object is stored without ever holding the whole file.
+    """
+
+    def __init__(self, stream: BinaryIO, max_size: int):
+        """
+        Initialize UploadReader.
+
+        Args:
+            stream: Source file object (e.g. UploadFile.file)
+            max_size: Largest allowed upload in bytes
+        """
+        self.stream = stream
+        self.max_size = max_size
+        self.size = 0
+        self._hasher = hashlib.sha256()
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Read the next chunk, updating the hash and size.
+
+        Raises:
+            UploadTooLargeError: If more than max_size bytes have been read
+        """
+        chunk = self.stream.read(size)
+        self.size += len(chunk)
+        if self.size > self.max_size:
+            raise UploadTooLargeError(
+                f"File too large (max {self.max_size / 1024 / 1024:.0f}MB)"
+            )
+        self._hasher.update(chunk)
+        return chunk
+
+    def hexdigest(self) -> str:
+        """SHA-256 of the bytes read so far."""
+        return self._hasher.hexdigest()
+
 
 class StorageService:
     """Manages file uploads and downloads to MinIO."""
 
+    # Set once the bucket has been checked (see verify_storage)
+    bucket_verified = False
+    http_client: Optional[urllib3.PoolManager] = None
+
     def __init__(self):
-        """Initialize MinIO client."""
+        """
+        Initialize MinIO client.
+
+        Makes no requests; call ensure_bucket_exists once before relying on
+        the bucket. Use get_storage_service() instead of constructing this
+        per request, so the connection pool is shared.
+        """
+        self.http_client = urllib3.PoolManager(
+            timeout=urllib3.Timeout(
+                connect=settings.MINIO_CONNECT_TIMEOUT_SECONDS,
+                read=settings.MINIO_READ_TIMEOUT_SECONDS,
+            ),
+            # One connection per thread that can be in a MinIO call at once
+            maxsize=settings.MINIO_MAX_CONNECTIONS,
+            cert_reqs="CERT_REQUIRED",
+            ca_certs=os.environ.get("SSL_CERT_FILE") or certifi.where(),
+            retries=urllib3.Retry(total=3, backoff_factor=0.2, status_forcelist=[500, 502, 503, 504]),
+        )
         self.client = Minio(
             endpoint=settings.MINIO_ENDPOINT,
             access_key=settings.MINIO_ACCESS_KEY,
             secret_key=settings.MINIO_SECRET_KEY,
             secure=settings.MINIO_SECURE,
+            # A known region saves a bucket-location lookup on presigning
+            region=settings.MINIO_REGION or None,
+            http_client=self.http_client,
         )
         self.bucket_name = settings.MINIO_BUCKET
-        self._ensure_bucket_exists()
 
-    def _ensure_bucket_exists(self) -> None:
-        """Create bucket if it doesn't exist."""
+    def ensure_bucket_exists(self) -> None:
+        """
+        Create bucket if it doesn't exist.
+
+        Raises:
+            S3Error: If the bucket can't be checked or created
+        """
         try:
             if not self.client.bucket_exists(self.bucket_name):
                 self.client.make_bucket(self.bucket_name)
                 logger.info(f"Created MinIO bucket: {self.bucket_name}")
+            self.bucket_verified = True
         except S3Error as e:
             logger.error(f"Failed to ensure bucket exists: {e}")
             raise
 
+    def close(self) -> None:
+        """Close the pooled connections."""
+        if self.http_client is not None:
+            self.http_client.clear()
+
+    # Async wrappers: MinIO calls block, so run them in a thread
+
+    async def upload_file_async(self, **kwargs) -> str:
+        """upload_file without blocking the event loop."""
+        return await asyncio.to_thread(self.upload_file, **kwargs)
+
+    async def upload_stream_async(self, stream: BinaryIO, **kwargs) -> str:
+        """upload_stream without blocking the event loop."""
+        return await asyncio.to_thread(self.upload_stream, stream, **kwargs)
+
+    async def upload_object_async(self, stream: BinaryIO, storage_key: str, **kwargs) -> str:
+        """upload_object without blocking the event loop."""
+        return await asyncio.to_thread(self.upload_object, stream, storage_key, **kwargs)
+
+    async def download_file_async(self, storage_key: str) -> bytes:
+        """download_file without blocking the event loop."""
+        return await asyncio.to_thread(self.download_file, storage_key)
+
+    async def get_presigned_url_async(self, storage_key: str, expiry_minutes: int = 60) -> str:
+        """get_presigned_url without blocking the event loop."""
+        return await asyncio.to_thread(self.get_presigned_url, storage_key, expiry_minutes)
+
+    async def delete_file_async(self, storage_key: str) -> None:
+        """delete_file without blocking the event loop."""
+        await asyncio.to_thread(self.delete_file, storage_key)
+
     def upload_file(
         self,
         file_content: bytes,
@@ -58,12 +174,7 @@ class StorageService:
             S3Error: If upload fails
         """
         try:
-            # Generate unique storage key: company_id/YYYY-MM/uuid_filename
-            now = datetime.utcnow()
-            date_prefix = now.strftime("%Y-%m")
-            import uuid
-            unique_id = uuid.uuid4().hex[:8]
-            storage_key = f"{company_id}/{date_prefix}/{unique_id}_{filename}"
+            storage_key = self._make_storage_key(filename, company_id)
 
             # Upload to MinIO
             file_size = len(file_content)
@@ -82,6 +193,97 @@ class StorageService:
             logger.error(f"Failed to upload file: {e}")
             raise
 
+    def upload_stream(
+        self,
+        stream: BinaryIO,
+        filename: str,
+        company_id: UUID,
+        content_type: str = "application/octet-stream",
+        part_size: int = MIN_PART_SIZE,
+    ) -> str:
+        """
+        Upload a file object of unknown length as a multipart upload.
+
+        MinIO reads one part at a time, so memory stays at part_size
+        whatever the size of the file.
+
+        Args:
+            stream: File object to read from (e.g. an UploadReader)
+            filename: Original filename (used for uniqueness)
+            company_id: Company ID for path scoping
+            content_type: MIME type of file
+            part_size: Bytes per multipart part (at least 5MB)
+
+        Returns:
+            storage_key: Path to file in MinIO (used for later retrieval)
+
+        Raises:
+            S3Error: If upload fails
+        """
+        storage_key = self._make_storage_key(filename, company_id)
+        try:
+            result = self.client.put_object(
+                bucket_name=self.bucket_name,
+                object_name=storage_key,
+                data=stream,
+                length=-1,
+                part_size=max(part_size, MIN_PART_SIZE),
+                content_type=content_type,
+            )
+            logger.info(f"Streamed file to MinIO: {storage_key} (etag {getattr(result, 'etag', None)})")
+            return storage_key
+
+        except S3Error as e:
+            logger.error(f"Failed to upload file: {e}")
+            raise
+
+    def upload_object(
+        self,
+        stream: BinaryIO,
+        storage_key: str,
+        content_type: str = "application/octet-stream",
+        part_size: int = MIN_PART_SIZE,
+    ) -> str:
+        """
+        Upload a file object under a key chosen by the caller (e.g. archives).
+
+        Overwrites any object already stored under storage_key.
+
+        Args:
+            stream: File object to read from
+            storage_key: Path to store the object at
+            content_type: MIME type of the object
+            part_size: Bytes per multipart part (at least 5MB)
+
+        Returns:
+            storage_key
+
+        Raises:
+            S3Error: If upload fails
+        """
+        try:
+            self.client.put_object(
+                bucket_name=self.bucket_name,
+                object_name=storage_key,
+                data=stream,
+                length=-1,
+                part_size=max(part_size, MIN_PART_SIZE),
+                content_type=content_type,
+            )
+            logger.info(f"Uploaded object to MinIO: {storage_key}")
+            return storage_key
+
+        except S3Error as e:
+            logger.error(f"Failed to upload object: {e}")
+            raise
+
+    @staticmethod
+    def _make_storage_key(filename: str, company_id: UUID) -> str:
+        """Unique storage key: company_id/YYYY-MM/uuid_filename."""
+        import uuid
+        date_prefix = datetime.utcnow().strftime("%Y-%m")
+        return f"{company_id}/{date_prefix}/{uuid.uuid4().hex[:8]}_{filename}"
+
     def download_file(self, storage_key: str) -> bytes:
         """
         Download file from MinIO.
@@ -161,3 +363,43 @@ class StorageService:
         except S3Error as e:
             logger.error(f"Failed to delete file: {e}")
             raise
+
+
+_storage_service: Optional[StorageService] = None
+
+
+def get_storage_service() -> StorageService:
+    """
+    Get the process-wide storage service, creating it on first use.
+
+    Returns:
+        StorageService sharing one MinIO connection pool across requests
+    """
+    global _storage_service
+    if _storage_service is None:
+        _storage_service = StorageService()
+    return _storage_service
+
+
+async def verify_storage() -> bool:
+    """
+    Check (or create) the bucket once, at startup.
+
+    Returns:
+        True if the bucket is available; failures are logged, not raised,
+        so the API can start while MinIO is down
+    """
+    storage = get_storage_service()
+    try:
+        await asyncio.to_thread(storage.ensure_bucket_exists)
+    except Exception as e:
+        logger.error(f"MinIO bucket check failed: {e}")
+    return storage.bucket_verified
+
+
+def close_storage_service() -> None:
+    """Close the process-wide storage service's connection pool."""
+    global _storage_service
+    if _storage_service is not None:
+        _storage_service.close()
+        _storage_service = None
@@ -1,13 +1,32 @@
 """Service for vendor management."""
-from typing import Optional, Union
+from typing import List, Optional, Union
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
 from sqlalchemy.orm import selectinload
 
+from app.models.deal import Deal
 from app.models.vendor import Vendor
 from app.models.vendor_proposal import VendorProposal
-from app.schemas.vendor import VendorCreate, VendorUpdate, VendorResponse, VendorListResponse
+from app.models.vendor_tag import CATEGORY, CERTIFICATION
+from app.schemas.vendor import (
+    VendorCreate,
+    VendorUpdate,
+    VendorResponse,
+    VendorListResponse,
+    VendorSuggestion,
+    VendorRecommendationResponse,
+)
+from app.services.counts import TotalMode, count_total
+from app.services.pagination import Cursor, next_cursor, paginate
+from app.services.search import autocomplete_filter, tag_filter, text_search
+from app.services.sequence import next_number, reserve_number
+from app.services.vendor_recommendation import get_vendor_features, score_vendors
+
+VENDOR_CODE_PREFIX = "VEND-"
+
+# Columns of the vendors text search index (see app.models.vendor)
+VENDOR_SEARCH_COLUMNS = ("company_name", "vendor_code")
 
 
 class VendorService:
@@ -30,26 +49,8 @@ class VendorService:
         Returns:
             Generated vendor code
         """
-        # Get all existing vendor codes for this company
-        query = select(Vendor.vendor_code).where(
-            Vendor.company_id == self.company_id
-        ).order_by(Vendor.vendor_code.desc())
-        result = await self.db.execute(query)
-        vendor_codes = result.scalars().all()
-
-        # Extract numeric parts and find maximum
-        max_num = 0
-        for code in vendor_codes:
-            if code and code.startswith("VEND-"):
-                try:
-                    num = int(code.split("-")[1])
-                    max_num = max(max_num, num)
-                except (ValueError, IndexError):
-                    pass
-
-        # Generate next code
-        next_num = max_num + 1
-        return f"VEND-{next_num:03d}"
+        number = await next_number(self.db, Vendor.vendor_code, self.company_id, VENDOR_CODE_PREFIX)
+        return f"{VENDOR_CODE_PREFIX}{number:03d}"
 
     async def create_vendor(self, data: VendorCreate) -> VendorResponse:
         """Create a new vendor."""
@@ -57,6 +58,8 @@ class VendorService:
         vendor_code = data.vendor_code
         if not vendor_code:
             vendor_code = await self._generate_vendor_code()
+        else:
+            await reserve_number(self.db, self.company_id, VENDOR_CODE_PREFIX, vendor_code)
 
         # Check if vendor_code already exists in this company
         existing = await self.db.execute(
@@ -162,29 +165,46 @@ class VendorService:
         vendor.deleted_at = func.now()
         await self.db.flush()
 
-    async def list_vendors(self, skip: int = 0, limit: int = 100) -> VendorListResponse:
-        """List all active vendors for company."""
-        # Get total count
-        count_result = await self.db.execute(
-            select(func.count(Vendor.id)).where(
-                and_(
-                    Vendor.company_id == self.company_id,
-                    Vendor.deleted_at.is_(None)
-                )
+    async def list_vendors(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[Cursor] = None,
+        include_total: TotalMode = TotalMode.EXACT,
+    ) -> VendorListResponse:
+        """List all active vendors for company (newest first, after cursor if given)."""
+        query = select(Vendor).where(
+            and_(
+                Vendor.company_id == self.company_id,
+                Vendor.deleted_at.is_(None)
             )
         )
-        total = count_result.scalar() or 0
+        total = await count_total(self.db, query, include_total, Vendor, self.company_id, {})
 
         # Get paginated items
-        result = await self.db.execute(
-            select(Vendor)
-            .where(
-                and_(
-                    Vendor.company_id == self.company_id,
-                    Vendor.deleted_at.is_(None)
-                )
+        result = await self.db.execute(paginate(query, Vendor, skip, limit, cursor))
+        vendors = result.scalars().all()
+
+        return VendorListResponse(
+            total=total,
+            items=[VendorResponse.from_orm(v) for v in vendors],
+            next_cursor=next_cursor(vendors, limit),
+        )
+
+    async def search_vendors(self, query: str, skip: int = 0, limit: int = 100) -> VendorListResponse:
+        """Search vendors by name or code, best matches first."""
+        base = select(Vendor).where(
+            and_(
+                Vendor.company_id == self.company_id,
+                Vendor.deleted_at.is_(None),
             )
-            .order_by(Vendor.created_at.desc())
+        )
+        base, rank = text_search(self.db, base, Vendor, VENDOR_SEARCH_COLUMNS, query)
+        total = await count_total(self.db, base, TotalMode.EXACT, Vendor, self.company_id)
+
+        result = await self.db.execute(
+            base
+            .order_by(rank.desc(), Vendor.created_at.desc(), Vendor.id.desc())
             .offset(skip)
             .limit(limit)
         )
@@ -195,44 +215,36 @@ class VendorService:
             items=[VendorResponse.from_orm(v) for v in vendors]
         )
 
-    async def search_vendors(self, query: str, skip: int = 0, limit: int = 100) -> VendorListResponse:
-        """Search vendors by name or code."""
-        count_result = await self.db.execute(
-            select(func.count(Vendor.id)).where(
-                and_(
-                    Vendor.company_id == self.company_id,
-                    Vendor.deleted_at.is_(None),
-                    (
-                        (Vendor.company_name.ilike(f"%{query}%")) |
-                        (Vendor.vendor_code.ilike(f"%{query}%"))
-                    )
-                )
-            )
-        )
-        total = count_result.scalar() or 0
+    async def autocomplete_vendors(self, prefix: str, limit: int = 10) -> List[VendorSuggestion]:
+        """
+        Active vendors whose name or code starts with prefix.
+
+        Args:
+            prefix: What the user has typed so far
+            limit: Max suggestions to return
 
+        Returns:
+            Suggestions ordered by name
+        """
+        if not prefix.strip():
+            return []
         result = await self.db.execute(
-            select(Vendor)
+            select(Vendor.id, Vendor.vendor_code, Vendor.company_name)
             .where(
                 and_(
                     Vendor.company_id == self.company_id,
                     Vendor.deleted_at.is_(None),
-                    (
-                        (Vendor.company_name.ilike(f"%{query}%")) |
-                        (Vendor.vendor_code.ilike(f"%{query}%"))
-                    )
+                    Vendor.is_active == True,
+                    autocomplete_filter(self.db, Vendor, VENDOR_SEARCH_COLUMNS, prefix),
                 )
             )
-            .order_by(Vendor.created_at.desc())
-            .offset(skip)
+            .order_by(func.lower(Vendor.company_name), Vendor.id)
             .limit(limit)
         )
-        vendors = result.scalars().all()
-
-        return VendorListResponse(
-            total=total,
-            items=[VendorResponse.from_orm(v) for v in vendors]
-        )
+        return [
+            VendorSuggestion(id=row.id, vendor_code=row.vendor_code, company_name=row.company_name)
+            for row in result
+        ]
 
     async def search_vendors_advanced(
         self,
@@ -253,8 +265,8 @@ class VendorService:
             min_credibility: Minimum credibility score (0-100)
             max_credibility: Maximum credibility score (0-100)
             country: Filter by country
-            category: Filter by product category (searches in list)
-            certification: Filter by certification (searches in list)
+            category: Filter by product category (an entry starting with it)
+            certification: Filter by certification (an entry starting with it)
             skip: Pagination offset
             limit: Pagination limit
         """
@@ -264,13 +276,6 @@ class VendorService:
             Vendor.is_active == True,
         ]
 
-        # Keyword search
-        if query:
-            filters.append(
-                (Vendor.company_name.ilike(f"%{query}%")) |
-                (Vendor.vendor_code.ilike(f"%{query}%"))
-            )
-
         # Credibility score range
         if min_credibility is not None:
             filters.append(Vendor.credibility_score >= min_credibility)
@@ -281,28 +286,23 @@ class VendorService:
         if country:
             filters.append(Vendor.country.ilike(f"%{country}%"))
 
-        # Product category filter (searches JSON array)
+        # Product category and certification filters (vendor_tags lookups)
         if category:
-            filters.append(
-                Vendor.product_categories.astext.ilike(f"%{category}%")
-            )
-
-        # Certification filter (searches JSON array)
+            filters.append(tag_filter(self.db, self.company_id, CATEGORY, category))
         if certification:
-            filters.append(
-                Vendor.certifications.astext.ilike(f"%{certification}%")
-            )
+            filters.append(tag_filter(self.db, self.company_id, CERTIFICATION, certification))
 
-        # Count total matching
-        count_result = await self.db.execute(
-            select(func.count(Vendor.id)).where(and_(*filters))
-        )
-        total = count_result.scalar() or 0
+        base = select(Vendor).where(and_(*filters))
+
+        # Keyword search
+        if query:
+            base, _ = text_search(self.db, base, Vendor, VENDOR_SEARCH_COLUMNS, query)
+
+        total = await count_total(self.db, base, TotalMode.EXACT, Vendor, self.company_id)
 
         # Get paginated results sorted by credibility (best first)
         result = await self.db.execute(
-            select(Vendor)
-            .where(and_(*filters))
+            base
             .order_by(Vendor.credibility_score.desc(), Vendor.created_at.desc())
             .offset(skip)
             .limit(limit)
@@ -328,3 +328,42 @@ class VendorService:
             .order_by(VendorProposal.created_at.desc())
         )
         return result.scalars().all()
+
+    async def recommend_vendors(self, deal_id: UUID, limit: int = 20) -> VendorRecommendationResponse:
+        """
+        Rank the company's active vendors for a deal's line items.
+
+        Scores category and certification match against the line items,
+        credibility, on-time delivery, lead time, proposal win rate and
+        price competitiveness (see app.services.vendor_recommendation).
+
+        Args:
+            deal_id: Deal to recommend vendors for
+            limit: Vendors to return
+
+        Returns:
+            VendorRecommendationResponse, best vendors first
+
+        Raises:
+            ValueError: If the deal is not found
+        """
+        deal = (await self.db.execute(
+            select(Deal.line_items).where(
+                and_(
+                    Deal.id == deal_id,
+                    Deal.company_id == self.company_id,
+                    Deal.deleted_at.is_(None)
+                )
+            )
+        )).first()
+        if deal is None:
+            raise ValueError("Deal not found")
+
+        features = await get_vendor_features(self.db, self.company_id)
+        required_certifications, items = score_vendors(features, deal.line_items, limit)
+        return VendorRecommendationResponse(
+            deal_id=deal_id,
+            vendors_scored=len(features),
+            required_certifications=required_certifications,
+            items=items,
+        )
@@ -0,0 +1,418 @@
+"""Vendor performance metrics, kept up to date from proposal decisions and deliveries."""
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.deal import Deal, DealStatus
+from app.models.vendor import Vendor
+from app.models.vendor_metrics import VendorMetrics
+from app.models.vendor_proposal import VendorProposal, VendorProposalStatus
+from app.services.vendor_recommendation import get_vendor_feature_cache
+
+logger = logging.getLogger(__name__)
+
+DECIDED = (VendorProposalStatus.SELECTED, VendorProposalStatus.REJECTED)
+
+# Weights of on-time delivery and proposal quality in credibility_score.
+# The weighted average is pulled towards CREDIBILITY_PRIOR as if from
+# CREDIBILITY_PRIOR_WEIGHT extra samples, so one late delivery doesn't
+# sink a vendor
+CREDIBILITY_WEIGHTS = {"on_time": 0.6, "quality": 0.4}
+CREDIBILITY_PRIOR = 50
+CREDIBILITY_PRIOR_WEIGHT = 3
+
+
+def _aware(value: datetime) -> datetime:
+    """value as UTC-aware (SQLite returns naive datetimes)."""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _days(start: datetime, end: datetime) -> float:
+    return (_aware(end) - _aware(start)).total_seconds() / 86400
+
+
+def proposal_quality(proposal: Any) -> Optional[float]:
+    """A decided proposal's quality sample: 1 if its specs matched, 0 if not, None if unassessed."""
+    if proposal.specs_match is None:
+        return None
+    return 1.0 if proposal.specs_match else 0.0
+
+
+def due_date(line_items: Any, decided_at: Optional[datetime], lead_time_days: Optional[int]) -> Optional[date]:
+    """
+    When a deal's delivery was due.
+
+    The earliest required_delivery_date of its line items, else the
+    selection date plus the proposal's lead time, else None.
+    """
+    dates = []
+    for item in line_items or []:
+        value = item.get("required_delivery_date") if isinstance(item, dict) else None
+        try:
+            dates.append(date.fromisoformat(str(value)[:10]))
+        except ValueError:
+            continue
+    if dates:
+        return min(dates)
+    if decided_at is not None and lead_time_days is not None:
+        return (_aware(decided_at) + timedelta(days=lead_time_days)).date()
+    return None
+
+
+def derived_fields(metrics: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Vendor performance fields from a vendor_metrics row.
+
+    Only fields the vendor has a record for are returned; the others keep
+    their typed-in values.
+
+    Args:
+        metrics: VendorMetrics column values
+
+    Returns:
+        Subset of on_time_delivery_rate, quality_score, avg_lead_time_days and credibility_score
+    """
+    fields: Dict[str, Any] = {}
+    parts = []
+    if metrics["deliveries"]:
+        fields["on_time_delivery_rate"] = round(metrics["on_time_ewma"], 4)
+        parts.append((CREDIBILITY_WEIGHTS["on_time"], metrics["on_time_ewma"], metrics["deliveries"]))
+    if metrics["quality_samples"]:
+        fields["quality_score"] = round(100 * metrics["quality_ewma"])
+        parts.append((CREDIBILITY_WEIGHTS["quality"], metrics["quality_ewma"], metrics["quality_samples"]))
+    if metrics["lead_time_samples"]:
+        fields["avg_lead_time_days"] = round(metrics["lead_time_ewma"])
+    if parts:
+        score = 100 * sum(weight * value for weight, value, _ in parts) / sum(weight for weight, _, _ in parts)
+        samples = sum(count for _, _, count in parts)
+        fields["credibility_score"] = round(
+            (samples * score + CREDIBILITY_PRIOR_WEIGHT * CREDIBILITY_PRIOR) / (samples + CREDIBILITY_PRIOR_WEIGHT)
+        )
+    return fields
+
+
+def _sample(samples: Any, ewma: Any, value: float) -> Dict[str, Any]:
+    """UPDATE values adding one sample to a running EWMA (the first sample sets it)."""
+    alpha = settings.VENDOR_METRICS_EWMA_ALPHA
+    return {
+        samples.key: samples + 1,
+        ewma.key: case((samples == 0, value), else_=ewma + alpha * (value - ewma)),
+    }
+
+
+async def _create_metrics(db: AsyncSession, vendor_id: UUID, company_id: UUID) -> None:
+    """Insert a vendor's metrics row unless it (or a concurrent insert) exists."""
+    dialect = db.get_bind().dialect.name
+    values = {"vendor_id": vendor_id, "company_id": company_id}
+    if dialect == "postgresql":
+        statement = postgresql.insert(VendorMetrics).values(**values).on_conflict_do_nothing()
+    elif dialect == "sqlite":
+        statement = sqlite.insert(VendorMetrics).values(**values).on_conflict_do_nothing()
+    else:
+        statement = insert(VendorMetrics).values(**values)
+    await db.execute(statement)
+
+
+async def _update_metrics(db: AsyncSession, vendor_id: UUID, values: Dict[str, Any]) -> Optional[Mapping[str, Any]]:
+    """Apply values to a vendor's metrics row and return the new row, or None if absent."""
+    result = await db.execute(
+        update(VendorMetrics)
+        .where(VendorMetrics.vendor_id == vendor_id)
+        .values(**values)
+        .returning(*VendorMetrics.__table__.columns)
+        .execution_options(synchronize_session=False)
+    )
+    return result.mappings().one_or_none()
+
+
+async def _apply(db: AsyncSession, vendor: Optional[Vendor], vendor_id: UUID, company_id: UUID, values: Dict[str, Any]) -> None:
+    """
+    Update a vendor's metrics in one statement and refresh its performance fields.
+
+    The new aggregates are computed in the UPDATE (the row stays locked
+    until commit), so concurrent events for a vendor don't lose updates.
+    The row is created on the vendor's first event.
+    """
+    metrics = await _update_metrics(db, vendor_id, values)
+    if metrics is None:
+        await _create_metrics(db, vendor_id, company_id)
+        metrics = await _update_metrics(db, vendor_id, values)
+    if vendor is not None:
+        for field, value in derived_fields(metrics).items():
+            setattr(vendor, field, value)
+
+
+async def _vendors(db: AsyncSession, vendor_ids: Sequence[UUID]) -> Dict[UUID, Vendor]:
+    """Vendors by id, loaded in one query."""
+    if not vendor_ids:
+        return {}
+    result = await db.execute(select(Vendor).where(Vendor.id.in_(set(vendor_ids))))
+    return {vendor.id: vendor for vendor in result.scalars()}
+
+
+async def record_proposal_decisions(
+    db: AsyncSession,
+    changes: Sequence[Tuple[VendorProposal, Any, Any]],
+) -> None:
+    """
+    Count proposals moving into or out of selected/rejected.
+
+    A proposal's quality is sampled the first time it is decided, and
+    decided_at is set on every decision (lead time counts from it).
+
+    Args:
+        db: Session the proposals are in
+        changes: (proposal, old status, new status) of proposals whose status changed
+    """
+    now = datetime.now(timezone.utc)
+    updates = []
+    for proposal, old_status, new_status in changes:
+        old_status, new_status = VendorProposalStatus(old_status), VendorProposalStatus(new_status)
+        values: Dict[str, Any] = {}
+        decided = int(new_status in DECIDED) - int(old_status in DECIDED)
+        won = int(new_status == VendorProposalStatus.SELECTED) - int(old_status == VendorProposalStatus.SELECTED)
+        if decided:
+            values["proposals_decided"] = VendorMetrics.proposals_decided + decided
+        if won:
+            values["proposals_won"] = VendorMetrics.proposals_won + won
+        if new_status in DECIDED:
+            quality = proposal_quality(proposal) if proposal.decided_at is None else None
+            if quality is not None:
+                values.update(_sample(VendorMetrics.quality_samples, VendorMetrics.quality_ewma, quality))
+            proposal.decided_at = now
+        if values:
+            updates.append((proposal, values))
+
+    vendors = await _vendors(db, [proposal.vendor_id for proposal, _ in updates])
+    for proposal, values in updates:
+        await _apply(db, vendors.get(proposal.vendor_id), proposal.vendor_id, proposal.company_id, values)
+
+
+async def record_deal_progress(db: AsyncSession, deal: Deal, status: DealStatus) -> None:
+    """
+    Sample the selected vendor's lead time when a deal ships, and punctuality when it's delivered.
+
+    Args:
+        db: Session the deal is in
+        deal: Deal that moved to status
+        status: New deal status (other than SHIPPED/DELIVERED is ignored)
+    """
+    if status not in (DealStatus.SHIPPED, DealStatus.DELIVERED):
+        return
+    proposal = (await db.execute(
+        select(VendorProposal).where(
+            VendorProposal.deal_id == deal.id,
+            VendorProposal.company_id == deal.company_id,
+            VendorProposal.status == VendorProposalStatus.SELECTED,
+            VendorProposal.deleted_at.is_(None),
+        )
+    )).scalars().first()
+    if proposal is None:
+        return
+
+    now = datetime.now(timezone.utc)
+    values: Dict[str, Any] = {}
+    if status == DealStatus.SHIPPED and proposal.shipped_at is None:
+        proposal.shipped_at = now
+        if proposal.decided_at is not None:
+            lead_time = _days(proposal.decided_at, now)
+            values.update(_sample(VendorMetrics.lead_time_samples, VendorMetrics.lead_time_ewma, lead_time))
+    elif status == DealStatus.DELIVERED and proposal.delivered_at is None:
+        proposal.delivered_at = now
+        due = due_date(deal.line_items, proposal.decided_at, proposal.lead_time_days)
+        if due is not None:
+            on_time = 1.0 if now.date() <= due else 0.0
+            values.update(_sample(VendorMetrics.deliveries, VendorMetrics.on_time_ewma, on_time))
+    if values:
+        vendor = await db.get(Vendor, proposal.vendor_id)
+        await _apply(db, vendor, proposal.vendor_id, proposal.company_id, values)
+
+
+def grouped_ewma(
+    groups: np.ndarray, order: np.ndarray, values: np.ndarray, group_count: int, alpha: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-group EWMA of values taken in order, as record_*() builds it one sample at a time.
+
+    The first sample sets the average and each later one moves it alpha
+    of the way, so sample i of n ends up weighted alpha * (1 - alpha)^(n - i)
+    (the first (1 - alpha)^(n - 1)): one weighted bincount.
+
+    Args:
+        groups: Group of each sample (0..group_count - 1)
+        order: Sort key of each sample within its group (time)
+        values: Sample values
+        group_count: Number of groups
+        alpha: Weight of the newest sample
+
+    Returns:
+        (samples per group, EWMA per group, NaN where a group has none)
+    """
+    counts = np.bincount(groups, minlength=group_count)
+    if not groups.size:
+        return counts, np.full(group_count, np.nan)
+    sorted_ = np.lexsort((order, groups))
+    groups, values = groups[sorted_], values[sorted_]
+    starts = np.cumsum(counts) - counts
+    position = np.arange(groups.size) - starts[groups]
+    from_end = counts[groups] - 1 - position
+    weights = np.where(position == 0, (1 - alpha) ** from_end, alpha * (1 - alpha) ** from_end)
+    ewma = np.bincount(groups, weights=weights * values, minlength=group_count)
+    return counts, np.where(counts > 0, ewma, np.nan)
+
+
+def _timestamps(values: Sequence[Optional[datetime]]) -> np.ndarray:
+    return np.fromiter((_aware(v).timestamp() if v else 0.0 for v in values), dtype=np.float64, count=len(values))
+
+
+async def recompute_company_metrics(db: AsyncSession, company_id: UUID) -> int:
+    """
+    Rebuild a company's vendor_metrics and vendor performance fields from proposal history.
+
+    Replays what record_proposal_decisions() and record_deal_progress()
+    would have counted, as array operations over all the company's
+    proposals rather than one update per event. Vendors with no record
+    keep their typed-in fields.
+
+    Args:
+        db: Session to work in (flushed, not committed)
+        company_id: Company to rebuild
+
+    Returns:
+        Number of vendors whose fields were updated
+    """
+    alpha = settings.VENDOR_METRICS_EWMA_ALPHA
+    vendor_ids = (await db.execute(
+        select(Vendor.id).where(Vendor.company_id == company_id, Vendor.deleted_at.is_(None))
+    )).scalars().all()
+    index = {vendor_id: i for i, vendor_id in enumerate(vendor_ids)}
+    n = len(vendor_ids)
+
+    live = (VendorProposal.company_id == company_id, VendorProposal.deleted_at.is_(None))
+    proposals = [
+        row for row in (await db.execute(
+            select(
+                VendorProposal.vendor_id, VendorProposal.status, VendorProposal.specs_match,
+                VendorProposal.decided_at, VendorProposal.shipped_at,
+            ).where(*live)
+        )).all()
+        if row.vendor_id in index
+    ]
+    groups = np.fromiter((index[p.vendor_id] for p in proposals), dtype=np.int64, count=len(proposals))
+    status = np.array([VendorProposalStatus(p.status).value for p in proposals], dtype=object)
+    decided_at = _timestamps([p.decided_at for p in proposals])
+    decided = np.isin(status, [s.value for s in DECIDED])
+    won = status == VendorProposalStatus.SELECTED.value
+    proposals_decided = np.bincount(groups[decided], minlength=n)
+    proposals_won = np.bincount(groups[won], minlength=n)
+
+    quality = np.array([np.nan if p.specs_match is None else float(p.specs_match) for p in proposals])
+    sampled = decided & ~np.isnan(quality)
+    quality_samples, quality_ewma = grouped_ewma(
+        groups[sampled], decided_at[sampled], quality[sampled], n, alpha
+    )
+
+    shipped = [i for i, p in enumerate(proposals) if p.shipped_at and p.decided_at]
+    lead_time_samples, lead_time_ewma = grouped_ewma(
+        groups[shipped],
+        _timestamps([proposals[i].shipped_at for i in shipped]),
+        np.array([_days(proposals[i].decided_at, proposals[i].shipped_at) for i in shipped]),
+        n, alpha,
+    )
+
+    # Deals' line items only for the (few) delivered proposals
+    delivered = [
+        row for row in (await db.execute(
+            select(
+                VendorProposal.vendor_id, VendorProposal.lead_time_days, VendorProposal.decided_at,
+                VendorProposal.delivered_at, Deal.line_items,
+            )
+            .join(Deal, Deal.id == VendorProposal.deal_id)
+            .where(*live, VendorProposal.delivered_at.is_not(None))
+        )).all()
+        if row.vendor_id in index
+    ]
+    timed, on_time = [], []
+    for p in delivered:
+        due = due_date(p.line_items, p.decided_at, p.lead_time_days)
+        if due is not None:
+            timed.append(p)
+            on_time.append(1.0 if _aware(p.delivered_at).date() <= due else 0.0)
+    deliveries, on_time_ewma = grouped_ewma(
+        np.fromiter((index[p.vendor_id] for p in timed), dtype=np.int64, count=len(timed)),
+        _timestamps([p.delivered_at for p in timed]), np.array(on_time), n, alpha,
+    )
+
+    def optional(values: np.ndarray, row: int) -> Optional[float]:
+        return None if np.isnan(values[row]) else float(values[row])
+
+    metrics_rows: List[Dict[str, Any]] = []
+    for row in np.flatnonzero(proposals_decided + quality_samples + lead_time_samples + deliveries):
+        metrics_rows.append({
+            "vendor_id": vendor_ids[row],
+            "company_id": company_id,
+            "proposals_decided": int(proposals_decided[row]),
+            "proposals_won": int(proposals_won[row]),
+            "quality_samples": int(quality_samples[row]),
+            "quality_ewma": optional(quality_ewma, row),
+            "lead_time_samples": int(lead_time_samples[row]),
+            "lead_time_ewma": optional(lead_time_ewma, row),
+            "deliveries": int(deliveries[row]),
+            "on_time_ewma": optional(on_time_ewma, row),
+        })
+
+    await db.execute(delete(VendorMetrics).where(VendorMetrics.company_id == company_id))
+    if metrics_rows:
+        await db.execute(insert(VendorMetrics), metrics_rows)
+
+    # Bulk UPDATE by primary key, one executemany per set of fields
+    updates: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+    for metrics in metrics_rows:
+        fields = derived_fields(metrics)
+        if fields:
+            updates.setdefault(tuple(sorted(fields)), []).append({"id": metrics["vendor_id"], **fields})
+    for rows in updates.values():
+        await db.execute(update(Vendor), rows)
+    await db.flush()
+    return sum(len(rows) for rows in updates.values())
+
+
+async def recompute_vendor_metrics(session_factory: async_sessionmaker, company_id: Optional[UUID] = None) -> int:
+    """
+    Rebuild vendor metrics from history, one company (and commit) at a time.
+
+    Corrects drift from events the incremental updates missed (proposals
+    edited or deleted afterwards, rows written outside the services).
+
+    Args:
+        session_factory: Factory for the sessions companies are rebuilt in
+        company_id: Company to rebuild (all companies with vendors if omitted)
+
+    Returns:
+        Number of vendors whose fields were updated
+    """
+    if company_id is not None:
+        company_ids = [company_id]
+    else:
+        async with session_factory() as db:
+            company_ids = (await db.execute(select(Vendor.company_id).distinct())).scalars().all()
+
+    updated = 0
+    for company in company_ids:
+        async with session_factory() as db:
+            count = await recompute_company_metrics(db, company)
+            await db.commit()
+        # Bulk updates bypass the session events that drop cached features
+        cache = get_vendor_feature_cache()
+        if cache is not None:
+            cache.invalidate(company)
+        updated += count
+        logger.info(f"Recomputed metrics of {count} vendors for company {company}")
+    return updated
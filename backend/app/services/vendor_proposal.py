@@ -1,5 +1,5 @@
 """Service for vendor proposal management - includes proposal comparison (hero feature)."""
-from typing import Optional, Union
+from typing import Dict, Optional, Union
 from uuid import UUID
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func, and_
@@ -8,14 +8,18 @@ from sqlalchemy.orm import selectinload
 from app.models.vendor_proposal import VendorProposal, VendorProposalStatus
 from app.models.vendor import Vendor
 from app.models.deal import Deal
+from app.schemas.activity_log import ChangeDetail
 from app.schemas.vendor_proposal import (
     VendorProposalCreate,
     VendorProposalUpdate,
     VendorProposalResponse,
     VendorProposalListResponse,
     ProposalComparisonResponse,
-    ProposalComparisonItem,
 )
+from app.services.activity_log import ActivityLogService
+from app.services.pagination import Cursor, next_cursor, paginate
+from app.services.proposal_comparison import compare_proposals
+from app.services.vendor_metrics import record_proposal_decisions
 
 
 class VendorProposalService:
@@ -30,6 +34,7 @@ class VendorProposalService:
         self.db = db
         self.user_id = user_id
         self.company_id = company_id
+        self.activity_log_service = ActivityLogService(db, company_id=company_id)
 
     async def create_proposal(self, data: VendorProposalCreate) -> VendorProposalResponse:
         """Create a new vendor proposal (request or record received proposal)."""
@@ -79,6 +84,16 @@ class VendorProposalService:
         self.db.add(proposal)
         await self.db.flush()
 
+        # Log creation (on the deal's timeline)
+        await self.activity_log_service.log_activity(
+            deal_id=proposal.deal_id,
+            action="created",
+            entity_type="vendor_proposal",
+            entity_id=proposal.id,
+            user_id=self.user_id,
+            company_id=self.company_id,
+        )
+
         # Manually set the vendor relationship to avoid lazy loading
         proposal.vendor = vendor
         return VendorProposalResponse.from_orm(proposal)
@@ -116,11 +131,26 @@ class VendorProposalService:
 
         # Update only the fields that were provided
         update_data = data.model_dump(exclude_unset=True)
+        old_values = {key: getattr(proposal, key) for key in update_data}
         for key, value in update_data.items():
             setattr(proposal, key, value)
 
+        if update_data.get("status") and update_data["status"] != old_values["status"]:
+            await record_proposal_decisions(self.db, [(proposal, old_values["status"], update_data["status"])])
         await self.db.flush()
 
+        changes = ActivityLogService.compute_changes(old_values, update_data)
+        if changes:
+            await self.activity_log_service.log_activity(
+                deal_id=proposal.deal_id,
+                action="updated",
+                entity_type="vendor_proposal",
+                entity_id=proposal.id,
+                changes=changes,
+                user_id=self.user_id,
+                company_id=self.company_id,
+            )
+
         # Fetch and return the updated proposal using the get method to ensure proper serialization
         return await self.get_proposal(proposal_id)
 
@@ -142,14 +172,25 @@ class VendorProposalService:
         proposal.deleted_at = func.now()
         await self.db.flush()
 
+        # Log deletion
+        await self.activity_log_service.log_activity(
+            deal_id=proposal.deal_id,
+            action="deleted",
+            entity_type="vendor_proposal",
+            entity_id=proposal.id,
+            user_id=self.user_id,
+            company_id=self.company_id,
+        )
+
     async def list_proposals(
         self,
         skip: int = 0,
         limit: int = 100,
         deal_id: Optional[UUID] = None,
         vendor_id: Optional[UUID] = None,
+        cursor: Optional[Cursor] = None,
     ) -> VendorProposalListResponse:
-        """List proposals for company with optional deal and vendor filters."""
+        """List proposals for company with optional deal and vendor filters (after cursor if given)."""
         # Build where conditions
         conditions = [
             VendorProposal.company_id == self.company_id,
@@ -168,19 +209,18 @@ class VendorProposalService:
         total = count_result.scalar() or 0
 
         # Fetch proposals
-        result = await self.db.execute(
+        query = (
             select(VendorProposal)
             .where(and_(*conditions))
             .options(selectinload(VendorProposal.vendor))
-            .order_by(VendorProposal.created_at.desc())
-            .offset(skip)
-            .limit(limit)
         )
+        result = await self.db.execute(paginate(query, VendorProposal, skip, limit, cursor))
         proposals = result.unique().scalars().all()
 
         return VendorProposalListResponse(
             total=total,
-            items=[VendorProposalResponse.from_orm(p) for p in proposals]
+            items=[VendorProposalResponse.from_orm(p) for p in proposals],
+            next_cursor=next_cursor(proposals, limit),
         )
 
     async def list_proposals_for_deal(self, deal_id: UUID) -> list:
@@ -199,7 +239,12 @@ class VendorProposalService:
         )
         return result.unique().scalars().all()
 
-    async def get_proposal_comparison(self, deal_id: UUID) -> ProposalComparisonResponse:
+    async def get_proposal_comparison(
+        self,
+        deal_id: UUID,
+        weights: Optional[Dict[str, float]] = None,
+        base_currency: Optional[str] = None,
+    ) -> ProposalComparisonResponse:
         """
         HERO FEATURE: Compare all vendor proposals for a deal side-by-side.
         Returns structured data for the proposal comparison dashboard.
@@ -207,73 +252,22 @@ class VendorProposalService:
         Displays:
         - All vendors with their proposals
         - Vendor credibility scores
-        - Pricing comparison (highlights best/worst)
+        - Pricing comparison in one currency (highlights best/worst), total and per line item
         - Lead time comparison
         - Spec match status and discrepancies
-        """
-        # Verify deal belongs to company
-        deal_result = await self.db.execute(
-            select(Deal).where(
-                and_(
-                    Deal.id == deal_id,
-                    Deal.company_id == self.company_id,
-                    Deal.deleted_at.is_(None)
-                )
-            )
-        )
-        if not deal_result.scalars().first():
-            raise ValueError("Deal not found")
+        - Weighted score and rank over price, lead time, credibility,
+          spec match and payment terms
 
-        # Get all proposals for this deal
-        proposals = await self.list_proposals_for_deal(deal_id)
-
-        # Calculate statistics for highlighting
-        prices = [p.total_price for p in proposals if p.total_price]
-        lead_times = [p.lead_time_days for p in proposals if p.lead_time_days]
-
-        best_price = min(prices) if prices else None
-        worst_price = max(prices) if prices else None
-        best_lead_time = min(lead_times) if lead_times else None
-        worst_lead_time = max(lead_times) if lead_times else None
-
-        # Build comparison items
-        comparison_items = []
-        for proposal in proposals:
-            item = ProposalComparisonItem(
-                id=proposal.id,
-                vendor_id=proposal.vendor_id,
-                vendor_name=proposal.vendor.company_name,
-                vendor_credibility=proposal.vendor.credibility_score,
-                total_price=proposal.total_price,
-                lead_time_days=proposal.lead_time_days,
-                specs_match=proposal.specs_match,
-                discrepancies=proposal.discrepancies,
-                status=proposal.status.value,
-                is_best_price=(
-                    proposal.total_price == best_price
-                    if proposal.total_price and best_price
-                    else False
-                ),
-                is_worst_price=(
-                    proposal.total_price == worst_price
-                    if proposal.total_price and worst_price
-                    else False
-                ),
-                is_best_lead_time=(
-                    proposal.lead_time_days == best_lead_time
-                    if proposal.lead_time_days and best_lead_time
-                    else False
-                ),
-            )
-            comparison_items.append(item)
-
-        return ProposalComparisonResponse(
-            deal_id=deal_id,
-            proposals=comparison_items,
-            best_price=best_price,
-            worst_price=worst_price,
-            best_lead_time=best_lead_time,
-            worst_lead_time=worst_lead_time,
+        Args:
+            deal_id: Deal whose proposals to compare
+            weights: Criterion weights overriding the defaults (what-if reweighting)
+            base_currency: Currency to compare prices in (defaults to FX_BASE_CURRENCY)
+
+        Raises:
+            ValueError: If the deal is not found or the weights are invalid
+        """
+        return await compare_proposals(
+            self.db, self.company_id, deal_id, weights=weights, base_currency=base_currency
         )
 
     async def select_vendor(self, proposal_id: UUID) -> VendorProposalResponse:
@@ -308,12 +302,32 @@ class VendorProposalService:
                 )
             )
         )
+        status_changes = []
         for other in other_proposals_result.scalars().all():
+            if other.status != VendorProposalStatus.REJECTED:
+                status_changes.append((other, other.status, VendorProposalStatus.REJECTED))
             other.status = VendorProposalStatus.REJECTED
 
         # Mark selected proposal as selected
+        if proposal.status != VendorProposalStatus.SELECTED:
+            status_changes.append((proposal, proposal.status, VendorProposalStatus.SELECTED))
         proposal.status = VendorProposalStatus.SELECTED
+        await record_proposal_decisions(self.db, status_changes)
         await self.db.flush()
 
+        # Log status changes
+        for changed, old_status, new_status in status_changes:
+            await self.activity_log_service.log_activity(
+                deal_id=changed.deal_id,
+                action="status_changed",
+                entity_type="vendor_proposal",
+                entity_id=changed.id,
+                changes=[
+                    ChangeDetail(field="status", old_value=str(old_status), new_value=str(new_status))
+                ],
+                user_id=self.user_id,
+                company_id=self.company_id,
+            )
+
         # Use get_proposal to safely fetch and serialize the updated proposal
         return await self.get_proposal(proposal_id)
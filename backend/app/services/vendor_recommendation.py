@@ -0,0 +1,392 @@
+"""Vendor recommendations for a deal: per-tenant vendor features scored in NumPy."""
+import logging
+import re
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import Float, and_, case, cast, event, func, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.vendor import Vendor
+from app.models.vendor_proposal import VendorProposal, VendorProposalStatus
+from app.models.vendor_tag import CATEGORY, CERTIFICATION
+from app.schemas.vendor import VendorRecommendation
+from app.services.search import tag_values
+from app.services.snapshot_cache import SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = "vendor_features"
+
+# Session.info key for the companies whose vendors or proposals a flush changed
+_STALE_KEY = "vendor_features_stale"
+
+# Score components and their weights. Category and certification match
+# are left out (and the others re-weighted) when the deal's line items
+# give them nothing to match
+WEIGHTS = {
+    "category_match": 0.30,
+    "certification_match": 0.15,
+    "credibility": 0.15,
+    "on_time_delivery": 0.10,
+    "lead_time": 0.10,
+    "win_rate": 0.10,
+    "price_competitiveness": 0.10,
+}
+# Components computed per vendor when the features are loaded, in the
+# column order of VendorFeatures.metrics
+METRIC_COLUMNS = ("credibility", "on_time_delivery", "lead_time", "win_rate", "price_competitiveness")
+
+# Pseudo-proposals at the tenant's average pulling a vendor's win rate and
+# price competitiveness towards it, so one lucky proposal doesn't top the list
+PRIOR_WEIGHT = 2.0
+# Used for a metric no vendor in the tenant has yet
+NEUTRAL = 0.5
+
+_WORD = re.compile(r"\w+")
+# Line items matched per bitmask chunk
+_MASK_BITS = 64
+
+
+def match_tokens(value: str) -> FrozenSet[str]:
+    """Lower-cased words of a tag or line item, with plural "s" dropped ("Steel Pipes" ~ "steel pipe")."""
+    words = _WORD.findall(value.lower())
+    return frozenset(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words)
+
+
+class TagIndex:
+    """
+    One kind of vendor tag (categories or certifications) as sparse arrays.
+
+    Vendor v's tags are entry_tag[indptr[v]:indptr[v + 1]], indexes into
+    values and tokens, so matching a deal is one pass over the distinct
+    tags and then array operations over every (vendor, tag) entry.
+    """
+
+    def __init__(self, vendor_count: int, pairs: Sequence[Tuple[int, str]]):
+        """
+        Build the index.
+
+        Args:
+            vendor_count: Rows of the features the index belongs to
+            pairs: (vendor row, tag value) of every tag
+        """
+        self.values: List[str] = sorted({value for _, value in pairs})
+        self.tokens = [match_tokens(value) for value in self.values]
+        positions = {value: i for i, value in enumerate(self.values)}
+        entry_vendor = np.fromiter((row for row, _ in pairs), dtype=np.int64, count=len(pairs))
+        entry_tag = np.fromiter((positions[value] for _, value in pairs), dtype=np.int64, count=len(pairs))
+        order = np.argsort(entry_vendor, kind="stable")
+        self.entry_vendor = entry_vendor[order]
+        self.entry_tag = entry_tag[order]
+        counts = np.bincount(self.entry_vendor, minlength=vendor_count)
+        self.indptr = np.concatenate(([0], np.cumsum(counts)))
+        # Vendors with at least one tag, and where their entries start
+        self.tagged = np.flatnonzero(counts)
+        self.starts = self.indptr[:-1][self.tagged]
+
+    def matching(self, line_tokens: Sequence[FrozenSet[str]]) -> List[Tuple[int, List[int]]]:
+        """(tag, line items it matches) for tags all of whose words appear in a line item."""
+        words = frozenset().union(*line_tokens) if line_tokens else frozenset()
+        result = []
+        for tag, tokens in enumerate(self.tokens):
+            if tokens and tokens <= words:
+                lines = [i for i, line in enumerate(line_tokens) if tokens <= line]
+                if lines:
+                    result.append((tag, lines))
+        return result
+
+    def vendor_tags(self, row: int, tags: np.ndarray) -> List[str]:
+        """Values of a vendor's tags that are set in the boolean per-tag array tags."""
+        own = self.entry_tag[self.indptr[row]:self.indptr[row + 1]]
+        return [self.values[t] for t in own if tags[t]]
+
+
+class VendorFeatures:
+    """A tenant's active vendors as arrays, ready to score against any deal."""
+
+    def __init__(
+        self,
+        vendor_ids: List[UUID],
+        vendor_codes: List[str],
+        company_names: List[str],
+        metrics: np.ndarray,
+        categories: TagIndex,
+        certifications: TagIndex,
+    ):
+        self.vendor_ids = vendor_ids
+        self.vendor_codes = vendor_codes
+        self.company_names = company_names
+        # (vendors, len(METRIC_COLUMNS)) in [0, 1]
+        self.metrics = metrics
+        self.categories = categories
+        self.certifications = certifications
+
+    def __len__(self) -> int:
+        return len(self.vendor_ids)
+
+
+def _fill(values: np.ndarray, default: float) -> np.ndarray:
+    """Replace NaN with the mean of the known values (default if there are none)."""
+    known = values[~np.isnan(values)]
+    return np.where(np.isnan(values), known.mean() if known.size else default, values)
+
+
+def _smoothed(numerators: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Per-vendor rates numerators / counts, shrunk towards the tenant's overall rate."""
+    prior = numerators.sum() / counts.sum() if counts.sum() else NEUTRAL
+    return (numerators + PRIOR_WEIGHT * prior) / (counts + PRIOR_WEIGHT)
+
+
+async def load_vendor_features(db: AsyncSession, company_id: UUID) -> VendorFeatures:
+    """
+    Read a tenant's active vendors, their tags and proposal history into arrays.
+
+    Tags are read from the vendors' JSON lists, normalized as the
+    vendor_tags rows are. Metrics are scaled to [0, 1]: credibility_score / 100, the on-time
+    rate, median / (median + lead time) for avg_lead_time_days, the share
+    of decided proposals (selected or rejected) the vendor won, and the
+    average of best price / vendor price over deals where two or more
+    vendors quoted in the same currency. Missing values count as the
+    tenant's average.
+
+    Args:
+        db: Session to read in
+        company_id: Tenant to load
+
+    Returns:
+        VendorFeatures, rows ordered by vendor id
+    """
+    # Per vendor: proposals won, proposals decided (selected or rejected),
+    # and best price / own price summed over priced proposals with a
+    # competing bid in the same deal and currency
+    price = case((VendorProposal.total_price > 0, cast(VendorProposal.total_price, Float)))
+    bids = (VendorProposal.deal_id, VendorProposal.currency)
+    proposals = (
+        select(
+            VendorProposal.vendor_id,
+            VendorProposal.status,
+            (func.min(price).over(partition_by=bids) / price).label("ratio"),
+            func.count(price).over(partition_by=bids).label("bids"),
+        )
+        .where(VendorProposal.company_id == company_id, VendorProposal.deleted_at.is_(None))
+        .subquery()
+    )
+    competed = and_(proposals.c.bids >= 2, proposals.c.ratio.is_not(None))
+    history = (
+        select(
+            proposals.c.vendor_id,
+            func.sum(case((proposals.c.status == VendorProposalStatus.SELECTED, 1), else_=0)).label("won"),
+            func.sum(case(
+                (proposals.c.status.in_([VendorProposalStatus.SELECTED, VendorProposalStatus.REJECTED]), 1),
+                else_=0,
+            )).label("decided"),
+            func.sum(case((competed, proposals.c.ratio), else_=0.0)).label("ratios"),
+            func.sum(case((competed, 1), else_=0)).label("quoted"),
+        )
+        .group_by(proposals.c.vendor_id)
+        .subquery()
+    )
+    # One row per vendor with its history joined on, rather than separate
+    # aggregate queries whose vendor ids would each need matching up
+    vendors = (await db.execute(
+        select(
+            Vendor.id, Vendor.vendor_code, Vendor.company_name, Vendor.credibility_score,
+            Vendor.on_time_delivery_rate, Vendor.avg_lead_time_days,
+            Vendor.product_categories, Vendor.certifications,
+            history.c.won, history.c.decided, history.c.ratios, history.c.quoted,
+        )
+        .outerjoin(history, history.c.vendor_id == Vendor.id)
+        .where(Vendor.company_id == company_id, Vendor.deleted_at.is_(None), Vendor.is_active.is_(True))
+        .order_by(Vendor.id)
+    )).all()
+    n = len(vendors)
+
+    def column(values) -> np.ndarray:
+        return np.fromiter((np.nan if v is None else v for v in values), dtype=np.float64, count=n)
+
+    credibility = _fill(column(v.credibility_score for v in vendors) / 100.0, NEUTRAL)
+    on_time = _fill(column(v.on_time_delivery_rate for v in vendors), NEUTRAL)
+    lead_days = column(v.avg_lead_time_days for v in vendors)
+    known = lead_days[~np.isnan(lead_days)]
+    median = max(float(np.median(known)), 1.0) if known.size else 1.0
+    lead_time = _fill(median / (median + np.maximum(lead_days, 0.0)), NEUTRAL)
+    win_rate = _smoothed(
+        np.nan_to_num(column(v.won for v in vendors)), np.nan_to_num(column(v.decided for v in vendors))
+    )
+    price_competitiveness = _smoothed(
+        np.nan_to_num(column(v.ratios for v in vendors)), np.nan_to_num(column(v.quoted for v in vendors))
+    )
+
+    tags: Dict[str, List[Tuple[int, str]]] = {CATEGORY: [], CERTIFICATION: []}
+    for row, vendor in enumerate(vendors):
+        tags[CATEGORY].extend((row, value) for value in tag_values(vendor.product_categories))
+        tags[CERTIFICATION].extend((row, value) for value in tag_values(vendor.certifications))
+
+    return VendorFeatures(
+        vendor_ids=[v.id for v in vendors],
+        vendor_codes=[v.vendor_code for v in vendors],
+        company_names=[v.company_name for v in vendors],
+        metrics=np.column_stack([
+            credibility, on_time, lead_time, win_rate, price_competitiveness,
+        ]).reshape(n, len(METRIC_COLUMNS)),
+        categories=TagIndex(n, tags[CATEGORY]),
+        certifications=TagIndex(n, tags[CERTIFICATION]),
+    )
+
+
+_cache: Optional[SnapshotCache[VendorFeatures]] = None
+
+
+def get_vendor_feature_cache() -> Optional[SnapshotCache[VendorFeatures]]:
+    """
+    Get the process-wide vendor feature cache (keyed by company), creating it on first use.
+
+    Returns:
+        SnapshotCache, or None when VENDOR_FEATURES_TTL_SECONDS <= 0
+    """
+    global _cache
+    if settings.VENDOR_FEATURES_TTL_SECONDS <= 0:
+        return None
+    if _cache is None:
+        _cache = SnapshotCache(
+            METRIC_PREFIX,
+            max_entries=settings.VENDOR_FEATURES_MAX_COMPANIES,
+            ttl_seconds=settings.VENDOR_FEATURES_TTL_SECONDS,
+        )
+    return _cache
+
+
+async def get_vendor_features(db: AsyncSession, company_id: UUID) -> VendorFeatures:
+    """A tenant's vendor features, from the cache or loaded (and cached)."""
+
+    async def load() -> VendorFeatures:
+        start = time.perf_counter()
+        features = await load_vendor_features(db, company_id)
+        logger.info(
+            f"Loaded features of {len(features)} vendors for company {company_id} "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms"
+        )
+        return features
+
+    cache = get_vendor_feature_cache()
+    if cache is None:
+        return await load_vendor_features(db, company_id)
+    return await cache.get_or_load(company_id, load)
+
+
+def line_item_tokens(line_items: Sequence[Any]) -> List[FrozenSet[str]]:
+    """match_tokens() of each line item's description and material spec."""
+    result = []
+    for item in line_items or []:
+        if isinstance(item, dict):
+            parts = (item.get("description"), item.get("material_spec") or item.get("specification"))
+            result.append(match_tokens(" ".join(str(part) for part in parts if part)))
+    return result
+
+
+def score_vendors(
+    features: VendorFeatures, line_items: Sequence[Any], limit: int
+) -> Tuple[List[str], List[VendorRecommendation]]:
+    """
+    Rank a tenant's vendors for a deal's line items.
+
+    A category matches a line item when all its words appear in the
+    item's description or material spec; category_match is the share of
+    line items a vendor has a matching category for (per-tag bitmasks of
+    line items, OR-ed per vendor). Certifications named in any line item
+    are required, and certification_match is the share of them a vendor
+    holds.
+
+    Args:
+        features: The tenant's vendor features
+        line_items: The deal's line_items
+        limit: Vendors to return
+
+    Returns:
+        (required certifications, best vendors first)
+    """
+    n = len(features)
+    lines = line_item_tokens(line_items)
+    components: Dict[str, np.ndarray] = {
+        name: features.metrics[:, i] for i, name in enumerate(METRIC_COLUMNS)
+    }
+
+    categories = features.categories
+    matched_categories = np.zeros(len(categories.values), dtype=bool)
+    covered = np.zeros(n)
+    matches = categories.matching(lines)
+    for start in range(0, len(lines), _MASK_BITS):
+        masks = np.zeros(len(categories.values), dtype=np.uint64)
+        for tag, tag_lines in matches:
+            bits = sum(1 << (i - start) for i in tag_lines if start <= i < start + _MASK_BITS)
+            masks[tag] = bits
+        if categories.tagged.size and masks.any():
+            per_vendor = np.bitwise_or.reduceat(masks[categories.entry_tag], categories.starts)
+            covered[categories.tagged] += np.bitwise_count(per_vendor)
+    if matches:
+        matched_categories[[tag for tag, _ in matches]] = True
+        components["category_match"] = covered / len(lines)
+
+    certifications = features.certifications
+    required = np.zeros(len(certifications.values), dtype=bool)
+    required[[tag for tag, _ in certifications.matching(lines)]] = True
+    if required.any():
+        held = np.bincount(
+            certifications.entry_vendor, weights=required[certifications.entry_tag], minlength=n
+        )
+        components["certification_match"] = held / required.sum()
+
+    names = list(components)
+    weights = np.array([WEIGHTS[name] for name in names])
+    scores = np.column_stack([components[name] for name in names]) @ (weights / weights.sum())
+
+    k = min(limit, n)
+    if k <= 0:
+        return [], []
+    best = np.argpartition(-scores, k - 1)[:k]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    recommendations = [
+        VendorRecommendation(
+            vendor_id=features.vendor_ids[row],
+            vendor_code=features.vendor_codes[row],
+            company_name=features.company_names[row],
+            score=round(float(scores[row]), 4),
+            **{name: round(float(components[name][row]), 4) for name in names},
+            matched_categories=categories.vendor_tags(row, matched_categories),
+            matched_certifications=certifications.vendor_tags(row, required),
+        )
+        for row in best
+    ]
+    return [certifications.values[t] for t in np.flatnonzero(required)], recommendations
+
+
+@event.listens_for(Session, "after_flush")
+def _note_changed_vendors(session: Session, flush_context) -> None:
+    """Record the companies whose vendors or proposals this flush wrote."""
+    if _cache is None:
+        return
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Vendor, VendorProposal)):
+            company_id = inspect(obj).dict.get("company_id")
+            if company_id is not None:
+                session.info.setdefault(_STALE_KEY, set()).add(company_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_changes(session: Session) -> None:
+    stale = session.info.pop(_STALE_KEY, set())
+    cache = _cache
+    if cache is None:
+        return
+    for company_id in stale:
+        cache.invalidate(company_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_changed_vendors(session: Session) -> None:
+    session.info.pop(_STALE_KEY, None)
@@ -0,0 +1,37 @@
+"""Celery application for background processing."""
+from celery import Celery
+from celery.schedules import crontab
+
+from app.config import settings
+
+celery_app = Celery(
+    "tradeflow",
+    broker=settings.CELERY_BROKER_URL,
+    backend=settings.CELERY_RESULT_BACKEND,
+    include=["app.workers.document_tasks", "app.workers.maintenance_tasks"],
+)
+
+celery_app.conf.update(
+    task_default_queue="documents",
+    task_serializer="json",
+    result_serializer="json",
+    accept_content=["json"],
+    # Pipeline stages are idempotent, so redeliver them if a worker dies mid-task
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # OCR tasks are long; don't let one worker hoard queued documents
+    worker_prefetch_multiplier=1,
+    task_ignore_result=True,
+    timezone="UTC",
+    # Run with `celery -A app.workers.celery_app beat`
+    beat_schedule={
+        "activity-log-maintenance": {
+            "task": "maintenance.activity_log",
+            "schedule": crontab(hour=3, minute=15),
+        },
+        "vendor-metrics-recompute": {
+            "task": "maintenance.recompute_vendor_metrics",
+            "schedule": crontab(hour=3, minute=45),
+        },
+    },
+)
@@ -0,0 +1,371 @@
+"""Document processing pipeline - parse, OCR and AI-extract stages."""
+import asyncio
+import logging
+from typing import List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.config import settings
+from app.models.document import Document, DocumentProcessingStage, DocumentStatus
+from app.services.ai_extraction import AIExtractionService, AIExtractionError
+from app.services.document_parsing import DocumentParsingService, DocumentParsingError
+from app.services.embeddings import Embedder, get_embedder, index_document
+from app.services.parsing_pool import run_in_parsing_pool
+from app.services.pdf_ocr import ocr_document_pages
+from app.services.storage import StorageService, get_storage_service
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentPipeline:
+    """
+    Run the processing stages for an uploaded document.
+
+    Every stage loads the document, does its work, stores the result and
+    commits, so stages can run in separate worker processes (Celery chain)
+    or back to back in-process (LocalDocumentQueue).
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        storage_service: Optional[StorageService] = None,
+        ai_service: Optional[AIExtractionService] = None,
+        embedder: Optional[Embedder] = None,
+    ):
+        """
+        Initialize DocumentPipeline.
+
+        Args:
+            session_factory: Factory for the sessions each stage runs in
+            storage_service: Storage client (the shared one if omitted)
+            ai_service: AI extraction client (created on first use if omitted)
+            embedder: Embedding backend (the configured one if omitted)
+        """
+        self.session_factory = session_factory
+        self._storage_service = storage_service
+        self._ai_service = ai_service
+        self._embedder = embedder
+
+    @property
+    def storage_service(self) -> StorageService:
+        if self._storage_service is None:
+            self._storage_service = get_storage_service()
+        return self._storage_service
+
+    @property
+    def ai_service(self) -> AIExtractionService:
+        if self._ai_service is None:
+            self._ai_service = AIExtractionService()
+        return self._ai_service
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    async def run(self, document_id: UUID) -> None:
+        """
+        Run all stages for a document, marking it FAILED on unexpected errors.
+
+        Args:
+            document_id: Document ID
+        """
+        try:
+            async with self.session_factory() as db:
+                document = await self._load(db, document_id)
+                if not document:
+                    return
+                storage_key = document.storage_key
+                text_reused = document.extracted_text is not None
+
+            if not text_reused:
+                content = await self.storage_service.download_file_async(storage_key)
+                ocr_pages = await self.parse(document_id, content=content)
+                if ocr_pages:
+                    await self.ocr(document_id, ocr_pages=ocr_pages, content=content)
+            await self.extract(document_id)
+        except Exception as e:
+            logger.error(f"Document pipeline failed for {document_id}: {e}", exc_info=True)
+            await self.mark_failed(document_id, e)
+
+    async def parse(self, document_id: UUID, content: Optional[bytes] = None) -> List[int]:
+        """
+        Parse stage: extract the native text layer (no OCR).
+
+        Skipped for duplicate uploads whose text was reused from the original.
+
+        Args:
+            document_id: Document ID
+            content: File bytes, downloaded from storage if omitted
+
+        Returns:
+            1-based pages that need the OCR stage (empty to skip it)
+        """
+        async with self.session_factory() as db:
+            document = await self._load(db, document_id)
+            if not document or document.extracted_text is not None:
+                return []
+
+            await self._enter_stage(db, document, DocumentProcessingStage.PARSE)
+            if content is None:
+                content = await self.storage_service.download_file_async(document.storage_key)
+
+            try:
+                extracted_text, ocr_pages = await run_in_parsing_pool(
+                    DocumentParsingService.extract_native_text, content, document.mime_type
+                )
+                logger.info(
+                    f"Parsed {len(extracted_text)} characters from {document_id}, "
+                    f"{len(ocr_pages)} pages need OCR"
+                )
+            except DocumentParsingError as e:
+                logger.warning(f"Text extraction failed: {e}, continuing with empty text")
+                extracted_text, ocr_pages = "", []
+
+            document.extracted_text = extracted_text
+            await db.commit()
+            return ocr_pages
+
+    async def ocr(
+        self,
+        document_id: UUID,
+        ocr_pages: Optional[List[int]] = None,
+        content: Optional[bytes] = None,
+    ) -> None:
+        """
+        OCR stage: OCR pages without a text layer and merge them in.
+
+        Args:
+            document_id: Document ID
+            ocr_pages: Pages reported by the parse stage (re-derived if omitted)
+            content: File bytes, downloaded from storage if omitted
+        """
+        if ocr_pages is not None and not ocr_pages:
+            return
+
+        async with self.session_factory() as db:
+            document = await self._load(db, document_id)
+            if not document:
+                return
+
+            await self._enter_stage(db, document, DocumentProcessingStage.OCR)
+            if content is None:
+                content = await self.storage_service.download_file_async(document.storage_key)
+
+            try:
+                if ocr_pages is None:
+                    _, ocr_pages = await run_in_parsing_pool(
+                        DocumentParsingService.extract_native_text, content, document.mime_type
+                    )
+                ocr_text = await ocr_document_pages(
+                    content, document.mime_type, document.extracted_text, ocr_pages
+                )
+                logger.info(f"OCR produced {len(ocr_text)} characters for {document_id}")
+            except DocumentParsingError as e:
+                logger.warning(f"OCR failed: {e}, keeping native text")
+                ocr_text = ""
+
+            if len(ocr_text.strip()) > len((document.extracted_text or "").strip()):
+                document.extracted_text = ocr_text
+            await db.commit()
+
+    async def extract(self, document_id: UUID) -> None:
+        """
+        AI-extract stage: send extracted text to Claude, embed, and complete the document.
+
+        Embeds the text and the extracted line items for similarity search
+        (see index_document).
+
+        Args:
+            document_id: Document ID
+        """
+        async with self.session_factory() as db:
+            document = await self._load(db, document_id)
+            if not document:
+                return
+
+            await self._enter_stage(db, document, DocumentProcessingStage.EXTRACT)
+
+            # parsed_data stores only the "data" key of the extraction result
+            try:
+                if document.extracted_text:
+                    extraction_result = await self.ai_service.extract_structured_data(
+                        extracted_text=document.extracted_text,
+                        category=document.category,
+                    )
+                    document.parsed_data = extraction_result.get("data", {})
+                    document.ai_confidence_score = float(extraction_result.get("confidence", 0.5))
+                else:
+                    logger.warning("No text to send to AI")
+                    document.parsed_data = {}
+                    document.ai_confidence_score = 0.0
+            except AIExtractionError as e:
+                logger.error(f"AI extraction failed: {e}")
+                document.parsed_data = {}
+                document.ai_confidence_score = 0.0
+                document.error_message = str(e)[:1000]
+
+            await index_document(db, document, self.embedder)
+
+            document.status = DocumentStatus.COMPLETED
+            document.processing_stage = None
+            await db.commit()
+            logger.info(f"Document processing complete: {document_id}")
+
+    async def mark_failed(self, document_id: UUID, error: Exception) -> None:
+        """
+        Mark a document FAILED in a fresh session.
+
+        Args:
+            document_id: Document ID
+            error: The error that stopped the pipeline
+        """
+        async with self.session_factory() as db:
+            document = await self._load(db, document_id)
+            if not document:
+                return
+            document.status = DocumentStatus.FAILED
+            document.processing_stage = None
+            document.error_message = f"{type(error).__name__}: {error}"[:1000]
+            await db.commit()
+
+    @staticmethod
+    async def _load(db: AsyncSession, document_id: UUID) -> Optional[Document]:
+        """Load a document that is still being processed."""
+        result = await db.execute(
+            select(Document).where(
+                (Document.id == document_id)
+                & (Document.status == DocumentStatus.PROCESSING)
+                & (Document.deleted_at.is_(None))
+            )
+        )
+        document = result.scalar_one_or_none()
+        if not document:
+            logger.warning(f"Document {document_id} not found or not processing, skipping stage")
+        return document
+
+    @staticmethod
+    async def _enter_stage(
+        db: AsyncSession, document: Document, stage: DocumentProcessingStage
+    ) -> None:
+        """Record the current stage so status polling can report progress."""
+        document.processing_stage = stage.value
+        await db.commit()
+
+
+class LocalDocumentQueue:
+    """In-process fallback queue: runs pipelines as tasks on the running event loop."""
+
+    def __init__(self, pipeline: DocumentPipeline, concurrency: int = 4):
+        self.pipeline = pipeline
+        self.concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def enqueue(self, document_id: UUID) -> None:
+        """Schedule the pipeline for a document and return immediately."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        task = asyncio.create_task(self._run(document_id))
+        # Keep a strong reference until the task finishes
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """Wait for all scheduled pipelines to finish."""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+
+    async def _run(self, document_id: UUID) -> None:
+        async with self._semaphore:
+            await self.pipeline.run(document_id)
+
+
+class CeleryDocumentQueue:
+    """Dispatch pipelines to Celery workers as a parse -> OCR -> extract chain."""
+
+    async def enqueue(self, document_id: UUID) -> None:
+        """Publish the stage chain for a document."""
+        from app.workers.document_tasks import build_document_chain
+
+        # Publishing talks to the broker, keep it off the event loop
+        await asyncio.to_thread(build_document_chain(document_id).apply_async)
+
+
+_document_queue = None
+
+
+def get_document_queue():
+    """
+    Dependency: the process-wide document queue for the configured backend.
+
+    Returns:
+        CeleryDocumentQueue when DOCUMENT_PIPELINE_BACKEND is "celery",
+        otherwise a LocalDocumentQueue bound to the application database
+    """
+    global _document_queue
+    if _document_queue is None:
+        if settings.DOCUMENT_PIPELINE_BACKEND == "celery":
+            _document_queue = CeleryDocumentQueue()
+        else:
+            from app.database import AsyncSessionLocal
+
+            _document_queue = LocalDocumentQueue(
+                DocumentPipeline(AsyncSessionLocal),
+                concurrency=settings.DOCUMENT_PIPELINE_CONCURRENCY,
+            )
+    return _document_queue
+
+
+async def requeue_unfinished_documents(session_factory: async_sessionmaker) -> int:
+    """
+    Re-enqueue documents an earlier API process left PROCESSING.
+
+    LocalDocumentQueue keeps its work in memory, so a restart drops queued
+    and running pipelines. Celery keeps them in the broker, so this is a
+    no-op for that backend.
+
+    Args:
+        session_factory: Factory for the application database sessions
+
+    Returns:
+        Number of documents re-enqueued
+    """
+    queue = get_document_queue()
+    if not isinstance(queue, LocalDocumentQueue):
+        return 0
+
+    async with session_factory() as db:
+        result = await db.execute(
+            select(Document).where(
+                (Document.status == DocumentStatus.PROCESSING)
+                & (Document.deleted_at.is_(None))
+            )
+        )
+        documents = result.scalars().all()
+        for document in documents:
+            # Text from an interrupted parse/OCR stage may be partial; text
+            # reused from a duplicate (still queued) is kept
+            if document.processing_stage in (
+                DocumentProcessingStage.PARSE.value,
+                DocumentProcessingStage.OCR.value,
+            ):
+                document.extracted_text = None
+            document.processing_stage = DocumentProcessingStage.QUEUED.value
+        await db.commit()
+
+    for document in documents:
+        await queue.enqueue(document.id)
+    if documents:
+        logger.info(f"Re-queued {len(documents)} unfinished documents")
+    return len(documents)
+
+
+async def shutdown_document_queue() -> None:
+    """Let in-process pipelines finish before the application exits."""
+    if isinstance(_document_queue, LocalDocumentQueue):
+        await _document_queue.drain()
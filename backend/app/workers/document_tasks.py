@@ -0,0 +1,84 @@
+"""Celery tasks for the document processing pipeline."""
+import asyncio
+import logging
+from typing import List
+from uuid import UUID
+
+from celery import chain
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.services.ai_extraction import close_anthropic_client
+from app.workers.celery_app import celery_app
+from app.workers.document_pipeline import DocumentPipeline
+
+logger = logging.getLogger(__name__)
+
+# Every task runs in its own event loop (asyncio.run), so pooled connections
+# can't be reused across tasks - open a fresh connection per stage instead.
+worker_engine = create_async_engine(settings.DATABASE_URL, poolclass=NullPool)
+WorkerSessionLocal = async_sessionmaker(
+    worker_engine,
+    class_=AsyncSession,
+    expire_on_commit=False,
+)
+
+pipeline = DocumentPipeline(WorkerSessionLocal)
+
+
+def build_document_chain(document_id: UUID):
+    """
+    Build the stage chain for a document.
+
+    Args:
+        document_id: Document ID
+
+    Returns:
+        Celery signature running parse -> OCR -> AI-extract
+    """
+    document_id = str(document_id)
+    return chain(
+        parse_document.si(document_id),
+        # Receives the parse stage's list of pages that need OCR
+        ocr_document.s(document_id),
+        extract_document.si(document_id),
+    )
+
+
+async def _run_in_loop(stage, document_id: UUID, **kwargs):
+    """Run a stage, closing the Anthropic client bound to this task's event loop."""
+    try:
+        return await stage(document_id, **kwargs)
+    finally:
+        await close_anthropic_client()
+
+
+def _run_stage(task, stage, document_id: str, **kwargs):
+    """Run one async stage, retrying transient errors before failing the document."""
+    try:
+        return asyncio.run(_run_in_loop(stage, UUID(document_id), **kwargs))
+    except Exception as e:
+        if task.request.retries < task.max_retries:
+            raise task.retry(exc=e)
+        logger.error(f"Stage {task.name} failed for {document_id}: {e}", exc_info=True)
+        asyncio.run(pipeline.mark_failed(UUID(document_id), e))
+        raise
+
+
+@celery_app.task(name="documents.parse", bind=True, max_retries=2, default_retry_delay=10)
+def parse_document(self, document_id: str) -> List[int]:
+    """Extract the native text layer of a document, returning pages to OCR."""
+    return _run_stage(self, pipeline.parse, document_id)
+
+
+@celery_app.task(name="documents.ocr", bind=True, max_retries=2, default_retry_delay=10)
+def ocr_document(self, ocr_pages: List[int], document_id: str) -> None:
+    """OCR the pages of a document that have no usable text layer."""
+    _run_stage(self, pipeline.ocr, document_id, ocr_pages=ocr_pages)
+
+
+@celery_app.task(name="documents.extract", bind=True, max_retries=2, default_retry_delay=30)
+def extract_document(self, document_id: str) -> None:
+    """Run AI extraction and mark the document COMPLETED."""
+    _run_stage(self, pipeline.extract, document_id)
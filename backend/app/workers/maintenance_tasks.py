@@ -0,0 +1,43 @@
+"""Celery tasks for periodic database maintenance."""
+import asyncio
+import logging
+from typing import Any, Dict
+
+from app.services.audit_retention import maintain_activity_log
+from app.services.embeddings import backfill_embeddings
+from app.services.storage import get_storage_service
+from app.services.vendor_metrics import recompute_vendor_metrics
+from app.workers.celery_app import celery_app
+from app.workers.document_tasks import WorkerSessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+@celery_app.task(name="maintenance.activity_log")
+def maintain_activity_log_task() -> Dict[str, Any]:
+    """Create upcoming activity_log partitions and archive months past retention."""
+    summary = asyncio.run(maintain_activity_log(WorkerSessionLocal, get_storage_service()))
+    logger.info(f"Activity log maintenance: {summary}")
+    return summary
+
+
+@celery_app.task(name="maintenance.embed_documents")
+def embed_documents_task(rebuild: bool = False) -> int:
+    """
+    Embed completed documents that have no embeddings yet (all of them if rebuild).
+
+    Not scheduled: run once after upgrading, or with rebuild=True after
+    changing EMBEDDING_BACKEND, e.g.
+    `celery -A app.workers.celery_app call maintenance.embed_documents`.
+    """
+    embedded = asyncio.run(backfill_embeddings(WorkerSessionLocal, rebuild=rebuild))
+    logger.info(f"Embedded {embedded} documents")
+    return embedded
+
+
+@celery_app.task(name="maintenance.recompute_vendor_metrics")
+def recompute_vendor_metrics_task() -> int:
+    """Rebuild vendor performance metrics from proposal history (nightly, and once after upgrading)."""
+    updated = asyncio.run(recompute_vendor_metrics(WorkerSessionLocal))
+    logger.info(f"Recomputed metrics of {updated} vendors")
+    return updated
@@ -0,0 +1,190 @@
+"""
+Benchmark: activity_log as one table vs monthly partitions (PostgreSQL).
+
+Builds both layouts side by side in a scratch schema, seeded server-side
+with generate_series: "plain" is the table before migration 010 (all
+its indexes), "partitioned" is the table after it (monthly RANGE
+partitions, timeline indexes only). Then times:
+
+  page      newest 50 entries of a deal's history (the timeline query)
+  count     the deal's total entry count
+  insert    1000 single-row inserts, as request commits write them
+  retire    removing the oldest month: DELETE vs DETACH + DROP PARTITION
+
+Needs a PostgreSQL database (partitioning has no SQLite equivalent);
+the scratch schema is dropped afterwards. Seeding 50M rows takes a
+while and about 15GB per layout.
+
+Usage:
+    python -m benchmarks.bench_activity_log_partitions --database-url postgresql+asyncpg://... \\
+        [--rows 50000000] [--months 24] [--deals 200000]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+SCHEMA = "bench_activity_log"
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+TENANTS = 100
+REPEATS = 50
+
+COLUMNS = """
+    id UUID NOT NULL,
+    company_id UUID NOT NULL,
+    deal_id UUID,
+    user_id UUID,
+    action VARCHAR(50) NOT NULL,
+    entity_type VARCHAR(50) NOT NULL,
+    entity_id UUID NOT NULL,
+    changes JSON NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL
+"""
+
+# Deal n belongs to tenant n % TENANTS; ids are derived so queries can name them
+SEED = """
+    INSERT INTO {table}
+    SELECT
+        gen_random_uuid(),
+        md5('tenant' || (d % {tenants}))::uuid,
+        md5('deal' || d)::uuid,
+        NULL,
+        (ARRAY['created', 'updated', 'status_changed'])[1 + i % 3],
+        'deal',
+        md5('deal' || d)::uuid,
+        '[{{"field": "notes", "old_value": null, "new_value": "bench"}}]',
+        TIMESTAMPTZ '{start}' + (i::float8 / {rows}) * (INTERVAL '1 month' * {months})
+    FROM generate_series({first}, {last}) AS i, LATERAL (SELECT (i * 7919) % {deals} AS d) AS deal
+"""
+
+
+def _month(index: int) -> str:
+    year, month = divmod(START.month - 1 + index, 12)
+    return datetime(START.year + year, month + 1, 1, tzinfo=timezone.utc).isoformat()
+
+
+async def _create(conn, months: int) -> None:
+    await conn.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    await conn.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+
+    await conn.execute(text(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))"))
+    await conn.execute(text(
+        f"CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}, PRIMARY KEY (id, created_at)) PARTITION BY RANGE (created_at)"
+    ))
+    for index in range(months + 1):
+        await conn.execute(text(
+            f"CREATE TABLE {SCHEMA}.partitioned_{index} PARTITION OF {SCHEMA}.partitioned "
+            f"FOR VALUES FROM ('{_month(index)}') TO ('{_month(index + 1)}')"
+        ))
+    await conn.execute(text(f"CREATE TABLE {SCHEMA}.partitioned_default PARTITION OF {SCHEMA}.partitioned DEFAULT"))
+
+
+async def _index(conn) -> None:
+    timeline = (
+        ("deal_created", "company_id, deal_id, created_at, id"),
+        ("entity_created", "company_id, entity_type, entity_id, created_at, id"),
+    )
+    for table in ("plain", "partitioned"):
+        for name, columns in timeline:
+            await conn.execute(text(f"CREATE INDEX {table}_{name} ON {SCHEMA}.{table} ({columns})"))
+    # The single-column indexes migration 010 drops
+    for column in ("company_id", "deal_id", "created_at"):
+        await conn.execute(text(f"CREATE INDEX plain_{column} ON {SCHEMA}.plain ({column})"))
+    await conn.execute(text(f"CREATE INDEX plain_entity ON {SCHEMA}.plain (entity_type, entity_id)"))
+    for table in ("plain", "partitioned"):
+        await conn.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+
+
+async def _seed(engine, rows: int, months: int, deals: int) -> None:
+    chunk = 1_000_000
+    for table in ("plain", "partitioned"):
+        for first in range(0, rows, chunk):
+            async with engine.begin() as conn:
+                await conn.execute(text(SEED.format(
+                    table=f"{SCHEMA}.{table}", tenants=TENANTS, start=START.isoformat(), rows=rows,
+                    months=months, deals=deals, first=first, last=min(first + chunk, rows) - 1,
+                )))
+            print(f"  {table}: {min(first + chunk, rows)} rows", flush=True)
+
+
+async def _median_ms(conn, statement: str, params_list) -> float:
+    timings = []
+    for params in params_list:
+        start = time.perf_counter()
+        (await conn.execute(text(statement), params)).all()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def _bench(database_url: str, rows: int, months: int, deals: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool, isolation_level="AUTOCOMMIT")
+    async with engine.connect() as conn:
+        await _create(conn, months)
+    print(f"Seeding {rows} rows over {months} months, {deals} deals")
+    await _seed(engine, rows, months, deals)
+    async with engine.connect() as conn:
+        await _index(conn)
+
+    params = [
+        {"deal": str(deal), "tenant": str(deal % TENANTS)}
+        for deal in random.Random(7).sample(range(deals), REPEATS)
+    ]
+
+    print(f"{'query':>8} {'plain (ms)':>11} {'partitioned (ms)':>17}")
+    async with engine.connect() as conn:
+        for name, statement in (
+            ("page", (
+                "SELECT * FROM {table} WHERE company_id = md5('tenant' || :tenant)::uuid "
+                "AND deal_id = md5('deal' || :deal)::uuid ORDER BY created_at DESC, id DESC LIMIT 50"
+            )),
+            ("count", (
+                "SELECT count(*) FROM {table} WHERE company_id = md5('tenant' || :tenant)::uuid "
+                "AND deal_id = md5('deal' || :deal)::uuid"
+            )),
+        ):
+            plain_ms = await _median_ms(conn, statement.format(table=f"{SCHEMA}.plain"), params)
+            partitioned_ms = await _median_ms(conn, statement.format(table=f"{SCHEMA}.partitioned"), params)
+            print(f"{name:>8} {plain_ms:>11.2f} {partitioned_ms:>17.2f}")
+
+        timings = {}
+        for table in ("plain", "partitioned"):
+            start = time.perf_counter()
+            for i in range(1000):
+                await conn.execute(text(
+                    f"INSERT INTO {SCHEMA}.{table} VALUES (gen_random_uuid(), md5('tenant' || :tenant)::uuid, "
+                    "md5('deal' || :deal)::uuid, NULL, 'updated', 'deal', md5('deal' || :deal)::uuid, '[]', now())"
+                ), {"tenant": str(i % TENANTS), "deal": str(i)})
+            timings[table] = (time.perf_counter() - start) * 1000
+        print(f"{'insert':>8} {timings['plain']:>11.0f} {timings['partitioned']:>17.0f}")
+
+        start = time.perf_counter()
+        await conn.execute(text(f"DELETE FROM {SCHEMA}.plain WHERE created_at < '{_month(1)}'"))
+        plain_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        await conn.execute(text(f"ALTER TABLE {SCHEMA}.partitioned DETACH PARTITION {SCHEMA}.partitioned_0"))
+        await conn.execute(text(f"DROP TABLE {SCHEMA}.partitioned_0"))
+        partitioned_ms = (time.perf_counter() - start) * 1000
+        print(f"{'retire':>8} {plain_ms:>11.0f} {partitioned_ms:>17.0f}")
+
+        await conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--rows", type=int, default=50_000_000)
+    parser.add_argument("--months", type=int, default=24)
+    parser.add_argument("--deals", type=int, default=200_000)
+    args = parser.parse_args()
+    asyncio.run(_bench(args.database_url, args.rows, args.months, args.deals))
+
+
+if __name__ == "__main__":
+    main()
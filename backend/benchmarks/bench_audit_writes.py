@@ -0,0 +1,162 @@
+"""
+Benchmark: SQL statements and latency per mutation, activity log flushed per entry vs buffered.
+
+The per-entry path is the previous log_activity: add an ActivityLog and
+flush it, one INSERT round trip per entry in the middle of the request.
+The buffered path collects the request's entries on the session and
+writes them in one multi-row INSERT at commit.
+
+Runs deal and quote mutations (each committed, as the API does) against
+a temporary SQLite database and counts the statements each one sends.
+A request logging one entry sends as many statements either way (the
+INSERT just moves to commit); update_10 changes ten deals in one
+request, as a bulk endpoint would.
+
+Usage:
+    python -m benchmarks.bench_audit_writes [--requests 200]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.activity_log import ActivityLog
+from app.models.company import Company
+from app.models.customer import Customer
+from app.models.deal import DealStatus
+from app.schemas.activity_log import ActivityLogResponse
+from app.schemas.deal import DealCreate, DealUpdate
+from app.schemas.quote import QuoteCreate
+from app.services.activity_log import ActivityLogService
+from app.services.deal import DealService
+from app.services.quote import QuoteService
+
+
+class PerEntryActivityLogService(ActivityLogService):
+    """The previous behaviour: flush every entry as it is logged."""
+
+    async def log_activity(self, deal_id, action, entity_type, entity_id, changes=None, user_id=None, company_id=None):
+        response = await super().log_activity(
+            deal_id, action, entity_type, entity_id, changes=changes, user_id=user_id, company_id=company_id
+        )
+        entry = self.db.info["activity_log_pending"].pop()
+        activity_log = ActivityLog(**entry)
+        self.db.add(activity_log)
+        await self.db.flush()
+        return ActivityLogResponse.model_validate(activity_log)
+
+
+async def _create_deal(session, company_id, customer_id, log_cls):
+    service = DealService(session, company_id=company_id)
+    service.activity_log_service = log_cls(session, company_id=company_id)
+    deal = await service.create_deal(DealCreate(description="Bench deal", customer_id=customer_id))
+    await session.commit()
+    return deal
+
+
+async def _update_deal(session, company_id, deal_id, log_cls):
+    service = DealService(session, company_id=company_id)
+    service.activity_log_service = log_cls(session, company_id=company_id)
+    await service.update_deal(deal_id, DealUpdate(description="Updated", notes=f"Bench {uuid4().hex[:8]}", total_value=100.0))
+    await session.commit()
+
+
+async def _update_status(session, company_id, deal_id, log_cls):
+    service = DealService(session, company_id=company_id)
+    service.activity_log_service = log_cls(session, company_id=company_id)
+    await service.update_deal_status(deal_id, DealStatus.SOURCING)
+    await session.commit()
+
+
+async def _update_many(session, company_id, deal_ids, log_cls):
+    service = DealService(session, company_id=company_id)
+    service.activity_log_service = log_cls(session, company_id=company_id)
+    for deal_id in deal_ids:
+        await service.update_deal(deal_id, DealUpdate(notes=f"Bench batch {uuid4().hex[:8]}"))
+    await session.commit()
+
+
+async def _create_quote(session, company_id, customer_id, deal_id, log_cls):
+    service = QuoteService(session, company_id=company_id)
+    service.activity_log_service = log_cls(session, company_id=company_id)
+    await service.create_quote(
+        QuoteCreate(customer_id=customer_id, deal_id=deal_id, title="Bench quote", total_amount=100.0)
+    )
+    await session.commit()
+
+
+async def _bench(database_url: str, requests: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_id = uuid4()
+    customer_id = uuid4()
+
+    statements = 0
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def _count(conn, cursor, statement, parameters, context, executemany):
+        nonlocal statements
+        statements += 1
+
+    async with session_factory() as session:
+        session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+        session.add(Customer(
+            id=customer_id, company_id=company_id, customer_code="BENCH-CUST", company_name="Bench", country="AE"
+        ))
+        await session.commit()
+
+    print(f"{requests} requests per operation")
+    print(f"{'operation':>14} {'log writes':>11} {'statements':>11} {'p50 (ms)':>9}")
+    for log_name, log_cls in (("per-entry", PerEntryActivityLogService), ("buffered", ActivityLogService)):
+        results = {"create_deal": [], "update_deal": [], "update_status": [], "create_quote": [], "update_10": []}
+        deal_ids = []
+        for _ in range(requests):
+            async with session_factory() as session:
+                steps = (
+                    ("create_deal", lambda: _create_deal(session, company_id, customer_id, log_cls)),
+                    ("update_deal", lambda: _update_deal(session, company_id, deal.id, log_cls)),
+                    ("update_status", lambda: _update_status(session, company_id, deal.id, log_cls)),
+                    ("create_quote", lambda: _create_quote(session, company_id, customer_id, deal.id, log_cls)),
+                    ("update_10", lambda: _update_many(session, company_id, deal_ids[-10:], log_cls)),
+                )
+                for name, step in steps:
+                    before = statements
+                    start = time.perf_counter()
+                    outcome = await step()
+                    results[name].append(((time.perf_counter() - start) * 1000, statements - before))
+                    if name == "create_deal":
+                        deal = outcome
+                        deal_ids.append(deal.id)
+        for name, samples in results.items():
+            p50 = statistics.median(ms for ms, _ in samples)
+            count = statistics.median(n for _, n in samples)
+            print(f"{name:>14} {log_name:>11} {count:>11.0f} {p50:>9.3f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.requests))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""
+Benchmark: document search latency, text scan vs full text index.
+
+Seeds documents spread over tenants, each with a few sentences of
+extracted text (words drawn Zipf-like from a 2000-word vocabulary, plus
+a unique part number) and parsed_data with an rfq_number. Then times,
+for one tenant, DocumentService.search_documents (page of 20, with
+snippets) against the '%word%' ILIKE over extracted_text it replaces:
+
+  rare      a part number, in one document
+  mid       a word in about 0.5% of documents
+  common    a word in about 10% of documents
+  two       the mid and common words together
+  category  a mid word within one category
+  rfq       rfq_number prefix (parsed_data field index, no words)
+
+Uses a temporary SQLite database by default (FTS5); pass --database-url
+to run against PostgreSQL (search_vector).
+
+Usage:
+    python -m benchmarks.bench_document_search [--rows 1000000] [--tenants 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.company import Company
+from app.models.document import Document, DocumentCategory, DocumentStatus
+from app.services.document import DocumentService
+from app.services.pagination import paginate
+
+REPEATS = 5
+PAGE = 20
+WORDS_PER_DOCUMENT = 60
+
+SYLLABLES = ["al", "bar", "cor", "dan", "el", "far", "gul", "han", "ir", "jas",
+             "kan", "lam", "mar", "nor", "om", "pet", "qas", "ros", "sal", "tar"]
+VOCABULARY = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES[:5]]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+CATEGORIES = [DocumentCategory.RFQ, DocumentCategory.VENDOR_PROPOSAL, DocumentCategory.INVOICE,
+              DocumentCategory.CERTIFICATE, DocumentCategory.SPEC_SHEET]
+
+
+async def _seed(session: AsyncSession, company_ids, rows: int) -> None:
+    for company_id in company_ids:
+        session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+    await session.flush()
+    rng = random.Random(7)
+    batch = []
+    for i in range(rows):
+        words = rng.choices(VOCABULARY, weights=WEIGHTS, k=WORDS_PER_DOCUMENT)
+        batch.append({
+            "id": uuid4(),
+            "company_id": company_ids[i % len(company_ids)],
+            "entity_type": "Deal",
+            "entity_id": uuid4(),
+            "category": rng.choice(CATEGORIES),
+            "storage_bucket": "documents",
+            "storage_key": f"bench/{i}.pdf",
+            "original_filename": f"document_{i}.pdf",
+            "file_size_bytes": 1024,
+            "mime_type": "application/pdf",
+            "extracted_text": " ".join(words) + f". Part PN{i:07d}.",
+            "parsed_data": {"rfq_number": f"RFQ-{i:07d}", "customer_name": words[0].capitalize()},
+            "status": DocumentStatus.COMPLETED,
+        })
+        if len(batch) == 5000:
+            await session.execute(insert(Document), batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Document), batch)
+    await session.commit()
+    # Planner statistics, as a long-running database has them
+    await session.execute(text("ANALYZE"))
+    await session.commit()
+
+
+def _word_with_share(share: float) -> str:
+    """The vocabulary word closest to appearing in share of documents."""
+    total = sum(WEIGHTS)
+    best, best_error = VOCABULARY[0], 1.0
+    for word, weight in zip(VOCABULARY, WEIGHTS):
+        document_share = 1 - (1 - weight / total) ** WORDS_PER_DOCUMENT
+        if abs(document_share - share) < best_error:
+            best, best_error = word, abs(document_share - share)
+    return best
+
+
+async def _scan(session: AsyncSession, company_id, words, category=None) -> None:
+    query = select(Document).where(Document.company_id == company_id, Document.deleted_at.is_(None))
+    for word in words:
+        query = query.where(Document.extracted_text.ilike(f"%{word}%"))
+    if category:
+        query = query.where(Document.category == category)
+    (await session.execute(paginate(query, Document, 0, PAGE))).scalars().all()
+
+
+async def _median_ms(fetch) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await fetch()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def _bench(database_url: str, rows: int, tenants: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_ids = [uuid4() for _ in range(tenants)]
+
+    async with session_factory() as session:
+        start = time.perf_counter()
+        await _seed(session, company_ids, rows)
+        print(f"{rows} documents over {tenants} tenants (seeded in {time.perf_counter() - start:.0f}s)")
+
+        company_id = company_ids[0]
+        service = DocumentService(session, company_id=company_id)
+        mid, common = _word_with_share(0.005), _word_with_share(0.10)
+        rare = f"PN{len(company_ids) * 7:07d}"
+        cases = [
+            ("rare", [rare], None),
+            ("mid", [mid], None),
+            ("common", [common], None),
+            ("two", [mid, common], None),
+            ("category", [mid], DocumentCategory.INVOICE),
+        ]
+        print(f"{'query':>9} {'scan (ms)':>10} {'indexed (ms)':>13} {'results':>8}")
+        for name, words, category in cases:
+            scan_ms = await _median_ms(lambda: _scan(session, company_id, words, category))
+            indexed_ms = await _median_ms(
+                lambda: service.search_documents(q=" ".join(words), category=category, limit=PAGE)
+            )
+            documents, _ = await service.search_documents(q=" ".join(words), category=category, limit=PAGE)
+            print(f"{name:>9} {scan_ms:>10.1f} {indexed_ms:>13.1f} {len(documents):>8}")
+
+        rfq = f"rfq-{len(company_ids) * 7:07d}"
+        indexed_ms = await _median_ms(
+            lambda: service.search_documents(parsed_fields={"rfq_number": rfq}, limit=PAGE)
+        )
+        print(f"{'rfq':>9} {'':>10} {indexed_ms:>13.1f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_bench(args.database_url, args.rows, args.tenants))
+        return
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.rows, args.tenants))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark: document embedding backfill and similarity search.
+
+Seeds completed documents spread over tenants (text drawn Zipf-like from
+a 2000-word vocabulary, five extracted line items each), then times:
+
+  backfill      backfill_embeddings() over every document (documents/s)
+  documents     DocumentService.find_similar_documents for one tenant
+  line items    DocumentService.find_similar_line_items for one tenant
+
+Uses a temporary SQLite database by default, where candidates are scored
+in NumPy; pass --database-url to run against PostgreSQL (pgvector HNSW).
+
+Usage:
+    python -m benchmarks.bench_document_similarity [--rows 100000] [--tenants 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.company import Company
+from app.models.document import Document, DocumentCategory, DocumentStatus
+from app.services.document import DocumentService
+from app.services.embeddings import backfill_embeddings
+
+REPEATS = 5
+WORDS_PER_DOCUMENT = 60
+
+SYLLABLES = ["al", "bar", "cor", "dan", "el", "far", "gul", "han", "ir", "jas",
+             "kan", "lam", "mar", "nor", "om", "pet", "qas", "ros", "sal", "tar"]
+VOCABULARY = [a + b + c for a in SYLLABLES for b in SYLLABLES for c in SYLLABLES[:5]]
+WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+MATERIALS = ["carbon steel pipe", "stainless steel flange", "gate valve", "ball valve", "gasket",
+             "stud bolt", "elbow 90", "reducing tee", "pressure gauge", "control cable"]
+SPECS = ["API 5L grade B", "ASTM A105", "API 6D class 300", "ASME B16.5", "ASTM A193 B7",
+         "SCH 40", "SCH 80", "PN16", "IP65", "ISO 9001"]
+
+
+async def _seed(session: AsyncSession, company_ids, rows: int) -> None:
+    for company_id in company_ids:
+        session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+    await session.flush()
+    rng = random.Random(7)
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "id": uuid4(),
+            "company_id": company_ids[i % len(company_ids)],
+            "category": rng.choice([DocumentCategory.RFQ, DocumentCategory.VENDOR_PROPOSAL]),
+            "storage_bucket": "documents",
+            "storage_key": f"bench/{i}.pdf",
+            "original_filename": f"document_{i}.pdf",
+            "file_size_bytes": 1024,
+            "mime_type": "application/pdf",
+            "extracted_text": " ".join(rng.choices(VOCABULARY, weights=WEIGHTS, k=WORDS_PER_DOCUMENT)),
+            "parsed_data": {"line_items": [
+                {"description": rng.choice(MATERIALS), "material_spec": f"{rng.choice(SPECS)} {rng.randint(1, 24)} inch"}
+                for _ in range(5)
+            ]},
+            "status": DocumentStatus.COMPLETED,
+        })
+        if len(batch) == 5000:
+            await session.execute(insert(Document), batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Document), batch)
+    await session.commit()
+
+
+async def _median_ms(fetch) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await fetch()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def _bench(database_url: str, rows: int, tenants: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_ids = [uuid4() for _ in range(tenants)]
+
+    async with session_factory() as session:
+        await _seed(session, company_ids, rows)
+
+    start = time.perf_counter()
+    embedded = await backfill_embeddings(session_factory, batch_size=500)
+    elapsed = time.perf_counter() - start
+    print(f"{rows} documents over {tenants} tenants, {rows * 5} line items")
+    print(f"backfill: {embedded} documents in {elapsed:.0f}s ({embedded / elapsed:.0f} documents/s)")
+
+    async with session_factory() as session:
+        # Planner statistics, as a long-running database has them
+        await session.execute(text("ANALYZE"))
+        await session.commit()
+
+        company_id = company_ids[0]
+        service = DocumentService(session, company_id=company_id)
+        document_id = (await session.execute(
+            select(Document.id).where(Document.company_id == company_id).limit(1)
+        )).scalar()
+
+        documents_ms = await _median_ms(lambda: service.find_similar_documents(document_id, limit=10))
+        line_items_ms = await _median_ms(
+            lambda: service.find_similar_line_items("carbon steel pipe API 5L grade B 6 inch", limit=20)
+        )
+        print(f"{'query':>11} {'ms':>8}")
+        print(f"{'documents':>11} {documents_ms:>8.1f}")
+        print(f"{'line items':>11} {line_items_ms:>8.1f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_bench(args.database_url, args.rows, args.tenants))
+        return
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.rows, args.tenants))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Benchmark: upload latency with inline vs background document processing.
+
+Compares DocumentService.upload_and_process_document (parse + OCR + AI in the
+request) with DocumentService.submit_document (store, enqueue, return) on an
+in-memory storage backend and a throwaway SQLite database. Parsing and AI
+extraction are simulated with size-proportional delays so the numbers show
+what the request path waits on, not how fast pdfplumber is on this machine.
+
+Usage:
+    python -m benchmarks.bench_document_upload [--runs 5] [--ms-per-mb 40]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from unittest.mock import patch
+from uuid import uuid4
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import Base
+from app.models.company import Company
+from app.models.document import DocumentCategory
+from app.services.ai_extraction import AIExtractionService
+from app.services.document import DocumentService
+from app.services.document_parsing import DocumentParsingService
+from app.services.storage import StorageService
+from app.workers.document_pipeline import DocumentPipeline, LocalDocumentQueue
+
+SIZES_MB = (1, 5, 25)
+AI_LATENCY_S = 1.5
+
+
+class InMemoryStorage:
+    """Object store stand-in for StorageService, keeping objects in a dict."""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_file(self, file_content, filename, company_id, content_type):
+        key = f"{company_id}/{uuid4()}_{filename}"
+        self.objects[key] = file_content
+        return key
+
+    def download_file(self, storage_key):
+        return self.objects[storage_key]
+
+
+def _patches(storage: InMemoryStorage, ms_per_mb: float):
+    """Simulate parse cost proportional to size and a fixed AI round trip."""
+
+    def parse(file_content, mime_type):
+        time.sleep(len(file_content) / 1_000_000 * ms_per_mb / 1000)
+        return "x" * 5000
+
+    async def extract(self, extracted_text, category):
+        await asyncio.sleep(AI_LATENCY_S)
+        return {"data": {}, "confidence": 0.9}
+
+    return (
+        patch.object(StorageService, "__init__", lambda self: setattr(self, "bucket_name", "documents")),
+        patch.object(StorageService, "upload_file", lambda self, **kw: storage.upload_file(**kw)),
+        patch.object(StorageService, "download_file", lambda self, key: storage.download_file(key)),
+        patch.object(DocumentParsingService, "extract_text", staticmethod(parse)),
+        patch.object(DocumentParsingService, "extract_native_text", staticmethod(lambda c, m: (parse(c, m), []))),
+        patch.object(AIExtractionService, "__init__", lambda self: None),
+        patch.object(AIExtractionService, "extract_structured_data", extract),
+    )
+
+
+async def _bench(runs: int, ms_per_mb: float) -> None:
+    # Simulated parsers are patched in this process, so parse in threads
+    settings.PARSING_POOL_WORKERS = 0
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    storage = InMemoryStorage()
+    patches = _patches(storage, ms_per_mb)
+    for p in patches:
+        p.start()
+    try:
+        async with session_factory() as db:
+            company = Company(id=uuid4(), company_name="Bench", subdomain="bench", country="US", is_active=True)
+            db.add(company)
+            await db.commit()
+            company_id = company.id
+
+        queue = LocalDocumentQueue(DocumentPipeline(session_factory), concurrency=4)
+
+        print(f"{'size':>6} {'inline p50 (ms)':>16} {'submit p50 (ms)':>16} {'speedup':>8}")
+        for size_mb in SIZES_MB:
+            content = os.urandom(size_mb * 1_000_000)
+            inline, submit = [], []
+            for _ in range(runs):
+                async with session_factory() as db:
+                    service = DocumentService(db, company_id=company_id)
+                    start = time.perf_counter()
+                    await service.upload_and_process_document(
+                        file_content=content,
+                        filename="bench.pdf",
+                        mime_type="application/pdf",
+                        category=DocumentCategory.RFQ,
+                    )
+                    inline.append((time.perf_counter() - start) * 1000)
+
+                async with session_factory() as db:
+                    service = DocumentService(db, company_id=company_id)
+                    start = time.perf_counter()
+                    await service.submit_document(
+                        file_content=content,
+                        filename="bench.pdf",
+                        mime_type="application/pdf",
+                        category=DocumentCategory.RFQ,
+                        queue=queue,
+                    )
+                    submit.append((time.perf_counter() - start) * 1000)
+                await queue.drain()
+
+            inline_p50 = statistics.median(inline)
+            submit_p50 = statistics.median(submit)
+            print(f"{size_mb:>4}MB {inline_p50:>16.1f} {submit_p50:>16.1f} {inline_p50 / submit_p50:>7.1f}x")
+    finally:
+        for p in reversed(patches):
+            p.stop()
+        await engine.dispose()
+        os.unlink(db_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ms-per-mb", type=float, default=40.0, help="simulated parse cost")
+    args = parser.parse_args()
+    asyncio.run(_bench(args.runs, args.ms_per_mb))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: deep-page query latency of deal listing, offset vs cursor.
+
+An offset page makes the database produce and throw away every row
+before it, so latency grows with depth. A cursor page seeks past the
+previous page's last (created_at, id) and reads only the rows it
+returns.
+
+Times the page query DealService.list_deals runs (paginate() over one
+company's deals); the total count is identical in both paths and left
+out. Uses a temporary SQLite database by default, where the sort key is
+an expression and both paths scan, so the gap there is only the skipped
+rows. Pass --database-url to run against PostgreSQL, where the cursor
+seek is served by ix_deal_company_created.
+
+Usage:
+    python -m benchmarks.bench_keyset_pagination [--rows 100000] [--limit 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.company import Company
+from app.models.deal import Deal, DealStatus
+from app.services.pagination import Cursor, paginate
+
+DEPTHS = (0, 100, 1000)
+REPEATS = 5
+
+
+async def _seed(session: AsyncSession, company_id, rows: int) -> None:
+    session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+    await session.flush()
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    batch = []
+    for i in range(rows):
+        batch.append({
+            "id": uuid4(),
+            "company_id": company_id,
+            "deal_number": f"BENCH-{i:07d}",
+            "description": f"Bench deal {i}",
+            "status": DealStatus.RFQ_RECEIVED,
+            "currency": "AED",
+            "line_items": [],
+            # A few rows per second, so some created_at values tie
+            "created_at": start + timedelta(seconds=i // 3),
+            "updated_at": start,
+        })
+        if len(batch) == 5000:
+            await session.execute(insert(Deal), batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Deal), batch)
+    await session.commit()
+
+
+async def _fetch(session: AsyncSession, company_id, limit: int, skip: int = 0, cursor=None):
+    query = select(Deal).where(Deal.company_id == company_id, Deal.deleted_at.is_(None))
+    result = await session.execute(paginate(query, Deal, skip, limit, cursor))
+    return result.scalars().all()
+
+
+async def _cursor_at(session: AsyncSession, company_id, page: int, limit: int):
+    """The cursor a client holds when asking for page `page` (not timed)."""
+    if page == 0:
+        return None
+    (last,) = await _fetch(session, company_id, 1, skip=page * limit - 1)
+    return Cursor(last.created_at, last.id)
+
+
+async def _median_ms(fetch) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await fetch()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def _bench(database_url: str, rows: int, limit: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_id = uuid4()
+
+    async with session_factory() as session:
+        await _seed(session, company_id, rows)
+        print(f"{rows} deals, {limit} per page")
+        print(f"{'page':>6} {'offset (ms)':>12} {'cursor (ms)':>12}")
+        for page in DEPTHS:
+            if page * limit >= rows:
+                break
+            cursor = await _cursor_at(session, company_id, page, limit)
+            offset_ms = await _median_ms(lambda: _fetch(session, company_id, limit, skip=page * limit))
+            cursor_ms = await _median_ms(lambda: _fetch(session, company_id, limit, cursor=cursor))
+            print(f"{page:>6} {offset_ms:>12.1f} {cursor_ms:>12.1f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_bench(args.database_url, args.rows, args.limit))
+        return
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.rows, args.limit))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
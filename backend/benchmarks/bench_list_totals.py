@@ -0,0 +1,77 @@
+"""
+Benchmark: cost of a deal list's total by include_total mode.
+
+exact runs SELECT count(*) with the page's filters on every request;
+estimate reads the count cache (seeded by the first request, then kept
+current as deals are created and deleted); false skips the count.
+
+Times count_total() for one company's deals (unfiltered and by status)
+in a temporary SQLite database; the page query is the same in every
+mode and left out.
+
+Usage:
+    python -m benchmarks.bench_list_totals [--rows 100000] [--requests 20]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.deal import Deal, DealStatus
+from app.services.counts import TotalMode, count_total
+from benchmarks.bench_keyset_pagination import _seed
+
+
+async def _bench(database_url: str, rows: int, requests: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_id = uuid4()
+
+    async with session_factory() as session:
+        await _seed(session, company_id, rows)
+        query = select(Deal).where(Deal.company_id == company_id, Deal.deleted_at.is_(None))
+        cases = (
+            ("all", query, {}),
+            ("status", query.where(Deal.status == DealStatus.RFQ_RECEIVED), {"status": DealStatus.RFQ_RECEIVED}),
+        )
+
+        print(f"{rows} deals")
+        print(f"{'filter':>7} {'total':>9} {'p50 (ms)':>9}")
+        for name, filtered, filters in cases:
+            for mode in (TotalMode.EXACT, TotalMode.ESTIMATE, TotalMode.NONE):
+                timings = []
+                for _ in range(requests):
+                    start = time.perf_counter()
+                    await count_total(session, filtered, mode, Deal, company_id, filters)
+                    timings.append((time.perf_counter() - start) * 1000)
+                print(f"{name:>7} {mode.value:>9} {statistics.median(timings):>9.3f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.rows, args.requests))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
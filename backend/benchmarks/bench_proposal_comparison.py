@@ -0,0 +1,196 @@
+"""
+Benchmark: weighted proposal comparison for a deal.
+
+Seeds one deal with many line items and proposals quoted in several
+currencies, each pricing most of the lines, then times:
+
+  load          load_deal_proposals(): the deal's proposals and line matching
+  compare       VendorProposalService.get_proposal_comparison with the proposals cached,
+                a different set of weights each call
+  python loop   the same scores and line comparison computed proposal by proposal
+
+Usage:
+    python -m benchmarks.bench_proposal_comparison [--proposals 200] [--lines 500]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import Base
+from app.models.company import Company
+from app.models.deal import Deal, DealStatus
+from app.models.vendor import Vendor
+from app.models.vendor_proposal import VendorProposal, VendorProposalStatus
+from app.services.fx import get_rates
+from app.services.proposal_comparison import DEFAULT_WEIGHTS, SPEC_UNKNOWN, load_deal_proposals
+from app.services.vendor_proposal import VendorProposalService
+
+REPEATS = 5
+CURRENCIES = ["AED", "USD", "SAR", "EUR"]
+TERMS = ["Net 30", "Net 60", "100% advance", "30% advance, 70% net 60", "LC at sight", None]
+
+
+async def _seed(session: AsyncSession, company_id, proposals: int, lines: int):
+    session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+    await session.flush()
+    rng = random.Random(7)
+
+    deal_id = uuid4()
+    deal_lines = [{"description": f"Item {i} carbon steel pipe", "quantity": rng.randint(1, 500), "unit": "EA"}
+                  for i in range(lines)]
+    await session.execute(insert(Deal), [{
+        "id": deal_id,
+        "company_id": company_id,
+        "deal_number": "DEAL-BENCH",
+        "description": "Bench deal",
+        "status": DealStatus.SOURCING,
+        "currency": "AED",
+        "line_items": deal_lines,
+    }])
+
+    vendor_rows, proposal_rows = [], []
+    for i in range(proposals):
+        vendor_id = uuid4()
+        vendor_rows.append({
+            "id": vendor_id,
+            "company_id": company_id,
+            "vendor_code": f"VEND-{i:06d}",
+            "company_name": f"Vendor {i}",
+            "country": "UAE",
+            "credibility_score": rng.randint(20, 100),
+            "is_active": True,
+        })
+        currency = rng.choice(CURRENCIES)
+        quoted = [{"description": line["description"], "quantity": line["quantity"],
+                   "unit_price": round(rng.uniform(10, 1000), 2), "currency": currency}
+                  for line in deal_lines if rng.random() < 0.9]
+        rng.shuffle(quoted)
+        proposal_rows.append({
+            "id": uuid4(),
+            "company_id": company_id,
+            "deal_id": deal_id,
+            "vendor_id": vendor_id,
+            "status": VendorProposalStatus.RECEIVED,
+            "total_price": round(sum(item["unit_price"] * item["quantity"] for item in quoted), 2),
+            "currency": currency,
+            "lead_time_days": rng.randint(5, 90),
+            "payment_terms": rng.choice(TERMS),
+            "specs_match": rng.choice([True, False, None]),
+            "line_items": quoted,
+        })
+    await session.execute(insert(Vendor), vendor_rows)
+    await session.execute(insert(VendorProposal), proposal_rows)
+    await session.commit()
+    return deal_id
+
+
+def _python_scores(data, rates) -> tuple:
+    """Scores and per-line best prices of score_proposals(), one proposal at a time."""
+    n, m = len(data.proposals), len(data.lines)
+    totals, lines = [], []
+    for row in range(n):
+        rate = rates.get(data.currencies[data.total_currency[row]])
+        price = data.total_price[row]
+        totals.append(price * rate if rate and price == price else None)
+        lines.append([
+            data.line_prices[row, j] * rates[data.currencies[data.line_currency[row, j]]]
+            if data.line_prices[row, j] == data.line_prices[row, j] else None
+            for j in range(m)
+        ])
+    best_total = min(t for t in totals if t is not None)
+    leads = [v for v in data.lead_time.tolist() if v == v]
+    best_lead = min(leads) + 1
+    days = [v for v in data.payment_days.tolist() if v == v]
+    max_days = max(days) if days else 0
+    scores = []
+    for row in range(n):
+        lead, pay, spec = data.lead_time[row], data.payment_days[row], data.spec_match[row]
+        values = {
+            "price": best_total / totals[row] if totals[row] else 0.0,
+            "lead_time": best_lead / (lead + 1) if lead == lead else 0.0,
+            "credibility": data.credibility[row] / 100,
+            "spec_match": spec if spec == spec else SPEC_UNKNOWN,
+            "payment_terms": (pay / max_days if max_days else 1.0) if pay == pay else 0.0,
+        }
+        total = sum(DEFAULT_WEIGHTS.values())
+        scores.append(sum(DEFAULT_WEIGHTS[k] * v for k, v in values.items()) / total)
+    best_line = [min((lines[row][j] for row in range(n) if lines[row][j] is not None), default=None)
+                 for j in range(m)]
+    return scores, best_line
+
+
+async def _bench(database_url: str, proposals: int, lines: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_id = uuid4()
+
+    async with session_factory() as session:
+        deal_id = await _seed(session, company_id, proposals, lines)
+
+    async with session_factory() as session:
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            data = await load_deal_proposals(session, company_id, deal_id)
+            timings.append((time.perf_counter() - start) * 1000)
+        load_ms = statistics.median(timings)
+
+        service = VendorProposalService(session, company_id=company_id)
+        await service.get_proposal_comparison(deal_id)
+        timings = []
+        for i in range(REPEATS):
+            weights = {"price": 0.4 + 0.1 * i, "lead_time": 0.3 - 0.05 * i}
+            start = time.perf_counter()
+            await service.get_proposal_comparison(deal_id, weights=weights)
+            timings.append((time.perf_counter() - start) * 1000)
+        compare_ms = statistics.median(timings)
+
+        rates = await get_rates(data.currencies, base=settings.FX_BASE_CURRENCY)
+        start = time.perf_counter()
+        scores, best_line = _python_scores(data, rates)
+        loop_ms = (time.perf_counter() - start) * 1000
+        result = await service.get_proposal_comparison(deal_id)
+        assert np.allclose([p.score for p in result.proposals], scores, atol=1e-4)
+        assert np.allclose([line.best_unit_price for line in result.lines], best_line, atol=1e-3)
+
+    print(f"{proposals} proposals x {lines} line items in {len(CURRENCIES)} currencies")
+    print(f"{'step':>12} {'ms':>9}")
+    print(f"{'load':>12} {load_ms:>9.1f}")
+    print(f"{'compare':>12} {compare_ms:>9.1f}")
+    print(f"{'python loop':>12} {loop_ms:>9.1f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--proposals", type=int, default=200)
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_bench(args.database_url, args.proposals, args.lines))
+        return
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.proposals, args.lines))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: generating the next DEAL- number, history scan vs counter.
+
+The scan is the previous _generate_deal_number: load every deal number
+the company has issued and take the max in Python. The counter path is
+one UPDATE ... RETURNING on the company's sequence_counter row.
+
+Runs against a temporary SQLite database seeded with one company's deals.
+
+Usage:
+    python -m benchmarks.bench_sequence_numbers [--rows 100000] [--requests 50]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.deal import Deal
+from app.services.sequence import next_number
+from benchmarks.bench_keyset_pagination import _seed
+
+
+async def scan_next_number(db: AsyncSession, company_id) -> int:
+    """The previous implementation: parse every issued number."""
+    result = await db.execute(
+        select(Deal.deal_number).where(Deal.company_id == company_id).order_by(Deal.deal_number.desc())
+    )
+    max_num = 0
+    for deal_num in result.scalars().all():
+        if deal_num and deal_num.startswith("DEAL-"):
+            try:
+                max_num = max(max_num, int(deal_num.split("-")[1]))
+            except (ValueError, IndexError):
+                pass
+    return max_num + 1
+
+
+async def counter_next_number(db: AsyncSession, company_id) -> int:
+    return await next_number(db, Deal.deal_number, company_id, "DEAL-")
+
+
+async def _bench(database_url: str, rows: int, requests: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_id = uuid4()
+
+    async with session_factory() as session:
+        await _seed(session, company_id, rows)
+        # Seed the counter outside the timings (happens once per company)
+        await counter_next_number(session, company_id)
+
+        print(f"{rows} existing deals")
+        print(f"{'method':>8} {'p50 (ms)':>9}")
+        for name, allocate in (("scan", scan_next_number), ("counter", counter_next_number)):
+            timings = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                await allocate(session, company_id)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{name:>8} {statistics.median(timings):>9.3f}")
+        await session.rollback()
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.rows, args.requests))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
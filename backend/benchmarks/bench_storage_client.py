@@ -0,0 +1,111 @@
+"""
+Benchmark: per-request storage overhead, new client vs shared client.
+
+Every request used to build a StorageService: a new Minio client and
+connection pool, a bucket-location lookup, a bucket_exists round trip,
+and a fresh TCP connection for the actual call. The shared service is
+built once, checks the bucket at startup and reuses pooled keep-alive
+connections.
+
+MinIO is replaced by a local HTTP server that answers every request
+with 200 and a small body. The overhead measured is therefore client
+construction, connection setup and the extra round trip, not MinIO
+itself.
+
+Usage:
+    python -m benchmarks.bench_storage_client [--requests 500]
+"""
+import argparse
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from minio import Minio
+
+from app.config import settings
+from app.services import storage as storage_module
+from app.services.storage import StorageService, get_storage_service
+
+BODY = b"x" * 1024
+LOCATION = b'<LocationConstraint xmlns="http://s3.amazonaws.com/doc/2006-03-01/">us-east-1</LocationConstraint>'
+
+
+class StubS3Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Send headers and body in one segment (no delayed-ACK stalls)
+    wbufsize = 64 * 1024
+    disable_nagle_algorithm = True
+
+    def _respond(self, body: bytes) -> None:
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_HEAD(self):
+        self._respond(b"")
+
+    def do_GET(self):
+        # Clients without a configured region look the bucket's up first
+        self._respond(LOCATION if "location" in self.path else BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+def legacy_request(storage_key: str) -> bytes:
+    """The previous per-request pattern: new client, bucket check, download."""
+    client = Minio(
+        endpoint=settings.MINIO_ENDPOINT,
+        access_key=settings.MINIO_ACCESS_KEY,
+        secret_key=settings.MINIO_SECRET_KEY,
+        secure=settings.MINIO_SECURE,
+    )
+    client.bucket_exists(settings.MINIO_BUCKET)
+    response = client.get_object(settings.MINIO_BUCKET, storage_key)
+    try:
+        return response.read()
+    finally:
+        response.close()
+        response.release_conn()
+
+
+def shared_request(storage_key: str) -> bytes:
+    return get_storage_service().download_file(storage_key)
+
+
+def _time(request, requests: int) -> list:
+    timings = []
+    for i in range(requests):
+        start = time.perf_counter()
+        request(f"company/2026-10/{i}_bench.pdf")
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubS3Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    settings.MINIO_ENDPOINT = f"127.0.0.1:{server.server_port}"
+    settings.MINIO_SECURE = False
+    storage_module._storage_service = StorageService()
+    get_storage_service().ensure_bucket_exists()
+
+    try:
+        print(f"{'client':>8} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+        for name, request in (("per-req", legacy_request), ("shared", shared_request)):
+            timings = sorted(_time(request, args.requests))
+            p99 = timings[int(len(timings) * 0.99) - 1]
+            print(f"{name:>8} {statistics.median(timings):>9.2f} {p99:>9.2f}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
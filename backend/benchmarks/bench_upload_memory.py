@@ -0,0 +1,111 @@
+"""
+Benchmark: peak memory of concurrent 25MB uploads, buffered vs streamed.
+
+The buffered path is the old upload: read the whole UploadFile, then
+upload_file wraps the bytes in BytesIO. The streamed path passes the
+spooled file through an UploadReader into upload_stream, which MinIO
+consumes one multipart part at a time.
+
+MinIO is replaced by a client that reads parts the way put_object does
+and discards them, so only the application side is measured. Peak
+memory is Python allocations tracked by tracemalloc.
+
+Usage:
+    python -m benchmarks.bench_upload_memory [--uploads 8] [--size-mb 25]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import tracemalloc
+from uuid import uuid4
+
+from starlette.datastructures import UploadFile
+
+from app.services.storage import MIN_PART_SIZE, StorageService, UploadReader
+
+
+class DiscardingMinio:
+    """Minio stand-in that reads uploads part by part and throws them away."""
+
+    def put_object(self, bucket_name, object_name, data, length, part_size=0, content_type=None):
+        part_size = part_size or MIN_PART_SIZE
+        remaining = length
+        while remaining != 0:
+            part = data.read(part_size if remaining < 0 else min(part_size, remaining))
+            if not part:
+                break
+            if remaining > 0:
+                remaining -= len(part)
+
+
+def _storage() -> StorageService:
+    storage = StorageService.__new__(StorageService)
+    storage.client = DiscardingMinio()
+    storage.bucket_name = "documents"
+    return storage
+
+
+def _upload_file(content: bytes) -> UploadFile:
+    """An UploadFile spooled to disk, as Starlette hands it to the endpoint."""
+    spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spool.write(content)
+    spool.seek(0)
+    return UploadFile(file=spool, filename="bench.pdf")
+
+
+async def buffered(storage: StorageService, file: UploadFile) -> None:
+    content = await file.read()
+    await asyncio.to_thread(
+        storage.upload_file,
+        file_content=content,
+        filename=file.filename,
+        company_id=uuid4(),
+        content_type="application/pdf",
+    )
+
+
+async def streamed(storage: StorageService, file: UploadFile) -> None:
+    reader = UploadReader(file.file, max_size=100 * 1024 * 1024)
+    await asyncio.to_thread(
+        storage.upload_stream,
+        reader,
+        filename=file.filename,
+        company_id=uuid4(),
+        content_type="application/pdf",
+    )
+
+
+async def _peak_mb(upload, uploads: int, content: bytes) -> float:
+    storage = _storage()
+    files = [_upload_file(content) for _ in range(uploads)]
+    tracemalloc.start()
+    try:
+        await asyncio.gather(*(upload(storage, f) for f in files))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        for f in files:
+            f.file.close()
+    return peak / 1024 / 1024
+
+
+async def _bench(uploads: int, size_mb: int) -> None:
+    content = os.urandom(size_mb * 1024 * 1024)
+    print(f"{uploads} concurrent uploads of {size_mb}MB")
+    print(f"{'path':>10} {'peak (MB)':>10} {'per upload (MB)':>16}")
+    for name, upload in (("buffered", buffered), ("streamed", streamed)):
+        peak = await _peak_mb(upload, uploads, content)
+        print(f"{name:>10} {peak:>10.1f} {peak / uploads:>16.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=25)
+    args = parser.parse_args()
+    asyncio.run(_bench(args.uploads, args.size_mb))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Benchmark: incremental vendor metric updates and the batch recompute.
+
+Seeds one tenant with vendors and a history of decided proposals (some
+shipped and delivered), then times:
+
+  select        VendorProposalService.select_vendor on a deal with five proposals,
+                metric updates included
+  recompute     recompute_company_metrics() over the whole history
+
+Usage:
+    python -m benchmarks.bench_vendor_metrics [--vendors 10000] [--deals 50000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.company import Company
+from app.models.deal import Deal, DealStatus
+from app.models.vendor import Vendor
+from app.models.vendor_proposal import VendorProposal, VendorProposalStatus
+from app.services.vendor_metrics import recompute_company_metrics
+from app.services.vendor_proposal import VendorProposalService
+
+REPEATS = 5
+PROPOSALS_PER_DEAL = 5
+BATCH = 5000
+
+
+async def _insert(session: AsyncSession, model, rows) -> None:
+    for start in range(0, len(rows), BATCH):
+        await session.execute(insert(model), rows[start:start + BATCH])
+
+
+async def _seed(session: AsyncSession, company_id, vendors: int, deals: int):
+    session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+    await session.flush()
+    rng = random.Random(7)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+    vendor_ids = [uuid4() for _ in range(vendors)]
+    await _insert(session, Vendor, [{
+        "id": vendor_id,
+        "company_id": company_id,
+        "vendor_code": f"VEND-{i:06d}",
+        "company_name": f"Vendor {i}",
+        "country": "UAE",
+        "credibility_score": 50,
+        "is_active": True,
+    } for i, vendor_id in enumerate(vendor_ids)])
+
+    deal_rows, proposal_rows, open_deals = [], [], []
+    for i in range(deals):
+        deal_id = uuid4()
+        created = start + timedelta(hours=i)
+        history = i < deals - REPEATS
+        deal_rows.append({
+            "id": deal_id,
+            "company_id": company_id,
+            "deal_number": f"DEAL-{i:06d}",
+            "description": "Bench deal",
+            "status": DealStatus.DELIVERED if history else DealStatus.SOURCING,
+            "currency": "AED",
+            "line_items": [{"description": "Pipe", "required_delivery_date": (created + timedelta(days=30)).date().isoformat()}],
+        })
+        if not history:
+            open_deals.append(deal_id)
+        for rank, vendor_id in enumerate(rng.sample(vendor_ids, PROPOSALS_PER_DEAL)):
+            selected = history and rank == 0
+            decided = created + timedelta(days=3)
+            proposal_rows.append({
+                "id": uuid4(),
+                "company_id": company_id,
+                "deal_id": deal_id,
+                "vendor_id": vendor_id,
+                "status": (VendorProposalStatus.SELECTED if selected
+                           else VendorProposalStatus.REJECTED if history else VendorProposalStatus.RECEIVED),
+                "total_price": 1000,
+                "currency": "AED",
+                "lead_time_days": 21,
+                "specs_match": rng.random() < 0.8,
+                "decided_at": decided if history else None,
+                "shipped_at": decided + timedelta(days=rng.randint(10, 40)) if selected else None,
+                "delivered_at": decided + timedelta(days=rng.randint(20, 50)) if selected else None,
+            })
+    await _insert(session, Deal, deal_rows)
+    await _insert(session, VendorProposal, proposal_rows)
+    await session.commit()
+    return open_deals, [row["id"] for row in proposal_rows if row["deal_id"] in set(open_deals)]
+
+
+async def _bench(database_url: str, vendors: int, deals: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_id = uuid4()
+
+    async with session_factory() as session:
+        open_deals, open_proposals = await _seed(session, company_id, vendors, deals)
+
+    timings = []
+    for deal_index in range(REPEATS):
+        proposal_id = open_proposals[deal_index * PROPOSALS_PER_DEAL]
+        async with session_factory() as session:
+            service = VendorProposalService(session, company_id=company_id)
+            start = time.perf_counter()
+            await service.select_vendor(proposal_id)
+            await session.commit()
+            timings.append((time.perf_counter() - start) * 1000)
+    select_ms = statistics.median(timings)
+
+    async with session_factory() as session:
+        start = time.perf_counter()
+        updated = await recompute_company_metrics(session, company_id)
+        await session.commit()
+        recompute_s = time.perf_counter() - start
+
+    print(f"{vendors} vendors, {deals * PROPOSALS_PER_DEAL} proposals over {deals} deals")
+    print(f"select_vendor with metric updates: {select_ms:.1f}ms")
+    print(f"recompute: {updated} vendors in {recompute_s:.2f}s")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vendors", type=int, default=10_000)
+    parser.add_argument("--deals", type=int, default=50_000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_bench(args.database_url, args.vendors, args.deals))
+        return
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.vendors, args.deals))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
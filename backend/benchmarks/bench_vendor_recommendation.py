@@ -0,0 +1,214 @@
+"""
+Benchmark: vendor recommendations for a deal.
+
+Seeds one tenant with vendors (1-4 categories and 0-2 certifications
+each, from a few hundred distinct tags), decided and priced proposals
+over past deals, and a deal with ten line items, then times:
+
+  load          load_vendor_features(): the tenant's vendors, tags and proposal stats
+  recommend     VendorService.recommend_vendors with the features cached
+  python loop   the same scores computed vendor by vendor in Python, for reference
+
+Usage:
+    python -m benchmarks.bench_vendor_recommendation [--vendors 100000] [--proposals 200000]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.company import Company
+from app.models.deal import Deal, DealStatus
+from app.models.vendor import Vendor
+from app.models.vendor_proposal import VendorProposal, VendorProposalStatus
+from app.models.vendor_tag import CATEGORY, CERTIFICATION, VendorTag
+from app.services.vendor import VendorService
+from app.services.vendor_recommendation import (
+    METRIC_COLUMNS,
+    WEIGHTS,
+    get_vendor_feature_cache,
+    line_item_tokens,
+    load_vendor_features,
+)
+
+REPEATS = 5
+DEALS = 20_000
+BATCH = 5000
+
+MATERIALS = ["carbon steel pipe", "stainless steel pipe", "flange", "gate valve", "ball valve",
+             "check valve", "gasket", "stud bolt", "elbow", "tee", "reducer", "pressure gauge",
+             "control cable", "power cable", "cable tray", "pump", "compressor", "heat exchanger"]
+GRADES = ["", "seamless", "welded", "forged", "cast", "galvanized", "coated", "high pressure",
+          "low temperature", "offshore", "subsea", "marine", "fire rated", "explosion proof"]
+CATEGORIES = sorted({f"{grade} {material}".strip() for grade in GRADES for material in MATERIALS})
+CERTIFICATIONS = ["iso 9001", "iso 14001", "api 5l", "api 6d", "api 6a", "asme u", "ped", "atex",
+                  "iecex", "nace mr0175", "ce", "ul", "dnv", "lloyds", "abs", "bv"]
+
+
+async def _insert(session: AsyncSession, model, rows) -> None:
+    for start in range(0, len(rows), BATCH):
+        await session.execute(insert(model), rows[start:start + BATCH])
+
+
+async def _seed(session: AsyncSession, company_id, vendors: int, proposals: int):
+    session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+    await session.flush()
+    rng = random.Random(7)
+
+    vendor_rows, tag_rows = [], []
+    for i in range(vendors):
+        vendor_id = uuid4()
+        categories = rng.sample(CATEGORIES, rng.randint(1, 4))
+        certifications = rng.sample(CERTIFICATIONS, rng.randint(0, 2))
+        vendor_rows.append({
+            "id": vendor_id,
+            "company_id": company_id,
+            "vendor_code": f"VEND-{i:06d}",
+            "company_name": f"Vendor {i}",
+            "country": "UAE",
+            "product_categories": categories,
+            "certifications": certifications,
+            "credibility_score": rng.randint(20, 100),
+            "on_time_delivery_rate": rng.choice([None, rng.random()]),
+            "avg_lead_time_days": rng.choice([None, rng.randint(5, 90)]),
+            "is_active": True,
+        })
+        tag_rows.extend({"vendor_id": vendor_id, "company_id": company_id, "kind": CATEGORY, "value": v}
+                        for v in categories)
+        tag_rows.extend({"vendor_id": vendor_id, "company_id": company_id, "kind": CERTIFICATION, "value": v}
+                        for v in certifications)
+    await _insert(session, Vendor, vendor_rows)
+    await _insert(session, VendorTag, tag_rows)
+
+    deal_rows = [{
+        "id": uuid4(),
+        "company_id": company_id,
+        "deal_number": f"DEAL-{i:06d}",
+        "description": "Bench deal",
+        "status": DealStatus.CLOSED,
+        "currency": "AED",
+        "line_items": [],
+    } for i in range(DEALS)]
+    target = {
+        "id": uuid4(),
+        "company_id": company_id,
+        "deal_number": "DEAL-TARGET",
+        "description": "Bench deal",
+        "status": DealStatus.RFQ_RECEIVED,
+        "currency": "AED",
+        "line_items": [
+            {"description": f"{rng.choice(GRADES)} {rng.choice(MATERIALS)}",
+             "material_spec": f"{rng.choice(CERTIFICATIONS).upper()} {rng.randint(1, 24)} inch",
+             "quantity": 10, "unit": "EA"}
+            for _ in range(10)
+        ],
+    }
+    await _insert(session, Deal, deal_rows + [target])
+
+    statuses = [VendorProposalStatus.SELECTED, VendorProposalStatus.REJECTED, VendorProposalStatus.RECEIVED]
+    proposal_rows = [{
+        "id": uuid4(),
+        "company_id": company_id,
+        "deal_id": rng.choice(deal_rows)["id"],
+        "vendor_id": rng.choice(vendor_rows)["id"],
+        "total_price": round(rng.uniform(50_000, 150_000), 2),
+        "currency": "AED",
+        "status": rng.choices(statuses, weights=[1, 3, 2])[0],
+    } for _ in range(proposals)]
+    await _insert(session, VendorProposal, proposal_rows)
+    await session.commit()
+    return target
+
+
+def _python_scores(features, line_items) -> list:
+    """The scores of score_vendors(), one vendor at a time."""
+    lines = line_item_tokens(line_items)
+    categories, certifications = features.categories, features.certifications
+    required = {t for t, tokens in enumerate(certifications.tokens)
+                if tokens and any(tokens <= line for line in lines)}
+    scores = []
+    for row in range(len(features)):
+        components = dict(zip(METRIC_COLUMNS, features.metrics[row].tolist()))
+        own = categories.entry_tag[categories.indptr[row]:categories.indptr[row + 1]].tolist()
+        covered = sum(1 for line in lines if any(categories.tokens[t] <= line for t in own))
+        components["category_match"] = covered / len(lines)
+        held = certifications.entry_tag[certifications.indptr[row]:certifications.indptr[row + 1]].tolist()
+        if required:
+            components["certification_match"] = len(required.intersection(held)) / len(required)
+        total = sum(WEIGHTS[name] for name in components)
+        scores.append(sum(WEIGHTS[name] * value for name, value in components.items()) / total)
+    return scores
+
+
+async def _median_ms(fetch) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await fetch()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def _bench(database_url: str, vendors: int, proposals: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_id = uuid4()
+
+    async with session_factory() as session:
+        target = await _seed(session, company_id, vendors, proposals)
+
+    async with session_factory() as session:
+        load_ms = await _median_ms(lambda: load_vendor_features(session, company_id))
+        service = VendorService(session, company_id=company_id)
+        await service.recommend_vendors(target["id"])
+        assert get_vendor_feature_cache().get(company_id) is not None
+        recommend_ms = await _median_ms(lambda: service.recommend_vendors(target["id"], limit=20))
+
+        features = get_vendor_feature_cache().get(company_id)
+        start = time.perf_counter()
+        scores = _python_scores(features, target["line_items"])
+        loop_ms = (time.perf_counter() - start) * 1000
+        result = await service.recommend_vendors(target["id"], limit=20)
+        expected = np.sort(np.array(scores))[::-1][:20]
+        assert np.allclose([item.score for item in result.items], expected, atol=1e-4)
+
+    print(f"{vendors} vendors, {proposals} proposals, deal with {len(target['line_items'])} line items")
+    print(f"{'step':>12} {'ms':>9}")
+    print(f"{'load':>12} {load_ms:>9.1f}")
+    print(f"{'recommend':>12} {recommend_ms:>9.1f}")
+    print(f"{'python loop':>12} {loop_ms:>9.1f}")
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--vendors", type=int, default=100_000)
+    parser.add_argument("--proposals", type=int, default=200_000)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_bench(args.database_url, args.vendors, args.proposals))
+        return
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.vendors, args.proposals))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Benchmark: vendor search, tag filters and autocomplete, scan vs index.
+
+Seeds vendors spread over tenants, then times for one tenant:
+
+  search    name/code substring: '%q%' ILIKE (before) vs
+            VendorService.search_vendors (trigram index), for a unique
+            code fragment and a name word
+  category  product category filter: LIKE over the JSON text (before) vs
+            the vendor_tags lookup search_vendors_advanced uses, for a
+            category of a sixth of vendors and one of the long tail
+  prefix    autocomplete: ILIKE 'q%' on name or code (before) vs
+            VendorService.autocomplete_vendors (lower() prefix indexes)
+
+Each "before" query is what the service ran prior to the indexes, total
+count included where the service counts. Uses a temporary SQLite
+database by default (FTS5 trigram table); pass --database-url to run
+against PostgreSQL (pg_trgm). The trigram index spans all tenants, so
+a term matching a large share of every tenant's vendors can be slower
+through it than scanning the one tenant's rows.
+
+Usage:
+    python -m benchmarks.bench_vendor_search [--rows 1000000] [--tenants 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+from uuid import uuid4
+
+from sqlalchemy import String, and_, cast, func, insert, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models.company import Company
+from app.models.vendor import Vendor
+from app.models.vendor_tag import VendorTag
+from app.schemas.vendor import VendorResponse
+from app.services.search import vendor_tag_rows
+from app.services.vendor import VendorService
+
+REPEATS = 5
+
+SYLLABLES = ["al", "bar", "cor", "dan", "el", "far", "gul", "han", "ir", "jas",
+             "kan", "lam", "mar", "nor", "om", "pet", "qas", "ros", "sal", "tar"]
+# 400 name words, so a word is in about 0.75% of names
+WORDS = [(a + b).capitalize() for a in SYLLABLES for b in SYLLABLES]
+# 12 common categories and a long tail
+CATEGORIES = ["Steel Pipes", "Valves", "Flanges", "Fittings", "Gaskets", "Pumps", "Cables", "Instruments",
+              "Fasteners", "Coatings", "Compressors", "Heat Exchangers"] + [f"{word} Parts" for word in WORDS[:100]]
+CERTIFICATIONS = ["ISO 9001", "ISO 14001", "API 5L", "API 6D", "ASME", "CE"]
+
+
+async def _seed(session: AsyncSession, company_ids, rows: int) -> None:
+    for company_id in company_ids:
+        session.add(Company(id=company_id, company_name="Bench", subdomain=f"bench-{company_id.hex[:8]}"))
+    await session.flush()
+    rng = random.Random(7)
+    vendors, tags = [], []
+    for i in range(rows):
+        vendor = Vendor(
+            id=uuid4(),
+            company_id=company_ids[i % len(company_ids)],
+            vendor_code=f"VEND-{i:07d}",
+            company_name=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.choice(WORDS)} {i:07d}",
+            country="UAE",
+            product_categories=rng.sample(CATEGORIES[:12], 2) + rng.sample(CATEGORIES[12:], 1),
+            certifications=rng.sample(CERTIFICATIONS, 2),
+            credibility_score=rng.randint(0, 100),
+            is_active=True,
+        )
+        vendors.append({column.key: getattr(vendor, column.key) for column in Vendor.__table__.columns
+                        if getattr(vendor, column.key) is not None})
+        tags.extend(vendor_tag_rows(vendor))
+        if len(vendors) == 5000:
+            await session.execute(insert(Vendor), vendors)
+            await session.execute(insert(VendorTag), tags)
+            vendors, tags = [], []
+    if vendors:
+        await session.execute(insert(Vendor), vendors)
+        await session.execute(insert(VendorTag), tags)
+    await session.commit()
+    # Planner statistics, as a long-running database has them
+    await session.execute(text("ANALYZE"))
+    await session.commit()
+
+
+def _active(company_id):
+    return and_(Vendor.company_id == company_id, Vendor.deleted_at.is_(None), Vendor.is_active == True)
+
+
+async def _scan_search(session: AsyncSession, company_id, q: str) -> None:
+    match = or_(Vendor.company_name.ilike(f"%{q}%"), Vendor.vendor_code.ilike(f"%{q}%"))
+    await session.execute(select(func.count(Vendor.id)).where(_active(company_id), match))
+    vendors = (await session.execute(
+        select(Vendor).where(_active(company_id), match).order_by(Vendor.created_at.desc()).limit(100)
+    )).scalars().all()
+    [VendorResponse.from_orm(v) for v in vendors]
+
+
+async def _scan_category(session: AsyncSession, company_id, category: str) -> None:
+    match = cast(Vendor.product_categories, String).ilike(f"%{category}%")
+    await session.execute(select(func.count(Vendor.id)).where(_active(company_id), match))
+    vendors = (await session.execute(
+        select(Vendor).where(_active(company_id), match)
+        .order_by(Vendor.credibility_score.desc(), Vendor.created_at.desc()).limit(100)
+    )).scalars().all()
+    [VendorResponse.from_orm(v) for v in vendors]
+
+
+async def _scan_prefix(session: AsyncSession, company_id, prefix: str) -> None:
+    match = or_(Vendor.company_name.ilike(f"{prefix}%"), Vendor.vendor_code.ilike(f"{prefix}%"))
+    (await session.execute(
+        select(Vendor.id, Vendor.vendor_code, Vendor.company_name).where(_active(company_id), match)
+        .order_by(func.lower(Vendor.company_name)).limit(10)
+    )).all()
+
+
+async def _median_ms(fetch) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        await fetch()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+async def _bench(database_url: str, rows: int, tenants: int) -> None:
+    engine = create_async_engine(database_url, poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    company_ids = [uuid4() for _ in range(tenants)]
+
+    async with session_factory() as session:
+        start = time.perf_counter()
+        await _seed(session, company_ids, rows)
+        print(f"{rows} vendors over {tenants} tenants (seeded in {time.perf_counter() - start:.0f}s)")
+
+        company_id = company_ids[0]
+        service = VendorService(session, company_id=company_id)
+        cases = [
+            ("search", "rare", lambda: _scan_search(session, company_id, "0012340"),
+             lambda: service.search_vendors("0012340")),
+            ("search", "word", lambda: _scan_search(session, company_id, "gulmar"),
+             lambda: service.search_vendors("gulmar")),
+            ("category", "common", lambda: _scan_category(session, company_id, "heat exchangers"),
+             lambda: service.search_vendors_advanced(category="heat exchangers")),
+            ("category", "tail", lambda: _scan_category(session, company_id, "albar parts"),
+             lambda: service.search_vendors_advanced(category="albar parts")),
+            ("prefix", "word", lambda: _scan_prefix(session, company_id, "gulmar"),
+             lambda: service.autocomplete_vendors("gulmar")),
+            ("prefix", "code", lambda: _scan_prefix(session, company_id, "vend-00012"),
+             lambda: service.autocomplete_vendors("vend-00012")),
+        ]
+        print(f"{'query':>9} {'term':>11} {'scan (ms)':>10} {'indexed (ms)':>13}")
+        for name, term, scan, indexed in cases:
+            scan_ms = await _median_ms(scan)
+            indexed_ms = await _median_ms(indexed)
+            print(f"{name:>9} {term:>11} {scan_ms:>10.1f} {indexed_ms:>13.1f}")
+
+    await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--tenants", type=int, default=20)
+    parser.add_argument("--database-url", default=None)
+    args = parser.parse_args()
+
+    if args.database_url:
+        asyncio.run(_bench(args.database_url, args.rows, args.tenants))
+        return
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    try:
+        asyncio.run(_bench(f"sqlite+aiosqlite:///{path}", args.rows, args.tenants))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Load test: /api/deals latency while document uploads are being processed.
+
+Drives the real FastAPI app in-process (one event loop, like one uvicorn
+worker) with a steady stream of GET /api/deals requests, first idle and then
+with concurrent uploads of a large spreadsheet whose parsing is genuinely
+CPU-bound (openpyxl). AI extraction is replaced with a non-blocking sleep and
+storage with an in-memory dict; the database is a throwaway SQLite file.
+
+Run once with the parsing pool and once with PARSING_POOL_WORKERS=0 (parse in
+a thread, sharing the GIL with the event loop) to compare:
+
+    python -m benchmarks.load_deals_during_uploads --workers 2
+    python -m benchmarks.load_deals_during_uploads --workers 0
+"""
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import tempfile
+import time
+from unittest.mock import patch
+from uuid import uuid4
+
+import httpx
+from openpyxl import Workbook
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import Base, get_db
+from app.deps import get_current_user_full
+from app.main import create_app
+from app.models.company import Company
+from app.models.deal import Deal, DealStatus
+from app.services import parsing_pool
+from app.services.ai_extraction import AIExtractionService
+from app.services.storage import StorageService
+from app.workers.document_pipeline import DocumentPipeline, LocalDocumentQueue, get_document_queue
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+def _spreadsheet(rows: int) -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    for i in range(rows):
+        sheet.append([f"Item {i}", "API 5L X52 seamless pipe", i % 500, "MT", 1234.5 + i])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def _poll_deals(client: httpx.AsyncClient, duration: float, interval: float):
+    latencies = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/api/deals", params={"limit": 20})
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _upload_loop(client: httpx.AsyncClient, queue: LocalDocumentQueue, content: bytes, count: int):
+    for i in range(count):
+        response = await client.post(
+            "/api/documents/upload",
+            files={"file": (f"bom_{i}.xlsx", content, XLSX_MIME)},
+            data={"category": "rfq"},
+        )
+        response.raise_for_status()
+    await queue.drain()
+
+
+async def _run(args) -> None:
+    settings.PARSING_POOL_WORKERS = args.workers
+
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}", poolclass=NullPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    company_id = uuid4()
+    async with session_factory() as db:
+        db.add(Company(id=company_id, company_name="Load", subdomain="load", country="US", is_active=True))
+        for i in range(200):
+            db.add(Deal(
+                company_id=company_id,
+                deal_number=f"DEAL-{i:05d}",
+                description=f"Load test deal {i}",
+                status=DealStatus.RFQ_RECEIVED,
+                currency="AED",
+                line_items=[],
+            ))
+        await db.commit()
+
+    objects = {}
+
+    def upload_file(self, file_content, filename, company_id, content_type):
+        key = f"{company_id}/{uuid4()}_{filename}"
+        objects[key] = file_content
+        return key
+
+    async def extract_structured_data(self, extracted_text, category):
+        await asyncio.sleep(0.5)
+        return {"data": {}, "confidence": 0.9}
+
+    queue = LocalDocumentQueue(DocumentPipeline(session_factory), concurrency=args.uploads)
+
+    async def override_get_db():
+        async with session_factory() as session:
+            yield session
+
+    async def override_current_user():
+        return {"user_id": uuid4(), "company_id": company_id, "email": "load@test", "role": "admin"}
+
+    app = create_app()
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user_full] = override_current_user
+    app.dependency_overrides[get_document_queue] = lambda: queue
+
+    content = _spreadsheet(args.rows)
+    patches = (
+        patch.object(StorageService, "__init__", lambda self: setattr(self, "bucket_name", "documents")),
+        patch.object(StorageService, "upload_file", upload_file),
+        patch.object(StorageService, "download_file", lambda self, key: objects[key]),
+        patch.object(AIExtractionService, "__init__", lambda self: None),
+        patch.object(AIExtractionService, "extract_structured_data", extract_structured_data),
+    )
+    for p in patches:
+        p.start()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            # Warm up (and start the pool's worker processes)
+            await _poll_deals(client, 0.5, args.interval)
+            await parsing_pool.run_in_parsing_pool(len, b"")
+
+            idle = await _poll_deals(client, args.duration, args.interval)
+
+            uploads = asyncio.gather(*(
+                _upload_loop(client, queue, content, args.per_client) for _ in range(args.uploads)
+            ))
+            loaded = await _poll_deals(client, args.duration, args.interval)
+            await uploads
+
+        print(f"parsing pool workers: {args.workers}, spreadsheet: {len(content) / 1e6:.1f}MB")
+        print(f"{'phase':>14} {'requests':>9} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+        for name, samples in (("idle", idle), ("during upload", loaded)):
+            print(
+                f"{name:>14} {len(samples):>9} {statistics.median(samples):>9.1f} "
+                f"{_percentile(samples, 99):>9.1f} {max(samples):>9.1f}"
+            )
+    finally:
+        for p in reversed(patches):
+            p.stop()
+        parsing_pool.shutdown_parsing_pool()
+        await engine.dispose()
+        os.unlink(db_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=settings.PARSING_POOL_WORKERS)
+    parser.add_argument("--uploads", type=int, default=2, help="concurrent uploaders")
+    parser.add_argument("--per-client", type=int, default=3, help="uploads per uploader")
+    parser.add_argument("--rows", type=int, default=20000, help="spreadsheet rows")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per phase")
+    parser.add_argument("--interval", type=float, default=0.01, help="pause between requests")
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,3 +3,6 @@ CREATE EXTENSION IF NOT EXISTS vector;
 
 -- Enable UUID extension
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+
+-- Enable trigram matching (vendor/customer search indexes)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
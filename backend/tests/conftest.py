@@ -215,6 +215,45 @@ def mock_storage_service(monkeypatch):
         self.client.bucket_exists = Mock(return_value=True)
 
     monkeypatch.setattr("app.services.storage.StorageService.__init__", mock_storage_init)
+    monkeypatch.setattr("app.services.storage._storage_service", None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_extraction_cache(monkeypatch):
+    """Give each test its own AI extraction cache."""
+    monkeypatch.setattr("app.services.extraction_cache._cache", None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_principal_cache(monkeypatch):
+    """Give each test its own principal cache."""
+    monkeypatch.setattr("app.services.principal_cache._cache", None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_count_cache(monkeypatch):
+    """Give each test its own list count cache."""
+    monkeypatch.setattr("app.services.counts._cache", None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_comparison_cache(monkeypatch):
+    """Give each test its own proposal comparison cache."""
+    monkeypatch.setattr("app.services.proposal_comparison._cache", None)
+
+
+@pytest.fixture(autouse=True)
+def fresh_sequence_allocator(monkeypatch):
+    """Give each test its own number block allocator."""
+    monkeypatch.setattr("app.services.sequence._allocator", None)
+
+
+@pytest.fixture(autouse=True)
+def inline_parsing_pool(monkeypatch):
+    """Parse in a thread so patched parsing functions (not picklable) still apply."""
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "PARSING_POOL_WORKERS", 0)
 
 
 @pytest_asyncio.fixture
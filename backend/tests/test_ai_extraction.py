@@ -1,9 +1,18 @@
 """Tests for AI Extraction Service - Claude integration."""
 import pytest
 import json
-from unittest.mock import patch, Mock
-
-from app.services.ai_extraction import AIExtractionService, AIExtractionError
+from uuid import uuid4
+from unittest.mock import patch, Mock, AsyncMock
+
+from app.services import metrics
+from app.services.ai_extraction import (
+    AIExtractionService,
+    AIExtractionError,
+    close_anthropic_client,
+    get_anthropic_client,
+)
+from app.services.document import DocumentService
+from app.services.extraction_cache import ExtractionCache
 from app.models.document import DocumentCategory
 
 
@@ -13,12 +22,14 @@ class TestAIExtractionService:
     @pytest.fixture
     def ai_service(self):
         """Create AI service with mocked Anthropic client."""
-        with patch('app.services.ai_extraction.Anthropic'):
+        with patch('app.services.ai_extraction.AsyncAnthropic'):
             service = AIExtractionService()
             service.client = Mock()
+            service.client.messages.create = AsyncMock()
             return service
 
-    def test_extract_rfq_data(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_rfq_data(self, ai_service):
         """Test extracting data from RFQ document."""
         extracted_data = {
             "data": {
@@ -38,7 +49,7 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps(extracted_data))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="RFQ from ABC Corporation requesting 100 pieces of steel pipe",
             category=DocumentCategory.RFQ
         )
@@ -47,7 +58,8 @@ class TestAIExtractionService:
         assert result["confidence"] == 0.92
         assert len(result["data"]["line_items"]) == 2
 
-    def test_extract_vendor_proposal_data(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_vendor_proposal_data(self, ai_service):
         """Test extracting data from vendor proposal."""
         extracted_data = {
             "data": {
@@ -64,7 +76,7 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps(extracted_data))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="Vendor proposal: Quality Suppliers quoting 75000 AED",
             category=DocumentCategory.VENDOR_PROPOSAL
         )
@@ -73,7 +85,8 @@ class TestAIExtractionService:
         assert result["data"]["total_price"] == 75000
         assert result["confidence"] == 0.88
 
-    def test_extract_certificate_data(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_certificate_data(self, ai_service):
         """Test extracting data from certificate document."""
         extracted_data = {
             "data": {
@@ -89,7 +102,7 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps(extracted_data))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="ISO 9001 Certificate Number ISO-2024-001 valid until 2027-12-31",
             category=DocumentCategory.CERTIFICATE
         )
@@ -98,7 +111,8 @@ class TestAIExtractionService:
         assert result["data"]["expiry_date"] == "2027-12-31"
         assert result["confidence"] == 0.95
 
-    def test_extract_with_low_confidence(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_with_low_confidence(self, ai_service):
         """Test extraction with low confidence score."""
         extracted_data = {
             "data": {
@@ -111,14 +125,15 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps(extracted_data))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="Blurry scanned document with unclear text",
             category=DocumentCategory.RFQ
         )
 
         assert result["confidence"] == 0.45
 
-    def test_extract_with_markdown_json(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_with_markdown_json(self, ai_service):
         """Test extraction when Claude returns JSON wrapped in markdown."""
         json_data = {
             "data": {"customer": "Test"},
@@ -130,36 +145,39 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=markdown_response)]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="Test document",
             category=DocumentCategory.RFQ
         )
 
         assert result["data"]["customer"] == "Test"
 
-    def test_extract_invalid_json_response(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_invalid_json_response(self, ai_service):
         """Test handling of invalid JSON from Claude."""
         mock_message = Mock()
         mock_message.content = [Mock(text="Not valid JSON")]
         ai_service.client.messages.create.return_value = mock_message
 
         with pytest.raises(AIExtractionError, match="Could not parse JSON"):
-            ai_service.extract_structured_data(
+            await ai_service.extract_structured_data(
                 extracted_text="Test",
                 category=DocumentCategory.RFQ
             )
 
-    def test_extract_with_timeout(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_with_timeout(self, ai_service):
         """Test handling of Claude API timeout."""
         ai_service.client.messages.create.side_effect = TimeoutError("Request timeout")
 
         with pytest.raises(AIExtractionError, match="timeout"):
-            ai_service.extract_structured_data(
+            await ai_service.extract_structured_data(
                 extracted_text="Test",
                 category=DocumentCategory.RFQ
             )
 
-    def test_extract_different_categories(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_different_categories(self, ai_service):
         """Test that different categories get different prompts."""
         categories = [
             DocumentCategory.RFQ,
@@ -175,27 +193,28 @@ class TestAIExtractionService:
         for category in categories:
             ai_service.client.messages.create.reset_mock()
 
-            ai_service.extract_structured_data(
+            await ai_service.extract_structured_data(
                 extracted_text="Sample text",
                 category=category
             )
 
             # Verify Claude was called with category-specific prompt
-            ai_service.client.messages.create.assert_called_once()
+            ai_service.client.messages.create.assert_awaited_once()
             call_args = ai_service.client.messages.create.call_args
             prompt = call_args.kwargs['messages'][0]['content']
 
             # Each category should have different prompt content
             assert category.value in prompt.lower() or len(prompt) > 100
 
-    def test_extract_with_default_confidence(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_with_default_confidence(self, ai_service):
         """Test that default confidence is assigned if not provided."""
         mock_message = Mock()
         # Response without confidence field
         mock_message.content = [Mock(text=json.dumps({"data": {"key": "value"}}))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="Test",
             category=DocumentCategory.RFQ
         )
@@ -204,13 +223,14 @@ class TestAIExtractionService:
         assert "confidence" in result
         assert 0.0 <= result["confidence"] <= 1.0
 
-    def test_extract_empty_text(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_empty_text(self, ai_service):
         """Test extraction from empty text."""
         mock_message = Mock()
         mock_message.content = [Mock(text=json.dumps({"data": {}, "confidence": 0.0}))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="",
             category=DocumentCategory.RFQ
         )
@@ -218,7 +238,8 @@ class TestAIExtractionService:
         assert isinstance(result, dict)
         assert "data" in result
 
-    def test_extract_large_text(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_large_text(self, ai_service):
         """Test extraction from large text (should not fail)."""
         large_text = "A" * 5000  # Large text
 
@@ -226,14 +247,15 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps({"data": {}, "confidence": 0.8}))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text=large_text,
             category=DocumentCategory.RFQ
         )
 
         assert isinstance(result, dict)
 
-    def test_extract_special_characters(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_extract_special_characters(self, ai_service):
         """Test extraction from text with special characters."""
         special_text = "Price: $1,000.00 | Vendor: ABC (国际) Ltd | Status: ✓"
 
@@ -249,7 +271,7 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps(extracted_data))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text=special_text,
             category=DocumentCategory.VENDOR_PROPOSAL
         )
@@ -257,13 +279,14 @@ class TestAIExtractionService:
         assert result["data"]["vendor"] == "ABC Ltd"
         assert result["confidence"] == 0.85
 
-    def test_claude_model_configuration(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_claude_model_configuration(self, ai_service):
         """Test that Claude is configured with correct model and token limit."""
         mock_message = Mock()
         mock_message.content = [Mock(text=json.dumps({"data": {}, "confidence": 0.8}))]
         ai_service.client.messages.create.return_value = mock_message
 
-        ai_service.extract_structured_data(
+        await ai_service.extract_structured_data(
             extracted_text="Test",
             category=DocumentCategory.RFQ
         )
@@ -272,7 +295,8 @@ class TestAIExtractionService:
         assert call_kwargs['model'] == ai_service.model
         assert call_kwargs['max_tokens'] == ai_service.max_tokens
 
-    def test_rfq_extraction_includes_currency(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_rfq_extraction_includes_currency(self, ai_service):
         """Test that RFQ extraction includes top-level currency field."""
         extracted_data = {
             "data": {
@@ -305,7 +329,7 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps(extracted_data))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="RFQ content with pricing in USD...",
             category=DocumentCategory.RFQ
         )
@@ -321,7 +345,8 @@ class TestAIExtractionService:
         assert result["data"]["line_items"][0]["currency"] == "USD"
         assert result["data"]["line_items"][0]["unit_price_requested"] == 25.50
 
-    def test_rfq_currency_extraction_fallback_to_line_items(self, ai_service):
+    @pytest.mark.asyncio
+    async def test_rfq_currency_extraction_fallback_to_line_items(self, ai_service):
         """Test that RFQ extraction can fallback to line item currency if top-level missing."""
         extracted_data = {
             "data": {
@@ -346,7 +371,7 @@ class TestAIExtractionService:
         mock_message.content = [Mock(text=json.dumps(extracted_data))]
         ai_service.client.messages.create.return_value = mock_message
 
-        result = ai_service.extract_structured_data(
+        result = await ai_service.extract_structured_data(
             extracted_text="RFQ in EUR...",
             category=DocumentCategory.RFQ
         )
@@ -355,3 +380,160 @@ class TestAIExtractionService:
         # Frontend should handle fallback to line item currency
         assert result["data"]["rfq_number"] == "RFQ-002"
         assert result["data"]["line_items"][0]["currency"] == "EUR"
+
+
+class TestExtractionCache:
+    """Test caching of extraction results by text, category, prompt and model."""
+
+    @pytest.fixture
+    def ai_service(self):
+        """AI service with its own cache and a mocked Anthropic client."""
+        with patch('app.services.ai_extraction.AsyncAnthropic'):
+            service = AIExtractionService(cache=ExtractionCache(max_entries=10, ttl_seconds=60))
+            service.client = Mock()
+            mock_message = Mock()
+            mock_message.content = [Mock(text=json.dumps({"data": {"vendor_name": "Acme"}, "confidence": 0.9}))]
+            service.client.messages.create = AsyncMock(return_value=mock_message)
+            return service
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+
+    @pytest.mark.asyncio
+    async def test_same_text_hits_cache(self, ai_service):
+        """Extracting the same text twice calls Claude once."""
+        first = await ai_service.extract_structured_data("Acme quote", DocumentCategory.VENDOR_PROPOSAL)
+        second = await ai_service.extract_structured_data("Acme quote", DocumentCategory.VENDOR_PROPOSAL)
+
+        assert ai_service.client.messages.create.call_count == 1
+        assert second == first
+        assert metrics.hit_rate("ai_extraction_cache") == 0.5
+
+    @pytest.mark.asyncio
+    async def test_key_includes_category_and_model(self, ai_service):
+        """A different category or model is a cache miss."""
+        await ai_service.extract_structured_data("Acme quote", DocumentCategory.VENDOR_PROPOSAL)
+        await ai_service.extract_structured_data("Acme quote", DocumentCategory.INVOICE)
+        ai_service.model = "another-model"
+        await ai_service.extract_structured_data("Acme quote", DocumentCategory.VENDOR_PROPOSAL)
+
+        assert ai_service.client.messages.create.call_count == 3
+
+    def test_prompt_version_changes_with_category_prompt(self):
+        """Changing one category's prompt only changes that category's version."""
+        rfq_version = AIExtractionService.prompt_version(DocumentCategory.RFQ)
+        invoice_version = AIExtractionService.prompt_version(DocumentCategory.INVOICE)
+        original_build = AIExtractionService._build_prompt
+
+        def edited_build(text, category):
+            prompt = original_build(text, category)
+            return prompt + "\nAlso extract incoterms." if category == DocumentCategory.RFQ else prompt
+
+        with patch.dict('app.services.ai_extraction._prompt_versions', clear=True), \
+             patch.object(AIExtractionService, '_build_prompt', staticmethod(edited_build)):
+            assert AIExtractionService.prompt_version(DocumentCategory.RFQ) != rfq_version
+            assert AIExtractionService.prompt_version(DocumentCategory.INVOICE) == invoice_version
+
+    @pytest.mark.asyncio
+    async def test_force_refresh_bypasses_cache(self, ai_service):
+        """force_refresh calls Claude even when a cached result exists."""
+        await ai_service.extract_structured_data("Acme quote", DocumentCategory.VENDOR_PROPOSAL)
+        await ai_service.extract_structured_data(
+            "Acme quote", DocumentCategory.VENDOR_PROPOSAL, force_refresh=True
+        )
+
+        assert ai_service.client.messages.create.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self, ai_service):
+        """A failed extraction is retried on the next call."""
+        ai_service.client.messages.create.side_effect = [TimeoutError("timeout"), Mock(
+            content=[Mock(text='{"data": {}, "confidence": 0.5}')]
+        )]
+        with pytest.raises(AIExtractionError):
+            await ai_service.extract_structured_data("Acme quote", DocumentCategory.RFQ)
+        result = await ai_service.extract_structured_data("Acme quote", DocumentCategory.RFQ)
+
+        assert result["confidence"] == 0.5
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction_and_ttl(self):
+        """Entries are evicted least-recently-used first and expire after the TTL."""
+        cache = ExtractionCache(max_entries=2, ttl_seconds=60)
+        await cache.set("a", {"data": 1})
+        await cache.set("b", {"data": 2})
+        await cache.get("a")
+        await cache.set("c", {"data": 3})
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == {"data": 1}
+        assert metrics.get_count("ai_extraction_cache.evictions") == 1
+
+        expired = ExtractionCache(max_entries=2, ttl_seconds=0)
+        await expired.set("a", {"data": 1})
+        assert await expired.get("a") is None
+
+    @pytest.mark.asyncio
+    async def test_redis_tier(self):
+        """Redis hits are promoted into the LRU and Redis errors are misses."""
+        redis_client = Mock()
+        pipe = redis_client.pipeline.return_value
+        pipe.execute.return_value = [json.dumps({"data": {"shared": True}}), 60_000]
+        cache = ExtractionCache(max_entries=10, ttl_seconds=60, redis_client=redis_client)
+
+        assert await cache.get("k") == {"data": {"shared": True}}
+        assert await cache.get("k") == {"data": {"shared": True}}
+        pipe.get.assert_called_once_with("k")
+
+        pipe.execute.side_effect = ConnectionError("Redis down")
+        redis_client.set.side_effect = ConnectionError("Redis down")
+        assert await cache.get("other") is None
+        await cache.set("other", {"data": {}})
+        assert await cache.get("other") == {"data": {}}
+
+    @pytest.mark.asyncio
+    async def test_redis_hit_keeps_remaining_ttl(self):
+        """An entry promoted from Redis expires when the Redis entry does."""
+        redis_client = Mock()
+        redis_client.pipeline.return_value.execute.return_value = [json.dumps({"data": {}}), 0]
+        cache = ExtractionCache(max_entries=10, ttl_seconds=3600, redis_client=redis_client)
+
+        assert await cache.get("k") == {"data": {}}
+        assert cache._get_local("k") is None
+
+    @pytest.mark.asyncio
+    async def test_stored_result_is_not_shared_with_caller(self, ai_service):
+        """Mutating a returned result doesn't change the cached entry."""
+        first = await ai_service.extract_structured_data("Acme quote", DocumentCategory.VENDOR_PROPOSAL)
+        first["data"]["vendor_name"] = "Changed"
+        second = await ai_service.extract_structured_data("Acme quote", DocumentCategory.VENDOR_PROPOSAL)
+
+        assert second["data"]["vendor_name"] == "Acme"
+
+
+class TestAnthropicClient:
+    """Test the process-wide Anthropic client."""
+
+    @pytest.mark.asyncio
+    async def test_services_share_one_client(self):
+        """Every service in an event loop uses the same connection pool."""
+        with patch('app.services.ai_extraction.AsyncAnthropic') as mock_anthropic:
+            mock_anthropic.return_value.close = AsyncMock()
+            first = AIExtractionService(cache=ExtractionCache(max_entries=1, ttl_seconds=1))
+            second = AIExtractionService(cache=ExtractionCache(max_entries=1, ttl_seconds=1))
+
+            assert first.client is second.client
+            assert get_anthropic_client() is first.client
+            mock_anthropic.assert_called_once()
+
+            await close_anthropic_client()
+            mock_anthropic.return_value.close.assert_awaited_once()
+
+    def test_document_service_creates_ai_service_lazily(self):
+        """Reads and status polling never build an extraction client."""
+        with patch('app.services.document.AIExtractionService') as mock_service:
+            service = DocumentService(Mock(), company_id=uuid4())
+            mock_service.assert_not_called()
+            assert service.ai_service is service.ai_service
+            mock_service.assert_called_once()
@@ -1,9 +1,12 @@
 """Tests for M0 Authentication and Multi-Tenancy."""
 import pytest
+from unittest.mock import patch
 from uuid import uuid4
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.deps import get_current_user_full
 from app.models.company import Company
 from app.models.user import User
 from app.services.auth import AuthService
@@ -270,3 +273,62 @@ class TestAuthEndpoints:
         )
 
         assert response.status_code == 401
+
+
+class TestPrincipalCache:
+    """Test caching of authenticated users in get_current_user_full."""
+
+    @staticmethod
+    def _auth_header(test_db, user: User, company_id=None) -> str:
+        token = AuthService(test_db)._create_access_token(user.id, company_id or user.company_id, user.email)
+        return f"Bearer {token}"
+
+    @pytest.mark.asyncio
+    async def test_second_request_skips_user_lookup(self, test_db, sample_user):
+        """Test only the first request for a user queries the database."""
+        header = self._auth_header(test_db, sample_user)
+
+        with patch.object(test_db, "execute", wraps=test_db.execute) as mock_execute:
+            first = await get_current_user_full(authorization=header, db=test_db)
+            second = await get_current_user_full(authorization=header, db=test_db)
+
+        assert mock_execute.call_count == 1
+        assert first == second
+        assert second["role"] == sample_user.role
+
+    @pytest.mark.asyncio
+    async def test_deactivation_invalidates_principal(self, test_db, sample_user):
+        """Test a deactivated user is rejected on the next request."""
+        header = self._auth_header(test_db, sample_user)
+        await get_current_user_full(authorization=header, db=test_db)
+
+        sample_user.is_active = False
+        await test_db.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_full(authorization=header, db=test_db)
+        assert exc_info.value.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_role_change_invalidates_principal(self, test_db, sample_user):
+        """Test a new role is seen on the next request."""
+        header = self._auth_header(test_db, sample_user)
+        await get_current_user_full(authorization=header, db=test_db)
+
+        sample_user.role = "finance"
+        await test_db.commit()
+
+        current = await get_current_user_full(authorization=header, db=test_db)
+        assert current["role"] == "finance"
+
+    @pytest.mark.asyncio
+    async def test_cached_principal_checks_company(self, test_db, sample_user, sample_company_2):
+        """Test a token for another company isn't served from the cache."""
+        await get_current_user_full(authorization=self._auth_header(test_db, sample_user), db=test_db)
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user_full(
+                authorization=self._auth_header(test_db, sample_user, company_id=sample_company_2.id),
+                db=test_db,
+            )
+        assert exc_info.value.status_code == 401
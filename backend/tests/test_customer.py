@@ -124,6 +124,19 @@ async def test_list_customers_with_search(test_db, user_id):
     assert response.total == 1
 
 
+@pytest.mark.asyncio
+async def test_autocomplete_customers(test_db, sample_customer):
+    """Test customer search and autocomplete by name or code."""
+    service = CustomerService(test_db, company_id=sample_customer.company_id)
+
+    response = await service.list_customers(search="company")
+    assert [c.id for c in response.customers] == [sample_customer.id]
+
+    suggestions = await service.autocomplete_customers("test")
+    assert [s.id for s in suggestions] == [sample_customer.id]
+    assert await service.autocomplete_customers("company") == []
+
+
 @pytest.mark.asyncio
 async def test_update_customer(test_db, sample_customer, user_id):
     """Test updating a customer."""
@@ -209,3 +209,109 @@ class TestDocumentParsingService:
 
             assert "$1,000.00" in text
             assert "2026-03-15" in text
+
+
+class TestPageLevelOCR:
+    """Test that PDF OCR runs per page, only where needed, within the text budget."""
+
+    def test_only_pages_without_text_are_ocrd(self):
+        """Text pages are kept, blank pages are OCR'd in page order."""
+        with patch.object(DocumentParsingService, 'extract_pdf_page_texts',
+                          return_value=["Typed cover letter to buyer", "", "Typed terms and conditions"]), \
+             patch.object(DocumentParsingService, 'ocr_pdf_page', return_value="Scanned table") as mock_ocr:
+            text = DocumentParsingService.extract_text_from_pdf(b"pdf")
+
+        mock_ocr.assert_called_once()
+        assert mock_ocr.call_args.args[1] == 2
+        assert text == (
+            "--- Page 1 ---\nTyped cover letter to buyer\n\n"
+            "--- Page 2 ---\nScanned table\n\n"
+            "--- Page 3 ---\nTyped terms and conditions"
+        )
+
+    def test_text_pdf_skips_ocr(self):
+        """PDFs with a text layer on every page never rasterize."""
+        with patch.object(DocumentParsingService, 'extract_pdf_page_texts',
+                          return_value=["Page one has a text layer", "Page two has a text layer"]), \
+             patch.object(DocumentParsingService, 'ocr_pdf_page') as mock_ocr:
+            text = DocumentParsingService.extract_text_from_pdf(b"pdf")
+
+        mock_ocr.assert_not_called()
+        assert "Page two has a text layer" in text
+
+    def test_ocr_stops_at_text_budget(self):
+        """Scanned pages after MAX_TEXT_LENGTH is reached are never rendered."""
+        page_text = "x" * 3000
+        with patch.object(DocumentParsingService, 'count_pdf_pages', return_value=50), \
+             patch.object(DocumentParsingService, 'ocr_pdf_page', return_value=page_text) as mock_ocr:
+            text = DocumentParsingService._extract_text_from_pdf_ocr(b"pdf")
+
+        assert mock_ocr.call_count == 3
+        assert len(text) >= DocumentParsingService.MAX_TEXT_LENGTH
+
+    def test_failed_page_keeps_native_text(self):
+        """An OCR error on one page doesn't lose the rest of the document."""
+        with patch.object(DocumentParsingService, 'ocr_pdf_page',
+                          side_effect=[DocumentParsingError("bad page"), "Page 2 OCR"]):
+            text = DocumentParsingService._extract_text_from_pdf_ocr(
+                b"pdf", native_pages={1: "abc"}, ocr_pages=[1, 2]
+            )
+
+        assert text == "--- Page 1 ---\nabc\n\n--- Page 2 ---\nPage 2 OCR"
+
+    def test_ocr_pdf_page_renders_single_page(self):
+        """Each page is rasterized on its own (first_page == last_page)."""
+        with patch('app.services.document_parsing.convert_from_path', return_value=[Mock()]) as mock_convert, \
+             patch('app.services.document_parsing.pytesseract.image_to_string', return_value="OCR"):
+            text = DocumentParsingService.ocr_pdf_page("catalogue.pdf", 7)
+
+        mock_convert.assert_called_once_with("catalogue.pdf", first_page=7, last_page=7)
+        assert text == "OCR"
+
+    def test_native_text_reports_ocr_pages(self):
+        """The parse stage reports which pages the OCR stage must handle."""
+        with patch.object(DocumentParsingService, 'extract_pdf_page_texts',
+                          return_value=["Typed page with content", " ", ""]):
+            text, ocr_pages = DocumentParsingService.extract_native_text(b"pdf", "application/pdf")
+
+        assert text == "--- Page 1 ---\nTyped page with content"
+        assert ocr_pages == [2, 3]
+        assert DocumentParsingService.split_pages(text) == {1: "Typed page with content"}
+
+    def test_native_text_skips_ocr_pages_past_budget(self):
+        """Blank pages after the text budget is full aren't sent to OCR."""
+        page_texts = ["", "y" * 5000, "z" * 5000, ""]
+        with patch.object(DocumentParsingService, 'extract_pdf_page_texts', return_value=page_texts):
+            text, ocr_pages = DocumentParsingService.extract_native_text(b"pdf", "application/pdf")
+
+        assert len(text) == DocumentParsingService.MAX_TEXT_LENGTH
+        assert ocr_pages == [1]
+
+
+class TestMimeSniffing:
+    """Test identifying uploads from their leading bytes."""
+
+    def test_sniffs_known_formats(self):
+        """Magic numbers map to the MIME types the content can be."""
+        assert DocumentParsingService.sniff_mime_types(b"%PDF-1.7\n") == {"application/pdf"}
+        assert DocumentParsingService.sniff_mime_types(b"\x89PNG\r\n\x1a\n....") == {"image/png"}
+        assert DocumentParsingService.sniff_mime_types(b"RIFF\x00\x00\x00\x00WEBPVP8 ") == {"image/webp"}
+        assert "application/vnd.ms-excel" in DocumentParsingService.sniff_mime_types(
+            b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+        )
+
+    def test_unknown_format(self):
+        """Unrecognised content isn't classified."""
+        assert DocumentParsingService.sniff_mime_types(b"plain text") is None
+
+    def test_resolve_mime_type(self):
+        """Generic types are replaced by the sniffed one, contradictions rejected."""
+        from fastapi import HTTPException
+        from app.api.documents import resolve_mime_type
+
+        assert resolve_mime_type("application/octet-stream", b"%PDF-1.4") == "application/pdf"
+        assert resolve_mime_type("application/pdf", b"unknown") == "application/pdf"
+        with pytest.raises(HTTPException):
+            resolve_mime_type("image/png", b"%PDF-1.4")
+        with pytest.raises(HTTPException):
+            resolve_mime_type("text/plain", b"hello")
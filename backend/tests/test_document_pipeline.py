@@ -0,0 +1,308 @@
+"""Tests for the background document processing pipeline."""
+import io
+
+import pytest
+from unittest.mock import Mock, patch
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.models.document import Document, DocumentCategory, DocumentProcessingStage, DocumentStatus
+from app.models.embedding import DocumentEmbedding
+from app.services.document import DocumentService
+from app.services.storage import StorageService
+from app.services.document_parsing import DocumentParsingService, DocumentParsingError
+from app.services.ai_extraction import AIExtractionService
+from app.services import metrics
+from app.workers.document_pipeline import DocumentPipeline, LocalDocumentQueue, requeue_unfinished_documents
+
+
+@pytest.fixture
+def session_factory(test_db):
+    """Session factory on the test database, like the worker's own sessions."""
+    return async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def ai_service():
+    """AI service with a stubbed extraction result."""
+    service = Mock(spec=AIExtractionService)
+    service.extract_structured_data.return_value = {
+        "data": {"customer_name": "ABC Corp"},
+        "confidence": 0.9,
+    }
+    return service
+
+
+@pytest.fixture
+def queue(session_factory, ai_service):
+    """In-process document queue bound to the test database."""
+    pipeline = DocumentPipeline(session_factory, storage_service=StorageService(), ai_service=ai_service)
+    return LocalDocumentQueue(pipeline, concurrency=2)
+
+
+class TestDocumentPipeline:
+    """Test upload-then-process flow."""
+
+    @pytest.mark.asyncio
+    async def test_submit_returns_processing_document(self, test_db, sample_company, sample_user, queue):
+        """Upload returns immediately with the document queued."""
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_rfq.pdf"), \
+             patch.object(queue, 'enqueue') as mock_enqueue:
+            service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+            document = await service.submit_document(
+                file_content=b"PDF content",
+                filename="rfq.pdf",
+                mime_type="application/pdf",
+                category=DocumentCategory.RFQ,
+                queue=queue,
+            )
+
+        assert document.status == DocumentStatus.PROCESSING
+        assert document.processing_stage == DocumentProcessingStage.QUEUED.value
+        assert document.parsed_data is None
+        mock_enqueue.assert_called_once_with(document.id)
+
+    @pytest.mark.asyncio
+    async def test_pipeline_completes_text_document(self, test_db, sample_company, sample_user, queue, ai_service):
+        """Text-layer PDFs skip OCR and end COMPLETED with parsed data."""
+        native_text = "RFQ line items " * 20
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_rfq.pdf"), \
+             patch.object(DocumentParsingService, 'extract_native_text', return_value=(native_text, [])), \
+             patch.object(DocumentParsingService, 'ocr_pdf_page') as mock_ocr:
+            service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+            document = await service.submit_document(
+                file_content=b"PDF content",
+                filename="rfq.pdf",
+                mime_type="application/pdf",
+                category=DocumentCategory.RFQ,
+                queue=queue,
+            )
+            await queue.drain()
+
+        await test_db.refresh(document)
+        assert document.status == DocumentStatus.COMPLETED
+        assert document.processing_stage is None
+        assert document.extracted_text == native_text
+        assert document.parsed_data == {"customer_name": "ABC Corp"}
+        assert document.ai_confidence_score == 0.9
+        mock_ocr.assert_not_called()
+        ai_service.extract_structured_data.assert_called_once()
+        assert await test_db.get(DocumentEmbedding, document.id) is not None
+
+    @pytest.mark.asyncio
+    async def test_pipeline_runs_ocr_for_scanned_document(self, test_db, sample_company, sample_user, queue):
+        """Only the pages without a text layer go through the OCR stage."""
+        native_text = "--- Page 1 ---\nTyped cover letter"
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_scan.pdf"), \
+             patch.object(DocumentParsingService, 'extract_native_text', return_value=(native_text, [2])), \
+             patch.object(DocumentParsingService, 'ocr_pdf_page', return_value="Scanned line items") as mock_ocr:
+            service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+            document = await service.submit_document(
+                file_content=b"Scanned PDF",
+                filename="scan.pdf",
+                mime_type="application/pdf",
+                category=DocumentCategory.RFQ,
+                queue=queue,
+            )
+            await queue.drain()
+
+        await test_db.refresh(document)
+        # Workers render the page from a temp file, not from pickled bytes
+        mock_ocr.assert_called_once()
+        assert mock_ocr.call_args.args[1] == 2
+        assert document.extracted_text == (
+            "--- Page 1 ---\nTyped cover letter\n\n--- Page 2 ---\nScanned line items"
+        )
+        assert document.status == DocumentStatus.COMPLETED
+
+    @pytest.mark.asyncio
+    async def test_pipeline_parsing_error_continues(self, test_db, sample_company, sample_user, queue, ai_service):
+        """Unparseable documents complete with empty text and no AI call."""
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_bad.xlsx"), \
+             patch.object(DocumentParsingService, 'extract_native_text', side_effect=DocumentParsingError("bad")):
+            service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+            document = await service.submit_document(
+                file_content=b"not excel",
+                filename="bad.xlsx",
+                mime_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                category=DocumentCategory.OTHER,
+                queue=queue,
+            )
+            await queue.drain()
+
+        await test_db.refresh(document)
+        assert document.status == DocumentStatus.COMPLETED
+        assert document.extracted_text == ""
+        ai_service.extract_structured_data.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_pipeline_storage_error_marks_failed(self, test_db, sample_company, sample_user, queue):
+        """Unexpected errors (e.g. storage down) mark the document FAILED."""
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_rfq.pdf"), \
+             patch.object(StorageService, 'download_file', side_effect=ConnectionError("MinIO unreachable")):
+            service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+            document = await service.submit_document(
+                file_content=b"PDF content",
+                filename="rfq.pdf",
+                mime_type="application/pdf",
+                category=DocumentCategory.RFQ,
+                queue=queue,
+            )
+            await queue.drain()
+
+        await test_db.refresh(document)
+        assert document.status == DocumentStatus.FAILED
+        assert "MinIO unreachable" in document.error_message
+
+    @pytest.mark.asyncio
+    async def test_enqueue_failure_marks_failed(self, test_db, sample_company, sample_user, queue):
+        """A document that can't be queued is FAILED, not left PROCESSING."""
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_rfq.pdf"), \
+             patch.object(queue, 'enqueue', side_effect=ConnectionError("broker down")):
+            service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+            with pytest.raises(ConnectionError):
+                await service.submit_document(
+                    file_content=b"PDF content",
+                    filename="rfq.pdf",
+                    mime_type="application/pdf",
+                    category=DocumentCategory.RFQ,
+                    queue=queue,
+                )
+
+        result = await test_db.execute(select(Document))
+        document = result.scalar_one()
+        assert document.status == DocumentStatus.FAILED
+        assert "broker down" in document.error_message
+
+    @pytest.mark.asyncio
+    async def test_requeue_unfinished_documents(self, test_db, sample_company, session_factory, queue, monkeypatch):
+        """Documents interrupted by a restart are re-parsed from scratch."""
+        document = Document(
+            company_id=sample_company.id,
+            category=DocumentCategory.RFQ,
+            storage_bucket="documents",
+            storage_key="k/2026-10/a_rfq.pdf",
+            original_filename="rfq.pdf",
+            file_size_bytes=11,
+            mime_type="application/pdf",
+            status=DocumentStatus.PROCESSING,
+            processing_stage=DocumentProcessingStage.OCR.value,
+            extracted_text="partial",
+        )
+        test_db.add(document)
+        await test_db.commit()
+        monkeypatch.setattr("app.workers.document_pipeline._document_queue", queue)
+
+        with patch.object(DocumentParsingService, 'extract_native_text', return_value=("RFQ text", [])):
+            assert await requeue_unfinished_documents(session_factory) == 1
+            await queue.drain()
+
+        await test_db.refresh(document)
+        assert document.status == DocumentStatus.COMPLETED
+        assert document.extracted_text == "RFQ text"
+
+
+class TestDocumentDeduplication:
+    """Test content-hash deduplication of uploads."""
+
+    @pytest.fixture(autouse=True)
+    def reset_metrics(self):
+        metrics.reset()
+
+    async def _submit(self, test_db, company_id, user_id, queue, category=DocumentCategory.VENDOR_PROPOSAL):
+        service = DocumentService(test_db, company_id=company_id, user_id=user_id)
+        return await service.submit_document(
+            file_content=b"Proposal PDF",
+            filename="proposal.pdf",
+            mime_type="application/pdf",
+            category=category,
+            queue=queue,
+        )
+
+    @pytest.mark.asyncio
+    async def test_duplicate_reuses_storage_and_results(self, test_db, sample_company, sample_user, queue, ai_service):
+        """Re-uploading processed content skips storage, parsing and AI."""
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_proposal.pdf") as mock_upload, \
+             patch.object(DocumentParsingService, 'extract_native_text', return_value=("Unit price 120", [])) as mock_parse:
+            original = await self._submit(test_db, sample_company.id, sample_user.id, queue)
+            await queue.drain()
+            with patch.object(queue, 'enqueue') as mock_enqueue:
+                duplicate = await self._submit(test_db, sample_company.id, sample_user.id, queue)
+
+        assert mock_upload.call_count == 1
+        assert mock_parse.call_count == 1
+        ai_service.extract_structured_data.assert_called_once()
+        mock_enqueue.assert_not_called()
+
+        assert duplicate.id != original.id
+        assert duplicate.status == DocumentStatus.COMPLETED
+        assert duplicate.source_document_id == original.id
+        assert duplicate.storage_key == original.storage_key
+        assert duplicate.content_hash == original.content_hash
+        assert duplicate.extracted_text == "Unit price 120"
+        assert duplicate.parsed_data == {"customer_name": "ABC Corp"}
+        assert metrics.hit_rate("document_dedup") == 0.5
+
+    @pytest.mark.asyncio
+    async def test_duplicate_in_other_category_reuses_text_only(self, test_db, sample_company, sample_user, queue, ai_service):
+        """A different category re-runs AI extraction but not parsing."""
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_proposal.pdf"), \
+             patch.object(DocumentParsingService, 'extract_native_text', return_value=("Unit price 120", [])) as mock_parse:
+            await self._submit(test_db, sample_company.id, sample_user.id, queue)
+            await queue.drain()
+            duplicate = await self._submit(
+                test_db, sample_company.id, sample_user.id, queue, category=DocumentCategory.INVOICE
+            )
+            await queue.drain()
+
+        await test_db.refresh(duplicate)
+        assert mock_parse.call_count == 1
+        assert ai_service.extract_structured_data.call_count == 2
+        assert duplicate.status == DocumentStatus.COMPLETED
+        assert duplicate.extracted_text == "Unit price 120"
+        assert metrics.get_count("document_dedup.misses") == 2
+
+    @pytest.mark.asyncio
+    async def test_no_dedup_across_companies(self, test_db, sample_company, sample_company_2, sample_user, queue):
+        """The same file uploaded by another company is stored separately."""
+        with patch.object(StorageService, 'upload_file', return_value="k/2026-10/a_proposal.pdf") as mock_upload, \
+             patch.object(DocumentParsingService, 'extract_native_text', return_value=("Unit price 120", [])):
+            await self._submit(test_db, sample_company.id, sample_user.id, queue)
+            await queue.drain()
+            other = await self._submit(test_db, sample_company_2.id, None, queue)
+
+        assert mock_upload.call_count == 2
+        assert other.source_document_id is None
+        assert other.status == DocumentStatus.PROCESSING
+
+    @pytest.mark.asyncio
+    async def test_streamed_duplicate_drops_its_upload(self, test_db, sample_company, sample_user, queue, ai_service):
+        """A streamed upload is hashed in flight and discarded if it's a duplicate."""
+        content = b"%PDF-1.7 Proposal"
+        service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+
+        def consume(self, stream, **kwargs):
+            while stream.read(4):
+                pass
+            return f"k/2026-10/{mock_upload.call_count}_proposal.pdf"
+
+        with patch.object(StorageService, 'upload_stream', autospec=True, side_effect=consume) as mock_upload, \
+             patch.object(StorageService, 'delete_file') as mock_delete, \
+             patch.object(DocumentParsingService, 'extract_native_text', return_value=("Unit price 120", [])):
+            original = await service.submit_document_stream(
+                io.BytesIO(content), "proposal.pdf", "application/pdf",
+                DocumentCategory.VENDOR_PROPOSAL, queue=queue,
+            )
+            await queue.drain()
+            duplicate = await service.submit_document_stream(
+                io.BytesIO(content), "proposal.pdf", "application/pdf",
+                DocumentCategory.VENDOR_PROPOSAL, queue=queue,
+            )
+
+        assert original.content_hash == DocumentService.compute_content_hash(content)
+        assert original.file_size_bytes == len(content)
+        assert original.source_document_id is None
+        assert mock_upload.call_count == 2
+        mock_delete.assert_called_once_with("k/2026-10/2_proposal.pdf")
+        assert duplicate.storage_key == original.storage_key
+        assert duplicate.status == DocumentStatus.COMPLETED
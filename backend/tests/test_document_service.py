@@ -4,9 +4,13 @@ import io
 from uuid import uuid4
 from unittest.mock import Mock, patch, AsyncMock
 
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
 from app.models.document import Document, DocumentCategory, DocumentStatus
 from app.models.deal import Deal, DealStatus
 from app.services.document import DocumentService
+from app.services.embeddings import backfill_embeddings
+from app.services.pagination import Cursor
 from app.services.storage import StorageService
 from app.services.document_parsing import DocumentParsingService, DocumentParsingError
 from app.services.ai_extraction import AIExtractionService, AIExtractionError
@@ -20,11 +24,11 @@ class TestDocumentService:
         """Test uploading and processing a document (full flow)."""
         # Mock the external services
         with patch.object(StorageService, 'upload_file') as mock_storage, \
-             patch.object(DocumentParsingService, 'extract_text') as mock_parsing, \
+             patch.object(DocumentParsingService, 'extract_native_text') as mock_parsing, \
              patch.object(AIExtractionService, 'extract_structured_data') as mock_ai:
 
             mock_storage.return_value = "company_id/2026-02/abc123_test.pdf"
-            mock_parsing.return_value = "Sample RFQ with line items"
+            mock_parsing.return_value = ("Sample RFQ with line items", [])
             mock_ai.return_value = {
                 "data": {"customer_name": "ABC Corp", "quantity": 100},
                 "confidence": 0.85
@@ -59,11 +63,11 @@ class TestDocumentService:
     async def test_document_with_entity_reference(self, test_db, sample_company, sample_user, sample_deal):
         """Test uploading document attached to an entity (Deal)."""
         with patch.object(StorageService, 'upload_file') as mock_storage, \
-             patch.object(DocumentParsingService, 'extract_text') as mock_parsing, \
+             patch.object(DocumentParsingService, 'extract_native_text') as mock_parsing, \
              patch.object(AIExtractionService, 'extract_structured_data') as mock_ai:
 
             mock_storage.return_value = "company_id/2026-02/xyz789_proposal.pdf"
-            mock_parsing.return_value = "Vendor proposal with pricing"
+            mock_parsing.return_value = ("Vendor proposal with pricing", [])
             mock_ai.return_value = {
                 "data": {"total_price": 50000, "lead_time_days": 30},
                 "confidence": 0.92
@@ -94,11 +98,11 @@ class TestDocumentService:
     async def test_document_without_entity_reference(self, test_db, sample_company, sample_user):
         """Test uploading company-level document (no entity reference)."""
         with patch.object(StorageService, 'upload_file') as mock_storage, \
-             patch.object(DocumentParsingService, 'extract_text') as mock_parsing, \
+             patch.object(DocumentParsingService, 'extract_native_text') as mock_parsing, \
              patch.object(AIExtractionService, 'extract_structured_data') as mock_ai:
 
             mock_storage.return_value = "company_id/2026-02/policy.pdf"
-            mock_parsing.return_value = "Company policy document"
+            mock_parsing.return_value = ("Company policy document", [])
             mock_ai.return_value = {
                 "data": {"policy_name": "Code of Conduct"},
                 "confidence": 0.88
@@ -145,7 +149,7 @@ class TestDocumentService:
     async def test_document_parsing_error_handling(self, test_db, sample_company, sample_user):
         """Test graceful handling when text extraction fails."""
         with patch.object(StorageService, 'upload_file') as mock_storage, \
-             patch.object(DocumentParsingService, 'extract_text') as mock_parsing, \
+             patch.object(DocumentParsingService, 'extract_native_text') as mock_parsing, \
              patch.object(AIExtractionService, 'extract_structured_data') as mock_ai:
 
             mock_storage.return_value = "company_id/2026-02/corrupt.pdf"
@@ -173,11 +177,11 @@ class TestDocumentService:
     async def test_document_ai_extraction_error_handling(self, test_db, sample_company, sample_user):
         """Test graceful handling when AI extraction fails."""
         with patch.object(StorageService, 'upload_file') as mock_storage, \
-             patch.object(DocumentParsingService, 'extract_text') as mock_parsing, \
+             patch.object(DocumentParsingService, 'extract_native_text') as mock_parsing, \
              patch.object(AIExtractionService, 'extract_structured_data') as mock_ai:
 
             mock_storage.return_value = "company_id/2026-02/test.pdf"
-            mock_parsing.return_value = "Some text"
+            mock_parsing.return_value = ("Some text", [])
             mock_ai.side_effect = AIExtractionError("Claude API timeout")
 
             service = DocumentService(
@@ -344,6 +348,113 @@ class TestDocumentService:
         assert document is None
 
 
+    @pytest.mark.asyncio
+    async def test_search_documents(self, test_db, sample_company, sample_user, sample_deal):
+        """Test full text and parsed field search, with snippets and cursor paging."""
+        rfq = Document(
+            company_id=sample_company.id,
+            entity_type="Deal",
+            entity_id=sample_deal.id,
+            category=DocumentCategory.RFQ,
+            storage_bucket="documents",
+            storage_key="company_id/2026-02/rfq.pdf",
+            original_filename="rfq.pdf",
+            file_size_bytes=1024,
+            mime_type="application/pdf",
+            status=DocumentStatus.PROCESSING,
+        )
+        test_db.add(rfq)
+        await _create_test_documents(test_db, sample_company, sample_deal, count=3)
+
+        service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+
+        # Indexed once extraction fills the text in
+        documents, _ = await service.search_documents(q="seamless pipes")
+        assert documents == []
+        rfq.extracted_text = "Please quote 200 seamless carbon steel pipes, API 5L grade B."
+        rfq.parsed_data = {"rfq_number": "RFQ-2026-0042", "customer_name": "Gulf Refining"}
+        await test_db.flush()
+
+        documents, snippets = await service.search_documents(q="seamless pipe")
+        assert [doc.id for doc in documents] == [rfq.id]
+        assert "<mark>seamless</mark>" in snippets[rfq.id]
+
+        documents, _ = await service.search_documents(q="refining", category=DocumentCategory.RFQ)
+        assert [doc.id for doc in documents] == [rfq.id]
+        documents, _ = await service.search_documents(q="refining", category=DocumentCategory.INVOICE)
+        assert documents == []
+
+        documents, snippets = await service.search_documents(parsed_fields={"rfq_number": "rfq-2026"})
+        assert [doc.id for doc in documents] == [rfq.id]
+        assert snippets == {}
+
+        page1, _ = await service.search_documents(q="document text", entity_id=sample_deal.id, limit=2)
+        assert len(page1) == 2
+        page2, _ = await service.search_documents(
+            q="document text", entity_id=sample_deal.id, limit=2,
+            cursor=Cursor(page1[-1].created_at, page1[-1].id),
+        )
+        assert len(page2) == 1
+        assert {doc.id for doc in page1 + page2} == {doc.id for doc in await _all_documents(service)} - {rfq.id}
+
+        with pytest.raises(ValueError):
+            await service.search_documents(q="  ")
+        with pytest.raises(ValueError):
+            await service.search_documents(parsed_fields={"customer_name": "Gulf"})
+
+    @pytest.mark.asyncio
+    async def test_find_similar_documents_and_line_items(self, test_db, sample_company, sample_user):
+        """Backfilled embeddings rank documents and extracted line items by similarity."""
+        def completed(category, text, line_items=None):
+            document = Document(
+                company_id=sample_company.id,
+                category=category,
+                storage_bucket="documents",
+                storage_key=f"company_id/2026-02/{uuid4()}.pdf",
+                original_filename="document.pdf",
+                file_size_bytes=1024,
+                mime_type="application/pdf",
+                extracted_text=text,
+                parsed_data={"line_items": line_items or []},
+                status=DocumentStatus.COMPLETED,
+            )
+            test_db.add(document)
+            return document
+
+        new_rfq = completed(DocumentCategory.RFQ, "Quote seamless carbon steel pipes API 5L grade B, 6 inch")
+        past_rfq = completed(DocumentCategory.RFQ, "Seamless carbon steel pipes API 5L grade B, 8 inch", [
+            {"description": "Gate valve", "specification": "API 6D class 300 flanged"},
+            {"description": "Seamless pipe", "specification": "API 5L grade B schedule 40"},
+        ])
+        proposal = completed(DocumentCategory.VENDOR_PROPOSAL, "We offer seamless carbon steel pipes API 5L", [
+            {"description": "Carbon steel pipe", "material_spec": "API 5L grade B"},
+        ])
+        completed(DocumentCategory.INVOICE, "Freight charges for container shipment to Jebel Ali")
+        await test_db.commit()
+
+        session_factory = async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+        assert await backfill_embeddings(session_factory, batch_size=2) == 4
+        assert await backfill_embeddings(session_factory) == 0
+
+        service = DocumentService(test_db, company_id=sample_company.id, user_id=sample_user.id)
+        matches = await service.find_similar_documents(new_rfq.id)
+        assert [document.id for document, _ in matches][:2] == [past_rfq.id, proposal.id]
+        assert matches[0][1] > matches[-1][1]
+        matches = await service.find_similar_documents(new_rfq.id, category=DocumentCategory.VENDOR_PROPOSAL)
+        assert [document.id for document, _ in matches] == [proposal.id]
+        assert await service.find_similar_documents(uuid4()) is None
+
+        matches = await service.find_similar_line_items("seamless pipe API 5L schedule 40")
+        line_item, document, similarity = matches[0]
+        assert (document.id, line_item.line_index, line_item.material_spec) == (
+            past_rfq.id, 1, "API 5L grade B schedule 40"
+        )
+        assert len(matches) == 3
+
+        other = DocumentService(test_db, company_id=uuid4(), user_id=sample_user.id)
+        assert await other.find_similar_line_items("seamless pipe") == []
+
+
 # Helper fixtures and functions
 
 @pytest.fixture
@@ -407,3 +518,8 @@ async def _create_test_documents(test_db, company, deal, count=1):
         )
         test_db.add(doc)
     await test_db.flush()
+
+
+async def _all_documents(service):
+    documents, _ = await service.list_documents(limit=100)
+    return documents
@@ -0,0 +1,61 @@
+"""Tests for the CPU-bound parsing process pool."""
+import io
+import pytest
+from openpyxl import Workbook
+
+from app.config import settings
+from app.services import parsing_pool
+from app.services.document_parsing import DocumentParsingService, DocumentParsingError
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+
+@pytest.fixture
+def process_pool(monkeypatch):
+    """Enable a real one-worker pool for the test, then shut it down."""
+    monkeypatch.setattr(settings, "PARSING_POOL_WORKERS", 1)
+    yield
+    parsing_pool.shutdown_parsing_pool()
+
+
+def _xlsx_bytes() -> bytes:
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append(["Item", "Qty"])
+    sheet.append(["Steel Pipe", 100])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class TestParsingPool:
+    """Test running parsers off the event loop."""
+
+    @pytest.mark.asyncio
+    async def test_runs_in_worker_process(self, process_pool):
+        """Parsing runs in the process pool and returns the text."""
+        text = await parsing_pool.run_in_parsing_pool(
+            DocumentParsingService.extract_text, _xlsx_bytes(), XLSX_MIME
+        )
+
+        assert parsing_pool.get_parsing_pool() is not None
+        assert "Steel Pipe" in text
+
+    @pytest.mark.asyncio
+    async def test_worker_errors_are_reraised(self, process_pool):
+        """DocumentParsingError raised in a worker reaches the caller."""
+        with pytest.raises(DocumentParsingError, match="Unsupported MIME type"):
+            await parsing_pool.run_in_parsing_pool(
+                DocumentParsingService.extract_text, b"data", "application/zip"
+            )
+
+    @pytest.mark.asyncio
+    async def test_disabled_pool_uses_thread(self):
+        """PARSING_POOL_WORKERS=0 falls back to a thread."""
+        assert parsing_pool.get_parsing_pool() is None
+
+        text = await parsing_pool.run_in_parsing_pool(
+            DocumentParsingService.extract_text, _xlsx_bytes(), XLSX_MIME
+        )
+
+        assert "Steel Pipe" in text
@@ -0,0 +1,107 @@
+"""Tests for streaming page-level PDF OCR."""
+import asyncio
+import os
+import pytest
+from unittest.mock import patch
+
+from app.services.document_parsing import DocumentParsingService, DocumentParsingError
+from app.services.pdf_ocr import extract_text_with_ocr, stream_pdf_ocr
+
+
+class TestStreamPdfOcr:
+    """Test parallel OCR with in-order merge and early termination."""
+
+    @pytest.mark.asyncio
+    async def test_merges_native_and_ocr_pages_in_order(self):
+        """OCR output slots in between native pages by page number."""
+        with patch.object(DocumentParsingService, 'ocr_pdf_page',
+                          side_effect=lambda pdf_path, page: f"OCR {page}") as mock_ocr:
+            text = await stream_pdf_ocr(
+                "catalogue.pdf", native_pages={1: "Native 1", 3: "Native 3"}, ocr_pages=[2, 4], window=2
+            )
+
+        assert mock_ocr.call_count == 2
+        assert text == (
+            "--- Page 1 ---\nNative 1\n\n--- Page 2 ---\nOCR 2\n\n"
+            "--- Page 3 ---\nNative 3\n\n--- Page 4 ---\nOCR 4"
+        )
+
+    @pytest.mark.asyncio
+    async def test_stops_once_budget_is_filled(self):
+        """A 50-page scan stops after the pages needed to fill MAX_TEXT_LENGTH."""
+        with patch.object(DocumentParsingService, 'ocr_pdf_page', return_value="x" * 3000) as mock_ocr:
+            text = await stream_pdf_ocr(
+                "catalogue.pdf", native_pages={}, ocr_pages=list(range(1, 51)), window=2
+            )
+
+        assert len(text) == DocumentParsingService.MAX_TEXT_LENGTH
+        # Three pages fill the budget; at most one more was already in flight
+        assert mock_ocr.call_count <= 4
+
+    @pytest.mark.asyncio
+    async def test_runs_pages_concurrently(self):
+        """Up to `window` pages are OCR'd at the same time."""
+        running = 0
+        peak = 0
+
+        def slow_ocr(pdf_path, page):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            import time
+            time.sleep(0.05)
+            running -= 1
+            return f"OCR {page}"
+
+        with patch.object(DocumentParsingService, 'ocr_pdf_page', side_effect=slow_ocr):
+            await stream_pdf_ocr("catalogue.pdf", native_pages={}, ocr_pages=[1, 2, 3, 4], window=3)
+
+        assert peak > 1
+
+    @pytest.mark.asyncio
+    async def test_failed_page_keeps_native_text(self):
+        """An OCR error on one page keeps that page's native text."""
+        with patch.object(DocumentParsingService, 'ocr_pdf_page',
+                          side_effect=[DocumentParsingError("bad page"), "OCR 2"]):
+            text = await stream_pdf_ocr(
+                "catalogue.pdf", native_pages={1: "abc"}, ocr_pages=[1, 2], window=1
+            )
+
+        assert text == "--- Page 1 ---\nabc\n\n--- Page 2 ---\nOCR 2"
+
+
+class TestExtractTextWithOcr:
+    """Test the async extraction entry point used by the inline upload path."""
+
+    @pytest.mark.asyncio
+    async def test_ocrs_only_blank_pages_from_a_temp_file(self):
+        """Blank pages are OCR'd from one temp file that is removed afterwards."""
+        paths = []
+
+        def fake_ocr(pdf_path, page):
+            paths.append(pdf_path)
+            with open(pdf_path, "rb") as f:
+                assert f.read() == b"pdf bytes"
+            return f"OCR {page}"
+
+        with patch.object(DocumentParsingService, 'extract_pdf_page_texts',
+                          return_value=["Typed cover letter to buyer", "", ""]), \
+             patch.object(DocumentParsingService, 'ocr_pdf_page', side_effect=fake_ocr):
+            text = await extract_text_with_ocr(b"pdf bytes", "application/pdf")
+
+        assert text == (
+            "--- Page 1 ---\nTyped cover letter to buyer\n\n"
+            "--- Page 2 ---\nOCR 2\n\n--- Page 3 ---\nOCR 3"
+        )
+        assert len(set(paths)) == 1
+        assert not os.path.exists(paths[0])
+
+    @pytest.mark.asyncio
+    async def test_text_documents_skip_ocr(self):
+        """Documents with a text layer are returned as parsed."""
+        with patch.object(DocumentParsingService, 'extract_native_text', return_value=("Sheet text", [])), \
+             patch.object(DocumentParsingService, 'ocr_pdf_page') as mock_ocr:
+            text = await extract_text_with_ocr(b"xlsx", "application/vnd.ms-excel")
+
+        assert text == "Sheet text"
+        mock_ocr.assert_not_called()
@@ -453,6 +453,275 @@ class TestVendorSearchAdvanced:
         assert len(result.items) == 0
 
 
+class TestVendorTextSearch:
+    """Test indexed vendor search, tag filters and autocomplete."""
+
+    @pytest.mark.asyncio
+    async def test_search_vendors_ranks_and_follows_updates(self, test_db, sample_vendors):
+        """Search finds substrings of name or code, and sees renames."""
+        company_id = sample_vendors[0].company_id
+        service = VendorService(test_db, company_id=company_id)
+
+        result = await service.search_vendors("pipe")
+        assert [v.vendor_code for v in result.items] == ["VND-002"]
+        assert result.total == 1
+
+        result = await service.search_vendors("VND-00")
+        assert result.total == 3
+
+        sample_vendors[2].company_name = "Premium Pipeworks"
+        await test_db.flush()
+        result = await service.search_vendors("pipe")
+        assert {v.vendor_code for v in result.items} == {"VND-002", "VND-003"}
+
+        # Short queries fall back to a scan
+        result = await service.search_vendors("qu")
+        assert [v.vendor_code for v in result.items] == ["VND-002"]
+
+    @pytest.mark.asyncio
+    async def test_search_vendors_advanced_by_tags(self, test_db, sample_company):
+        """Category and certification filters match tag prefixes, case-insensitively."""
+        service = VendorService(test_db, company_id=sample_company.id)
+        tagged = await service.create_vendor(VendorCreate(
+            vendor_code="VND-TAG",
+            company_name="Tagged Vendor",
+            country="UAE",
+            product_categories=["Steel Pipes", "Valves"],
+            certifications=["ISO 9001"],
+        ))
+
+        result = await service.search_vendors_advanced(category="steel")
+        assert [v.id for v in result.items] == [tagged.id]
+        result = await service.search_vendors_advanced(certification="iso")
+        assert [v.id for v in result.items] == [tagged.id]
+
+        vendor = await test_db.get(Vendor, tagged.id)
+        vendor.certifications = ["API 5L"]
+        await test_db.flush()
+        result = await service.search_vendors_advanced(certification="iso")
+        assert result.total == 0
+        result = await service.search_vendors_advanced(certification="API 5L", query="tagged")
+        assert [v.id for v in result.items] == [tagged.id]
+
+    @pytest.mark.asyncio
+    async def test_autocomplete_vendors(self, test_db, sample_vendors):
+        """Autocomplete matches the start of a name or code only."""
+        company_id = sample_vendors[0].company_id
+        service = VendorService(test_db, company_id=company_id)
+
+        suggestions = await service.autocomplete_vendors("pr")
+        assert [s.vendor_code for s in suggestions] == ["VND-003"]
+
+        suggestions = await service.autocomplete_vendors("vnd-00", limit=2)
+        assert [s.company_name for s in suggestions] == ["Premium Materials Inc", "QuickDeal Pipes Ltd"]
+
+        assert await service.autocomplete_vendors("steel") == []
+
+
+class TestVendorRecommendations:
+    """Test vendor recommendations for a deal's line items."""
+
+    @pytest.mark.asyncio
+    async def test_recommend_vendors_for_deal(self, test_db, sample_company, sample_deal):
+        """Vendors matching the line items and winning proposals rank first; commits refresh the ranking."""
+        service = VendorService(test_db, company_id=sample_company.id)
+        sample_deal.line_items = [
+            {"description": "Seamless steel pipes", "material_spec": "API 5L X52, ISO 9001 mill"},
+            {"description": "Gate valve", "material_spec": "API 6D class 300"},
+        ]
+        pipes = await service.create_vendor(VendorCreate(
+            vendor_code="VND-PIPE", company_name="Pipe Mill", country="UAE", credibility_score=70,
+            product_categories=["Steel Pipe"], certifications=["ISO 9001"], avg_lead_time_days=20,
+        ))
+        both = await service.create_vendor(VendorCreate(
+            vendor_code="VND-BOTH", company_name="Pipes and Valves", country="UAE", credibility_score=70,
+            product_categories=["steel pipes", "Gate Valves"], certifications=["iso 9001"], avg_lead_time_days=20,
+        ))
+        other = await service.create_vendor(VendorCreate(
+            vendor_code="VND-ELEC", company_name="Cable Co", country="UAE", credibility_score=90,
+            product_categories=["Cables"], on_time_delivery_rate=1.0,
+        ))
+        for vendor, price, status in (
+            (pipes, 90000, VendorProposalStatus.SELECTED),
+            (both, 100000, VendorProposalStatus.REJECTED),
+        ):
+            test_db.add(VendorProposal(
+                id=uuid4(), company_id=sample_company.id, deal_id=sample_deal.id, vendor_id=vendor.id,
+                total_price=price, currency="AED", status=status,
+            ))
+        await test_db.commit()
+
+        result = await service.recommend_vendors(sample_deal.id)
+        assert result.vendors_scored == 3
+        assert result.required_certifications == ["iso 9001"]
+        assert [item.vendor_id for item in result.items] == [both.id, pipes.id, other.id]
+        top = result.items[0]
+        assert top.category_match == 1.0
+        assert top.certification_match == 1.0
+        assert top.matched_categories == ["gate valves", "steel pipes"]
+        assert top.matched_certifications == ["iso 9001"]
+        assert result.items[1].category_match == 0.5
+        assert result.items[1].win_rate > top.win_rate
+        assert result.items[1].price_competitiveness > top.price_competitiveness
+        assert result.items[2].category_match == 0.0
+        assert result.items[2].certification_match == 0.0
+
+        # Committed vendor changes show up on the next request
+        vendor = await test_db.get(Vendor, other.id)
+        vendor.product_categories = ["Steel Pipe", "Gate Valve"]
+        vendor.certifications = ["ISO 9001"]
+        vendor.avg_lead_time_days = 10
+        await test_db.commit()
+        result = await service.recommend_vendors(sample_deal.id, limit=1)
+        assert [item.vendor_id for item in result.items] == [other.id]
+
+        with pytest.raises(ValueError, match="Deal not found"):
+            await service.recommend_vendors(uuid4())
+
+
+class TestVendorMetrics:
+    """Test vendor metrics maintained from proposal decisions and deliveries."""
+
+    @pytest.mark.asyncio
+    async def test_metrics_follow_decisions_and_deliveries(
+        self, test_db, sample_company, sample_deal, sample_vendors, sample_vendor_proposals
+    ):
+        """Selecting a vendor and delivering the deal update vendor fields; recompute rebuilds them."""
+        from app.models.deal import DealStatus
+        from app.models.vendor_metrics import VendorMetrics
+        from app.services.deal import DealService
+        from app.services.vendor_metrics import recompute_company_metrics
+
+        proposal_service = VendorProposalService(test_db, company_id=sample_company.id)
+        await proposal_service.select_vendor(sample_vendor_proposals[0].id)
+        chosen, other, mismatched = sample_vendors
+        assert chosen.quality_score == 100
+        assert chosen.credibility_score == 62
+        assert mismatched.quality_score == 0
+        assert mismatched.credibility_score == 38
+        metrics = await test_db.get(VendorMetrics, chosen.id)
+        assert (metrics.proposals_decided, metrics.proposals_won) == (1, 1)
+
+        deal_service = DealService(test_db, company_id=sample_company.id)
+        for status in (DealStatus.QUOTED, DealStatus.PO_RECEIVED, DealStatus.ORDERED,
+                       DealStatus.IN_PRODUCTION, DealStatus.SHIPPED, DealStatus.DELIVERED):
+            await deal_service.update_deal_status(sample_deal.id, status)
+        proposal = await test_db.get(VendorProposal, sample_vendor_proposals[0].id)
+        assert proposal.shipped_at is not None and proposal.delivered_at is not None
+        # Required by 2024-03-15, so late
+        assert chosen.on_time_delivery_rate == 0.0
+        assert chosen.avg_lead_time_days == 0
+        assert chosen.credibility_score == 46
+
+        expected = {v.id: (v.credibility_score, v.quality_score, v.on_time_delivery_rate) for v in sample_vendors}
+        for vendor in sample_vendors:
+            vendor.credibility_score = 99
+        await test_db.flush()
+        assert await recompute_company_metrics(test_db, sample_company.id) == 3
+        for vendor in sample_vendors:
+            await test_db.refresh(vendor)
+        assert {v.id: (v.credibility_score, v.quality_score, v.on_time_delivery_rate) for v in sample_vendors} == expected
+        metrics = await test_db.get(VendorMetrics, chosen.id)
+        assert (metrics.proposals_decided, metrics.deliveries, metrics.lead_time_samples) == (1, 1, 1)
+
+    def test_grouped_ewma_matches_running_updates(self):
+        """The vectorized EWMA equals feeding samples one at a time."""
+        import numpy as np
+        from app.services.vendor_metrics import grouped_ewma
+
+        rng = np.random.default_rng(3)
+        groups = rng.integers(0, 5, size=200)
+        order = rng.random(200)
+        values = rng.random(200)
+        counts, ewma = grouped_ewma(groups, order, values, 6, 0.2)
+
+        for group in range(6):
+            running = None
+            for i in np.argsort(order):
+                if groups[i] == group:
+                    running = values[i] if running is None else running + 0.2 * (values[i] - running)
+            assert counts[group] == (groups == group).sum()
+            assert (np.isnan(ewma[group]) if running is None else np.isclose(ewma[group], running))
+
+
+class TestProposalComparisonScoring:
+    """Test the weighted, currency-normalized proposal comparison."""
+
+    @pytest.mark.asyncio
+    async def test_normalizes_currencies_and_compares_lines(
+        self, test_db, sample_company, sample_deal, sample_vendors, sample_vendor_proposals
+    ):
+        """A USD quote is compared in AED, total and per line item."""
+        quick, premium = sample_vendor_proposals[1], sample_vendor_proposals[2]
+        quick.currency, quick.total_price = "USD", 25000.0  # 91,812.50 AED
+        quick.payment_terms = "30% advance, 70% net 60"
+        quick.line_items = [{"description": "Steel pipes", "quantity": 100, "unit_price": 250, "currency": "USD"}]
+        premium.line_items = {"line_items": [{"description": "Pipe", "quantity": 100, "total_price": 92000}]}
+        await test_db.flush()
+
+        service = VendorProposalService(test_db, company_id=sample_company.id)
+        comparison = await service.get_proposal_comparison(sample_deal.id)
+        items = {p.id: p for p in comparison.proposals}
+
+        assert comparison.base_currency == "AED"
+        assert items[quick.id].normalized_total_price == 91812.5
+        assert items[quick.id].is_best_price and not items[premium.id].is_best_price
+        assert comparison.best_price == 91812.5 and comparison.worst_price == 95000.0
+        assert items[quick.id].payment_days == 42.0
+        assert items[quick.id].rank == 1
+        assert [p.rank for p in sorted(comparison.proposals, key=lambda p: -p.score)] == [1, 2, 3]
+
+        assert len(comparison.lines) == 1
+        assert comparison.lines[0].best_unit_price == 918.125
+        assert comparison.lines[0].best_proposal_id == quick.id
+        assert items[premium.id].line_unit_prices == [920.0]
+        assert items[quick.id].lines_best == 1
+        assert items[sample_vendor_proposals[0].id].line_unit_prices == [None]
+
+    @pytest.mark.asyncio
+    async def test_reweighting_and_cache_invalidation(
+        self, test_db, sample_company, sample_deal, sample_vendor_proposals
+    ):
+        """Weights change the ranking without a reload; a committed change reloads the deal."""
+        from app.services import metrics
+
+        cheapest, fastest = sample_vendor_proposals[2], sample_vendor_proposals[1]
+        await test_db.commit()
+        service = VendorProposalService(test_db, company_id=sample_company.id)
+        by_price = await service.get_proposal_comparison(sample_deal.id, weights={
+            "price": 1, "lead_time": 0, "credibility": 0, "spec_match": 0, "payment_terms": 0,
+        })
+        by_lead = await service.get_proposal_comparison(sample_deal.id, weights={"price": 0, "lead_time": 5})
+        assert by_price.weights == {"price": 1.0}
+        assert next(p for p in by_price.proposals if p.rank == 1).id == cheapest.id
+        assert next(p for p in by_lead.proposals if p.rank == 1).id == fastest.id
+        assert metrics.get_count("proposal_comparison.hits") >= 1
+
+        with pytest.raises(ValueError):
+            await service.get_proposal_comparison(sample_deal.id, weights={"delivery": 1})
+
+        # Flushed but uncommitted changes are read from the database
+        fastest.total_price = 50000.0
+        await test_db.flush()
+        comparison = await service.get_proposal_comparison(sample_deal.id)
+        assert comparison.best_price == 50000.0
+        await test_db.commit()
+        comparison = await service.get_proposal_comparison(sample_deal.id)
+        assert comparison.best_price == 50000.0
+
+    def test_payment_days(self):
+        """Payment terms are read as days of credit."""
+        from app.services.proposal_comparison import payment_days
+
+        assert payment_days("Net 30") == 30
+        assert payment_days("100% advance") == 0
+        assert payment_days("LC at sight") == 0
+        assert payment_days("30% advance, balance within 60 days") == 42
+        assert payment_days("50% net 30, 50% net 90") == 60
+        assert payment_days("to be agreed") is None
+        assert payment_days(None) is None
+
+
 class TestVendorProposalAPI:
     """Test vendor and proposal API endpoints."""
 
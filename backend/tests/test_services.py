@@ -1,11 +1,32 @@
 """Tests for service layer."""
+import gzip
+import json
 import pytest
+from datetime import datetime, timezone
+from unittest.mock import Mock
 from uuid import uuid4
 
+from fastapi import HTTPException
+from sqlalchemy import event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.config import settings
+from app.models.activity_log import ActivityLog
 from app.models.deal import Deal, DealStatus
+from app.models.sequence_counter import SequenceCounter
 from app.schemas.deal import DealCreate, DealUpdate, DealListResponse
+from app.schemas.quote import QuoteCreate
+from app.schemas.vendor_proposal import VendorProposalCreate
 from app.services.deal import DealService, VALID_STATUS_TRANSITIONS
-from app.services.activity_log import ActivityLogService
+from app.services import metrics
+from app.services.activity_log import ActivityLogService, start_audit_writer, stop_audit_writer
+from app.services.audit_retention import maintain_activity_log
+from app.services.counts import TotalMode
+from app.services.pagination import Cursor, next_cursor
+from app.services.quote import QuoteService
+from app.services.sequence import next_number
+from app.services.vendor_proposal import VendorProposalService
+from app.deps import get_cursor
 
 
 @pytest.mark.asyncio
@@ -286,3 +307,268 @@ async def test_compute_changes():
     assert any(c.field == "description" for c in changes)
     assert any(c.field == "total_value" for c in changes)
     assert not any(c.field == "status" for c in changes)  # Unchanged
+
+
+@pytest.mark.asyncio
+async def test_list_deals_cursor_pages(test_db, sample_company, sample_deals):
+    """Cursor pages cover every deal once, even when created_at ties."""
+    service = DealService(test_db, company_id=sample_company.id)
+
+    seen = []
+    cursor = None
+    while True:
+        response = await service.list_deals(limit=3, cursor=cursor)
+        seen.extend(deal.id for deal in response.deals)
+        if response.next_cursor is None:
+            break
+        cursor = Cursor.decode(response.next_cursor)
+
+    offset_page = await service.list_deals(skip=0, limit=50)
+    assert seen == [deal.id for deal in offset_page.deals]
+    assert sorted(seen) == sorted(deal.id for deal in sample_deals)
+
+
+@pytest.mark.asyncio
+async def test_deal_activity_cursor_pages(test_db, sample_company, sample_deal):
+    """Activity logs page by cursor newest first."""
+    service = DealService(test_db, company_id=sample_company.id)
+    for i in range(3):
+        await service.update_deal(sample_deal.id, DealUpdate(description=f"Update {i}"))
+
+    logs_service = service.activity_log_service
+    first, total = await logs_service.get_deal_activity_logs(sample_deal.id, limit=2)
+    rest, _ = await logs_service.get_deal_activity_logs(
+        sample_deal.id, limit=2, cursor=Cursor.decode(next_cursor(first, 2))
+    )
+
+    assert total == 3
+    assert len(first) == 2 and len(rest) == 1
+    assert not {log.id for log in first} & {log.id for log in rest}
+
+
+def test_cursor_round_trip():
+    """Cursors decode to what they encoded; garbage is rejected."""
+    cursor = Cursor(datetime(2026, 10, 16, 12, 30, 1, 250000, tzinfo=timezone.utc), uuid4())
+    assert Cursor.decode(cursor.encode()) == cursor
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_cursor("not-a-cursor")
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_deals_without_total(test_db, sample_company, sample_deals):
+    """include_total=false skips the count."""
+    service = DealService(test_db, company_id=sample_company.id)
+
+    response = await service.list_deals(limit=2, include_total=TotalMode.NONE)
+
+    assert response.total is None
+    assert len(response.deals) == 2
+
+
+@pytest.mark.asyncio
+async def test_estimated_total_follows_creates_and_deletes(test_db, sample_company, sample_deals):
+    """Estimated totals are counted once, then adjusted as deals come and go."""
+    service = DealService(test_db, company_id=sample_company.id)
+    estimate = TotalMode.ESTIMATE
+
+    assert (await service.list_deals(include_total=estimate)).total == 4
+    assert (await service.list_deals(status=DealStatus.SOURCING, include_total=estimate)).total == 1
+
+    # Rows written behind the ORM's back aren't seen: the count is cached
+    await test_db.execute(insert(Deal).values(
+        id=uuid4(), company_id=sample_company.id, deal_number="RAW-001",
+        description="Raw insert", status=DealStatus.RFQ_RECEIVED, currency="AED", line_items=[],
+    ))
+    await test_db.commit()
+    assert (await service.list_deals(include_total=estimate)).total == 4
+
+    created = await service.create_deal(DealCreate(
+        deal_number="NEW-001", description="New deal", customer_rfq_ref="RFQ-NEW",
+    ))
+    await test_db.commit()
+    assert (await service.list_deals(include_total=estimate)).total == 5
+
+    await service.delete_deal(created.id)
+    await test_db.commit()
+    assert (await service.list_deals(include_total=estimate)).total == 4
+
+    # A status change drops the status-filtered count instead of adjusting it
+    sourcing = next(deal for deal in sample_deals if deal.status == DealStatus.SOURCING)
+    await service.update_deal_status(sourcing.id, DealStatus.QUOTED)
+    await test_db.commit()
+    assert (await service.list_deals(status=DealStatus.SOURCING, include_total=estimate)).total == 0
+    assert (await service.list_deals(include_total=TotalMode.EXACT)).total == 5
+
+
+@pytest.mark.asyncio
+async def test_deal_numbers_continue_from_history(test_db, sample_company):
+    """The counter starts after the highest number already issued."""
+    service = DealService(test_db, company_id=sample_company.id)
+    test_db.add(Deal(
+        company_id=sample_company.id, deal_number="DEAL-041", description="Legacy",
+        status=DealStatus.RFQ_RECEIVED, deleted_at=datetime.now(timezone.utc),
+    ))
+    await test_db.flush()
+
+    first = await service.create_deal(DealCreate(description="First"))
+    second = await service.create_deal(DealCreate(description="Second"))
+    await service.create_deal(DealCreate(deal_number="DEAL-050", description="By hand"))
+    third = await service.create_deal(DealCreate(description="Third"))
+
+    assert [first.deal_number, second.deal_number, third.deal_number] == [
+        "DEAL-042", "DEAL-043", "DEAL-051",
+    ]
+    counter = await test_db.get(SequenceCounter, (sample_company.id, "DEAL-"))
+    assert counter.value == 51
+
+
+@pytest.mark.asyncio
+async def test_deal_numbers_from_leased_blocks(test_db, sample_company, monkeypatch):
+    """With SEQUENCE_BLOCK_SIZE > 1 numbers come from blocks leased in their own transaction."""
+    monkeypatch.setattr(settings, "SEQUENCE_BLOCK_SIZE", 10)
+    await test_db.commit()
+
+    numbers = [
+        await next_number(test_db, Deal.deal_number, sample_company.id, "DEAL-")
+        for _ in range(12)
+    ]
+    await test_db.rollback()
+
+    assert numbers == list(range(1, 13))
+    # Both leases were committed, whatever happens to the caller's transaction
+    counter = await test_db.get(SequenceCounter, (sample_company.id, "DEAL-"))
+    assert counter.value == 20
+
+
+def _count_activity_inserts(test_db) -> list:
+    """Record INSERTs into activity_log on the test engine."""
+    statements = []
+
+    @event.listens_for(test_db.bind.sync_engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO activity_log"):
+            statements.append(statement)
+
+    return statements
+
+
+@pytest.mark.asyncio
+async def test_activity_logs_written_in_one_insert_at_commit(test_db, sample_company, sample_deal):
+    """A unit of work's audit entries are buffered and inserted together."""
+    inserts = _count_activity_inserts(test_db)
+    service = DealService(test_db, company_id=sample_company.id)
+
+    await service.update_deal(sample_deal.id, DealUpdate(description="Changed"))
+    await service.update_deal_status(sample_deal.id, DealStatus.SOURCING)
+    await service.update_deal(sample_deal.id, DealUpdate(notes="Noted"))
+    assert inserts == []
+
+    await test_db.commit()
+    assert len(inserts) == 1
+    logs, total = await service.activity_log_service.get_deal_activity_logs(sample_deal.id)
+    assert total == 3
+    assert [log.action for log in logs] == ["updated", "status_changed", "updated"][::-1]
+
+
+@pytest.mark.asyncio
+async def test_activity_log_background_writer(test_db, sample_company, sample_deal, monkeypatch):
+    """The background writer batches committed entries; more than it can hold are written inline."""
+    monkeypatch.setattr(settings, "AUDIT_LOG_WRITER", "background")
+    monkeypatch.setattr(settings, "AUDIT_LOG_MAX_PENDING", 2)
+    monkeypatch.setattr("app.services.activity_log._writer", None)
+    await test_db.commit()
+    inline_before = metrics.get_count("audit_log.inline_writes")
+    batches_before = metrics.get_count("audit_log.batches")
+    start_audit_writer(async_sessionmaker(test_db.bind, expire_on_commit=False))
+    service = DealService(test_db, company_id=sample_company.id)
+    try:
+        await service.update_deal(sample_deal.id, DealUpdate(description="Queued"))
+        await test_db.commit()
+
+        # Three entries are more than the writer may hold: written inline
+        for i in range(3):
+            await service.update_deal(sample_deal.id, DealUpdate(notes=f"Inline {i}"))
+        await test_db.commit()
+    finally:
+        await stop_audit_writer()
+
+    assert metrics.get_count("audit_log.inline_writes") - inline_before == 1
+    assert metrics.get_count("audit_log.batches") - batches_before == 1
+    _, total = await service.activity_log_service.get_deal_activity_logs(sample_deal.id)
+    assert total == 4
+
+
+@pytest.mark.asyncio
+async def test_deal_timeline_merges_child_entities(test_db, sample_company, sample_deal, sample_customer, sample_vendor):
+    """Quote and vendor proposal events are on their deal's timeline, newest first."""
+    company_id = sample_company.id
+    await QuoteService(test_db, company_id=company_id).create_quote(
+        QuoteCreate(customer_id=sample_customer.id, deal_id=sample_deal.id, title="Pipes", total_amount=100.0)
+    )
+    proposal_service = VendorProposalService(test_db, company_id=company_id)
+    proposal = await proposal_service.create_proposal(
+        VendorProposalCreate(vendor_id=sample_vendor.id, deal_id=sample_deal.id)
+    )
+    await proposal_service.select_vendor(proposal.id)
+    await test_db.commit()
+
+    service = ActivityLogService(test_db, company_id=company_id)
+    events, total = await service.get_deal_timeline(sample_deal.id, include_total=TotalMode.EXACT)
+    assert {(e.entity_type, e.action) for e in events} == {
+        ("vendor_proposal", "status_changed"),
+        ("vendor_proposal", "created"),
+        ("quote", "created"),
+        ("deal", "auto_status_changed"),
+    }
+    # Newest first (SQLite sorts on milliseconds, then id)
+    millis = [e.created_at.replace(microsecond=e.created_at.microsecond // 1000 * 1000) for e in events]
+    assert millis == sorted(millis, reverse=True)
+    assert total == 4
+
+    proposals, total = await service.get_deal_timeline(sample_deal.id, entity_types=["vendor_proposal"])
+    assert sorted(e.action for e in proposals) == ["created", "status_changed"]
+    assert total is None
+
+    first, _ = await service.get_deal_timeline(sample_deal.id, limit=3)
+    rest, _ = await service.get_deal_timeline(sample_deal.id, limit=3, cursor=Cursor.decode(next_cursor(first, 3)))
+    assert [e.id for e in first + rest] == [e.id for e in events]
+
+
+@pytest.mark.asyncio
+async def test_activity_log_months_past_retention_are_archived(test_db, sample_company, monkeypatch):
+    """Months older than AUDIT_LOG_HOT_MONTHS move to object storage, one gzipped JSONL per tenant."""
+    monkeypatch.setattr(settings, "AUDIT_LOG_HOT_MONTHS", 12)
+
+    def entry(created_at):
+        return {
+            "id": uuid4(), "company_id": sample_company.id, "deal_id": uuid4(), "action": "updated",
+            "entity_type": "deal", "entity_id": uuid4(), "changes": [], "created_at": created_at,
+        }
+
+    await test_db.execute(insert(ActivityLog), [
+        entry(datetime(2025, 1, 20, tzinfo=timezone.utc)),
+        entry(datetime(2025, 1, 10, tzinfo=timezone.utc)),
+        entry(datetime(2025, 3, 5, tzinfo=timezone.utc)),
+        entry(datetime(2026, 9, 1, tzinfo=timezone.utc)),
+    ])
+    await test_db.commit()
+
+    uploads = {}
+
+    async def upload(stream, storage_key, **kwargs):
+        uploads[storage_key] = gzip.decompress(stream.read())
+
+    storage = Mock(upload_object_async=upload)
+    summary = await maintain_activity_log(
+        async_sessionmaker(test_db.bind, expire_on_commit=False), storage,
+        now=datetime(2026, 10, 16, tzinfo=timezone.utc),
+    )
+
+    assert summary["months_archived"] == ["2025-01", "2025-03"]
+    assert summary["rows_archived"] == 3
+    january = [json.loads(line) for line in uploads[f"activity-log-archive/2025-01/{sample_company.id}.jsonl.gz"].splitlines()]
+    assert [row["created_at"][:10] for row in january] == ["2025-01-10", "2025-01-20"]
+    remaining = (await test_db.execute(select(ActivityLog.created_at))).scalars().all()
+    assert len(remaining) == 1
@@ -1,9 +1,22 @@
 """Tests for Storage Service - MinIO operations."""
+import hashlib
+import io
+
 import pytest
 from unittest.mock import patch, Mock
 from uuid import uuid4
 
-from app.services.storage import StorageService
+from minio.error import S3Error
+
+from app.services.storage import (
+    MIN_PART_SIZE,
+    StorageService,
+    UploadReader,
+    UploadTooLargeError,
+    close_storage_service,
+    get_storage_service,
+    verify_storage,
+)
 
 
 class TestStorageService:
@@ -195,3 +208,94 @@ class TestStorageService:
 
         # Both should have same company_id prefix
         assert key1.split('/')[0] == key2.split('/')[0]
+
+    def test_upload_stream_uses_multipart_upload(self, storage_service):
+        """Test streaming a file object of unknown length."""
+        company_id = uuid4()
+        reader = UploadReader(io.BytesIO(b"streamed content"), max_size=1024)
+
+        storage_key = storage_service.upload_stream(
+            reader,
+            filename="big.pdf",
+            company_id=company_id,
+            content_type="application/pdf",
+        )
+
+        assert storage_key.startswith(str(company_id))
+        assert storage_key.endswith("_big.pdf")
+        call_args = storage_service.client.put_object.call_args
+        assert call_args.kwargs['data'] is reader
+        assert call_args.kwargs['length'] == -1
+        assert call_args.kwargs['part_size'] == MIN_PART_SIZE
+
+
+    def test_ensure_bucket_exists_creates_missing_bucket(self, storage_service):
+        """Test the bucket is created once and marked verified."""
+        storage_service.client.bucket_exists.return_value = False
+
+        storage_service.ensure_bucket_exists()
+
+        storage_service.client.make_bucket.assert_called_once_with("documents")
+        assert storage_service.bucket_verified
+
+    @pytest.mark.asyncio
+    async def test_async_wrappers_delegate(self, storage_service):
+        """Test the async wrappers run the blocking calls."""
+        storage_service.client.get_object.return_value = Mock(read=lambda: b"data", close=lambda: None)
+
+        assert await storage_service.download_file_async("k") == b"data"
+        await storage_service.delete_file_async("k")
+
+        storage_service.client.remove_object.assert_called_once_with(bucket_name="documents", object_name="k")
+
+
+class TestSharedStorageService:
+    """Test the process-wide storage service."""
+
+    def test_get_storage_service_is_shared(self):
+        """Test every caller gets the same client until it is closed."""
+        first = get_storage_service()
+        assert get_storage_service() is first
+
+        close_storage_service()
+        assert get_storage_service() is not first
+
+    @pytest.mark.asyncio
+    async def test_verify_storage_checks_bucket(self):
+        """Test the startup check verifies the bucket."""
+        storage = get_storage_service()
+
+        assert await verify_storage() is True
+        storage.client.bucket_exists.assert_called_once_with("documents")
+
+    @pytest.mark.asyncio
+    async def test_verify_storage_tolerates_errors(self):
+        """Test MinIO being down doesn't stop startup."""
+        storage = get_storage_service()
+        storage.client.bucket_exists.side_effect = S3Error("Err", "down", "", "", "", Mock())
+
+        assert await verify_storage() is False
+        assert not storage.bucket_verified
+
+class TestUploadReader:
+    """Test hashing and size limiting of streamed uploads."""
+
+    def test_hashes_and_counts_bytes(self):
+        """Test the hash and size match the bytes read."""
+        content = b"x" * 3000
+        reader = UploadReader(io.BytesIO(content), max_size=4096)
+
+        while reader.read(1024):
+            pass
+
+        assert reader.size == 3000
+        assert reader.hexdigest() == hashlib.sha256(content).hexdigest()
+
+    def test_rejects_oversized_stream(self):
+        """Test reading past max_size raises before the data is passed on."""
+        reader = UploadReader(io.BytesIO(b"x" * 3000), max_size=2048)
+
+        reader.read(1024)
+        reader.read(1024)
+        with pytest.raises(UploadTooLargeError):
+            reader.read(1024)
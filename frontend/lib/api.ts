@@ -54,6 +54,7 @@ import {
   DocumentCategory,
   DocumentListResponse,
   DocumentDownloadUrlResponse,
+  DocumentStatusResponse,
 } from "./types/document"
 
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"
@@ -471,6 +472,14 @@ export const documentApi = {
   get: (documentId: string) =>
     axiosInstance.get<Document>(`/api/documents/${documentId}`),
 
+  /**
+   * Poll processing status of an uploaded document
+   */
+  getStatus: (documentId: string) =>
+    axiosInstance.get<DocumentStatusResponse>(
+      `/api/documents/${documentId}/status`
+    ),
+
   /**
    * Get presigned download URL
    */
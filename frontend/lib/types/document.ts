@@ -23,6 +23,8 @@ export enum DocumentStatus {
   FAILED = "failed",
 }
 
+export type DocumentProcessingStage = "queued" | "parse" | "ocr" | "extract";
+
 export interface Document {
   id: string;
   company_id: string;
@@ -37,6 +39,7 @@ export interface Document {
   extracted_text?: string; // May be large, excluded from list responses
   parsed_data?: Record<string, unknown> | null;
   status: DocumentStatus;
+  processing_stage?: DocumentProcessingStage | null;
   ai_confidence_score?: number | null;
   error_message?: string | null;
   description?: string | null;
@@ -57,6 +60,7 @@ export interface DocumentListItem {
   mime_type: string;
   parsed_data?: Record<string, unknown> | null;
   status: DocumentStatus;
+  processing_stage?: DocumentProcessingStage | null;
   ai_confidence_score?: number | null;
   error_message?: string | null;
   description?: string | null;
@@ -65,6 +69,15 @@ export interface DocumentListItem {
   updated_at: string;
 }
 
+export interface DocumentStatusResponse {
+  id: string;
+  status: DocumentStatus;
+  processing_stage?: DocumentProcessingStage | null;
+  ai_confidence_score?: number | null;
+  error_message?: string | null;
+  updated_at: string;
+}
+
 export interface DocumentListResponse {
   items: DocumentListItem[];
   total: number;